@@ -49,6 +49,7 @@ module "apprunner" {
     ENVIRONMENT            = var.environment_name
     SERVICE_NAME           = local.service_name
     ENABLE_XRAY_TRACING    = var.enable_observability ? "true" : "false"
+    RATE_LIMIT_BACKEND     = "dynamodb"
   }
   env_secret_arns = {
     AUTH0_ISSUER   = module.auth0_secrets.auth0_issuer_secret_arn
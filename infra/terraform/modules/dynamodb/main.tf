@@ -17,6 +17,49 @@ resource "aws_dynamodb_table" "this" {
     name = "SK"
     type = "S"
   }
+
+  attribute {
+    name = "GSI1PK"
+    type = "S"
+  }
+
+  attribute {
+    name = "GSI1SK"
+    type = "S"
+  }
+
+  attribute {
+    name = "GSI2PK"
+    type = "S"
+  }
+
+  attribute {
+    name = "GSI2SK"
+    type = "S"
+  }
+
+  # Dos in user order: GSI1PK = DECK#<deckId>, GSI1SK = POS#<position>#<doId>.
+  global_secondary_index {
+    name            = "GSI1"
+    hash_key        = "GSI1PK"
+    range_key       = "GSI1SK"
+    projection_type = "ALL"
+  }
+
+  # Sparse status index over active dos only: GSI2PK = DECK#<deckId>#OPEN|DONE,
+  # GSI2SK = <createdAt>#<doId>. Archived dos drop their GSI2 keys.
+  global_secondary_index {
+    name            = "GSI2"
+    hash_key        = "GSI2PK"
+    range_key       = "GSI2SK"
+    projection_type = "ALL"
+  }
+
+  # Short-lived items (rate-limit buckets, clone jobs) carry an epoch-seconds expiry.
+  ttl {
+    attribute_name = "expiresAt"
+    enabled        = true
+  }
 }
 
 output "table_name" {
@@ -0,0 +1,114 @@
+"""``POST /v1/batch``: several deck calls in one round-trip.
+
+The caller is authenticated once for the whole batch; each sub-request is
+dispatched in process through the app's router with that identity, so it
+runs the same route, validation and access checks as a direct call. Every
+sub-request still takes a rate-limit token and the batch shares one request
+deadline, which bounds the work a single batch can ask for.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from ...deadline import UNBOUNDED_PATH_SUFFIXES
+from ...dependencies import BATCH_USER_SCOPE_KEY, AuthContext
+from ...profiling import ProfiledRoute
+from ...ratelimit import enforce_rate_limit
+from ...schemas import BatchRequest, BatchResponse, BatchSubRequest, BatchSubResponse
+from ...settings import settings
+
+router = APIRouter(prefix="/v1/batch", tags=["batch"], route_class=ProfiledRoute)
+
+BATCH_PATH_PREFIX = "/v1/decks"
+
+logger = logging.getLogger(__name__)
+
+
+def _supported(path: str) -> bool:
+    # Streaming export/import bodies do not fit a JSON envelope.
+    return (path == BATCH_PATH_PREFIX or path.startswith(BATCH_PATH_PREFIX + "/")) and not path.endswith(
+        UNBOUNDED_PATH_SUFFIXES
+    )
+
+
+async def _dispatch(request: Request, user: AuthContext, sub: BatchSubRequest) -> BatchSubResponse:
+    target = urlsplit(sub.path)
+    if target.scheme or target.netloc or not _supported(target.path):
+        return BatchSubResponse(id=sub.id, status=status.HTTP_400_BAD_REQUEST, body={"detail": "unsupported_path"})
+
+    payload = b"" if sub.body is None else json.dumps(sub.body).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+    scope: Dict[str, Any] = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": sub.method,
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": "",
+        "path": target.path,
+        "raw_path": target.path.encode(),
+        "query_string": target.query.encode(),
+        "headers": headers,
+        "app": request.scope.get("app"),
+        "state": {},
+        BATCH_USER_SCOPE_KEY: user,
+    }
+    if "starlette.exception_handlers" in request.scope:
+        scope["starlette.exception_handlers"] = request.scope["starlette.exception_handlers"]
+
+    sent = False
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    result: Dict[str, Any] = {"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "body": []}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            result["body"].append(message.get("body", b""))
+
+    try:
+        await request.app.router(scope, receive, send)
+    except Exception:
+        logger.exception("Unhandled error in batch sub-request %s %s", sub.method, target.path)
+        return BatchSubResponse(id=sub.id, status=status.HTTP_500_INTERNAL_SERVER_ERROR, body={"error": "internal_error"})
+
+    raw = b"".join(result["body"])
+    body: Optional[Any] = None
+    if raw:
+        try:
+            body = json.loads(raw)
+        except ValueError:
+            body = raw.decode(errors="replace")
+    return BatchSubResponse(id=sub.id, status=result["status"], body=body)
+
+
+@router.post("", response_model=BatchResponse)
+async def batch_endpoint(payload: BatchRequest, request: Request, user: AuthContext = Depends(enforce_rate_limit)):
+    """Run up to ``BATCH_MAX_REQUESTS`` deck calls concurrently; responses keep the request order."""
+    if len(payload.requests) > settings.batch_max_requests:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="batch_too_large")
+
+    limit = asyncio.Semaphore(max(1, settings.batch_concurrency))
+
+    async def run(sub: BatchSubRequest) -> BatchSubResponse:
+        async with limit:
+            return await _dispatch(request, user, sub)
+
+    responses: List[BatchSubResponse] = await asyncio.gather(*(run(sub) for sub in payload.requests))
+    return BatchResponse(responses=responses)
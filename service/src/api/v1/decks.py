@@ -1,65 +1,182 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
-
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Union
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+
+from ...coalesce import get_coalescer
 from ...dependencies import AuthContext, get_current_user
+from ...jobs import get_job_runner
+from ...profiling import ProfiledRoute
+from ...ratelimit import enforce_rate_limit
 from ...repository import (
     CollaboratorNotFoundError,
+    ConcurrentUpdateError,
     DuplicateCollaboratorError,
+    InvalidCursorError,
+    JobInProgressError,
+    LAYOUT_ATTRIBUTES,
+    RepositoryError,
     add_collaborator,
+    add_collaborators,
+    adjacent_do,
+    archive_cutoff,
+    archive_dos,
     batch_load_decks,
+    clone_deck,
+    collaborator_count,
     create_deck,
     delete_deck,
+    display_order,
     get_deck,
+    get_deck_with_dos,
     get_do,
+    import_dos,
+    is_archivable,
+    is_collaborator,
+    iter_deck_export,
     list_access_rows,
+    list_archived_dos,
+    list_collaborators,
     list_dos,
+    list_dos_by_status,
+    migrate_collaborators,
+    move_do,
     remove_collaborator,
     rename_deck,
+    run_clone_job,
+    unarchive_do,
     create_do,
     update_do,
     delete_do,
 )
 from ...schemas import (
+    Collaborator,
     CollaboratorAddRequest,
+    CollaboratorBatchRequest,
+    CollaboratorBatchResponse,
+    CollaboratorBatchResult,
+    CollaboratorPage,
+    DeckCloneRequest,
     DeckCreateRequest,
     DeckDetail,
+    DeckDetailWithDos,
+    DeckImportDeckRecord,
+    DeckImportDoRecord,
+    DeckImportResponse,
     DeckRenameRequest,
     DeckSummary,
     DoCreateRequest,
     DoItem,
+    DoMoveRequest,
+    DoPage,
     DoUpdateRequest,
+    JobStatus,
+)
+from ...positions import key_between, validate as validate_position
+from ...session import consistent_deck, consistent_lists
+from ...settings import settings
+from .fields import DECK_DETAIL, DECK_SUMMARY, DO_ITEM, Values
+
+router = APIRouter(
+    prefix="/v1/decks",
+    tags=["decks"],
+    dependencies=[Depends(enforce_rate_limit)],
+    route_class=ProfiledRoute,
 )
-
-router = APIRouter(prefix="/v1/decks", tags=["decks"])
 
 
-def _collaborator_list(deck: Dict) -> List[str]:
-    collaborators = deck.get("collaborators") or {}
-    return sorted(collaborators.keys())
+def _collaborator_preview(deck: Dict, *, consistent: bool = False) -> List[str]:
+    # Detail views carry only the first page; the full list is paginated
+    # through GET /{deck_id}/collaborators.
+    if not collaborator_count(deck):
+        return []
+    items, _ = list_collaborators(
+        deck["deckId"],
+        limit=settings.collaborator_preview_limit,
+        consistent=consistent,
+    )
+    return [item["email"] for item in items]
+
+
+# Field values are computed lazily so sparse responses skip what they leave out
+# (the collaborator preview query, for one).
+def _summary_values(deck: Dict, user: AuthContext) -> Values:
+    return {
+        "deckId": lambda: deck["deckId"],
+        "name": lambda: deck["name"],
+        "isOwner": lambda: deck["ownerSub"] == user.sub,
+        "collaborators": lambda: collaborator_count(deck),
+    }
+
+
+def _detail_values(deck: Dict, user: AuthContext, *, consistent: bool = False) -> Values:
+    return {
+        "deckId": lambda: deck["deckId"],
+        "name": lambda: deck["name"],
+        "isOwner": lambda: deck["ownerSub"] == user.sub,
+        "ownerSub": lambda: deck["ownerSub"],
+        "collaborators": lambda: _collaborator_preview(deck, consistent=consistent),
+        "collaboratorCount": lambda: collaborator_count(deck),
+        "createdAt": lambda: deck["createdAt"],
+        "updatedAt": lambda: deck["updatedAt"],
+    }
+
+
+def _do_values(item: Dict) -> Values:
+    return {
+        "doId": lambda: item["doId"],
+        "deckId": lambda: item["deckId"],
+        "text": lambda: item["text"],
+        "completed": lambda: item.get("completed", False),
+        "position": lambda: item.get("position"),
+        "createdAt": lambda: item["createdAt"],
+        "updatedAt": lambda: item["updatedAt"],
+        "completedAt": lambda: item.get("completedAt"),
+        "archivedAt": lambda: item.get("archivedAt"),
+        "dueAt": lambda: item.get("dueAt"),
+    }
 
 
 def _deck_to_summary(deck: Dict, user: AuthContext) -> DeckSummary:
-    return DeckSummary(
-        deckId=deck["deckId"],
-        name=deck["name"],
-        isOwner=deck["ownerSub"] == user.sub,
-        collaborators=len(_collaborator_list(deck)),
-    )
+    return DECK_SUMMARY.build(_summary_values(deck, user))
 
 
-def _deck_to_detail(deck: Dict, user: AuthContext) -> DeckDetail:
-    return DeckDetail(
-        deckId=deck["deckId"],
-        name=deck["name"],
-        isOwner=deck["ownerSub"] == user.sub,
-        ownerSub=deck["ownerSub"],
-        collaborators=_collaborator_list(deck),
-        createdAt=deck["createdAt"],
-        updatedAt=deck["updatedAt"],
-    )
+def _deck_to_detail(deck: Dict, user: AuthContext, *, consistent: bool = False) -> DeckDetail:
+    return DECK_DETAIL.build(_detail_values(deck, user, consistent=consistent))
+
+
+def _do_to_item(item: Dict) -> DoItem:
+    return DO_ITEM.build(_do_values(item))
+
+
+def _utc_iso(value: datetime) -> str:
+    # Client timestamps (due dates, imported times) are stored in UTC at whole seconds so they compare as strings.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+def _archive_partial_dos(items: List[Dict]) -> None:
+    # Projected items are re-read whole before they are copied into ARCHIVE#.
+    archive_dos([full for full in (get_do(item["deckId"], item["doId"]) for item in items) if full])
+
+
+def _active_dos(items: List[Dict], background_tasks: BackgroundTasks, *, partial: bool = False) -> List[Dict]:
+    """Drop completed dos past the archive age and archive them after the response."""
+    cutoff = archive_cutoff()
+    stale = [item for item in items if is_archivable(item, cutoff)]
+    if not stale:
+        return items
+    background_tasks.add_task(_archive_partial_dos if partial else archive_dos, stale)
+    return [item for item in items if not is_archivable(item, cutoff)]
 
 
 def _ensure_access(deck: Dict, user: AuthContext, *, require_owner: bool = False):
@@ -68,8 +185,7 @@ def _ensure_access(deck: Dict, user: AuthContext, *, require_owner: bool = False
     if require_owner:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="owner_only")
     email = user.require_email()
-    collaborators = deck.get("collaborators") or {}
-    if email not in collaborators:
+    if not is_collaborator(deck, email):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
 
 
@@ -77,6 +193,7 @@ def _ensure_access(deck: Dict, user: AuthContext, *, require_owner: bool = False
 def list_decks_endpoint(
     search: Optional[str] = Query(None),
     visibility: str = Query("all", pattern="^(mine|shared|all)$"),
+    fields: Optional[str] = Query(None),
     user: AuthContext = Depends(get_current_user),
 ):
     if visibility not in {"mine", "shared", "all"}:
@@ -85,18 +202,19 @@ def list_decks_endpoint(
     if visibility in {"shared", "all"}:
         user.require_email()
 
-    access_rows = list_access_rows(user.sub, user.email if user.email_verified else None, visibility, search)
-    deck_map = batch_load_decks(row["deckId"] for row in access_rows)
-
-    summaries: List[DeckSummary] = []
-    for row in access_rows:
-        deck = deck_map.get(row["deckId"])
-        if not deck:
-            continue
-        summaries.append(_deck_to_summary(deck, user))
+    selected = DECK_SUMMARY.parse(fields)
+    consistent = consistent_lists("decks")
+    access_rows = list_access_rows(user.sub, user.email if user.email_verified else None, visibility, search, consistent)
+    deck_map = batch_load_decks(
+        (row["deckId"] for row in access_rows), attributes=DECK_SUMMARY.attributes(selected), consistent=consistent
+    )
 
-    summaries.sort(key=lambda d: (not d.isOwner, d.name.lower()))
-    return {"items": summaries}
+    # Owned decks first, then by name; access rows carry both.
+    access_rows.sort(key=lambda row: (row.get("access") != "owner", row["nameLower"]))
+    decks = [deck_map[row["deckId"]] for row in access_rows if row["deckId"] in deck_map]
+    if selected is not None:
+        return JSONResponse({"items": [DECK_SUMMARY.render(_summary_values(deck, user), selected) for deck in decks]})
+    return {"items": [_deck_to_summary(deck, user) for deck in decks]}
 
 
 @router.post("", response_model=DeckDetail, status_code=status.HTTP_201_CREATED)
@@ -108,18 +226,213 @@ def create_deck_endpoint(
     return _deck_to_detail(deck, user)
 
 
-def _get_deck_or_404(deck_id: str) -> Dict:
-    deck = get_deck(deck_id)
+async def _ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+        if len(buffer) > settings.import_max_line_bytes:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="line_too_long")
+    if buffer:
+        yield buffer
+
+
+def _parse_import_line(line: bytes, line_no: int, model):
+    try:
+        record = model.model_validate(json.loads(line))
+        if getattr(record, "position", None):
+            validate_position(record.position)
+        return record
+    except (ValueError, ValidationError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "invalid_record", "line": line_no},
+        )
+
+
+@router.post("/import", response_model=DeckImportResponse, status_code=status.HTTP_201_CREATED)
+async def import_deck_endpoint(request: Request, user: AuthContext = Depends(get_current_user)):
+    started = time.perf_counter()
+    flush_size = 25 * settings.batch_write_concurrency
+    deck: Optional[Dict] = None
+    pending: List[Dict] = []
+    in_flight: Optional[asyncio.Future] = None
+    imported = 0
+    line_no = 0
+    # Dos keep their exported position; records without one follow the last seen, in file order.
+    position: Optional[str] = None
+
+    try:
+        async for line in _ndjson_lines(request):
+            line_no += 1
+            if not line.strip():
+                continue
+            if deck is None:
+                record = _parse_import_line(line, line_no, DeckImportDeckRecord)
+                deck = await run_in_threadpool(create_deck, user.sub, record.name)
+                continue
+
+            record = _parse_import_line(line, line_no, DeckImportDoRecord)
+            do_position = record.position or key_between(position, None)
+            position = max(position or do_position, do_position)
+            pending.append(
+                {
+                    "position": do_position,
+                    "text": record.text,
+                    "completed": record.completed,
+                    "createdAt": _utc_iso(record.createdAt) if record.createdAt else None,
+                    "updatedAt": _utc_iso(record.updatedAt) if record.updatedAt else None,
+                    "dueAt": _utc_iso(record.dueAt) if record.dueAt else None,
+                    "archivedAt": _utc_iso(record.archivedAt) if record.archivedAt else None,
+                }
+            )
+            if len(pending) >= flush_size:
+                # Keep one write in flight while the next chunk streams in.
+                if in_flight is not None:
+                    imported += await in_flight
+                in_flight = asyncio.ensure_future(run_in_threadpool(import_dos, deck["deckId"], pending, deck))
+                pending = []
+
+        if deck is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="empty_import")
+        if in_flight is not None:
+            imported += await in_flight
+            in_flight = None
+        if pending:
+            imported += await run_in_threadpool(import_dos, deck["deckId"], pending, deck)
+    except BaseException:
+        if in_flight is not None:
+            await asyncio.gather(in_flight, return_exceptions=True)
+        if deck is not None:
+            await run_in_threadpool(delete_deck, deck)
+        raise
+
+    elapsed = time.perf_counter() - started
+    return DeckImportResponse(
+        deckId=deck["deckId"],
+        name=deck["name"],
+        imported=imported,
+        seconds=round(elapsed, 3),
+        itemsPerSecond=round(imported / elapsed, 1) if elapsed else float(imported),
+    )
+
+
+def _get_deck_or_404(deck_id: str, attributes: Optional[List[str]] = None) -> Dict:
+    # A deck the caller's session just created or changed is read consistently.
+    deck = get_deck(deck_id, consistent=consistent_deck("deck", deck_id), attributes=attributes)
     if not deck:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="deck_not_found")
+    if "collaborators" in deck:
+        migrate_collaborators(deck)
     return deck
 
 
-@router.get("/{deck_id}", response_model=DeckDetail)
-def get_deck_endpoint(deck_id: str, user: AuthContext = Depends(get_current_user)):
+@router.get("/{deck_id}", response_model=Union[DeckDetailWithDos, DeckDetail])
+def get_deck_endpoint(
+    deck_id: str,
+    background_tasks: BackgroundTasks,
+    include: Optional[str] = Query(None, pattern="^dos$"),
+    fields: Optional[str] = Query(None),
+    user: AuthContext = Depends(get_current_user),
+):
+    selected = DECK_DETAIL.parse(fields)
+    consistent = consistent_deck("deck", deck_id)
+    if include != "dos":
+        deck = _get_deck_or_404(deck_id, attributes=DECK_DETAIL.attributes(selected))
+        _ensure_access(deck, user)
+        if selected is not None:
+            return JSONResponse(DECK_DETAIL.render(_detail_values(deck, user, consistent=consistent), selected))
+        return _deck_to_detail(deck, user, consistent=consistent)
+
+    deck, items = get_deck_with_dos(deck_id, consistent=consistent)
+    if not deck:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="deck_not_found")
+    if "collaborators" in deck:
+        migrate_collaborators(deck)
+    _ensure_access(deck, user)
+    dos = [_do_to_item(item) for item in sorted(_active_dos(items, background_tasks), key=display_order)]
+    if selected is not None:
+        # The deck part is sparse; the embedded dos stay whole.
+        detail = DECK_DETAIL.render(_detail_values(deck, user, consistent=consistent), selected)
+        return JSONResponse({**detail, "dos": [item.model_dump(mode="json") for item in dos]})
+    return DeckDetailWithDos(**_deck_to_detail(deck, user, consistent=consistent).model_dump(), dos=dos)
+
+
+def _export_lines(deck_id: str) -> Iterator[bytes]:
+    for item in iter_deck_export(deck_id):
+        if item["SK"] == "DECK":
+            record = {
+                "type": "deck",
+                "deckId": item["deckId"],
+                "name": item["name"],
+                "createdAt": item["createdAt"],
+                "updatedAt": item["updatedAt"],
+            }
+        else:
+            record = {
+                "type": "do",
+                "doId": item["doId"],
+                "position": display_order(item)[0],
+                "text": item["text"],
+                "completed": item.get("completed", False),
+                "createdAt": item["createdAt"],
+                "updatedAt": item["updatedAt"],
+            }
+            if item.get("dueAt"):
+                record["dueAt"] = item["dueAt"]
+            if item["SK"].startswith("ARCHIVE#"):
+                record["archivedAt"] = item["archivedAt"]
+        yield (json.dumps(record) + "\n").encode("utf-8")
+
+
+@router.get("/{deck_id}/export")
+def export_deck_endpoint(deck_id: str, user: AuthContext = Depends(get_current_user)):
     deck = _get_deck_or_404(deck_id)
     _ensure_access(deck, user)
-    return _deck_to_detail(deck, user)
+    return StreamingResponse(
+        _export_lines(deck_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="deck-{deck_id}.ndjson"'},
+    )
+
+
+@router.post(
+    "/{deck_id}:clone",
+    response_model=DeckDetail,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobStatus}},
+)
+def clone_deck_endpoint(
+    deck_id: str,
+    payload: Optional[DeckCloneRequest] = None,
+    user: AuthContext = Depends(get_current_user),
+):
+    """Copy a deck the caller can read into a new deck they own.
+
+    Small decks are copied before responding (201 with the new deck). Larger
+    ones respond 202 with a job to poll at ``/v1/jobs/{jobId}`` while the dos
+    are copied by the job runner, one such job per user at a time (409 while
+    one is running).
+    """
+    source = _get_deck_or_404(deck_id)
+    _ensure_access(source, user)
+    name = payload.name if payload and payload.name else f"{source['name']} (copy)"[:120]
+    try:
+        deck, job = clone_deck(source, user.sub, name)
+    except JobInProgressError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="clone_in_progress")
+    if job is None:
+        return _deck_to_detail(deck, user, consistent=True)
+    # Rendered before the job starts updating its progress on the same dict.
+    response = JSONResponse(
+        JobStatus.model_validate(job).model_dump(mode="json"),
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": f"/v1/jobs/{job['jobId']}"},
+    )
+    get_job_runner().start(run_clone_job, job)
+    return response
 
 
 @router.patch("/{deck_id}", response_model=DeckDetail)
@@ -131,7 +444,7 @@ def rename_deck_endpoint(
     deck = _get_deck_or_404(deck_id)
     _ensure_access(deck, user, require_owner=True)
     updated = rename_deck(deck, payload.name)
-    return _deck_to_detail(updated, user)
+    return _deck_to_detail(updated, user, consistent=True)
 
 
 @router.delete("/{deck_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -157,7 +470,48 @@ def add_collaborator_endpoint(
         updated = add_collaborator(deck, email)
     except DuplicateCollaboratorError:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="collaborator_exists")
-    return _deck_to_detail(updated, user)
+    return _deck_to_detail(updated, user, consistent=True)
+
+
+@router.post("/{deck_id}/collaborators:batch", response_model=CollaboratorBatchResponse)
+def add_collaborators_batch_endpoint(
+    deck_id: str,
+    payload: CollaboratorBatchRequest,
+    user: AuthContext = Depends(get_current_user),
+):
+    deck = _get_deck_or_404(deck_id)
+    _ensure_access(deck, user, require_owner=True)
+    emails = list(dict.fromkeys(email.lower() for email in payload.emails))
+    if len(emails) > settings.collaborator_batch_max:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="batch_too_large")
+
+    outcomes = add_collaborators(deck, [email for email in emails if email != user.email])
+    results = [
+        CollaboratorBatchResult(email=email, status=outcomes.get(email, "cannot_add_self"))
+        for email in emails
+    ]
+    return CollaboratorBatchResponse(results=results, collaboratorCount=collaborator_count(deck))
+
+
+@router.get("/{deck_id}/collaborators", response_model=CollaboratorPage)
+def list_collaborators_endpoint(
+    deck_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    user: AuthContext = Depends(get_current_user),
+):
+    deck = _get_deck_or_404(deck_id)
+    _ensure_access(deck, user)
+    try:
+        items, next_cursor = list_collaborators(
+            deck_id, limit=limit, cursor=cursor, consistent=consistent_deck("deck", deck_id)
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_cursor")
+    return CollaboratorPage(
+        items=[Collaborator(email=item["email"], addedAt=item["addedAt"]) for item in items],
+        nextCursor=next_cursor,
+    )
 
 
 @router.delete("/{deck_id}/collaborators/{email}", status_code=status.HTTP_204_NO_CONTENT)
@@ -177,28 +531,60 @@ def remove_collaborator_endpoint(
 
 
 def _deck_access_for_dos(deck_id: str, user: AuthContext) -> Dict:
-    deck = _get_deck_or_404(deck_id)
+    # Only what the access check (and the lazy collaborator migration) reads.
+    # The do layout rides along so the do queries and writes that follow need no second read.
+    deck = _get_deck_or_404(deck_id, attributes=[*DECK_DETAIL.attributes([]), *LAYOUT_ATTRIBUTES])
     _ensure_access(deck, user)
     return deck
 
 
 @router.get("/{deck_id}/dos", response_model=Dict[str, List[DoItem]])
-def list_dos_endpoint(deck_id: str, user: AuthContext = Depends(get_current_user)):
+def list_dos_endpoint(
+    deck_id: str,
+    background_tasks: BackgroundTasks,
+    completed: Optional[bool] = Query(None),
+    fields: Optional[str] = Query(None),
+    user: AuthContext = Depends(get_current_user),
+):
+    selected = DO_ITEM.parse(fields)
     _deck_access_for_dos(deck_id, user)
-    items = list_dos(deck_id)
-    dos = [
-        DoItem(
-            doId=item["doId"],
-            deckId=item["deckId"],
-            text=item["text"],
-            completed=item.get("completed", False),
-            createdAt=item["createdAt"],
-            updatedAt=item["updatedAt"],
-        )
-        for item in items
-    ]
-    dos.sort(key=lambda d: d.createdAt)
-    return {"items": dos}
+    # The position index returns active dos in user order; with ?completed the
+    # sparse status index returns one status in creation order. Archived dos
+    # live under ARCHIVE# and are listed by GET /{deck_id}/archive.
+    attributes = DO_ITEM.attributes(selected)
+    consistent = consistent_deck("dos", deck_id)
+    if completed is None:
+        items = list_dos(deck_id, attributes=attributes, consistent=consistent)
+    else:
+        items = list_dos_by_status(deck_id, completed, attributes=attributes, consistent=consistent)
+    items = _active_dos(items, background_tasks, partial=selected is not None)
+    if selected is not None:
+        return JSONResponse({"items": [DO_ITEM.render(_do_values(item), selected) for item in items]})
+    return {"items": [_do_to_item(item) for item in items]}
+
+
+@router.get("/{deck_id}/archive", response_model=DoPage)
+def list_archive_endpoint(
+    deck_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    user: AuthContext = Depends(get_current_user),
+):
+    _deck_access_for_dos(deck_id, user)
+    try:
+        items, next_cursor = list_archived_dos(deck_id, limit=limit, cursor=cursor)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_cursor")
+    return DoPage(items=[_do_to_item(item) for item in items], nextCursor=next_cursor)
+
+
+@router.post("/{deck_id}/archive/{do_id}:unarchive", response_model=DoItem)
+def unarchive_do_endpoint(deck_id: str, do_id: str, user: AuthContext = Depends(get_current_user)):
+    _deck_access_for_dos(deck_id, user)
+    restored = unarchive_do(deck_id, do_id)
+    if not restored:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="archived_do_not_found")
+    return _do_to_item(restored)
 
 
 @router.post("/{deck_id}/dos", response_model=DoItem, status_code=status.HTTP_201_CREATED)
@@ -207,46 +593,97 @@ def create_do_endpoint(
     payload: DoCreateRequest,
     user: AuthContext = Depends(get_current_user),
 ):
-    _deck_access_for_dos(deck_id, user)
-    do_item = create_do(deck_id, payload.text)
-    return DoItem(
-        doId=do_item["doId"],
-        deckId=deck_id,
-        text=do_item["text"],
-        completed=do_item["completed"],
-        createdAt=do_item["createdAt"],
-        updatedAt=do_item["updatedAt"],
-    )
+    deck = _deck_access_for_dos(deck_id, user)
+    do_item = create_do(deck_id, payload.text, due_at=_utc_iso(payload.dueAt) if payload.dueAt else None, deck=deck)
+    return _do_to_item(do_item)
 
 
 @router.patch("/{deck_id}/dos/{do_id}", response_model=DoItem)
-def update_do_endpoint(
+async def update_do_endpoint(
     deck_id: str,
     do_id: str,
     payload: DoUpdateRequest,
     user: AuthContext = Depends(get_current_user),
 ):
-    _deck_access_for_dos(deck_id, user)
-    if payload.text is None and payload.completed is None:
+    # Async so a coalesced update waits out its window on the event loop rather than on a worker thread.
+    deck = await run_in_threadpool(_deck_access_for_dos, deck_id, user)
+    due_given = "dueAt" in payload.model_fields_set
+    if payload.text is None and payload.completed is None and not due_given:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="no_updates_provided")
 
+    if settings.update_coalesce_window_ms > 0:
+        changes = payload.model_dump(include={"text", "completed"}, exclude_none=True)
+        if due_given:
+            changes["dueAt"] = _utc_iso(payload.dueAt) if payload.dueAt else None
+        try:
+            updated = await get_coalescer().submit((deck_id, do_id), changes)
+        except ConcurrentUpdateError:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="concurrent_update")
+        if not updated:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="do_not_found")
+        return _do_to_item(updated)
+
+    return await run_in_threadpool(_update_do_now, deck, do_id, payload, due_given)
+
+
+def _update_do_now(deck: Dict, do_id: str, payload: DoUpdateRequest, due_given: bool) -> DoItem:
+    deck_id = deck["deckId"]
     existing = get_do(deck_id, do_id)
     if not existing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="do_not_found")
 
-    updated = update_do(existing, payload.text, payload.completed)
-    return DoItem(
-        doId=updated["doId"],
-        deckId=updated["deckId"],
-        text=updated["text"],
-        completed=updated["completed"],
-        createdAt=updated["createdAt"],
-        updatedAt=updated["updatedAt"],
-    )
+    kwargs = {"due_at": _utc_iso(payload.dueAt) if payload.dueAt else None} if due_given else {}
+    try:
+        updated = update_do(existing, payload.text, payload.completed, deck=deck, **kwargs)
+    except ConcurrentUpdateError:
+        # Deleted (or moved to another shard) since it was read.
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="concurrent_update")
+    return _do_to_item(updated)
+
+
+def _neighbor_or_400(deck_id: str, do_id: Optional[str], moving_id: str) -> Optional[Dict]:
+    if do_id is None:
+        return None
+    if do_id == moving_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_neighbor")
+    neighbor = get_do(deck_id, do_id)
+    if not neighbor:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_neighbor")
+    if not neighbor.get("position"):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="rebalance_required")
+    return neighbor
+
+
+@router.post("/{deck_id}/dos/{do_id}:move", response_model=DoItem)
+def move_do_endpoint(
+    deck_id: str,
+    do_id: str,
+    payload: DoMoveRequest,
+    user: AuthContext = Depends(get_current_user),
+):
+    """Place a do after ``afterDoId`` and/or before ``beforeDoId``; with neither it moves to the top."""
+    _deck_access_for_dos(deck_id, user)
+    existing = get_do(deck_id, do_id)
+    if not existing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="do_not_found")
+
+    after = _neighbor_or_400(deck_id, payload.afterDoId, do_id)
+    before = _neighbor_or_400(deck_id, payload.beforeDoId, do_id)
+    if before is None and (after is not None or payload.afterDoId is None):
+        before = adjacent_do(deck_id, after, after=True, exclude=do_id)
+    elif after is None and before is not None:
+        after = adjacent_do(deck_id, before, after=False, exclude=do_id)
+
+    try:
+        updated = move_do(existing, after, before)
+    except RepositoryError:
+        # Neighbours out of order (stale client view or equal positions).
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="position_conflict")
+    return _do_to_item(updated)
 
 
 @router.delete("/{deck_id}/dos/{do_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_do_endpoint(deck_id: str, do_id: str, user: AuthContext = Depends(get_current_user)):
-    _deck_access_for_dos(deck_id, user)
-    delete_do(deck_id, do_id)
+    deck = _deck_access_for_dos(deck_id, user)
+    delete_do(deck_id, do_id, deck=deck)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
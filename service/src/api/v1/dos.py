@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+
+from ...dependencies import AuthContext, get_current_user
+from ...profiling import ProfiledRoute
+from ...ratelimit import enforce_rate_limit
+from ...repository import InvalidCursorError, list_access_rows, list_dos_across_decks, list_due_dos
+from ...schemas import DoItem, DoPage
+from ...session import consistent_decks, consistent_lists
+from ...settings import settings
+from ...viewcache import deck_scope, email_scope, get_view_cache, user_scope
+from .decks import _active_dos, _do_to_item, _utc_iso
+
+router = APIRouter(
+    prefix="/v1/dos",
+    tags=["dos"],
+    dependencies=[Depends(enforce_rate_limit)],
+    route_class=ProfiledRoute,
+)
+
+
+@router.get("", response_model=DoPage)
+def list_my_dos_endpoint(
+    background_tasks: BackgroundTasks,
+    completed: bool = Query(False),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    user: AuthContext = Depends(get_current_user),
+):
+    """Dos with the given status across every deck the caller owns or shares, oldest first."""
+    email = user.email if user.email_verified else None
+    cache = get_view_cache()
+    cache_key = (user.sub, email, completed, limit, cursor)
+    # Another worker's cached page may predate the session's writes, so those bypass the cache.
+    lists_written = consistent_lists("my_dos")
+    cached = None if lists_written else cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    generations = cache.snapshot([user_scope(user.sub)] + ([email_scope(email)] if email else []))
+    deck_ids = sorted({row["deckId"] for row in list_access_rows(user.sub, email, "all", None, lists_written)})
+    generations.update(cache.snapshot(deck_scope(deck_id) for deck_id in deck_ids))
+    fresh = consistent_decks("my_dos", deck_ids)
+    try:
+        items, next_cursor = list_dos_across_decks(deck_ids, completed, limit, cursor, fresh)
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_cursor")
+
+    page = DoPage(items=[_do_to_item(item) for item in _active_dos(items, background_tasks)], nextCursor=next_cursor)
+    if not lists_written:
+        cache.put(cache_key, generations, page)
+    return page
+
+
+@router.get("/due", response_model=Dict[str, List[DoItem]])
+def list_due_dos_endpoint(
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(..., alias="to"),
+    user: AuthContext = Depends(get_current_user),
+):
+    """Open dos due in ``[from, to)`` across every deck the caller owns or shares, soonest first."""
+    start_iso, end_iso = _utc_iso(start), _utc_iso(end)
+    if end_iso <= start_iso:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_range")
+    if datetime.fromisoformat(end_iso) - datetime.fromisoformat(start_iso) > timedelta(days=settings.due_max_range_days):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="range_too_large")
+    email = user.email if user.email_verified else None
+    return {"items": [_do_to_item(item) for item in list_due_dos(user.sub, email, start_iso, end_iso, consistent_lists("due"))]}
@@ -0,0 +1,84 @@
+"""Sparse fieldsets: ``?fields=a,b`` picks response fields and the attributes read for them."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, TypeAdapter
+
+from ...schemas import DeckDetail, DeckSummary, DoItem
+
+Values = Dict[str, Callable[[], Any]]
+
+
+class Fieldset:
+    def __init__(self, model: Type[BaseModel], attributes: Dict[str, Tuple[str, ...]], always: Tuple[str, ...] = ()):
+        self.model = model
+        # Response field -> item attributes it is computed from.
+        self._attributes = attributes
+        # Attributes the endpoint itself needs whatever the client asked for.
+        self._always = always
+        self._adapters = {name: TypeAdapter(info.annotation) for name, info in model.model_fields.items()}
+
+    def parse(self, raw: Optional[str]) -> Optional[List[str]]:
+        if raw is None:
+            return None
+        fields = list(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+        if not fields or any(name not in self._attributes for name in fields):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_fields")
+        return fields
+
+    def attributes(self, fields: Optional[List[str]]) -> Optional[List[str]]:
+        """Attributes to project for ``fields``; None reads whole items."""
+        if fields is None:
+            return None
+        names = dict.fromkeys(self._always)
+        for field in fields:
+            names.update(dict.fromkeys(self._attributes[field]))
+        return list(names)
+
+    def build(self, values: Values) -> BaseModel:
+        return self.model(**{name: value() for name, value in values.items()})
+
+    def render(self, values: Values, fields: List[str]) -> Dict[str, Any]:
+        # Each value goes through its field's type so sparse responses format like full ones.
+        rendered = {}
+        for name in fields:
+            adapter = self._adapters[name]
+            rendered[name] = adapter.dump_python(adapter.validate_python(values[name]()), mode="json")
+        return rendered
+
+
+DECK_SUMMARY = Fieldset(
+    DeckSummary,
+    {
+        "deckId": ("deckId",),
+        "name": ("name",),
+        "isOwner": ("ownerSub",),
+        "collaborators": ("collaboratorCount", "collaborators"),
+    },
+    always=("deckId",),
+)
+
+DECK_DETAIL = Fieldset(
+    DeckDetail,
+    {
+        "deckId": ("deckId",),
+        "name": ("name",),
+        "isOwner": ("ownerSub",),
+        "ownerSub": ("ownerSub",),
+        "collaborators": ("collaboratorCount", "collaborators"),
+        "collaboratorCount": ("collaboratorCount", "collaborators"),
+        "createdAt": ("createdAt",),
+        "updatedAt": ("updatedAt",),
+    },
+    always=("deckId", "ownerSub", "collaborators", "updatedAt"),
+)
+
+DO_ITEM = Fieldset(
+    DoItem,
+    {name: (name,) for name in DoItem.model_fields},
+    # Listing archives stale completed dos, which needs their keys and completion times.
+    always=("deckId", "doId", "completed", "completedAt", "updatedAt", "unarchivedAt"),
+)
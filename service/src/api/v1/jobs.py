@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from ...dependencies import AuthContext, get_current_user
+from ...profiling import ProfiledRoute
+from ...ratelimit import enforce_rate_limit
+from ...repository import get_job
+from ...schemas import JobStatus
+
+router = APIRouter(
+    prefix="/v1/jobs",
+    tags=["jobs"],
+    dependencies=[Depends(enforce_rate_limit)],
+    route_class=ProfiledRoute,
+)
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+def get_job_endpoint(job_id: str, user: AuthContext = Depends(get_current_user)):
+    """Progress of a background job the caller started."""
+    job = get_job(job_id)
+    # Other users' jobs are indistinguishable from missing ones.
+    if not job or job["ownerSub"] != user.sub:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="job_not_found")
+    return JobStatus.model_validate(job)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from ...dependencies import AuthContext, get_current_user
+from ...profiling import ProfiledRoute
+from ...ratelimit import enforce_rate_limit
+from ...repository import InvalidCursorError, search
+from ...schemas import SearchHit, SearchPage
+from ...session import consistent_lists
+
+router = APIRouter(
+    prefix="/v1/search",
+    tags=["search"],
+    dependencies=[Depends(enforce_rate_limit)],
+    route_class=ProfiledRoute,
+)
+
+
+def _hit(result: Dict) -> SearchHit:
+    item = result["item"]
+    if "doId" in item:
+        return SearchHit(
+            type="do",
+            score=result["score"],
+            deckId=item["deckId"],
+            doId=item["doId"],
+            text=item["text"],
+            completed=item.get("completed", False),
+        )
+    return SearchHit(type="deck", score=result["score"], deckId=item["deckId"], name=item["name"])
+
+
+@router.get("", response_model=SearchPage)
+def search_endpoint(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    user: AuthContext = Depends(get_current_user),
+):
+    """Decks and dos across everything the caller owns or shares, matched word by word."""
+    email = user.email if user.email_verified else None
+    try:
+        results, next_cursor = search(user.sub, email, q, limit, cursor, consistent=consistent_lists("search"))
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_cursor")
+    return SearchPage(items=[_hit(result) for result in results], nextCursor=next_cursor)
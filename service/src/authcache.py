@@ -0,0 +1,133 @@
+"""Auth caches (JWKS documents and verified token claims) shared by worker processes.
+
+With ``AUTH_CACHE_PATH`` set, entries live in a small SQLite file that every
+worker on the host opens, so a new worker starts warm and a JWKS refresh is
+fetched once per host rather than once per process. Without it (tests, a
+single ``uvicorn``) the cache is a per-process dict. The cache only ever
+saves work: any storage error is treated as a miss.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Expired rows are swept on roughly one write in this many.
+PRUNE_EVERY = 256
+LOCAL_MAX_ENTRIES = 10000
+
+
+class LocalCache:
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            if len(self._entries) >= LOCAL_MAX_ENTRIES:
+                self._entries = {k: entry for k, entry in self._entries.items() if entry[0] > now}
+                while len(self._entries) >= LOCAL_MAX_ENTRIES:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[key] = (now + ttl, value)
+
+    @contextlib.contextmanager
+    def lock(self, name: str) -> Iterator[None]:
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            yield
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class FileCache:
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        # Claims are not secrets, but nobody else on the host needs to read them.
+        os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=OFF")
+            self._local.db = db
+        return db
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            row = self._connect().execute(
+                "SELECT value FROM entries WHERE key = ? AND expires > ?", (key, time.time())
+            ).fetchone()
+        except sqlite3.Error:
+            logger.warning("auth cache read failed", exc_info=True)
+            return None
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        try:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)", (key, json.dumps(value), now + ttl)
+            )
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                db.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+        except sqlite3.Error:
+            logger.warning("auth cache write failed", exc_info=True)
+
+    @contextlib.contextmanager
+    def lock(self, name: str) -> Iterator[None]:
+        """Host-wide lock, so only one worker does the work it guards."""
+        with open(f"{self.path}.{name}.lock", "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def clear(self) -> None:
+        with contextlib.suppress(sqlite3.Error):
+            self._connect().execute("DELETE FROM entries")
+
+
+@lru_cache(maxsize=None)
+def cache_for(path: Optional[str]):
+    """The shared cache at ``path``, or a per-process one without it."""
+    if path:
+        try:
+            return FileCache(path)
+        except (OSError, sqlite3.Error):
+            logger.warning("auth cache %s unavailable; caching per process", path, exc_info=True)
+    return LocalCache()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+
+class SlidingWindow:
+    """Per-second buckets of calls and failures over a short window."""
+
+    def __init__(self, seconds: int, clock: Callable[[], float] = time.monotonic):
+        self.seconds = max(1, seconds)
+        self.clock = clock
+        self._buckets = [[0, 0, 0] for _ in range(self.seconds)]  # [second, calls, failures]
+        self._lock = threading.Lock()
+
+    def record(self, failed: bool) -> None:
+        second = int(self.clock())
+        with self._lock:
+            bucket = self._buckets[second % self.seconds]
+            if bucket[0] != second:
+                bucket[:] = [second, 0, 0]
+            bucket[1] += 1
+            if failed:
+                bucket[2] += 1
+
+    def totals(self) -> Tuple[int, int]:
+        second = int(self.clock())
+        calls = failures = 0
+        with self._lock:
+            for bucket_second, bucket_calls, bucket_failures in self._buckets:
+                if second - bucket_second < self.seconds:
+                    calls += bucket_calls
+                    failures += bucket_failures
+        return calls, failures
+
+    def clear(self) -> None:
+        with self._lock:
+            for bucket in self._buckets:
+                bucket[:] = [0, 0, 0]
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("circuit open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_ratio: float,
+        min_calls: int,
+        window_seconds: int,
+        open_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+        on_state_change: Optional[Callable[[str], None]] = None,
+    ):
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.window = SlidingWindow(window_seconds, clock)
+        self.on_state_change = on_state_change
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        if self.on_state_change:
+            self.on_state_change(state)
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN:
+                waited = self.clock() - self._opened_at
+                if waited < self.open_seconds:
+                    raise CircuitOpenError(self.open_seconds - waited)
+                self._transition(HALF_OPEN)
+            # Half-open lets a single probe through at a time; a probe that
+            # never reported back is abandoned after another open period.
+            now = self.clock()
+            if self._probe_started is not None and now - self._probe_started < self.open_seconds:
+                raise CircuitOpenError(self.open_seconds)
+            self._probe_started = now
+
+    def record(self, failed: bool) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_started = None
+                if failed:
+                    self._open()
+                else:
+                    self.window.clear()
+                    self._transition(CLOSED)
+                return
+            if self.state == OPEN:
+                return
+            self.window.record(failed)
+            calls, failures = self.window.totals()
+            if calls >= self.min_calls and failures / calls >= self.failure_ratio:
+                self._open()
+
+    def _open(self) -> None:
+        self._opened_at = self.clock()
+        self._transition(OPEN)
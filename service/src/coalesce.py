@@ -0,0 +1,184 @@
+"""Opt-in coalescing of rapid ``PATCH`` updates to the same do.
+
+With ``UPDATE_COALESCE_WINDOW_MS`` above zero, the first update to a
+``(deckId, doId)`` opens a batch and waits out the window; updates to the
+same do arriving meanwhile are merged into it (later fields win). The merged
+changes are then written with one conditional ``UpdateItem`` against a fresh
+read of the do, and every waiting request gets the merged result. Changes
+that leave the do as it already is are not written at all, so a toggle and
+its undo cost nothing. Every waiting request records the write in its own
+read-your-writes session, not just the one that flushed it.
+
+Waiting happens on the event loop: the window is an asyncio timer and only
+the write itself takes a worker thread, so open batches do not hold threads
+other requests need. Batches live in one process's memory, so updates only
+merge when they reach the same worker (with several workers or instances,
+rapid PATCHes of one do spread across them are written separately). ``close``
+(at shutdown) flushes the open batches without waiting out their windows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from .metrics import registry
+from .repository import ConcurrentUpdateError, get_do, update_do
+from .session import note_writes
+from .settings import settings
+from .viewcache import deck_scope
+
+COALESCED_UPDATES = registry.counter("dodeck_coalesce_updates_total", "Do updates submitted to the coalescing buffer.")
+COALESCED_WRITES = registry.counter("dodeck_coalesce_writes_total", "Writes issued for coalesced do updates.")
+SAVED_WRITES = registry.counter(
+    "dodeck_coalesce_saved_writes_total", "Do updates absorbed by a coalesced write (or found to change nothing)."
+)
+
+# A flush re-reads the do and retries when another writer got in between.
+CONFLICT_ATTEMPTS = 3
+
+Key = Tuple[str, str]
+Result = Optional[Dict[str, Any]]
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def _wake(loop: asyncio.AbstractEventLoop, future: asyncio.Future) -> None:
+    """Resolve ``future`` from any thread."""
+    try:
+        loop.call_soon_threadsafe(_resolve, future)
+    except RuntimeError:  # its loop has closed; nobody is waiting on it any more
+        pass
+
+
+class _Batch:
+    __slots__ = ("changes", "updates", "done", "result", "writes", "error", "window", "waiters")
+
+    def __init__(self, changes: Dict[str, Any], loop: asyncio.AbstractEventLoop):
+        self.changes = dict(changes)
+        self.updates = 1
+        self.done = threading.Event()
+        self.result: Result = None
+        self.writes = 0
+        self.error: Optional[BaseException] = None
+        # Resolved early by ``close``; the leader waits on it for at most the window.
+        self.window = (loop, loop.create_future())
+        self.waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+
+def write_do_changes(key: Key, changes: Dict[str, Any]) -> Tuple[Result, int]:
+    """Apply ``changes`` (``text``, ``completed``, ``dueAt``) to the do; returns it and the writes made."""
+    deck_id, do_id = key
+    for _ in range(CONFLICT_ATTEMPTS):
+        current = get_do(deck_id, do_id, consistent=True)
+        if current is None:
+            return None, 0
+        wanted = {**changes, "text": changes["text"].strip()} if changes.get("text") is not None else changes
+        pending = {name: value for name, value in wanted.items() if current.get(name) != value}
+        if not pending:
+            return current, 0
+        kwargs = {"due_at": pending["dueAt"]} if "dueAt" in pending else {}
+        try:
+            updated = update_do(
+                current,
+                pending.get("text"),
+                pending.get("completed"),
+                expected_updated_at=current["updatedAt"],
+                **kwargs,
+            )
+        except ConcurrentUpdateError:
+            continue
+        return updated, 1
+    raise ConcurrentUpdateError(do_id)
+
+
+class WriteCoalescer:
+    def __init__(self, window_seconds: float, write: Callable[[Key, Dict[str, Any]], Tuple[Result, int]] = write_do_changes):
+        self.window_seconds = window_seconds
+        self._write = write
+        self._lock = threading.Lock()
+        self._open: Dict[Key, _Batch] = {}
+        self._writing: Set[_Batch] = set()
+        self._closing = threading.Event()
+
+    async def submit(self, key: Key, changes: Dict[str, Any]) -> Result:
+        """Merge ``changes`` into the open batch for ``key`` (or open one) and wait for its write."""
+        COALESCED_UPDATES.inc()
+        loop = asyncio.get_running_loop()
+        leader = False
+        with self._lock:
+            batch = self._open.get(key)
+            if batch is not None:
+                batch.changes.update(changes)
+                batch.updates += 1
+            elif not self._closing.is_set():
+                batch = self._open[key] = _Batch(changes, loop)
+                leader = True
+        if batch is None:
+            # Shutting down: write through.
+            result, writes = await run_in_threadpool(self._write, key, changes)
+            COALESCED_WRITES.inc(writes)
+            SAVED_WRITES.inc(1 - writes)
+            return result
+        if leader:
+            await asyncio.wait([batch.window[1]], timeout=self.window_seconds)
+            await run_in_threadpool(self._flush, key, batch)
+        else:
+            await self._written(batch, loop)
+        if batch.error is not None:
+            raise batch.error
+        if batch.writes:
+            # The write ran in the leader's context; every request it absorbed has written the deck too.
+            note_writes([deck_scope(key[0])])
+        return batch.result
+
+    async def _written(self, batch: _Batch, loop: asyncio.AbstractEventLoop) -> None:
+        future = loop.create_future()
+        with self._lock:
+            if batch.done.is_set():
+                return
+            batch.waiters.append((loop, future))
+        await future
+
+    def _flush(self, key: Key, batch: _Batch) -> None:
+        with self._lock:
+            # Later updates start a new batch from here on.
+            if self._open.get(key) is batch:
+                del self._open[key]
+            self._writing.add(batch)
+        try:
+            batch.result, batch.writes = self._write(key, batch.changes)
+            COALESCED_WRITES.inc(batch.writes)
+            SAVED_WRITES.inc(batch.updates - batch.writes)
+        except BaseException as exc:
+            batch.error = exc
+        finally:
+            with self._lock:
+                self._writing.discard(batch)
+                batch.done.set()
+                waiters, batch.waiters = batch.waiters, []
+            for loop, future in waiters:
+                _wake(loop, future)
+
+    def close(self, timeout: float) -> bool:
+        """Write every open batch now and wait up to ``timeout`` for them; later updates are written directly."""
+        self._closing.set()
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            batches = list(self._open.values()) + list(self._writing)
+        for batch in batches:
+            _wake(*batch.window)
+        return all(batch.done.wait(max(0.0, deadline - time.monotonic())) for batch in batches)
+
+
+@lru_cache(maxsize=1)
+def get_coalescer() -> WriteCoalescer:
+    return WriteCoalescer(settings.update_coalesce_window_ms / 1000)
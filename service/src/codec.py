@@ -0,0 +1,181 @@
+"""Compact storage encoding for the high-volume item families.
+
+Format 2 (``v = 2``) stores do items, archived dos, access rows and the
+``DUE#``/``TOK#`` entries with one- or two-letter attribute names. Timestamps
+become epoch microseconds, and values the keys already spell out (deck and do
+ids, ``nameLower``, the access kind) are dropped. Keys and index keys are
+never encoded. Items without ``v`` are the original verbose format (1).
+
+The repository encodes on write and decodes on read, so everything above it
+sees verbose items only. A decoded compact item keeps ``v`` so writers know
+which names its stored copy uses. Deck and collaborator items stay verbose:
+they are read one at a time by ``GetItem``/``BatchGetItem``, which bill each
+item in whole 4 KB units, so shrinking them saves no capacity.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from .settings import settings
+
+VERSION = "v"
+COMPACT = 2
+
+KEY_ATTRIBUTES = ("PK", "SK", "GSI1PK", "GSI1SK", "GSI2PK", "GSI2SK")
+TIMESTAMPS = {"createdAt", "updatedAt", "completedAt", "archivedAt", "unarchivedAt", "dueAt"}
+
+# Verbose name -> compact name, per item family.
+NAMES: Dict[str, Dict[str, str]] = {
+    "do": {
+        "text": "t",
+        "completed": "c",
+        "position": "p",
+        "createdAt": "ca",
+        "updatedAt": "ua",
+        "completedAt": "da",
+        "archivedAt": "aa",
+        "unarchivedAt": "ra",
+        "dueAt": "du",
+    },
+    "access": {"name": "n", "ownerSub": "o"},
+    "due": {"deckId": "d"},
+    "search": {"exact": "x", "length": "l"},
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def family(item: Dict[str, Any]) -> Optional[str]:
+    pk, sk = item.get("PK", ""), item.get("SK", "")
+    if pk.startswith("DECK#") and sk.startswith(("DO#", "ARCHIVE#")):
+        return "do"
+    if pk.startswith("ACCESS#"):
+        return "access"
+    if pk.startswith("DUE#"):
+        return "due"
+    if pk.startswith("TOK#"):
+        return "search"
+    return None
+
+
+def is_compact(item: Dict[str, Any]) -> bool:
+    return item.get(VERSION) == COMPACT
+
+
+def compact_enabled() -> bool:
+    return settings.item_encoding == "compact"
+
+
+def _to_micros(value: Any) -> Any:
+    # Only canonical UTC timestamps are converted, so decoding gives back the same string.
+    if not isinstance(value, str):
+        return value
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if parsed.tzinfo is None or parsed.utcoffset() != timedelta(0):
+        return value
+    micros = (parsed - _EPOCH) // timedelta(microseconds=1)
+    return micros if _from_micros(micros) == value else value
+
+
+def _from_micros(value: Any) -> Any:
+    if isinstance(value, (int, Decimal)) and not isinstance(value, bool):
+        return (_EPOCH + timedelta(microseconds=int(value))).isoformat()
+    return value
+
+
+def _derived(kind: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    """Verbose attributes spelled out by the keys of a ``kind`` item."""
+    pk, sk = item["PK"], item["SK"]
+    if kind == "do":
+        # Dos of a sharded deck live under ``DECK#<deckId>#<shard>``.
+        return {"deckId": pk[len("DECK#"):].split("#", 1)[0], "doId": sk.split("#", 1)[1]}
+    if kind == "access":
+        if not sk.startswith("DECK#") or "#" not in sk[len("DECK#"):]:
+            return {}
+        name_lower, deck_id = sk[len("DECK#"):].rsplit("#", 1)
+        derived = {"deckId": deck_id, "nameLower": name_lower}
+        if pk.startswith("ACCESS#USER#"):
+            derived.update(access="owner", ownerSub=pk[len("ACCESS#USER#"):])
+        else:
+            derived["access"] = "collaborator"
+        return derived
+    if kind == "due":
+        due_at, do_id = sk.rsplit("#", 1)
+        return {"dueAt": due_at, "doId": do_id}
+    deck_id, _, rest = sk.partition("#")
+    derived = {"deckId": deck_id}
+    if rest.startswith("DO#"):
+        derived["doId"] = rest[len("DO#"):]
+    return derived
+
+
+def encode(item: Dict[str, Any], compact: Optional[bool] = None) -> Dict[str, Any]:
+    """The item as it should be written under the configured ``ITEM_ENCODING`` (or ``compact``)."""
+    kind = family(item)
+    verbose = {key: value for key, value in item.items() if key != VERSION}
+    if kind is None or not (compact_enabled() if compact is None else compact):
+        return verbose
+    names = NAMES[kind]
+    derived = _derived(kind, verbose)
+    encoded: Dict[str, Any] = {VERSION: COMPACT}
+    for key, value in verbose.items():
+        if key in KEY_ATTRIBUTES:
+            encoded[key] = value
+        elif key in derived and derived[key] == value:
+            continue
+        elif key in names:
+            encoded[names[key]] = _to_micros(value) if key in TIMESTAMPS else value
+        else:
+            encoded[key] = value
+    return encoded
+
+
+def decode(item: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Verbose view of a stored item; verbose items come back unchanged."""
+    if not item or not is_compact(item):
+        return item
+    kind = family(item)
+    if kind is None:
+        return item
+    short = {compact: verbose for verbose, compact in NAMES[kind].items()}
+    decoded: Dict[str, Any] = dict(_derived(kind, item)) if "SK" in item else {}
+    for key, value in item.items():
+        field = short.get(key, key)
+        decoded[field] = _from_micros(value) if field in TIMESTAMPS else value
+    return decoded
+
+
+def decode_all(items: Iterable[Dict[str, Any]], attributes: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Decode ``items``; with ``attributes``, keep only those (undoing :func:`stored_projection`'s extras)."""
+    decoded = [decode(item) for item in items]
+    if attributes is None:
+        return decoded
+    return [{key: item[key] for key in attributes if key in item} for item in decoded]
+
+
+def stored_name(kind: str, field: str, item: Dict[str, Any]) -> str:
+    """Attribute holding ``field`` in the stored copy of ``item``."""
+    return NAMES[kind].get(field, field) if is_compact(item) else field
+
+
+def stored_value(field: str, val: Any, item: Dict[str, Any]) -> Any:
+    """``val`` as stored for ``field`` in the stored copy of ``item``."""
+    return _to_micros(val) if is_compact(item) and field in TIMESTAMPS else val
+
+
+def stored_projection(kind: str, attributes: Optional[List[str]]) -> Optional[List[str]]:
+    """Stored attributes to read for the verbose ``attributes`` of a ``kind`` item in either format."""
+    if attributes is None:
+        return None
+    names = NAMES[kind]
+    stored = dict.fromkeys(attributes)
+    stored.update(dict.fromkeys(names[field] for field in attributes if field in names))
+    # Keys carry the dropped attributes; v says which names the item uses.
+    stored.update(dict.fromkeys(("PK", "SK", VERSION)))
+    return list(stored)
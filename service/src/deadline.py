@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from .settings import settings
+
+# Bulk transfer endpoints stream for as long as the payload needs.
+UNBOUNDED_PATH_SUFFIXES = ("/export", "/import")
+
+_deadline: ContextVar[Optional[float]] = ContextVar("dodeck_deadline", default=None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request budget, or ``None`` when unbounded."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def set_budget(seconds: Optional[float]):
+    value = time.monotonic() + seconds if seconds else None
+    return _deadline.set(value)
+
+
+def reset(token) -> None:
+    _deadline.reset(token)
+
+
+class DeadlineMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].endswith(UNBOUNDED_PATH_SUFFIXES):
+            await self.app(scope, receive, send)
+            return
+        token = set_budget(settings.request_deadline_seconds)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset(token)
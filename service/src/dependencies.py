@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 
+from .observability import set_user
+from .profiling import request_thread
 from .security import verify_jwt
 from .settings import settings
 
@@ -28,8 +30,18 @@ class AuthContext:
         return self.email
 
 
-def get_current_user(authorization: str | None = Header(default=None)) -> AuthContext:
-    claims = verify_jwt(authorization)
+# ASGI scope key under which /v1/batch hands its already-verified caller to sub-requests.
+BATCH_USER_SCOPE_KEY = "dodeck.batch_user"
+
+
+def get_current_user(request: Request, authorization: str | None = Header(default=None)) -> AuthContext:
+    batch_user = request.scope.get(BATCH_USER_SCOPE_KEY)
+    if batch_user is not None:
+        set_user(batch_user.sub)
+        return batch_user
+
+    with request_thread():
+        claims = verify_jwt(authorization)
     sub = claims.get("sub")
     if not sub:
         raise HTTPException(
@@ -53,6 +65,7 @@ def get_current_user(authorization: str | None = Header(default=None)) -> AuthCo
         else claims.get("email_verified")
     )
 
+    set_user(sub)
     return AuthContext(
         sub=sub,
         email=email,
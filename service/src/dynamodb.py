@@ -1,26 +1,241 @@
 from __future__ import annotations
 
+import threading
+import time
 from functools import lru_cache
+from typing import Optional, Tuple
 
 import boto3
 from botocore.config import Config
 
+from . import deadline
+from .breaker import CircuitBreaker, CircuitOpenError, SlidingWindow
+from .metrics import registry
+from .observability import record_dynamodb_call
 from .settings import settings
 
+THROTTLE_CODES = {
+    "ThrottlingException",
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+}
 
-def _create_resource():
-    config = Config(retries={"max_attempts": 3, "mode": "standard"})
+# Remaining request budgets are rounded down to one of these tiers so each
+# tier can keep its own client with capped timeouts. The clients split one
+# pool of connections between them (see tier_pool_size).
+BUDGET_TIERS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+DDB_ATTEMPTS = registry.counter(
+    "dodeck_dynamodb_attempts_total",
+    "DynamoDB HTTP attempts, including retries, by outcome.",
+)
+DDB_FAST_FAILURES = registry.counter(
+    "dodeck_dynamodb_fast_failures_total",
+    "DynamoDB calls refused before sending, by reason.",
+)
+DDB_BREAKER_STATE = registry.gauge(
+    "dodeck_dynamodb_breaker_state",
+    "DynamoDB circuit breaker state (0 closed, 1 half-open, 2 open).",
+)
+DDB_CONNECTION_WAIT = registry.histogram(
+    "dodeck_dynamodb_connection_wait_seconds",
+    "Time a DynamoDB attempt waited for a pooled connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DDB_CONNECTIONS_IN_USE = registry.gauge(
+    "dodeck_dynamodb_connections_in_use",
+    "DynamoDB attempts currently holding a pooled connection, across all clients.",
+)
+
+
+class StorageUnavailableError(Exception):
+    """Raised when a DynamoDB call is refused without being attempted."""
+
+    status_code = 503
+    code = "storage_unavailable"
+    retry_after: Optional[float] = None
+
+
+class DeadlineExceededError(StorageUnavailableError):
+    """Raised when the request budget is too small for another DynamoDB call."""
+
+    status_code = 504
+    code = "deadline_exceeded"
+
+
+class DynamoDBUnavailableError(StorageUnavailableError):
+    """Raised while the circuit breaker is open."""
+
+    code = "dynamodb_unavailable"
+
+    def __init__(self, retry_after: float):
+        super().__init__("circuit open")
+        self.retry_after = retry_after
+
+
+attempt_window = SlidingWindow(settings.shed_window_seconds)
+breaker = CircuitBreaker(
+    failure_ratio=settings.ddb_breaker_failure_ratio,
+    min_calls=settings.ddb_breaker_min_calls,
+    window_seconds=settings.ddb_breaker_window_seconds,
+    open_seconds=settings.ddb_breaker_open_seconds,
+    on_state_change=lambda state: DDB_BREAKER_STATE.set(BREAKER_STATES[state]),
+)
+
+
+def throttle_ratio() -> Tuple[float, int]:
+    attempts, throttled = attempt_window.totals()
+    if not attempts:
+        return 0.0, 0
+    return throttled / attempts, attempts
+
+
+def _check_budget() -> None:
+    remaining = deadline.remaining()
+    if remaining is not None and remaining < settings.ddb_min_call_budget_seconds:
+        DDB_FAST_FAILURES.inc(reason="deadline")
+        raise DeadlineExceededError("request deadline exceeded")
+
+
+def _on_before_call(**_kwargs) -> None:
+    _check_budget()
+    if not settings.ddb_breaker_enabled:
+        return
+    try:
+        breaker.before_call()
+    except CircuitOpenError as exc:
+        DDB_FAST_FAILURES.inc(reason="circuit_open")
+        raise DynamoDBUnavailableError(exc.retry_after) from exc
+
+
+def _on_before_send(**_kwargs) -> None:
+    # Fires for every attempt, so retries also stop once the budget is spent.
+    _check_budget()
+
+
+def _on_response_received(parsed_response=None, response_dict=None, exception=None, **_kwargs) -> None:
+    code = ((parsed_response or {}).get("Error") or {}).get("Code")
+    status_code = (response_dict or {}).get("status_code") or 0
+    throttled = code in THROTTLE_CODES
+    if throttled:
+        outcome = "throttled"
+    elif exception is not None or status_code >= 500:
+        outcome = "error"
+    elif code:
+        outcome = "client_error"
+    else:
+        outcome = "ok"
+    DDB_ATTEMPTS.inc(outcome=outcome)
+    attempt_window.record(throttled)
+    if settings.ddb_breaker_enabled:
+        breaker.record(outcome in {"throttled", "error"})
+
+
+def pool_size() -> int:
+    return settings.ddb_max_pool_connections or settings.worker_threads
+
+
+def tier_pool_size(tier: Optional[float]) -> int:
+    """Share of ``pool_size()`` kept by the client of one budget tier.
+
+    The untiered client and the roomiest tiers, which most requests use, get
+    the remainder; every client keeps at least one connection.
+    """
+    clients = (None,) + tuple(reversed(BUDGET_TIERS))
+    share, extra = divmod(pool_size(), len(clients))
+    return max(1, share + (clients.index(tier) < extra))
+
+
+class ConnectionGate:
+    """Caps concurrent attempts across all clients at the pool size and times the wait.
+
+    urllib3 does not block when botocore's pool is exhausted: it opens an extra
+    connection and throws it away afterwards, so the shortage never shows up.
+    Holding a slot from ``before-send`` to ``response-received`` makes threads
+    queue for a pooled connection instead, bounded by the request deadline.
+    """
+
+    def __init__(self, size: int):
+        self._slots = threading.BoundedSemaphore(size)
+        self._held = threading.local()
+
+    def acquire(self, **_kwargs) -> None:
+        # A slot is never carried into the next attempt, even if its response event was missed.
+        self.release()
+        started = time.perf_counter()
+        remaining = deadline.remaining()
+        if not self._slots.acquire(timeout=None if remaining is None else max(remaining, 0)):
+            DDB_FAST_FAILURES.inc(reason="connection_wait")
+            raise DeadlineExceededError("request deadline exceeded waiting for a DynamoDB connection")
+        self._held.slot = True
+        DDB_CONNECTION_WAIT.observe(time.perf_counter() - started)
+        DDB_CONNECTIONS_IN_USE.inc()
+
+    def release(self, **_kwargs) -> None:
+        # Also fires for attempts refused before they took a slot.
+        if getattr(self._held, "slot", False):
+            self._held.slot = False
+            DDB_CONNECTIONS_IN_USE.dec()
+            self._slots.release()
+
+
+@lru_cache(maxsize=None)
+def connection_gate() -> ConnectionGate:
+    return ConnectionGate(pool_size())
+
+
+def budget_tier(remaining: Optional[float]) -> Optional[float]:
+    if remaining is None:
+        return None
+    for tier in reversed(BUDGET_TIERS):
+        if remaining >= tier:
+            return tier
+    return BUDGET_TIERS[0]
+
+
+def _client_config(tier: Optional[float]) -> Config:
+    connect_timeout = settings.ddb_connect_timeout_seconds
+    read_timeout = settings.ddb_read_timeout_seconds
+    max_attempts = settings.ddb_max_attempts
+    if tier is not None:
+        connect_timeout = min(connect_timeout, tier)
+        read_timeout = min(read_timeout, tier)
+        max_attempts = max(1, min(max_attempts, int(tier // read_timeout)))
+    return Config(
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        retries={"max_attempts": max_attempts, "mode": settings.ddb_retry_mode},
+        max_pool_connections=tier_pool_size(tier),
+    )
+
+
+def _create_resource(tier: Optional[float] = None):
     kwargs = {
         "region_name": settings.aws_region,
-        "config": config,
+        "config": _client_config(tier),
     }
     if settings.dynamodb_endpoint_url:
         kwargs["endpoint_url"] = settings.dynamodb_endpoint_url
 
-    return boto3.resource("dynamodb", **kwargs)
+    resource = boto3.resource("dynamodb", **kwargs)
+    gate = connection_gate()
+    events = resource.meta.client.meta.events
+    events.register("before-call.dynamodb", _on_before_call)
+    events.register("before-parameter-build.dynamodb", record_dynamodb_call)
+    events.register("before-send.dynamodb", _on_before_send)
+    events.register("before-send.dynamodb", gate.acquire)
+    events.register("response-received.dynamodb", gate.release)
+    events.register("response-received.dynamodb", _on_response_received)
+    return resource
 
 
-@lru_cache(maxsize=1)
-def get_table():
-    resource = _create_resource()
+@lru_cache(maxsize=None)
+def _table_for_tier(tier: Optional[float]):
+    resource = _create_resource(tier)
     return resource.Table(settings.table_name)
+
+
+def get_table():
+    return _table_for_tier(budget_tier(deadline.remaining()))
@@ -0,0 +1,49 @@
+"""Background jobs, run on their own worker threads outside any request.
+
+A job started by a request (a large clone) is handed to this executor and the
+request responds straight away: the job holds no load-shedding slot, request
+worker thread or access-log timing, and is not bound by the request deadline.
+Jobs run with a fresh context, so nothing of the starting request (its
+deadline, read-your-writes session or profile) carries over.
+``CLONE_JOB_CONCURRENCY`` caps how many run at once per process; more wait
+their turn. ``close`` (at shutdown) waits for the running ones.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Any, Callable, Dict, Set
+
+from .settings import settings
+
+
+class JobRunner:
+    def __init__(self, workers: int):
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="dodeck-job")
+        self._lock = threading.Lock()
+        self._running: Set[Future] = set()
+
+    def start(self, run: Callable[[Dict[str, Any]], Any], job: Dict[str, Any]) -> Future:
+        future = self._pool.submit(contextvars.Context().run, run, job)
+        with self._lock:
+            self._running.add(future)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            self._running.discard(future)
+
+    def close(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` for the jobs started so far; False if some are still running."""
+        with self._lock:
+            running = list(self._running)
+        return not wait(running, timeout=timeout).not_done
+
+
+@lru_cache(maxsize=1)
+def get_job_runner() -> JobRunner:
+    return JobRunner(settings.clone_job_concurrency)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+import random
+import threading
+from typing import Optional, Tuple
+
+from .dynamodb import throttle_ratio
+from .metrics import registry
+from .settings import settings
+
+INFLIGHT = registry.gauge("dodeck_inflight_requests", "HTTP requests currently being served.")
+SHED = registry.counter("dodeck_requests_shed_total", "Requests rejected with 503 by adaptive load shedding.")
+
+EXEMPT_PATHS = {"/healthz", "/metrics"}
+
+
+def shed_probability(inflight: int, ratio: float, attempts: int) -> Tuple[float, Optional[str]]:
+    """Rejection probability ramps up linearly between the soft and hard limits."""
+    probability, reason = 0.0, None
+
+    soft, hard = settings.shed_inflight_soft_limit, settings.shed_inflight_hard_limit
+    if inflight > soft:
+        probability = 1.0 if inflight >= hard else (inflight - soft) / max(hard - soft, 1)
+        reason = "inflight"
+
+    threshold = settings.shed_throttle_ratio
+    if attempts >= settings.shed_min_attempts and ratio > threshold:
+        throttle_probability = min(1.0, (ratio - threshold) / max(1.0 - threshold, 1e-6))
+        if throttle_probability > probability:
+            probability, reason = throttle_probability, "dynamodb_throttling"
+    return probability, reason
+
+
+class LoadSheddingMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        with self._lock:
+            self._inflight += 1
+            inflight = self._inflight
+        INFLIGHT.set(inflight)
+        try:
+            ratio, attempts = throttle_ratio()
+            probability, reason = shed_probability(inflight, ratio, attempts)
+            if reason and random.random() < probability:
+                SHED.inc(reason=reason)
+                await self._reject(send)
+                return
+            await self.app(scope, receive, send)
+        finally:
+            with self._lock:
+                self._inflight -= 1
+                INFLIGHT.set(self._inflight)
+
+    @staticmethod
+    async def _reject(send) -> None:
+        body = json.dumps({"error": "overloaded"}).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    (b"retry-after", str(settings.shed_retry_after_seconds).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -1,24 +1,60 @@
 from __future__ import annotations
 
 import logging
+import math
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Header, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from .api.v1.batch import router as batch_router
 from .api.v1.decks import router as decks_router
+from .api.v1.dos import router as dos_router
+from .api.v1.jobs import router as jobs_router
+from .api.v1.search import router as search_router
+from .coalesce import get_coalescer
+from .deadline import DeadlineMiddleware
+from .dynamodb import StorageUnavailableError
+from .jobs import get_job_runner
+from .loadshed import LoadSheddingMiddleware
+from .metrics import registry
+from .observability import AccessLogMiddleware, configure_logging
+from .profiling import ProfilingMiddleware, authorized as profiling_authorized, get_store as profile_store
+from .session import SESSION_HEADER, SessionMiddleware
 from .settings import settings
+from .threadpool import configure_thread_limiter
 
 logging.basicConfig(level=settings.log_level.upper())
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_thread_limiter()
+    yield
+    # Requests cut off by the graceful shutdown timeout may leave coalesced updates waiting.
+    await run_in_threadpool(get_coalescer().close, settings.graceful_shutdown_seconds)
+    # Background clones get the same grace; one cut off stays ``running`` until its claim lapses.
+    await run_in_threadpool(get_job_runner().close, settings.graceful_shutdown_seconds)
+
 
 app = FastAPI(
     title="DoDeck API",
+    lifespan=lifespan,
     version="1.0.0",
     docs_url="/docs" if settings.environment != "prod" else None,
     redoc_url=None,
     openapi_url="/openapi.json",
 )
 
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(LoadSheddingMiddleware)
+app.add_middleware(AccessLogMiddleware)
+app.add_middleware(SessionMiddleware)
+
 if settings.cors_allowed_origins:
     app.add_middleware(
         CORSMiddleware,
@@ -26,6 +62,7 @@ if settings.cors_allowed_origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[SESSION_HEADER],
     )
 
 if settings.enable_xray_tracing:
@@ -49,7 +86,50 @@ def healthz():
     return {"ok": True, "version": app.version, "environment": settings.environment}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics(authorization: str | None = Header(default=None)):
+    if settings.metrics_token and authorization != f"Bearer {settings.metrics_token}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid_metrics_token")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+def _require_profiling_token(authorization: str | None) -> None:
+    if not settings.profiling_enabled or not settings.profiling_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="profiling_disabled")
+    token = authorization[len("Bearer "):] if authorization and authorization.startswith("Bearer ") else None
+    if not profiling_authorized(token):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid_profiling_token")
+
+
+@app.get("/admin/profiles", include_in_schema=False)
+def list_profiles(authorization: str | None = Header(default=None)):
+    _require_profiling_token(authorization)
+    return {"items": profile_store().list()}
+
+
+@app.get("/admin/profiles/{name}", include_in_schema=False)
+def get_profile(name: str, authorization: str | None = Header(default=None)):
+    _require_profiling_token(authorization)
+    profile = profile_store().read(name)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="profile_not_found")
+    return profile
+
+
 app.include_router(decks_router)
+app.include_router(dos_router)
+app.include_router(search_router)
+app.include_router(batch_router)
+app.include_router(jobs_router)
+
+
+@app.exception_handler(StorageUnavailableError)
+async def storage_unavailable(request: Request, exc: StorageUnavailableError):
+    logging.warning("DynamoDB call refused for %s %s: %s", request.method, request.url.path, exc.code)
+    headers = {}
+    if exc.retry_after is not None:
+        headers["Retry-After"] = str(max(1, math.ceil(exc.retry_after)))
+    return JSONResponse(status_code=exc.status_code, content={"error": exc.code}, headers=headers)
 
 
 @app.exception_handler(Exception)
@@ -0,0 +1,1075 @@
+"""Thread-safe in-memory stand-in for the DoDeck DynamoDB table.
+
+``MemoryTable`` and ``MemoryClient`` implement the subset of the boto3
+resource ``Table`` and its ``meta.client`` that the repository uses, with the
+same single-table semantics: items sorted by SK within a partition, global
+secondary indexes, condition/update/projection expressions, transactions and
+``ClientError`` codes. It is meant for tests, local runs and load tests, not
+durability; nothing is persisted and the 1 MB page limit is not modelled.
+"""
+
+from __future__ import annotations
+
+import copy
+import re
+import threading
+import zlib
+from bisect import bisect_left, bisect_right, insort
+from decimal import Decimal
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.table import BatchWriter
+from boto3.dynamodb.types import Binary, TypeSerializer
+from botocore.exceptions import ClientError
+
+from .settings import settings
+
+MAX_ITEM_BYTES = 400 * 1024
+MAX_TRANSACTION_ITEMS = 100
+
+_MISSING = object()
+
+
+# --------------------------------------------------------------------------- errors
+
+
+def _error(code: str, message: str, operation: str, **extra) -> ClientError:
+    response = {"Error": {"Code": code, "Message": message}, "ResponseMetadata": {"HTTPStatusCode": 400}}
+    response.update(extra)
+    return ClientError(response, operation)
+
+
+class _ValidationError(Exception):
+    pass
+
+
+# --------------------------------------------------------------------------- values
+
+
+def _normalize(value: Any) -> Any:
+    """Coerce values the way boto3's serializer would accept them."""
+    if isinstance(value, bool) or value is None or isinstance(value, (str, Decimal)):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, float):
+        raise TypeError("Float types are not supported. Use Decimal types instead.")
+    if isinstance(value, (bytes, bytearray)):
+        return Binary(bytes(value))
+    if isinstance(value, Binary):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return {_normalize(v) for v in value}
+    raise TypeError(f"Unsupported type {type(value)!r} for value {value!r}")
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, Decimal):
+        return len(value.as_tuple().digits) // 2 + 2
+    if isinstance(value, Binary):
+        return len(value.value)
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, int):
+        return _size(Decimal(value))
+    if isinstance(value, dict):
+        return 3 + sum(_size(k) + _size(v) + 1 for k, v in value.items())
+    if isinstance(value, (list, set)):
+        return 3 + sum(_size(v) + 1 for v in value)
+    return 0
+
+
+def item_size(item: Dict[str, Any]) -> int:
+    """Approximate DynamoDB item size in bytes (attribute names plus values); ints count as the numbers they store as."""
+    return sum(len(name.encode("utf-8")) + _size(value) for name, value in item.items())
+
+
+def _same_type(left: Any, right: Any) -> bool:
+    return isinstance(left, (Decimal, str, Binary)) and type(left) is type(right)
+
+
+# --------------------------------------------------------------------------- expressions
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<op><>|<=|>=|[=<>(),.\[\]+-])|(?P<name>#[A-Za-z0-9_]+)|(?P<value>:[A-Za-z0-9_]+)"
+    r"|(?P<num>\d+)|(?P<ident>[A-Za-z_][A-Za-z0-9_]*))"
+)
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    tokens: List[Tuple[str, str]] = []
+    pos = 0
+    expression = expression.rstrip()
+    while pos < len(expression):
+        match = _TOKEN.match(expression, pos)
+        if not match or match.end() == pos:
+            raise _ValidationError(f"Invalid expression near: {expression[pos:pos + 20]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, expression: str, names: Dict[str, str], values: Dict[str, Any]):
+        self.tokens = _tokenize(expression)
+        self.pos = 0
+        self.names = names
+        self.values = values
+
+    # -- token helpers
+    def peek(self, offset: int = 0) -> Tuple[Optional[str], Optional[str]]:
+        idx = self.pos + offset
+        return self.tokens[idx] if idx < len(self.tokens) else (None, None)
+
+    def next(self) -> Tuple[str, str]:
+        token = self.peek()
+        if token[0] is None:
+            raise _ValidationError("Unexpected end of expression")
+        self.pos += 1
+        return token
+
+    def expect(self, text: str) -> None:
+        kind, token = self.next()
+        if token != text:
+            raise _ValidationError(f"Expected {text!r}, got {token!r}")
+
+    def keyword(self, word: str) -> bool:
+        kind, token = self.peek()
+        if kind == "ident" and token.upper() == word:
+            self.pos += 1
+            return True
+        return False
+
+    def done(self) -> bool:
+        return self.pos >= len(self.tokens)
+
+    # -- operands
+    def path(self) -> Tuple[Any, ...]:
+        parts: List[Any] = [self._segment()]
+        while True:
+            _, token = self.peek()
+            if token == ".":
+                self.next()
+                parts.append(self._segment())
+            elif token == "[":
+                self.next()
+                kind, index = self.next()
+                if kind != "num":
+                    raise _ValidationError("List index must be a number")
+                self.expect("]")
+                parts.append(int(index))
+            else:
+                return tuple(parts)
+
+    def _segment(self) -> str:
+        kind, token = self.next()
+        if kind == "name":
+            if token not in self.names:
+                raise _ValidationError(f"An expression attribute name used in the document path is not defined; attribute name: {token}")
+            return self.names[token]
+        if kind == "ident":
+            return token
+        raise _ValidationError(f"Invalid document path token {token!r}")
+
+    def value(self, token: str) -> Any:
+        if token not in self.values:
+            raise _ValidationError(f"An expression attribute value used in expression is not defined; attribute value: {token}")
+        return self.values[token]
+
+    def operand(self):
+        kind, token = self.peek()
+        if kind == "value":
+            self.next()
+            return ("value", self.value(token))
+        if kind == "ident" and token.lower() == "size" and self.peek(1)[1] == "(":
+            self.next()
+            self.expect("(")
+            path = self.path()
+            self.expect(")")
+            return ("size", path)
+        return ("path", self.path())
+
+    # -- conditions
+    def condition(self):
+        node = self._and()
+        while self.keyword("OR"):
+            node = ("or", node, self._and())
+        return node
+
+    def _and(self):
+        node = self._not()
+        while self.keyword("AND"):
+            node = ("and", node, self._not())
+        return node
+
+    def _not(self):
+        if self.keyword("NOT"):
+            return ("not", self._not())
+        return self._primary()
+
+    def _primary(self):
+        kind, token = self.peek()
+        if token == "(":
+            self.next()
+            node = self.condition()
+            self.expect(")")
+            return node
+        if kind == "ident" and self.peek(1)[1] == "(":
+            func = token.lower()
+            if func in {"attribute_exists", "attribute_not_exists"}:
+                self.next()
+                self.expect("(")
+                path = self.path()
+                self.expect(")")
+                return (func, path)
+            if func in {"attribute_type", "begins_with", "contains"}:
+                self.next()
+                self.expect("(")
+                left = self.operand()
+                self.expect(",")
+                right = self.operand()
+                self.expect(")")
+                return (func, left, right)
+        left = self.operand()
+        if self.keyword("BETWEEN"):
+            low = self.operand()
+            if not self.keyword("AND"):
+                raise _ValidationError("BETWEEN requires AND")
+            return ("between", left, low, self.operand())
+        if self.keyword("IN"):
+            self.expect("(")
+            options = [self.operand()]
+            while self.peek()[1] == ",":
+                self.next()
+                options.append(self.operand())
+            self.expect(")")
+            return ("in", left, options)
+        _, comparator = self.next()
+        if comparator not in {"=", "<>", "<", "<=", ">", ">="}:
+            raise _ValidationError(f"Invalid comparator {comparator!r}")
+        return ("cmp", comparator, left, self.operand())
+
+    # -- updates
+    def update(self) -> List[Tuple[str, Any]]:
+        actions: List[Tuple[str, Any]] = []
+        while not self.done():
+            kind, token = self.next()
+            clause = token.upper() if kind == "ident" else None
+            if clause not in {"SET", "REMOVE", "ADD", "DELETE"}:
+                raise _ValidationError(f"Invalid UpdateExpression clause {token!r}")
+            while True:
+                path = self.path()
+                if clause == "SET":
+                    self.expect("=")
+                    actions.append(("SET", (path, self._set_value())))
+                elif clause == "REMOVE":
+                    actions.append(("REMOVE", path))
+                else:
+                    _, token = self.next()
+                    actions.append((clause, (path, self.value(token))))
+                if self.peek()[1] != ",":
+                    break
+                self.next()
+        return actions
+
+    def _set_value(self):
+        left = self._set_operand()
+        _, token = self.peek()
+        if token in {"+", "-"}:
+            self.next()
+            return ("arith", token, left, self._set_operand())
+        return left
+
+    def _set_operand(self):
+        kind, token = self.peek()
+        if kind == "ident" and self.peek(1)[1] == "(" and token.lower() in {"if_not_exists", "list_append"}:
+            self.next()
+            self.expect("(")
+            first = self.path() if token.lower() == "if_not_exists" else self._set_operand()
+            self.expect(",")
+            second = self._set_operand()
+            self.expect(")")
+            return (token.lower(), first, second)
+        return self.operand()
+
+
+def _resolve(item: Dict[str, Any], path: Sequence[Any]) -> Any:
+    current: Any = item
+    for part in path:
+        if isinstance(part, int):
+            if not isinstance(current, list) or part >= len(current):
+                return _MISSING
+            current = current[part]
+        else:
+            if not isinstance(current, dict) or part not in current:
+                return _MISSING
+            current = current[part]
+    return current
+
+
+def _operand(item: Dict[str, Any], node) -> Any:
+    kind = node[0]
+    if kind == "value":
+        return node[1]
+    if kind == "path":
+        return _resolve(item, node[1])
+    if kind == "size":
+        value = _resolve(item, node[1])
+        if value is _MISSING:
+            return _MISSING
+        if isinstance(value, Binary):
+            return Decimal(len(value.value))
+        return Decimal(len(value))
+    raise _ValidationError(f"Unsupported operand {kind}")
+
+
+_TYPE_CODES = {
+    "S": lambda v: isinstance(v, str),
+    "N": lambda v: isinstance(v, Decimal),
+    "B": lambda v: isinstance(v, Binary),
+    "BOOL": lambda v: isinstance(v, bool),
+    "NULL": lambda v: v is None,
+    "M": lambda v: isinstance(v, dict),
+    "L": lambda v: isinstance(v, list),
+    "SS": lambda v: isinstance(v, set) and all(isinstance(x, str) for x in v),
+    "NS": lambda v: isinstance(v, set) and all(isinstance(x, Decimal) for x in v),
+    "BS": lambda v: isinstance(v, set) and all(isinstance(x, Binary) for x in v),
+}
+
+
+def _compare(op: str, left: Any, right: Any) -> bool:
+    if left is _MISSING or right is _MISSING:
+        return op == "<>" and not (left is _MISSING and right is _MISSING)
+    if op == "=":
+        return left == right
+    if op == "<>":
+        return left != right
+    if not _same_type(left, right):
+        return False
+    if isinstance(left, Binary):
+        left, right = left.value, right.value
+    return {"<": left < right, "<=": left <= right, ">": left > right, ">=": left >= right}[op]
+
+
+def _evaluate(item: Dict[str, Any], node) -> bool:
+    kind = node[0]
+    if kind == "and":
+        return _evaluate(item, node[1]) and _evaluate(item, node[2])
+    if kind == "or":
+        return _evaluate(item, node[1]) or _evaluate(item, node[2])
+    if kind == "not":
+        return not _evaluate(item, node[1])
+    if kind == "attribute_exists":
+        return _resolve(item, node[1]) is not _MISSING
+    if kind == "attribute_not_exists":
+        return _resolve(item, node[1]) is _MISSING
+    if kind == "attribute_type":
+        value, code = _operand(item, node[1]), _operand(item, node[2])
+        return value is not _MISSING and _TYPE_CODES.get(code, lambda v: False)(value)
+    if kind == "begins_with":
+        value, prefix = _operand(item, node[1]), _operand(item, node[2])
+        if isinstance(value, str) and isinstance(prefix, str):
+            return value.startswith(prefix)
+        if isinstance(value, Binary) and isinstance(prefix, Binary):
+            return value.value.startswith(prefix.value)
+        return False
+    if kind == "contains":
+        value, member = _operand(item, node[1]), _operand(item, node[2])
+        if isinstance(value, str) and isinstance(member, str):
+            return member in value
+        if isinstance(value, (set, list)):
+            return member in value
+        return False
+    if kind == "between":
+        value = _operand(item, node[1])
+        return _compare(">=", value, _operand(item, node[2])) and _compare("<=", value, _operand(item, node[3]))
+    if kind == "in":
+        value = _operand(item, node[1])
+        return value is not _MISSING and any(value == _operand(item, option) for option in node[2])
+    if kind == "cmp":
+        return _compare(node[1], _operand(item, node[2]), _operand(item, node[3]))
+    raise _ValidationError(f"Unsupported condition {kind}")
+
+
+class _Expressions:
+    """Collects names/values for one request and parses its expressions."""
+
+    def __init__(self, kwargs: Dict[str, Any]):
+        self.names = dict(kwargs.get("ExpressionAttributeNames") or {})
+        self.values = {k: _normalize(v) for k, v in (kwargs.get("ExpressionAttributeValues") or {}).items()}
+        self._builder = ConditionExpressionBuilder()
+
+    def _text(self, expression: Any, is_key_condition: bool = False) -> str:
+        if isinstance(expression, ConditionBase):
+            built = self._builder.build_expression(expression, is_key_condition=is_key_condition)
+            self.names.update(built.attribute_name_placeholders)
+            self.values.update({k: _normalize(v) for k, v in built.attribute_value_placeholders.items()})
+            return built.condition_expression
+        return expression
+
+    def condition(self, expression: Any, is_key_condition: bool = False):
+        if expression is None:
+            return None
+        parser = _Parser(self._text(expression, is_key_condition), self.names, self.values)
+        node = parser.condition()
+        if not parser.done():
+            raise _ValidationError("Unexpected trailing tokens in condition")
+        return node
+
+    def update(self, expression: str):
+        return _Parser(expression, self.names, self.values).update()
+
+    def projection(self, expression: Optional[str]) -> Optional[List[Tuple[Any, ...]]]:
+        if not expression:
+            return None
+        parser = _Parser(expression, self.names, self.values)
+        paths = [parser.path()]
+        while not parser.done():
+            parser.expect(",")
+            paths.append(parser.path())
+        return paths
+
+
+def _project(item: Dict[str, Any], paths: Optional[List[Tuple[Any, ...]]]) -> Dict[str, Any]:
+    if paths is None:
+        return copy.deepcopy(item)
+    result: Dict[str, Any] = {}
+    for path in paths:
+        value = _resolve(item, path)
+        if value is _MISSING:
+            continue
+        target = result
+        for part in path[:-1]:
+            if isinstance(part, int):
+                break
+            target = target.setdefault(part, {})
+        else:
+            if not isinstance(path[-1], int):
+                target[path[-1]] = copy.deepcopy(value)
+    return result
+
+
+# --------------------------------------------------------------------------- updates
+
+
+def _apply_set(item: Dict[str, Any], path: Sequence[Any], value: Any) -> None:
+    parent: Any = item
+    for part in path[:-1]:
+        parent = parent[part] if isinstance(part, int) else parent.get(part, _MISSING)
+        if parent is _MISSING or not isinstance(parent, (dict, list)):
+            raise _ValidationError("The document path provided in the update expression is invalid for update")
+    last = path[-1]
+    if isinstance(last, int):
+        if not isinstance(parent, list):
+            raise _ValidationError("The document path provided in the update expression is invalid for update")
+        if last >= len(parent):
+            parent.append(value)
+        else:
+            parent[last] = value
+    else:
+        if not isinstance(parent, dict):
+            raise _ValidationError("The document path provided in the update expression is invalid for update")
+        parent[last] = value
+
+
+def _apply_remove(item: Dict[str, Any], path: Sequence[Any]) -> None:
+    parent = _resolve(item, path[:-1]) if len(path) > 1 else item
+    last = path[-1]
+    if isinstance(parent, dict) and not isinstance(last, int):
+        parent.pop(last, None)
+    elif isinstance(parent, list) and isinstance(last, int) and last < len(parent):
+        parent.pop(last)
+
+
+def _set_value(item: Dict[str, Any], node) -> Any:
+    kind = node[0]
+    if kind == "arith":
+        left, right = _set_value(item, node[2]), _set_value(item, node[3])
+        if not isinstance(left, Decimal) or not isinstance(right, Decimal):
+            raise _ValidationError("An operand in the update expression has an incorrect data type")
+        return left + right if node[1] == "+" else left - right
+    if kind == "if_not_exists":
+        current = _resolve(item, node[1])
+        return _set_value(item, node[2]) if current is _MISSING else current
+    if kind == "list_append":
+        left, right = _set_value(item, node[1]), _set_value(item, node[2])
+        if not isinstance(left, list) or not isinstance(right, list):
+            raise _ValidationError("An operand in the update expression has an incorrect data type")
+        return left + right
+    value = _operand(item, node)
+    if value is _MISSING:
+        raise _ValidationError("The provided expression refers to an attribute that does not exist in the item")
+    return value
+
+
+def _apply_update(item: Dict[str, Any], actions, key_names: Iterable[str]) -> List[str]:
+    """Apply parsed update actions in place; returns the touched top-level names."""
+    touched: List[str] = []
+    key_names = set(key_names)
+    # Right-hand sides see the item as it was before the update.
+    original = copy.deepcopy(item)
+    for action, payload in actions:
+        path = payload if action == "REMOVE" else payload[0]
+        if path[0] in key_names:
+            raise _ValidationError(f"Cannot update attribute {path[0]}. This attribute is part of the key")
+        touched.append(path[0])
+        if action == "SET":
+            _apply_set(item, path, copy.deepcopy(_set_value(original, payload[1])))
+        elif action == "REMOVE":
+            _apply_remove(item, path)
+        elif action == "ADD":
+            current, value = _resolve(item, path), payload[1]
+            if current is _MISSING:
+                _apply_set(item, path, copy.deepcopy(value))
+            elif isinstance(current, Decimal) and isinstance(value, Decimal):
+                _apply_set(item, path, current + value)
+            elif isinstance(current, set) and isinstance(value, set):
+                _apply_set(item, path, current | value)
+            else:
+                raise _ValidationError("An operand in the update expression has an incorrect data type")
+        elif action == "DELETE":
+            current, value = _resolve(item, path), payload[1]
+            if isinstance(current, set) and isinstance(value, set):
+                remaining = current - value
+                if remaining:
+                    _apply_set(item, path, remaining)
+                else:
+                    _apply_remove(item, path)
+    return touched
+
+
+# --------------------------------------------------------------------------- storage
+
+
+class _Index:
+    def __init__(self, name: str, hash_key: str, range_key: Optional[str]):
+        self.name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.partitions: Dict[Any, List[Tuple[Any, str, str]]] = {}
+
+    def entry(self, item: Dict[str, Any]) -> Optional[Tuple[Any, Tuple[Any, str, str]]]:
+        hash_value = item.get(self.hash_key)
+        if hash_value is None:
+            return None
+        range_value = item.get(self.range_key) if self.range_key else ""
+        if range_value is None:
+            return None  # sparse: items without both keys stay out of the index
+        return hash_value, (range_value, item["PK"], item["SK"])
+
+    def add(self, item: Dict[str, Any]) -> None:
+        entry = self.entry(item)
+        if entry:
+            insort(self.partitions.setdefault(entry[0], []), entry[1])
+
+    def discard(self, item: Dict[str, Any]) -> None:
+        entry = self.entry(item)
+        if not entry:
+            return
+        rows = self.partitions.get(entry[0], [])
+        idx = bisect_left(rows, entry[1])
+        if idx < len(rows) and rows[idx] == entry[1]:
+            rows.pop(idx)
+        if not rows:
+            self.partitions.pop(entry[0], None)
+
+
+class MemoryStore:
+    def __init__(self, definition: Dict[str, Any]):
+        schema = {k["KeyType"]: k["AttributeName"] for k in definition["KeySchema"]}
+        self.hash_key = schema["HASH"]
+        self.range_key = schema.get("RANGE")
+        self.indexes: Dict[str, _Index] = {}
+        for gsi in definition.get("GlobalSecondaryIndexes", []):
+            keys = {k["KeyType"]: k["AttributeName"] for k in gsi["KeySchema"]}
+            self.indexes[gsi["IndexName"]] = _Index(gsi["IndexName"], keys["HASH"], keys.get("RANGE"))
+        self.partitions: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.RLock()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.partitions.clear()
+            for index in self.indexes.values():
+                index.partitions.clear()
+
+    def key_of(self, key: Dict[str, Any]) -> Tuple[str, str]:
+        names = {self.hash_key, self.range_key}
+        if set(key) != names:
+            raise _ValidationError("The provided key element does not match the schema")
+        pk, sk = key[self.hash_key], key[self.range_key]
+        if not isinstance(pk, str) or not isinstance(sk, str) or not pk or not sk:
+            raise _ValidationError("One or more parameter values are not valid. Key attributes must be non-empty strings")
+        return pk, sk
+
+    def get(self, pk: str, sk: str) -> Optional[Dict[str, Any]]:
+        partition = self.partitions.get(pk)
+        return partition["items"].get(sk) if partition else None
+
+    def put(self, item: Dict[str, Any]) -> None:
+        pk, sk = item[self.hash_key], item[self.range_key]
+        if item_size(item) > MAX_ITEM_BYTES:
+            raise _ValidationError("Item size has exceeded the maximum allowed size")
+        self.delete(pk, sk)
+        partition = self.partitions.setdefault(pk, {"keys": [], "items": {}})
+        insort(partition["keys"], sk)
+        partition["items"][sk] = item
+        for index in self.indexes.values():
+            index.add(item)
+
+    def delete(self, pk: str, sk: str) -> Optional[Dict[str, Any]]:
+        partition = self.partitions.get(pk)
+        if not partition or sk not in partition["items"]:
+            return None
+        item = partition["items"].pop(sk)
+        keys = partition["keys"]
+        keys.pop(bisect_left(keys, sk))
+        if not keys:
+            self.partitions.pop(pk)
+        for index in self.indexes.values():
+            index.discard(item)
+        return item
+
+
+def _split_key_condition(node, hash_key: str, range_key: Optional[str]):
+    """Split a key condition into the hash-key value and an optional range node."""
+    conjuncts = []
+
+    def walk(n):
+        if n[0] == "and":
+            walk(n[1])
+            walk(n[2])
+        else:
+            conjuncts.append(n)
+
+    walk(node)
+    hash_value, range_node = _MISSING, None
+    for part in conjuncts:
+        if part[0] == "cmp" and part[1] == "=" and part[2] == ("path", (hash_key,)) and part[3][0] == "value":
+            hash_value = part[3][1]
+        elif range_node is None and _range_attribute(part) == range_key:
+            range_node = part
+        else:
+            raise _ValidationError("Query key condition not supported")
+    if hash_value is _MISSING:
+        raise _ValidationError("Query condition missed key schema element")
+    return hash_value, range_node
+
+
+def _range_attribute(node) -> Optional[str]:
+    if node[0] in {"cmp", "between", "begins_with"}:
+        operand = node[2] if node[0] == "cmp" else node[1]
+        if operand[0] == "path" and len(operand[1]) == 1:
+            return operand[1][0]
+    return None
+
+
+def _range_bounds(rows: List[Any], node, key) -> Tuple[int, int]:
+    """Narrow a sorted list to the slice the range condition can match."""
+    lo, hi = 0, len(rows)
+    if node is None:
+        return lo, hi
+    if node[0] == "begins_with":
+        prefix = node[2][1]
+        if not isinstance(prefix, str):
+            raise _ValidationError("begins_with on a key requires a string prefix")
+        return bisect_left(rows, prefix, key=key), bisect_right(rows, prefix + "\U0010ffff", key=key)
+    if node[0] == "between":
+        return bisect_left(rows, node[2][1], key=key), bisect_right(rows, node[3][1], key=key)
+    op, value = node[1], node[3][1]
+    if op == "=":
+        return bisect_left(rows, value, key=key), bisect_right(rows, value, key=key)
+    if op == "<":
+        return lo, bisect_left(rows, value, key=key)
+    if op == "<=":
+        return lo, bisect_right(rows, value, key=key)
+    if op == ">":
+        return bisect_right(rows, value, key=key), hi
+    if op == ">=":
+        return bisect_left(rows, value, key=key), hi
+    raise _ValidationError(f"Unsupported key condition operator {op}")
+
+
+class MemoryClient:
+    """Low-level operations shared by ``MemoryTable`` and ``table.meta.client``."""
+
+    def __init__(self, table_name: str, store: MemoryStore):
+        self.table_name = table_name
+        self.store = store
+        self._before_call: List[Callable[..., None]] = []
+
+    def register_before_call(self, hook: Callable[..., None]) -> None:
+        """Run ``hook`` before every operation, like botocore's ``before-call`` event."""
+        self._before_call.append(hook)
+
+    # -- helpers
+    def _check_table(self, name: str, operation: str) -> None:
+        if name != self.table_name:
+            raise _error("ResourceNotFoundException", "Requested resource not found", operation)
+
+    def _run(self, operation: str, func, *args, params: Optional[Dict[str, Any]] = None):
+        for hook in self._before_call:
+            hook(event_name=f"before-call.dynamodb.{operation}", params=params or {})
+        try:
+            with self.store.lock:
+                return func(*args)
+        except _ValidationError as exc:
+            raise _error("ValidationException", str(exc), operation) from None
+        except TypeError as exc:
+            raise _error("ValidationException", str(exc), operation) from None
+
+    def _key(self, key: Dict[str, Any]) -> Tuple[str, str]:
+        return self.store.key_of(_normalize(key))
+
+    def _check(self, current: Optional[Dict[str, Any]], condition) -> bool:
+        return condition is None or _evaluate(current or {}, condition)
+
+    # -- single item
+    def get_item(self, TableName: str, Key: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        self._check_table(TableName, "GetItem")
+
+        def op():
+            exprs = _Expressions(kwargs)
+            item = self.store.get(*self._key(Key))
+            if item is None:
+                return {}
+            return {"Item": _project(item, exprs.projection(kwargs.get("ProjectionExpression")))}
+
+        return self._run("GetItem", op, params={"Key": Key, **kwargs})
+
+    def put_item(self, TableName: str, Item: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        self._check_table(TableName, "PutItem")
+
+        def op():
+            item = _normalize(Item)
+            pk, sk = self.store.key_of({self.store.hash_key: item.get(self.store.hash_key), self.store.range_key: item.get(self.store.range_key)})
+            exprs = _Expressions(kwargs)
+            current = self.store.get(pk, sk)
+            if not self._check(current, exprs.condition(kwargs.get("ConditionExpression"))):
+                raise self._condition_failed("PutItem", current, kwargs)
+            self.store.put(copy.deepcopy(item))
+            if kwargs.get("ReturnValues") == "ALL_OLD" and current is not None:
+                return {"Attributes": copy.deepcopy(current)}
+            return {}
+
+        return self._run("PutItem", op, params={"Item": Item, **kwargs})
+
+    def update_item(self, TableName: str, Key: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        self._check_table(TableName, "UpdateItem")
+
+        def op():
+            pk, sk = self._key(Key)
+            exprs = _Expressions(kwargs)
+            current = self.store.get(pk, sk)
+            if not self._check(current, exprs.condition(kwargs.get("ConditionExpression"))):
+                raise self._condition_failed("UpdateItem", current, kwargs)
+            updated = copy.deepcopy(current) if current else {self.store.hash_key: pk, self.store.range_key: sk}
+            touched: List[str] = []
+            if kwargs.get("UpdateExpression"):
+                touched = _apply_update(updated, exprs.update(kwargs["UpdateExpression"]), (self.store.hash_key, self.store.range_key))
+            self.store.put(updated)
+            return self._return_values(kwargs.get("ReturnValues"), current, updated, touched)
+
+        return self._run("UpdateItem", op, params={"Key": Key, **kwargs})
+
+    def delete_item(self, TableName: str, Key: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        self._check_table(TableName, "DeleteItem")
+
+        def op():
+            pk, sk = self._key(Key)
+            exprs = _Expressions(kwargs)
+            current = self.store.get(pk, sk)
+            if not self._check(current, exprs.condition(kwargs.get("ConditionExpression"))):
+                raise self._condition_failed("DeleteItem", current, kwargs)
+            self.store.delete(pk, sk)
+            if kwargs.get("ReturnValues") == "ALL_OLD" and current is not None:
+                return {"Attributes": copy.deepcopy(current)}
+            return {}
+
+        return self._run("DeleteItem", op, params={"Key": Key, **kwargs})
+
+    @staticmethod
+    def _return_values(mode: Optional[str], old, new, touched: List[str]) -> Dict[str, Any]:
+        if mode in (None, "NONE"):
+            return {}
+        if mode == "ALL_NEW":
+            return {"Attributes": copy.deepcopy(new)}
+        if mode == "ALL_OLD":
+            return {"Attributes": copy.deepcopy(old)} if old else {}
+        source = new if mode == "UPDATED_NEW" else (old or {})
+        attrs = {name: copy.deepcopy(source[name]) for name in touched if name in source}
+        return {"Attributes": attrs} if attrs else {}
+
+    @staticmethod
+    def _condition_failed(operation: str, current, kwargs) -> ClientError:
+        extra = {}
+        if kwargs.get("ReturnValuesOnConditionCheckFailure") == "ALL_OLD" and current:
+            serializer = TypeSerializer()
+            extra["Item"] = {k: serializer.serialize(v) for k, v in current.items()}
+        return _error("ConditionalCheckFailedException", "The conditional request failed", operation, **extra)
+
+    # -- reads over ranges
+    def query(self, TableName: str, **kwargs) -> Dict[str, Any]:
+        self._check_table(TableName, "Query")
+        return self._run("Query", self._query, kwargs, params=kwargs)
+
+    def _query(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        exprs = _Expressions(kwargs)
+        index_name = kwargs.get("IndexName")
+        if index_name:
+            if kwargs.get("ConsistentRead"):
+                raise _ValidationError("Consistent reads are not supported on global secondary indexes")
+            index = self.store.indexes.get(index_name)
+            if index is None:
+                raise _ValidationError(f"The table does not have the specified index: {index_name}")
+            hash_key, range_key = index.hash_key, index.range_key
+        else:
+            index, hash_key, range_key = None, self.store.hash_key, self.store.range_key
+
+        key_node = exprs.condition(kwargs["KeyConditionExpression"], is_key_condition=True)
+        hash_value, range_node = _split_key_condition(key_node, hash_key, range_key)
+
+        start = _normalize(kwargs["ExclusiveStartKey"]) if kwargs.get("ExclusiveStartKey") else None
+        if index is None:
+            partition = self.store.partitions.get(hash_value)
+            rows = partition["keys"] if partition else []
+            lo, hi = _range_bounds(rows, range_node, None)
+            resolve = lambda sk: partition["items"][sk]  # noqa: E731
+            start_pos = start[self.store.range_key] if start else None
+        else:
+            rows = index.partitions.get(hash_value, [])
+            lo, hi = _range_bounds(rows, range_node, lambda row: row[0])
+            resolve = lambda row: self.store.get(row[1], row[2])  # noqa: E731
+            start_pos = (
+                (start.get(range_key, "") if range_key else "", start[self.store.hash_key], start[self.store.range_key])
+                if start
+                else None
+            )
+
+        forward = kwargs.get("ScanIndexForward", True)
+        if start_pos is not None:
+            if forward:
+                lo = max(lo, bisect_right(rows, start_pos, lo, hi))
+            else:
+                hi = min(hi, bisect_left(rows, start_pos, lo, hi))
+        order = range(lo, hi) if forward else range(hi - 1, lo - 1, -1)
+        window = (rows[i] for i in order)
+        return self._page(window, resolve, exprs, kwargs, index)
+
+    def _page(self, rows: Iterable[Any], resolve, exprs: _Expressions, kwargs, index: Optional[_Index]) -> Dict[str, Any]:
+        limit = kwargs.get("Limit")
+        filter_node = exprs.condition(kwargs.get("FilterExpression"))
+        projection = exprs.projection(kwargs.get("ProjectionExpression"))
+        items: List[Dict[str, Any]] = []
+        scanned = 0
+        last_item = None
+        for row in rows:
+            if limit is not None and scanned >= limit:
+                break
+            item = resolve(row)
+            scanned += 1
+            last_item = item
+            if filter_node is None or _evaluate(item, filter_node):
+                items.append(item)
+
+        response: Dict[str, Any] = {"Count": len(items), "ScannedCount": scanned}
+        if kwargs.get("Select") != "COUNT":
+            response["Items"] = [_project(item, projection) for item in items]
+        if limit is not None and scanned >= limit and last_item is not None:
+            last_key = {self.store.hash_key: last_item[self.store.hash_key], self.store.range_key: last_item[self.store.range_key]}
+            if index is not None:
+                last_key[index.hash_key] = last_item[index.hash_key]
+                if index.range_key:
+                    last_key[index.range_key] = last_item[index.range_key]
+            response["LastEvaluatedKey"] = last_key
+        return response
+
+    def scan(self, TableName: str, **kwargs) -> Dict[str, Any]:
+        self._check_table(TableName, "Scan")
+
+        def op():
+            exprs = _Expressions(kwargs)
+            segment, total = kwargs.get("Segment"), kwargs.get("TotalSegments")
+            start = _normalize(kwargs.get("ExclusiveStartKey")) if kwargs.get("ExclusiveStartKey") else None
+            start_pos = (start[self.store.hash_key], start[self.store.range_key]) if start else None
+
+            def rows() -> Iterator[Tuple[str, str]]:
+                for pk in sorted(self.store.partitions):
+                    if total and zlib.crc32(pk.encode("utf-8")) % total != segment:
+                        continue
+                    for sk in list(self.store.partitions[pk]["keys"]):
+                        if start_pos is None or (pk, sk) > start_pos:
+                            yield pk, sk
+
+            return self._page(rows(), lambda row: self.store.get(*row), exprs, kwargs, None)
+
+        return self._run("Scan", op, params=kwargs)
+
+    # -- batches and transactions
+    def batch_get_item(self, RequestItems: Dict[str, Any], **_kwargs) -> Dict[str, Any]:
+        def op():
+            responses: Dict[str, List[Dict[str, Any]]] = {}
+            total = sum(len(request["Keys"]) for request in RequestItems.values())
+            if total > 100:
+                raise _ValidationError("Too many items requested for the BatchGetItem call")
+            for table_name, request in RequestItems.items():
+                self._check_table(table_name, "BatchGetItem")
+                keys = [self._key(key) for key in request["Keys"]]
+                if len(set(keys)) != len(keys):
+                    raise _ValidationError("Provided list of item keys contains duplicates")
+                exprs = _Expressions(request)
+                projection = exprs.projection(request.get("ProjectionExpression"))
+                found = [self.store.get(*key) for key in keys]
+                responses[table_name] = [_project(item, projection) for item in found if item is not None]
+            return {"Responses": responses, "UnprocessedKeys": {}}
+
+        return self._run("BatchGetItem", op)
+
+    def batch_write_item(self, RequestItems: Dict[str, List[Dict[str, Any]]], **_kwargs) -> Dict[str, Any]:
+        def op():
+            writes: List[Tuple[str, Any]] = []
+            for table_name, requests in RequestItems.items():
+                self._check_table(table_name, "BatchWriteItem")
+                for request in requests:
+                    if "PutRequest" in request:
+                        item = _normalize(request["PutRequest"]["Item"])
+                        key = self.store.key_of({self.store.hash_key: item.get(self.store.hash_key), self.store.range_key: item.get(self.store.range_key)})
+                        writes.append((key, item))
+                    else:
+                        writes.append((self._key(request["DeleteRequest"]["Key"]), None))
+            if len(writes) > 25:
+                raise _ValidationError("Too many items requested for the BatchWriteItem call")
+            if len({key for key, _ in writes}) != len(writes):
+                raise _ValidationError("Provided list of item keys contains duplicates")
+            for item in (item for _, item in writes if item is not None):
+                if item_size(item) > MAX_ITEM_BYTES:
+                    raise _ValidationError("Item size has exceeded the maximum allowed size")
+            for key, item in writes:
+                if item is None:
+                    self.store.delete(*key)
+                else:
+                    self.store.put(copy.deepcopy(item))
+            return {"UnprocessedItems": {}}
+
+        return self._run("BatchWriteItem", op)
+
+    def transact_write_items(self, TransactItems: List[Dict[str, Any]], **_kwargs) -> Dict[str, Any]:
+        def op():
+            if len(TransactItems) > MAX_TRANSACTION_ITEMS:
+                raise _ValidationError(f"Member must have length less than or equal to {MAX_TRANSACTION_ITEMS}")
+            plan = []
+            for entry in TransactItems:
+                (action, request), = entry.items()
+                self._check_table(request["TableName"], "TransactWriteItems")
+                if action == "Put":
+                    item = _normalize(request["Item"])
+                    key = self.store.key_of({self.store.hash_key: item.get(self.store.hash_key), self.store.range_key: item.get(self.store.range_key)})
+                else:
+                    item, key = None, self._key(request["Key"])
+                plan.append((action, request, key, item))
+            if len({key for _, _, key, _ in plan}) != len(plan):
+                raise _ValidationError("Transaction request cannot include multiple operations on one item")
+
+            reasons, failed = [], False
+            for action, request, key, _ in plan:
+                exprs = _Expressions(request)
+                current = self.store.get(*key)
+                if self._check(current, exprs.condition(request.get("ConditionExpression"))):
+                    reasons.append({"Code": "None"})
+                    continue
+                failed = True
+                reason = {"Code": "ConditionalCheckFailed", "Message": "The conditional request failed"}
+                if request.get("ReturnValuesOnConditionCheckFailure") == "ALL_OLD" and current:
+                    serializer = TypeSerializer()
+                    reason["Item"] = {k: serializer.serialize(v) for k, v in current.items()}
+                reasons.append(reason)
+            if failed:
+                codes = ", ".join(reason["Code"] for reason in reasons)
+                raise _error(
+                    "TransactionCanceledException",
+                    f"Transaction cancelled, please refer cancellation reasons for specific reasons [{codes}]",
+                    "TransactWriteItems",
+                    CancellationReasons=reasons,
+                )
+
+            # Build every new image first so a validation error leaves nothing applied.
+            staged = []
+            for action, request, key, item in plan:
+                if action == "Put":
+                    if item_size(item) > MAX_ITEM_BYTES:
+                        raise _ValidationError("Item size has exceeded the maximum allowed size")
+                    staged.append((key, copy.deepcopy(item)))
+                elif action == "Update":
+                    current = self.store.get(*key)
+                    updated = copy.deepcopy(current) if current else {self.store.hash_key: key[0], self.store.range_key: key[1]}
+                    exprs = _Expressions(request)
+                    _apply_update(updated, exprs.update(request["UpdateExpression"]), (self.store.hash_key, self.store.range_key))
+                    staged.append((key, updated))
+                elif action == "Delete":
+                    staged.append((key, None))
+            for key, item in staged:
+                if item is None:
+                    self.store.delete(*key)
+                else:
+                    self.store.put(item)
+            return {}
+
+        return self._run("TransactWriteItems", op)
+
+
+class MemoryTable:
+    """The subset of ``boto3.resources.Table`` the repository relies on."""
+
+    def __init__(self, name: str, definition: Dict[str, Any]):
+        self.name = name
+        self.store = MemoryStore(definition)
+        self.meta = SimpleNamespace(client=MemoryClient(name, self.store))
+
+    def load(self) -> None:
+        return None
+
+    def clear(self) -> None:
+        self.store.clear()
+
+    def get_item(self, **kwargs):
+        return self.meta.client.get_item(TableName=self.name, **kwargs)
+
+    def put_item(self, **kwargs):
+        return self.meta.client.put_item(TableName=self.name, **kwargs)
+
+    def update_item(self, **kwargs):
+        return self.meta.client.update_item(TableName=self.name, **kwargs)
+
+    def delete_item(self, **kwargs):
+        return self.meta.client.delete_item(TableName=self.name, **kwargs)
+
+    def query(self, **kwargs):
+        return self.meta.client.query(TableName=self.name, **kwargs)
+
+    def scan(self, **kwargs):
+        return self.meta.client.scan(TableName=self.name, **kwargs)
+
+    def batch_writer(self, overwrite_by_pkeys: Optional[List[str]] = None) -> BatchWriter:
+        return BatchWriter(self.name, self.meta.client, overwrite_by_pkeys=overwrite_by_pkeys)
+
+
+@lru_cache(maxsize=1)
+def get_table() -> MemoryTable:
+    from .dynamodb import _on_before_call
+    from .observability import record_dynamodb_call
+    from .storage import table_definition
+
+    table = MemoryTable(settings.table_name, table_definition(settings.table_name))
+    # Same request-deadline, circuit-breaker and call-logging hooks as the boto3 clients.
+    table.meta.client.register_before_call(_on_before_call)
+    table.meta.client.register_before_call(record_dynamodb_call)
+    return table
@@ -0,0 +1,208 @@
+"""Structured access logs and the slow repository-call log.
+
+Both loggers hand records to a ``QueueHandler``; a single ``QueueListener``
+thread formats them as JSON lines and writes them out, so request threads
+never block on the log stream.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import hashlib
+import json
+import logging
+import queue
+import sys
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+
+from .profiling import request_thread
+from .settings import settings
+
+access_logger = logging.getLogger("dodeck.access")
+slow_call_logger = logging.getLogger("dodeck.slow_call")
+
+_listener: Optional[QueueListener] = None
+
+
+@dataclass
+class RequestStats:
+    user_sub: Optional[str] = None
+    dynamodb_calls: int = 0
+
+
+@dataclass
+class OperationStats:
+    name: str
+    calls: List[Dict[str, Any]] = field(default_factory=list)
+
+
+_request: ContextVar[Optional[RequestStats]] = ContextVar("dodeck_request_stats", default=None)
+_operation: ContextVar[Optional[OperationStats]] = ContextVar("dodeck_operation_stats", default=None)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", {}))
+        return json.dumps(payload, default=str)
+
+
+def configure_logging() -> None:
+    """Route the access and slow-call loggers through a queue (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+    _listener = QueueListener(records, stream, respect_handler_level=False)
+    _listener.start()
+    for logger in (access_logger, slow_call_logger):
+        logger.handlers[:] = [QueueHandler(records)]
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Drain queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def user_hash(sub: Optional[str]) -> Optional[str]:
+    if not sub:
+        return None
+    return hashlib.sha256(sub.encode("utf-8")).hexdigest()[:16]
+
+
+def set_user(sub: str) -> None:
+    stats = _request.get()
+    if stats is not None:
+        stats.user_sub = sub
+
+
+def _render_value(value: Any) -> Any:
+    # Wire-format attribute values ({"S": "DECK#1"}) collapse to their payload.
+    if isinstance(value, dict) and len(value) == 1:
+        return next(iter(value.values()))
+    return value
+
+
+def render_key_condition(params: Dict[str, Any]) -> Optional[str]:
+    expression = params.get("KeyConditionExpression")
+    if expression is None:
+        key = params.get("Key")
+        return " AND ".join(f"{name} = {_render_value(value)}" for name, value in key.items()) if key else None
+    names = dict(params.get("ExpressionAttributeNames") or {})
+    values = dict(params.get("ExpressionAttributeValues") or {})
+    if isinstance(expression, ConditionBase):
+        built = ConditionExpressionBuilder().build_expression(expression, is_key_condition=True)
+        expression = built.condition_expression
+        names.update(built.attribute_name_placeholders)
+        values.update(built.attribute_value_placeholders)
+    for placeholder in sorted(values, key=len, reverse=True):
+        expression = expression.replace(placeholder, str(_render_value(values[placeholder])))
+    for placeholder in sorted(names, key=len, reverse=True):
+        expression = expression.replace(placeholder, names[placeholder])
+    return expression
+
+
+def record_dynamodb_call(event_name: str = "", params: Optional[Dict[str, Any]] = None, **_kwargs) -> None:
+    """Per-call hook: counts calls per request and notes them per repository operation."""
+    stats = _request.get()
+    if stats is not None:
+        stats.dynamodb_calls += 1
+    operation = _operation.get()
+    if operation is not None:
+        operation.calls.append(
+            {"op": event_name.rsplit(".", 1)[-1], "key": render_key_condition(params or {})}
+        )
+
+
+def repository_operation(func):
+    """Log the wrapped repository call when it runs longer than ``SLOW_CALL_THRESHOLD_MS``."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with request_thread():  # the profiler samples threads doing its request's work
+            if _operation.get() is not None:
+                return func(*args, **kwargs)  # nested operations report as part of the outer one
+            stats = OperationStats(func.__name__)
+            token = _operation.set(stats)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _operation.reset(token)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if elapsed_ms >= settings.slow_call_threshold_ms:
+                    calls = stats.calls
+                    slow_call_logger.warning(
+                        "slow repository call",
+                        extra={
+                            "fields": {
+                                "operation": stats.name,
+                                "latencyMs": round(elapsed_ms, 2),
+                                "dynamodbCalls": len(calls),
+                                "pagesRead": sum(1 for call in calls if call["op"] in {"Query", "Scan"}),
+                                "keyConditions": sorted({call["key"] for call in calls if call["key"]}),
+                            }
+                        },
+                    )
+
+    return wrapper
+
+
+class AccessLogMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.access_log_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def capture_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture_status)
+        finally:
+            _request.reset(token)
+            route = scope.get("route")
+            access_logger.info(
+                "request",
+                extra={
+                    "fields": {
+                        "method": scope.get("method"),
+                        "route": getattr(route, "path", None) or scope.get("path"),
+                        "status": status_code,
+                        "latencyMs": round((time.perf_counter() - started) * 1000, 2),
+                        "userHash": user_hash(stats.user_sub),
+                        "dynamodbCalls": stats.dynamodb_calls,
+                    }
+                },
+            )
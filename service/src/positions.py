@@ -0,0 +1,185 @@
+"""Lexicographic fractional-index keys for user-ordered dos.
+
+A key is an integer part followed by an optional fraction, both in base 62
+with digits in ASCII order, so plain string comparison orders keys. The
+integer part starts with a head character that encodes its length
+(``a`` = 2 chars, ``b`` = 3, ...; ``Z``, ``Y``, ... for negative
+magnitudes), which keeps repeated appends at the end of a list logarithmic
+in length. Between any two keys there is always another key, so moving an
+item only rewrites that item.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime
+from typing import List, Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+SMALLEST_INTEGER = "A" + "0" * 26
+
+# Integer parts of new dos are creation times in epoch milliseconds: seven
+# base-62 digits (good until 2081) under head ``g`` (integer length 8).
+_TIMESTAMP_HEAD = "g"
+_TIMESTAMP_DIGITS = 7
+
+
+class PositionError(ValueError):
+    pass
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise PositionError(f"invalid position head {head!r}")
+
+
+def _integer_part(key: str) -> str:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise PositionError(f"invalid position {key!r}")
+    return key[:length]
+
+
+def validate(key: str) -> None:
+    if not key or key == SMALLEST_INTEGER or any(ch not in DIGITS for ch in key[1:]):
+        raise PositionError(f"invalid position {key!r}")
+    integer = _integer_part(key)
+    if key[len(integer):].endswith("0"):
+        raise PositionError(f"invalid position {key!r}")
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """A fraction strictly between fractions ``a`` and ``b`` (``None`` is 1)."""
+    if b is not None:
+        n = 0
+        while (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _increment(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) + 1
+        if value < BASE:
+            digits[i] = DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = "0"
+    if head == "Z":
+        return "a0"
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append("0")
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) - 1
+        if value >= 0:
+            digits[i] = DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """A key that sorts strictly after ``a`` and before ``b``; ``None`` means unbounded."""
+    if a is not None:
+        validate(a)
+    if b is not None:
+        validate(b)
+    if a is not None and b is not None and a >= b:
+        raise PositionError(f"{a!r} does not sort before {b!r}")
+
+    if a is None:
+        if b is None:
+            return "a0"
+        integer_b = _integer_part(b)
+        if integer_b == SMALLEST_INTEGER:
+            return integer_b + _midpoint("", b[len(integer_b):])
+        if integer_b < b:
+            return integer_b
+        lower = _decrement(integer_b)
+        if lower is None:
+            raise PositionError("cannot place a key before the smallest position")
+        return lower
+
+    integer_a = _integer_part(a)
+    fraction_a = a[len(integer_a):]
+    if b is None:
+        higher = _increment(integer_a)
+        return integer_a + _midpoint(fraction_a, None) if higher is None else higher
+
+    integer_b = _integer_part(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, b[len(integer_b):])
+    higher = _increment(integer_a)
+    if higher is not None and higher < b:
+        return higher
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def keys_between(a: Optional[str], b: Optional[str], count: int) -> List[str]:
+    """``count`` evenly spread, increasing keys between ``a`` and ``b``."""
+    if count <= 0:
+        return []
+    if count == 1:
+        return [key_between(a, b)]
+    if b is None:
+        keys = [key_between(a, None)]
+        while len(keys) < count:
+            keys.append(key_between(keys[-1], None))
+        return keys
+    if a is None:
+        keys = [key_between(None, b)]
+        while len(keys) < count:
+            keys.append(key_between(None, keys[-1]))
+        return list(reversed(keys))
+    half = count // 2
+    middle = key_between(a, b)
+    return keys_between(a, middle, half) + [middle] + keys_between(middle, b, count - half - 1)
+
+
+def timestamp_key(moment: datetime, *, jitter: bool = True) -> str:
+    """An append position for an item created at ``moment``.
+
+    Creation time orders new dos after existing ones without reading the
+    current last position; a short random fraction separates dos created in
+    the same millisecond.
+    """
+    millis = max(0, int(moment.timestamp() * 1000))
+    digits = []
+    for _ in range(_TIMESTAMP_DIGITS):
+        millis, remainder = divmod(millis, BASE)
+        digits.append(DIGITS[remainder])
+    key = _TIMESTAMP_HEAD + "".join(reversed(digits))
+    if jitter:
+        key += DIGITS[random.randrange(BASE)] + DIGITS[random.randrange(1, BASE)]
+    return key
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+
+from .metrics import registry
+from .settings import settings
+from .threadpool import run_in_worker_thread
+
+PROFILE_HEADER = b"x-dodeck-profile"
+PROFILES_CAPTURED = registry.counter("dodeck_profiles_captured_total", "Request profiles written, by trigger.")
+
+_NAME = re.compile(r"^[0-9]{13}-[0-9a-f]{8}\.json$")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class Sampler:
+    """Samples the profiled request's thread stacks at a fixed interval.
+
+    Only threads doing the request's work are read (see ``request_thread``),
+    so concurrent requests and idle workers stay out of the profile. The
+    event loop thread is shared with other requests, so there only stacks
+    running through one of the request's handler frames count (see
+    ``ProfiledRoute``). Wall time is the number of samples per stack; CPU time
+    is each thread's CPU clock delta charged to the stack it was in.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.wall: Counter = Counter()
+        self.cpu: Counter = Counter()
+        self.samples = 0
+        self._cpu_seen: Dict[int, float] = {}
+        self._threads: Counter = Counter()
+        self._handlers: Dict[int, List[FrameType]] = {}
+        self._threads_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="dodeck-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Ask the sampling thread to finish; ``join`` waits for it."""
+        self._stop.set()
+
+    def join(self) -> None:
+        self._thread.join()
+
+    def attach(self) -> None:
+        ident = threading.get_ident()
+        with self._threads_lock:
+            if not self._threads[ident]:
+                # CPU the thread spent on other requests since it last worked for this one is not ours.
+                self._cpu_seen.pop(ident, None)
+            self._threads[ident] += 1
+
+    def detach(self) -> None:
+        ident = threading.get_ident()
+        with self._threads_lock:
+            self._threads[ident] -= 1
+            if self._threads[ident] <= 0:
+                del self._threads[ident]
+
+    def attach_handler(self, frame: FrameType) -> None:
+        """Count the calling (event loop) thread while it runs beneath ``frame``."""
+        with self._threads_lock:
+            self._handlers.setdefault(threading.get_ident(), []).append(frame)
+
+    def detach_handler(self, frame: FrameType) -> None:
+        ident = threading.get_ident()
+        with self._threads_lock:
+            self._handlers[ident].remove(frame)
+            if not self._handlers[ident]:
+                del self._handlers[ident]
+
+    def _thread_cpu(self, ident: int) -> Optional[float]:
+        try:
+            return time.clock_gettime(time.pthread_getcpuclockid(ident))
+        except (AttributeError, OSError):  # pragma: no cover - platforms without per-thread clocks
+            return None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        self.samples += 1
+        with self._threads_lock:
+            attached = set(self._threads)
+            handlers = {ident: list(frames) for ident, frames in self._handlers.items()}
+        if not attached and not handlers:
+            return
+        frames = sys._current_frames()
+        for ident in attached | set(handlers):
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack: List[str] = []
+            ours = ident in attached
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                ours = ours or any(frame is handler for handler in handlers.get(ident, ()))
+                frame = frame.f_back
+            cpu_now = self._thread_cpu(ident)
+            cpu_before = self._cpu_seen.get(ident)
+            if cpu_now is not None:
+                self._cpu_seen[ident] = cpu_now
+            if not ours:
+                continue  # the event loop is running another request
+            key = ";".join(reversed(stack))
+            self.wall[key] += 1
+            if cpu_now is not None and cpu_before is not None and cpu_now > cpu_before:
+                self.cpu[key] += cpu_now - cpu_before
+
+    def folded(self) -> Tuple[List[str], List[str]]:
+        """Stacks in the folded format flame graph tools read (``a;b;c count``)."""
+        wall = [f"{stack} {count}" for stack, count in self.wall.most_common()]
+        cpu = [f"{stack} {round(seconds * 1e6)}" for stack, seconds in self.cpu.most_common()]
+        return wall, cpu
+
+
+_profiled: ContextVar[Optional[Sampler]] = ContextVar("dodeck_profiled", default=None)
+
+
+@contextmanager
+def request_thread() -> Iterator[None]:
+    """Count the calling thread as working for the profiled request while the block runs.
+
+    Worker threads inherit the request's context, so repository calls, their
+    fan-out tasks and authentication mark themselves; outside a profiled
+    request this does nothing.
+    """
+    sampler = _profiled.get()
+    if sampler is None:
+        yield
+        return
+    sampler.attach()
+    try:
+        yield
+    finally:
+        sampler.detach()
+
+
+def _sampled(call: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(call)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with request_thread():
+            return call(*args, **kwargs)
+
+    return wrapper
+
+
+def _on_worker_thread(call: Callable[..., Any]) -> Callable[..., Any]:
+    sampled = _sampled(call)
+
+    @functools.wraps(call)
+    async def run(**kwargs: Any) -> Any:
+        return await run_in_worker_thread(sampled, **kwargs)
+
+    return run
+
+
+class ProfiledRoute(APIRoute):
+    """Route whose whole handler is sampled when its request is profiled.
+
+    That covers endpoint code between repository calls, on the worker thread
+    of a sync endpoint, and the response model serialization and rendering
+    on the event loop. Sync endpoints get their thread from
+    ``run_in_worker_thread``, which times the wait for it.
+    """
+
+    def get_route_handler(self) -> Callable:
+        # The dependant is already built from the endpoint's own signature.
+        if not asyncio.iscoroutinefunction(self.dependant.call):
+            self.dependant.call = _on_worker_thread(self.dependant.call)
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request):
+            sampler = _profiled.get()
+            if sampler is None:
+                return await handler(request)
+            frame = sys._getframe()
+            sampler.attach_handler(frame)
+            try:
+                return await handler(request)
+            finally:
+                sampler.detach_handler(frame)
+
+        return profiled_handler
+
+
+class ProfileStore:
+    """Bounded ring of profile files; the oldest files are removed first."""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = Path(directory)
+        self.max_files = max(1, max_files)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_name() -> str:
+        return f"{int(time.time() * 1000):013d}-{os.urandom(4).hex()}.json"
+
+    def write(self, name: str, profile: Dict) -> None:
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.directory / f".{name}.tmp"
+            tmp.write_text(json.dumps(profile))
+            tmp.replace(self.directory / name)
+            for stale in self._names()[: -self.max_files]:
+                (self.directory / stale).unlink(missing_ok=True)
+
+    def _names(self) -> List[str]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(entry.name for entry in self.directory.iterdir() if _NAME.match(entry.name))
+
+    def list(self) -> List[Dict]:
+        summaries = []
+        for name in reversed(self._names()):
+            try:
+                profile = json.loads((self.directory / name).read_text())
+            except (OSError, ValueError):
+                continue
+            summaries.append({"name": name, **profile["request"]})
+        return summaries
+
+    def read(self, name: str) -> Optional[Dict]:
+        if not _NAME.match(name):
+            return None
+        path = self.directory / name
+        if not path.is_file():
+            return None
+        return json.loads(path.read_text())
+
+
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ProfileStore:
+    global _store
+    with _store_lock:
+        if _store is None or str(_store.directory) != settings.profiling_dir:
+            _store = ProfileStore(settings.profiling_dir, settings.profiling_max_files)
+        _store.max_files = max(1, settings.profiling_max_files)
+        return _store
+
+
+def authorized(token: Optional[str]) -> bool:
+    expected = settings.profiling_token
+    return bool(expected and token and hmac.compare_digest(token, expected))
+
+
+class ProfilingMiddleware:
+    """Profiles single requests on demand (``X-Dodeck-Profile: <token>``) or by sampling.
+
+    Only one request is profiled at a time; concurrent requests run unprofiled.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = threading.Lock()
+
+    def _trigger(self, scope) -> Optional[str]:
+        if not settings.profiling_enabled:
+            return None
+        for name, value in scope.get("headers") or []:
+            if name == PROFILE_HEADER:
+                return "header" if authorized(value.decode("latin-1")) else None
+        if settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 0
+
+        async def capture_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if trigger == "header":
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-dodeck-profile-id", name.encode("ascii"))]
+            await send(message)
+
+        store = get_store()
+        name = store.new_name()
+        sampler = Sampler(settings.profiling_interval_seconds)
+        started, cpu_started = time.perf_counter(), time.process_time()
+        profiled = _profiled.set(sampler)
+        sampler.start()
+        try:
+            await self.app(scope, receive, capture_status)
+        finally:
+            sampler.stop()
+            _profiled.reset(profiled)
+            request = {
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "status": status_code,
+                "trigger": trigger,
+                "startedAt": time.time() - (time.perf_counter() - started),
+                "wallSeconds": round(time.perf_counter() - started, 6),
+                "processCpuSeconds": round(time.process_time() - cpu_started, 6),
+                "intervalSeconds": settings.profiling_interval_seconds,
+            }
+            try:
+                # Joining the sampler and writing the file block, so neither runs on the event loop.
+                await run_in_threadpool(self._save, store, name, sampler, request)
+            finally:
+                self._busy.release()
+
+    @staticmethod
+    def _save(store: ProfileStore, name: str, sampler: Sampler, request: Dict) -> None:
+        sampler.join()
+        wall, cpu = sampler.folded()
+        store.write(name, {"request": {**request, "samples": sampler.samples}, "wall": wall, "cpu": cpu})
+        PROFILES_CAPTURED.inc(trigger=request["trigger"])
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from functools import lru_cache
+from typing import Protocol, Tuple
+
+from botocore.exceptions import ClientError
+from fastapi import Depends, HTTPException, status
+
+from .dependencies import AuthContext, get_current_user
+from .metrics import registry
+from .settings import settings
+
+RATE_LIMITED = registry.counter(
+    "dodeck_rate_limited_total",
+    "Requests rejected by the per-user token bucket.",
+)
+
+
+class RateLimitBackend(Protocol):
+    def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        """Consume one token; return ``(allowed, retry_after_seconds)``."""
+
+
+class InMemoryRateLimitBackend:
+    """Token buckets held in this process, bounded to the most recent keys."""
+
+    def __init__(self, max_keys: int = 10_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(burst), now))
+            tokens = min(float(burst), tokens + (now - updated) * rate)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        if allowed:
+            return True, 0.0
+        return False, (1.0 - tokens) / rate
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class DynamoDBRateLimitBackend:
+    """GCRA buckets shared by every instance through the DoDeck table.
+
+    Each bucket is one ``RATE#{key}`` item holding the theoretical arrival
+    time (``tat``); a request is one or two conditional writes and never a read.
+    Locally it runs against dynamodb-local like the rest of the table.
+    """
+
+    def __init__(self, table=None):
+        self._table = table
+
+    @property
+    def table(self):
+        if self._table is None:
+            from .storage import get_table
+
+            self._table = get_table()
+        return self._table
+
+    @staticmethod
+    def _num(value: float) -> Decimal:
+        return Decimal(str(round(value, 6)))
+
+    def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        interval = 1.0 / rate
+        now = time.time()
+        limit = now + (burst - 1) * interval
+        item_key = {"PK": f"RATE#{key}", "SK": "RATE"}
+        expires_at = int(now + burst * interval) + 60
+
+        try:
+            # Idle bucket: restart the schedule from now.
+            self.table.update_item(
+                Key=item_key,
+                UpdateExpression="SET tat = :next, expiresAt = :exp",
+                ConditionExpression="attribute_not_exists(tat) OR tat <= :now",
+                ExpressionAttributeValues={
+                    ":next": self._num(now + interval),
+                    ":now": self._num(now),
+                    ":exp": expires_at,
+                },
+            )
+            return True, 0.0
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
+        try:
+            self.table.update_item(
+                Key=item_key,
+                UpdateExpression="SET tat = tat + :interval, expiresAt = :exp",
+                ConditionExpression="tat <= :limit",
+                ExpressionAttributeValues={
+                    ":interval": self._num(interval),
+                    ":limit": self._num(limit),
+                    ":exp": expires_at,
+                },
+                ReturnValuesOnConditionCheckFailure="ALL_OLD",
+            )
+            return True, 0.0
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            tat = float((exc.response.get("Item") or {}).get("tat", {}).get("N", limit + interval))
+            return False, max(tat - limit, interval)
+
+
+@lru_cache(maxsize=1)
+def get_backend() -> RateLimitBackend:
+    if settings.rate_limit_backend == "dynamodb":
+        return DynamoDBRateLimitBackend()
+    return InMemoryRateLimitBackend()
+
+
+def enforce_rate_limit(user: AuthContext = Depends(get_current_user)) -> AuthContext:
+    if not settings.rate_limit_enabled:
+        return user
+    allowed, retry_after = get_backend().take(
+        f"USER#{user.sub}",
+        settings.rate_limit_per_second,
+        settings.rate_limit_burst,
+    )
+    if not allowed:
+        RATE_LIMITED.inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="rate_limited",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+    return user
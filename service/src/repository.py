@@ -1,13 +1,57 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional
+import base64
+import contextvars
+import heapq
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from uuid import uuid4
 
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
 from botocore.exceptions import ClientError
 
-from .dynamodb import get_table
+from .codec import compact_enabled, decode, decode_all, encode, is_compact, stored_name, stored_projection, stored_value
+from .observability import repository_operation
+from .positions import PositionError, key_between, keys_between, timestamp_key
+from .profiling import request_thread
+from .search import grams, matches, query_terms, score as search_score, tokens
+from .session import note_writes
+from .settings import settings
+from .storage import get_table
+from .viewcache import deck_scope, email_scope, get_view_cache, user_scope
+
+# Dos are projected into GSI1 under their deck, sorted by fractional position.
+POSITION_INDEX = "GSI1"
+# Active dos are projected into the sparse GSI2 by completion status, in creation order.
+STATUS_INDEX = "GSI2"
+STATUS_KEYS = ("GSI2PK", "GSI2SK")
+# Passed for ``due_at`` to leave a do's due date alone.
+_UNCHANGED: Any = object()
+# Jobs live in their own partition (never inside a deck's ``SK >= DECK`` range) and expire via TTL.
+JOB_SK = "JOB"
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+# A user runs one background clone at a time. The claim names the job holding
+# it and lapses on its own if that job's worker stops mid-copy.
+JOB_CLAIM_SK = "RUNNING"
+JOB_CLAIM_SECONDS = 3600
+
+# Hot decks can spread their dos over ``doShards`` partitions; while a move
+# between layouts runs, ``previousDoShards`` names the layout being left.
+# ``dosIndexed`` marks decks whose dos all carry their position and status
+# index keys; older decks are backfilled the first time their dos are listed.
+LAYOUT_ATTRIBUTES = ("doShards", "previousDoShards", "dosIndexed")
+# Every list of a sharded deck queries each shard, so the fan-out is bounded.
+MAX_DO_SHARDS = 32
+MOVE_ATTEMPTS = 3
+
+logger = logging.getLogger(__name__)
 
 
 class RepositoryError(Exception):
@@ -22,6 +66,26 @@ class CollaboratorNotFoundError(RepositoryError):
     """Raised when collaborator is missing."""
 
 
+class InvalidCursorError(RepositoryError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class BatchWriteError(RepositoryError):
+    """Raised when BatchWriteItem keeps returning unprocessed items."""
+
+
+class BatchReadError(RepositoryError):
+    """Raised when BatchGetItem keeps returning unprocessed keys."""
+
+
+class ConcurrentUpdateError(RepositoryError):
+    """Raised when an item changed after it was read for a conditional write."""
+
+
+class JobInProgressError(RepositoryError):
+    """Raised when the user already has a background job running."""
+
+
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -38,6 +102,43 @@ def _do_sk(do_id: str) -> str:
     return f"DO#{do_id}"
 
 
+def _archive_sk(do_id: str) -> str:
+    return f"ARCHIVE#{do_id}"
+
+
+def _archived_gsi1_sk(archived_at: str, do_id: str) -> str:
+    return f"ARC#{archived_at}#{do_id}"
+
+
+def _status_pk(partition: str, completed: bool) -> str:
+    """GSI2 partition of the dos stored under ``partition`` (the deck's, or one of its shards)."""
+    return f"{partition}#{'DONE' if completed else 'OPEN'}"
+
+
+def _status_sk(created_at: str, do_id: str) -> str:
+    return f"{created_at}#{do_id}"
+
+
+def _position_sk(position: str, do_id: str) -> str:
+    return f"POS#{position}#{do_id}"
+
+
+def _due_pk(scope: str, day: str) -> str:
+    return f"DUE#{scope}#{day}"
+
+
+def _due_sk(due_at: str, do_id: str) -> str:
+    return f"{due_at}#{do_id}"
+
+
+def _search_pk(deck_id: str, gram: str) -> str:
+    return f"TOK#DECK#{deck_id}#{gram}"
+
+
+def _collab_sk(email: str) -> str:
+    return f"COLLAB#{email}"
+
+
 def _owner_access_pk(owner_sub: str) -> str:
     return f"ACCESS#USER#{owner_sub}"
 
@@ -50,43 +151,115 @@ def _access_sk(name_lower: str, deck_id: str) -> str:
     return f"DECK#{name_lower}#{deck_id}"
 
 
+def _shard_pk(deck_id: str, do_id: str, shards: int) -> str:
+    """Partition holding a do: the deck's own, or one of ``shards`` ``DECK#{id}#n`` partitions."""
+    if shards < 2:
+        return _deck_pk(deck_id)
+    return f"{_deck_pk(deck_id)}#{zlib.crc32(do_id.encode('utf-8')) % shards}"
+
+
+def _shard_pks(deck_id: str, shards: int) -> List[str]:
+    if shards < 2:
+        return [_deck_pk(deck_id)]
+    return [f"{_deck_pk(deck_id)}#{shard}" for shard in range(shards)]
+
+
+def _job_pk(job_id: str) -> str:
+    return f"JOB#{job_id}"
+
+
 def _chunk(items: List[dict], size: int = 25) -> Iterable[List[dict]]:
     for idx in range(0, len(items), size):
         yield items[idx : idx + size]
 
 
-def create_deck(owner_sub: str, name: str) -> Dict[str, Any]:
-    table = get_table()
-    client = table.meta.client
-    deck_id = str(uuid4())
-    clean_name = name.strip()
-    if not clean_name:
-        raise ValueError("name required")
-    name_lower = clean_name.lower()
-    now = _now_iso()
+def _encode_cursor(last_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not last_key:
+        return None
+    raw = json.dumps(last_key, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as exc:
+        raise InvalidCursorError from exc
+    if not isinstance(key, dict) or not all(isinstance(v, str) for v in key.values()):
+        raise InvalidCursorError
+    return key
+
+
+def _projection(attributes: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Read kwargs limiting items to ``attributes`` (all attributes when None)."""
+    if attributes is None:
+        return {}
+    names = {f"#p{index}": name for index, name in enumerate(attributes)}
+    return {"ProjectionExpression": ", ".join(names), "ExpressionAttributeNames": names}
+
+
+def _submit(pool: ThreadPoolExecutor, fn, *args):
+    # Worker threads inherit the caller's context (request deadline and the like).
+    return pool.submit(contextvars.copy_context().run, _in_request_thread, fn, *args)
+
 
-    deck_item = {
+def _in_request_thread(fn, *args):
+    with request_thread():
+        return fn(*args)
+
+
+def _invalidate_views(*scopes: str) -> None:
+    get_view_cache().invalidate(*scopes)
+    # The caller's session token covers the same scopes.
+    note_writes(scopes)
+
+
+def _is_condition_failure(exc: ClientError) -> bool:
+    return exc.response["Error"]["Code"] in {"ConditionalCheckFailedException", "TransactionCanceledException"}
+
+
+def _deck_item(deck_id: str, owner_sub: str, name: str, created_at: str, collaborator_count: int = 0) -> Dict[str, Any]:
+    return {
         "PK": _deck_pk(deck_id),
         "SK": _deck_sk(deck_id),
         "deckId": deck_id,
-        "name": clean_name,
-        "nameLower": name_lower,
+        "name": name,
+        "nameLower": name.lower(),
         "ownerSub": owner_sub,
-        "collaborators": {},
-        "createdAt": now,
-        "updatedAt": now,
+        "collaboratorCount": collaborator_count,
+        "dosIndexed": True,
+        "createdAt": created_at,
+        "updatedAt": created_at,
     }
 
-    owner_access_item = {
-        "PK": _owner_access_pk(owner_sub),
-        "SK": _access_sk(name_lower, deck_id),
-        "deckId": deck_id,
-        "name": clean_name,
-        "nameLower": name_lower,
-        "ownerSub": owner_sub,
+
+def _owner_access_item(deck: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "PK": _owner_access_pk(deck["ownerSub"]),
+        "SK": _access_sk(deck["nameLower"], deck["deckId"]),
+        "deckId": deck["deckId"],
+        "name": deck["name"],
+        "nameLower": deck["nameLower"],
+        "ownerSub": deck["ownerSub"],
         "access": "owner",
     }
 
+
+@repository_operation
+def create_deck(owner_sub: str, name: str) -> Dict[str, Any]:
+    table = get_table()
+    client = table.meta.client
+    deck_id = str(uuid4())
+    clean_name = name.strip()
+    if not clean_name:
+        raise ValueError("name required")
+    now = _now_iso()
+    deck_item = _deck_item(deck_id, owner_sub, clean_name, now)
+    owner_access_item = _owner_access_item(deck_item)
+
     client.transact_write_items(
         TransactItems=[
             {
@@ -99,11 +272,13 @@ def create_deck(owner_sub: str, name: str) -> Dict[str, Any]:
             {
                 "Put": {
                     "TableName": table.name,
-                    "Item": owner_access_item,
+                    "Item": encode(owner_access_item),
                 }
             },
         ]
     )
+    _apply_entry_changes(table, [], _search_entries(deck_item))
+    _invalidate_views(user_scope(owner_sub), deck_scope(deck_id))
     return deck_item
 
 
@@ -118,7 +293,22 @@ def _query_all(table, **kwargs):
     return results
 
 
-def list_access_rows(owner_sub: str, email: Optional[str], visibility: str, search: Optional[str]) -> List[Dict[str, Any]]:
+def _query_up_to(table, cap: int, **kwargs) -> List[Dict[str, Any]]:
+    """Like ``_query_all``, but stops once ``cap`` items have been read."""
+    results: List[Dict[str, Any]] = []
+    while len(results) < cap:
+        response = table.query(Limit=cap - len(results), **kwargs)
+        results.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    return results
+
+
+@repository_operation
+def list_access_rows(
+    owner_sub: str, email: Optional[str], visibility: str, search: Optional[str], consistent: bool = False
+) -> List[Dict[str, Any]]:
     table = get_table()
     condition_search = None
     if search:
@@ -131,7 +321,7 @@ def list_access_rows(owner_sub: str, email: Optional[str], visibility: str, sear
         key_condition = Key("PK").eq(pk_value)
         if condition_search is not None:
             key_condition = key_condition & condition_search
-        return _query_all(table, KeyConditionExpression=key_condition)
+        return decode_all(_query_all(table, KeyConditionExpression=key_condition, ConsistentRead=consistent))
 
     if visibility in {"mine", "all"}:
         items.extend(_query(_owner_access_pk(owner_sub)))
@@ -139,7 +329,7 @@ def list_access_rows(owner_sub: str, email: Optional[str], visibility: str, sear
         items.extend(_query(_collab_access_pk(email)))
 
     # Deduplicate by deckId keeping owner preference
-        dedup: Dict[str, Dict[str, Any]] = {}
+    dedup: Dict[str, Dict[str, Any]] = {}
     for item in items:
         deck_id = item["deckId"]
         existing = dedup.get(deck_id)
@@ -148,7 +338,10 @@ def list_access_rows(owner_sub: str, email: Optional[str], visibility: str, sear
     return list(dedup.values())
 
 
-def batch_load_decks(deck_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+@repository_operation
+def batch_load_decks(
+    deck_ids: Iterable[str], attributes: Optional[List[str]] = None, consistent: bool = False
+) -> Dict[str, Dict[str, Any]]:
     table = get_table()
     client = table.meta.client
     keys = [
@@ -159,23 +352,148 @@ def batch_load_decks(deck_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
         return {}
 
     result: Dict[str, Dict[str, any]] = {}
-    for chunk in _chunk(keys, size=100):
-        response = client.batch_get_item(
-            RequestItems={table.name: {"Keys": chunk}}
-        )
-        for item in response.get("Responses", {}).get(table.name, []):
-            result[item["deckId"]] = item
+    for item in _batch_get(client, table.name, keys, ConsistentRead=consistent, **_projection(attributes)):
+        result[item["deckId"]] = item
     return result
 
 
-def get_deck(deck_id: str) -> Optional[Dict[str, Any]]:
+def _batch_get(client, table_name: str, keys: List[Dict[str, Any]], **options) -> List[Dict[str, Any]]:
+    """BatchGetItem in chunks of 100, retrying unprocessed keys; items come back stored and unordered."""
+    items: List[Dict[str, Any]] = []
+    for chunk in _chunk(keys, size=100):
+        request = {table_name: {"Keys": chunk, **options}}
+        for attempt in range(settings.batch_write_max_attempts):
+            response = client.batch_get_item(RequestItems=request)
+            items.extend(response.get("Responses", {}).get(table_name, []))
+            request = response.get("UnprocessedKeys") or {}
+            if not request:
+                break
+            time.sleep(random.uniform(0, min(0.05 * 2**attempt, 2.0)))
+        else:
+            raise BatchReadError(f"{len(request[table_name]['Keys'])} keys left unprocessed")
+    return items
+
+
+@repository_operation
+def get_deck(
+    deck_id: str, consistent: bool = False, attributes: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
     table = get_table()
     response = table.get_item(
-        Key={"PK": _deck_pk(deck_id), "SK": _deck_sk(deck_id)}
+        Key={"PK": _deck_pk(deck_id), "SK": _deck_sk(deck_id)},
+        ConsistentRead=consistent,
+        **_projection(attributes),
+    )
+    item = response.get("Item")
+    if item and (attributes is None or set(LAYOUT_ATTRIBUTES) <= set(attributes)):
+        _remember_layouts(deck_id, item)
+    return item
+
+
+def _deck_layouts(deck: Dict[str, Any]) -> List[int]:
+    """Shard counts the deck's dos may be stored under, the current layout first."""
+    layouts = [int(deck.get("doShards") or 1)]
+    if deck.get("previousDoShards") is not None:
+        layouts.append(int(deck["previousDoShards"]))
+    return list(dict.fromkeys(layouts))
+
+
+_layout_cache: Dict[str, Tuple[float, List[int], bool]] = {}
+_layout_lock = threading.Lock()
+
+
+def _remember_layouts(deck_id: str, deck: Dict[str, Any]) -> None:
+    if settings.shard_layout_cache_seconds <= 0:
+        return
+    entry = (time.monotonic() + settings.shard_layout_cache_seconds, _deck_layouts(deck), bool(deck.get("dosIndexed")))
+    with _layout_lock:
+        if len(_layout_cache) >= 4096:
+            _layout_cache.clear()
+        _layout_cache[deck_id] = entry
+
+
+def _layout_entries(deck_ids: Iterable[str]) -> Dict[str, Tuple[List[int], bool]]:
+    """Layouts (and whether their dos are indexed) of several decks: cached ones as they are, the rest read in batches.
+
+    Entries live ``SHARD_LAYOUT_CACHE_SECONDS``; ``reshard_deck`` waits that
+    long between switching layouts and moving dos, so no process still writes
+    to a layout it is emptying.
+    """
+    now = time.monotonic()
+    entries: Dict[str, Tuple[List[int], bool]] = {}
+    with _layout_lock:
+        for deck_id in deck_ids:
+            cached = _layout_cache.get(deck_id)
+            if cached is not None and cached[0] > now:
+                entries[deck_id] = cached[1:]
+    missing = [deck_id for deck_id in dict.fromkeys(deck_ids) if deck_id not in entries]
+    if missing:
+        decks = batch_load_decks(missing, attributes=["deckId", *LAYOUT_ATTRIBUTES])
+        for deck_id in missing:
+            deck = decks.get(deck_id, {})
+            entries[deck_id] = (_deck_layouts(deck), bool(deck.get("dosIndexed")))
+            if deck_id in decks:
+                _remember_layouts(deck_id, deck)
+    return entries
+
+
+def _layouts_for(deck_ids: Iterable[str]) -> Dict[str, List[int]]:
+    return {deck_id: layouts for deck_id, (layouts, _) in _layout_entries(deck_ids).items()}
+
+
+def _do_partitions(deck_id: str, layouts: Optional[List[int]] = None) -> List[str]:
+    """Every partition that may hold the deck's dos."""
+    layouts = layouts or _layouts_for([deck_id])[deck_id]
+    return list(dict.fromkeys(pk for shards in layouts for pk in _shard_pks(deck_id, shards)))
+
+
+def _do_keys(deck_id: str, do_id: str, layouts: List[int], sk: Optional[str] = None) -> List[Dict[str, str]]:
+    """Where the do may be stored, the current layout first."""
+    pks = dict.fromkeys(_shard_pk(deck_id, do_id, shards) for shards in layouts)
+    return [{"PK": pk, "SK": sk or _do_sk(do_id)} for pk in pks]
+
+
+def _query_partitions(
+    partitions: List[str], query, sort_key: Optional[str] = None, reverse: bool = False
+) -> List[Dict[str, Any]]:
+    """Run ``query(pk)`` on every partition in parallel; with ``sort_key``, merge the sorted runs.
+
+    An item moved between layouts while this runs can be read twice, so
+    repeats (by ``SK``) are dropped.
+    """
+    if len(partitions) == 1:
+        return query(partitions[0])
+    workers = max(1, min(settings.cross_deck_concurrency, len(partitions)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [_submit(pool, query, pk) for pk in partitions]
+        runs = [future.result() for future in futures]
+    merged = heapq.merge(*runs, key=lambda item: item[sort_key], reverse=reverse) if sort_key else (
+        item for run in runs for item in run
     )
-    return response.get("Item")
+    seen = set()
+    items = []
+    for item in merged:
+        if item["SK"] not in seen:
+            seen.add(item["SK"])
+            items.append(item)
+    return items
+
+
+@repository_operation
+def get_deck_with_dos(deck_id: str, consistent: bool = False) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    table = get_table()
+    items = _deck_and_dos(table, deck_id, consistent)
+    deck: Optional[Dict[str, Any]] = None
+    dos: List[Dict[str, Any]] = []
+    for item in items:
+        if item["SK"] == _deck_sk(deck_id):
+            deck = item
+        elif item["SK"].startswith("DO#"):
+            dos.append(item)
+    return deck, dos
 
 
+@repository_operation
 def rename_deck(deck: Dict[str, Any], new_name: str) -> Dict[str, Any]:
     table = get_table()
     client = table.meta.client
@@ -206,6 +524,7 @@ def rename_deck(deck: Dict[str, Any], new_name: str) -> Dict[str, Any]:
 
     old_lower = deck.get("nameLower", new_lower)
     owner_sub = deck["ownerSub"]
+    emails = collaborator_emails(deck)
     operations.append(
         {
             "Delete": {
@@ -221,21 +540,22 @@ def rename_deck(deck: Dict[str, Any], new_name: str) -> Dict[str, Any]:
         {
             "Put": {
                 "TableName": table.name,
-                "Item": {
-                    "PK": _owner_access_pk(owner_sub),
-                    "SK": _access_sk(new_lower, deck_id),
-                    "deckId": deck_id,
-                    "name": new_clean,
-                    "nameLower": new_lower,
-                    "ownerSub": owner_sub,
-                    "access": "owner",
-                },
+                "Item": encode(
+                    {
+                        "PK": _owner_access_pk(owner_sub),
+                        "SK": _access_sk(new_lower, deck_id),
+                        "deckId": deck_id,
+                        "name": new_clean,
+                        "nameLower": new_lower,
+                        "ownerSub": owner_sub,
+                        "access": "owner",
+                    }
+                ),
             }
         }
     )
 
-    collaborators = deck.get("collaborators") or {}
-    for email in collaborators.keys():
+    for email in emails:
         operations.append(
             {
                 "Delete": {
@@ -251,15 +571,17 @@ def rename_deck(deck: Dict[str, Any], new_name: str) -> Dict[str, Any]:
             {
                 "Put": {
                     "TableName": table.name,
-                    "Item": {
-                        "PK": _collab_access_pk(email),
-                        "SK": _access_sk(new_lower, deck_id),
-                        "deckId": deck_id,
-                        "name": new_clean,
-                        "nameLower": new_lower,
-                        "ownerSub": owner_sub,
-                        "access": "collaborator",
-                    },
+                    "Item": encode(
+                        {
+                            "PK": _collab_access_pk(email),
+                            "SK": _access_sk(new_lower, deck_id),
+                            "deckId": deck_id,
+                            "name": new_clean,
+                            "nameLower": new_lower,
+                            "ownerSub": owner_sub,
+                            "access": "collaborator",
+                        }
+                    ),
                 }
             }
         )
@@ -267,22 +589,38 @@ def rename_deck(deck: Dict[str, Any], new_name: str) -> Dict[str, Any]:
     for chunk in _chunk(operations, size=25):
         client.transact_write_items(TransactItems=chunk)
 
+    before = dict(deck)
     deck["name"] = new_clean
     deck["nameLower"] = new_lower
     deck["updatedAt"] = now
+    _apply_entry_changes(table, _search_entries(before), _search_entries(deck))
+    _invalidate_views(deck_scope(deck_id), user_scope(owner_sub), *(email_scope(email) for email in emails))
     return deck
 
 
+@repository_operation
 def delete_deck(deck: Dict[str, Any]) -> None:
     table = get_table()
     client = table.meta.client
     deck_id = deck["deckId"]
     pk = _deck_pk(deck_id)
 
-    items = _query_all(table, KeyConditionExpression=Key("PK").eq(pk))
+    items = decode_all(_query_all(table, KeyConditionExpression=Key("PK").eq(pk)))
+    # The stored deck item has the current layout, even if ``deck`` was read before a move began.
+    stored = next((item for item in items if item["SK"] == _deck_sk(deck_id)), deck)
+    shards = [partition for partition in _do_partitions(deck_id, _deck_layouts(stored)) if partition != pk]
+    if shards:
+        items.extend(
+            _query_partitions(shards, lambda shard: decode_all(_query_all(table, KeyConditionExpression=Key("PK").eq(shard))))
+        )
+    emails = set((deck.get("collaborators") or {}).keys())
+    emails.update(item["email"] for item in items if item["SK"].startswith("COLLAB#"))
+    scopes = _access_scopes_for(deck["ownerSub"], emails)
     with table.batch_writer() as batch:
         for item in items:
             batch.delete_item(Key={"PK": item["PK"], "SK": item["SK"]})
+            for entry in _derived_entries(scopes, item):
+                batch.delete_item(Key={"PK": entry["PK"], "SK": entry["SK"]})
 
     access_operations = [
         {
@@ -295,8 +633,7 @@ def delete_deck(deck: Dict[str, Any]) -> None:
             }
         }
     ]
-    collaborators = deck.get("collaborators") or {}
-    for email in collaborators.keys():
+    for email in sorted(emails):
         access_operations.append(
             {
                 "Delete": {
@@ -311,19 +648,99 @@ def delete_deck(deck: Dict[str, Any]) -> None:
 
     for chunk in _chunk(access_operations, size=25):
         client.transact_write_items(TransactItems=chunk)
+    _invalidate_views(deck_scope(deck_id), user_scope(deck["ownerSub"]), *(email_scope(email) for email in emails))
+
+
+def collaborator_count(deck: Dict[str, Any]) -> int:
+    if "collaboratorCount" in deck:
+        return int(deck["collaboratorCount"])
+    return len(deck.get("collaborators") or {})
 
 
+def collaborator_emails(deck: Dict[str, Any]) -> List[str]:
+    table = get_table()
+    items = _query_all(
+        table,
+        KeyConditionExpression=Key("PK").eq(_deck_pk(deck["deckId"])) & Key("SK").begins_with("COLLAB#"),
+        ProjectionExpression="email",
+    )
+    emails = set((deck.get("collaborators") or {}).keys())
+    emails.update(item["email"] for item in items)
+    return sorted(emails)
+
+
+@repository_operation
+def is_collaborator(deck: Dict[str, Any], email: str) -> bool:
+    # Decks not yet migrated still carry the legacy collaborators map.
+    if email in (deck.get("collaborators") or {}):
+        return True
+    table = get_table()
+    response = table.get_item(
+        Key={"PK": _deck_pk(deck["deckId"]), "SK": _collab_sk(email)},
+        ProjectionExpression="PK",
+    )
+    return "Item" in response
+
+
+@repository_operation
+def list_collaborators(
+    deck_id: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    consistent: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    table = get_table()
+    kwargs: Dict[str, Any] = {
+        "KeyConditionExpression": Key("PK").eq(_deck_pk(deck_id)) & Key("SK").begins_with("COLLAB#"),
+        "Limit": limit,
+        "ConsistentRead": consistent,
+    }
+    start_key = _decode_cursor(cursor)
+    if start_key:
+        kwargs["ExclusiveStartKey"] = start_key
+    response = table.query(**kwargs)
+    return response.get("Items", []), _encode_cursor(response.get("LastEvaluatedKey"))
+
+
+def _collaborator_item(deck_id: str, email: str, added_at: str) -> Dict[str, Any]:
+    return {
+        "PK": _deck_pk(deck_id),
+        "SK": _collab_sk(email),
+        "deckId": deck_id,
+        "email": email,
+        "addedAt": added_at,
+    }
+
+
+def _collaborator_access_item(deck: Dict[str, Any], email: str) -> Dict[str, Any]:
+    return {
+        "PK": _collab_access_pk(email),
+        "SK": _access_sk(deck.get("nameLower", ""), deck["deckId"]),
+        "deckId": deck["deckId"],
+        "name": deck["name"],
+        "nameLower": deck.get("nameLower", ""),
+        "ownerSub": deck["ownerSub"],
+        "access": "collaborator",
+    }
+
+
+def expected_access_rows(deck: Dict[str, Any], emails: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """The access rows ``deck`` should have, unencoded: its owner's first, then one per collaborator.
+
+    Pass ``emails`` to build the rows for just those collaborators rather than
+    reading the deck's.
+    """
+    if emails is None:
+        emails = collaborator_emails(deck)
+    return [_owner_access_item(deck)] + [_collaborator_access_item(deck, email) for email in emails]
+
+
+@repository_operation
 def add_collaborator(deck: Dict[str, Any], email: str) -> Dict[str, Any]:
     table = get_table()
     client = table.meta.client
     deck_id = deck["deckId"]
     now = _now_iso()
-    expression_names = {"#email": email}
-    expression_values = {
-        ":meta": {"addedAt": now},
-        ":owner": deck["ownerSub"],
-        ":now": now,
-    }
 
     try:
         client.transact_write_items(
@@ -332,39 +749,116 @@ def add_collaborator(deck: Dict[str, Any], email: str) -> Dict[str, Any]:
                     "Update": {
                         "TableName": table.name,
                         "Key": {"PK": _deck_pk(deck_id), "SK": _deck_sk(deck_id)},
-                        "UpdateExpression": "SET updatedAt = :now, collaborators.#email = :meta",
-                        "ConditionExpression": "ownerSub = :owner AND attribute_not_exists(collaborators.#email)",
-                        "ExpressionAttributeNames": expression_names,
-                        "ExpressionAttributeValues": expression_values,
+                        "UpdateExpression": "SET updatedAt = :now ADD collaboratorCount :one",
+                        "ConditionExpression": "ownerSub = :owner",
+                        "ExpressionAttributeValues": {
+                            ":owner": deck["ownerSub"],
+                            ":now": now,
+                            ":one": 1,
+                        },
                     }
                 },
                 {
                     "Put": {
                         "TableName": table.name,
-                        "Item": {
-                            "PK": _collab_access_pk(email),
-                            "SK": _access_sk(deck.get("nameLower", ""), deck_id),
-                            "deckId": deck_id,
-                            "name": deck["name"],
-                            "nameLower": deck.get("nameLower", ""),
-                            "ownerSub": deck["ownerSub"],
-                            "access": "collaborator",
-                        },
+                        "Item": _collaborator_item(deck_id, email, now),
+                        "ConditionExpression": "attribute_not_exists(PK)",
+                    }
+                },
+                {
+                    "Put": {
+                        "TableName": table.name,
+                        "Item": encode(_collaborator_access_item(deck, email)),
                     }
                 },
             ]
         )
     except ClientError as exc:
-        if exc.response["Error"]["Code"] in {"ConditionalCheckFailedException", "TransactionCanceledException"}:
+        if _is_condition_failure(exc):
             raise DuplicateCollaboratorError from exc
         raise
 
-    collaborators = deck.setdefault("collaborators", {})
-    collaborators[email] = {"addedAt": now}
+    _invalidate_views(email_scope(email))
+    _sync_shared_entries(deck_id, email, shared=True)
+    deck["collaboratorCount"] = collaborator_count(deck) + 1
     deck["updatedAt"] = now
     return deck
 
 
+def _share_with(deck: Dict[str, Any], email: str, added_at: str) -> str:
+    table = get_table()
+    client = table.meta.client
+    # The deck item is deliberately left out so parallel shares of one deck
+    # do not conflict with each other; the count is bumped once afterwards.
+    transact_items = [
+        {
+            "Put": {
+                "TableName": table.name,
+                "Item": _collaborator_item(deck["deckId"], email, added_at),
+                "ConditionExpression": "attribute_not_exists(PK)",
+            }
+        },
+        {
+            "Put": {
+                "TableName": table.name,
+                "Item": encode(_collaborator_access_item(deck, email)),
+            }
+        },
+    ]
+    for attempt in range(3):
+        try:
+            client.transact_write_items(TransactItems=transact_items)
+            _invalidate_views(email_scope(email))
+            _sync_shared_entries(deck["deckId"], email, shared=True)
+            return "added"
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] != "TransactionCanceledException":
+                raise
+            reasons = [r.get("Code") for r in exc.response.get("CancellationReasons", [])]
+            if "ConditionalCheckFailed" in reasons:
+                return "exists"
+            if "TransactionConflict" not in reasons or attempt == 2:
+                raise
+            time.sleep(0.05 * (attempt + 1))
+    return "error"
+
+
+@repository_operation
+def add_collaborators(deck: Dict[str, Any], emails: List[str]) -> Dict[str, str]:
+    table = get_table()
+    deck_id = deck["deckId"]
+    now = _now_iso()
+    results: Dict[str, str] = {}
+    if not emails:
+        return results
+
+    workers = max(1, min(settings.collaborator_batch_concurrency, len(emails)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {email: _submit(pool, _share_with, deck, email, now) for email in emails}
+        for email, future in futures.items():
+            try:
+                results[email] = future.result()
+            except ClientError:
+                results[email] = "error"
+
+    added = sum(1 for outcome in results.values() if outcome == "added")
+    if added:
+        table.update_item(
+            Key={"PK": _deck_pk(deck_id), "SK": _deck_sk(deck_id)},
+            UpdateExpression="SET updatedAt = :now ADD collaboratorCount :added",
+            ConditionExpression="ownerSub = :owner",
+            ExpressionAttributeValues={
+                ":now": now,
+                ":added": added,
+                ":owner": deck["ownerSub"],
+            },
+        )
+        deck["collaboratorCount"] = collaborator_count(deck) + added
+        deck["updatedAt"] = now
+    return results
+
+
+@repository_operation
 def remove_collaborator(deck: Dict[str, Any], email: str) -> Dict[str, Any]:
     table = get_table()
     client = table.meta.client
@@ -378,15 +872,22 @@ def remove_collaborator(deck: Dict[str, Any], email: str) -> Dict[str, Any]:
                     "Update": {
                         "TableName": table.name,
                         "Key": {"PK": _deck_pk(deck_id), "SK": _deck_sk(deck_id)},
-                        "UpdateExpression": "REMOVE collaborators.#email SET updatedAt = :now",
-                        "ConditionExpression": "ownerSub = :owner AND attribute_exists(collaborators.#email)",
-                        "ExpressionAttributeNames": {"#email": email},
+                        "UpdateExpression": "SET updatedAt = :now ADD collaboratorCount :minus",
+                        "ConditionExpression": "ownerSub = :owner",
                         "ExpressionAttributeValues": {
                             ":owner": deck["ownerSub"],
                             ":now": now,
+                            ":minus": -1,
                         },
                     }
                 },
+                {
+                    "Delete": {
+                        "TableName": table.name,
+                        "Key": {"PK": _deck_pk(deck_id), "SK": _collab_sk(email)},
+                        "ConditionExpression": "attribute_exists(PK)",
+                    }
+                },
                 {
                     "Delete": {
                         "TableName": table.name,
@@ -399,88 +900,1412 @@ def remove_collaborator(deck: Dict[str, Any], email: str) -> Dict[str, Any]:
             ]
         )
     except ClientError as exc:
-        if exc.response["Error"]["Code"] in {"ConditionalCheckFailedException", "TransactionCanceledException"}:
+        if _is_condition_failure(exc):
             raise CollaboratorNotFoundError from exc
         raise
 
-    collaborators = deck.get("collaborators") or {}
-    collaborators.pop(email, None)
+    _invalidate_views(email_scope(email), deck_scope(deck_id))
+    _sync_shared_entries(deck_id, email, shared=False)
+    deck["collaboratorCount"] = max(collaborator_count(deck) - 1, 0)
     deck["updatedAt"] = now
     return deck
 
 
-def list_dos(deck_id: str) -> List[Dict[str, Any]]:
+@repository_operation
+def migrate_collaborators(deck: Dict[str, Any]) -> Dict[str, Any]:
+    """Move a legacy ``collaborators`` map out into COLLAB# items.
+
+    Readers accept both layouts, so this can run lazily on touch or from the
+    bulk migration tool while the service keeps serving traffic.
+    """
     table = get_table()
-    items = _query_all(
-        table,
-        KeyConditionExpression=Key("PK").eq(_deck_pk(deck_id)),
+    deck_id = deck["deckId"]
+    legacy = deck.get("collaborators")
+
+    while legacy is not None:
+        for email, meta in legacy.items():
+            added_at = (meta or {}).get("addedAt") or deck.get("updatedAt") or _now_iso()
+            try:
+                table.put_item(
+                    Item=_collaborator_item(deck_id, email, added_at),
+                    ConditionExpression="attribute_not_exists(PK)",
+                )
+            except ClientError as exc:
+                if not _is_condition_failure(exc):
+                    raise
+
+        # Shares and unshares bump the count in the same transaction as the
+        # COLLAB# item, so one landing after this read fails the write below.
+        seen = (get_deck(deck_id, consistent=True, attributes=["collaboratorCount"]) or {}).get("collaboratorCount")
+        count = table.query(
+            KeyConditionExpression=Key("PK").eq(_deck_pk(deck_id)) & Key("SK").begins_with("COLLAB#"),
+            Select="COUNT",
+            ConsistentRead=True,
+        )["Count"]
+        condition = "collaborators = :legacy AND "
+        values: Dict[str, Any] = {":count": count, ":legacy": legacy}
+        if seen is None:
+            condition += "attribute_not_exists(collaboratorCount)"
+        else:
+            condition += "collaboratorCount = :seen"
+            values[":seen"] = seen
+        try:
+            # Only drop the map and set the count if nobody changed either while we were copying.
+            table.update_item(
+                Key={"PK": _deck_pk(deck_id), "SK": _deck_sk(deck_id)},
+                UpdateExpression="REMOVE collaborators SET collaboratorCount = :count",
+                ConditionExpression=condition,
+                ExpressionAttributeValues=values,
+            )
+        except ClientError as exc:
+            if not _is_condition_failure(exc):
+                raise
+            fresh = get_deck(deck_id, consistent=True)
+            if not fresh:
+                return deck
+            deck.clear()
+            deck.update(fresh)
+            legacy = deck.get("collaborators")
+            continue
+
+        deck.pop("collaborators", None)
+        deck["collaboratorCount"] = count
+        break
+    return deck
+
+
+def _with_sort_key(attributes: Optional[List[str]], sort_key: str) -> Optional[List[str]]:
+    # Shard runs are merged on their index sort key, so projections must include it.
+    return None if attributes is None else [*attributes, sort_key]
+
+
+@repository_operation
+def list_dos(deck_id: str, attributes: Optional[List[str]] = None, consistent: bool = False) -> List[Dict[str, Any]]:
+    """Active dos in user order; the position runs of a sharded deck are merged."""
+    table = get_table()
+    if not _layout_entries([deck_id])[deck_id][1]:
+        return _select(sorted(_index_legacy_dos(table, deck_id), key=display_order), attributes)
+    if consistent:
+        items = _consistent_dos(table, deck_id, lambda item: item.get("GSI1SK", "").startswith("POS#"), "GSI1SK")
+        return _select(items, attributes)
+    projection = _projection(stored_projection("do", _with_sort_key(attributes, "GSI1SK")))
+    items = _query_partitions(
+        _do_partitions(deck_id),
+        lambda pk: _query_all(
+            table,
+            IndexName=POSITION_INDEX,
+            KeyConditionExpression=Key("GSI1PK").eq(pk) & Key("GSI1SK").begins_with("POS#"),
+            **projection,
+        ),
+        sort_key="GSI1SK",
     )
-    dos = [item for item in items if item["SK"].startswith("DO#")]
-    return dos
+    return decode_all(items, attributes)
 
 
-def get_do(deck_id: str, do_id: str) -> Optional[Dict[str, Any]]:
+@repository_operation
+def list_dos_by_status(
+    deck_id: str, completed: bool, attributes: Optional[List[str]] = None, consistent: bool = False
+) -> List[Dict[str, Any]]:
     table = get_table()
-    response = table.get_item(
-        Key={"PK": _deck_pk(deck_id), "SK": _do_sk(do_id)}
+    indexed = _layout_entries([deck_id])[deck_id][1]
+    if consistent or not indexed:
+        items = _consistent_dos(
+            table, deck_id, lambda item: item.get("GSI2PK") == _status_pk(item["PK"], completed), "GSI2SK", indexed
+        )
+        return _select(items, attributes)
+    projection = _projection(stored_projection("do", _with_sort_key(attributes, "GSI2SK")))
+    items = _query_partitions(
+        _do_partitions(deck_id),
+        lambda pk: _query_all(
+            table,
+            IndexName=STATUS_INDEX,
+            KeyConditionExpression=Key("GSI2PK").eq(_status_pk(pk, completed)),
+            **projection,
+        ),
+        sort_key="GSI2SK",
     )
-    return response.get("Item")
+    return decode_all(items, attributes)
+
+
+@repository_operation
+def list_dos_across_decks(
+    deck_ids: List[str],
+    completed: bool,
+    limit: int,
+    cursor: Optional[str] = None,
+    consistent: Iterable[str] = (),
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of dos with the given status from every deck, oldest first.
+
+    Each deck's status partition (each shard's, for sharded decks) is queried
+    concurrently (at most ``CROSS_DECK_CONCURRENCY`` in flight) for
+    ``limit + 1`` dos past the cursor, which is all a page can take from any
+    one partition; the sorted runs are then merged on ``GSI2SK``. The decks
+    in ``consistent``, and decks whose older dos are not indexed yet,
+    contribute a run read consistently from the base table.
+    """
+    start = _decode_cursor(cursor)
+    if start is not None and set(start) != {"GSI2SK"}:
+        raise InvalidCursorError
+    if not deck_ids:
+        return [], None
+    table = get_table()
+
+    def _query(pk: str) -> List[Dict[str, Any]]:
+        key = Key("GSI2PK").eq(_status_pk(pk, completed))
+        if start is not None:
+            key &= Key("GSI2SK").gt(start["GSI2SK"])
+        return decode_all(table.query(IndexName=STATUS_INDEX, KeyConditionExpression=key, Limit=limit + 1).get("Items", []))
+
+    def _read(source: str) -> List[Dict[str, Any]]:
+        # Sources are index partitions (``DECK#...``) or the ids of decks read consistently.
+        if source.startswith("DECK#"):
+            return _query(source)
+
+        def keep(item: Dict[str, Any]) -> bool:
+            return item.get("GSI2PK") == _status_pk(item["PK"], completed) and (
+                start is None or item["GSI2SK"] > start["GSI2SK"]
+            )
+
+        return _consistent_dos(table, source, keep, "GSI2SK", source not in unindexed)[: limit + 1]
+
+    entries = _layout_entries(deck_ids)
+    unindexed = {deck_id for deck_id, (_, indexed) in entries.items() if not indexed}
+    fresh = set(consistent) | unindexed
+    sources = [
+        pk
+        for deck_id in deck_ids
+        for pk in ([deck_id] if deck_id in fresh else _do_partitions(deck_id, entries[deck_id][0]))
+    ]
+    merged = _query_partitions(sources, _read, sort_key="GSI2SK")
+    items = merged[:limit]
+    next_cursor = _encode_cursor({"GSI2SK": items[-1]["GSI2SK"]}) if len(merged) > limit else None
+    return items, next_cursor
 
 
-def create_do(deck_id: str, text: str) -> Dict[str, Any]:
+@repository_operation
+def get_do(deck_id: str, do_id: str, consistent: bool = False) -> Optional[Dict[str, Any]]:
     table = get_table()
+    for key in _do_keys(deck_id, do_id, _layouts_for([deck_id])[deck_id]):
+        item = table.get_item(Key=key, ConsistentRead=consistent).get("Item")
+        if item:
+            return decode(item)
+    return None
+
+
+def _reencode(table, do_item: Dict[str, Any]) -> Dict[str, Any]:
+    """Rewrite a do stored in the other ``ITEM_ENCODING`` format before it is updated.
+
+    Formats are migrated lazily, one touched do at a time. If the do changed
+    since it was read, the fresh copy is returned instead and the next touch
+    migrates it.
+    """
+    if is_compact(do_item) == compact_enabled():
+        return do_item
+    stored = encode(do_item)
+    try:
+        table.put_item(
+            Item=stored,
+            ConditionExpression="#updated = :seen",
+            ExpressionAttributeNames={"#updated": stored_name("do", "updatedAt", do_item)},
+            ExpressionAttributeValues={":seen": stored_value("updatedAt", do_item["updatedAt"], do_item)},
+        )
+    except ClientError as exc:
+        if not _is_condition_failure(exc):
+            raise
+        return get_do(do_item["deckId"], do_item["doId"], consistent=True) or do_item
+    return decode(stored)
+
+
+def _do_item(
+    deck_id: str,
+    text: str,
+    completed: bool = False,
+    created_at: Optional[str] = None,
+    updated_at: Optional[str] = None,
+    position: Optional[str] = None,
+    due_at: Optional[str] = None,
+    shards: int = 1,
+) -> Dict[str, Any]:
     do_id = str(uuid4())
     now = _now_iso()
+    position = position or timestamp_key(datetime.fromisoformat(created_at or now))
+    pk = _shard_pk(deck_id, do_id, shards)
     item = {
-        "PK": _deck_pk(deck_id),
+        "PK": pk,
         "SK": _do_sk(do_id),
+        "GSI1PK": pk,
+        "GSI1SK": _position_sk(position, do_id),
+        "GSI2PK": _status_pk(pk, completed),
+        "GSI2SK": _status_sk(created_at or now, do_id),
         "deckId": deck_id,
         "doId": do_id,
         "text": text.strip(),
-        "completed": False,
-        "createdAt": now,
-        "updatedAt": now,
+        "completed": completed,
+        "position": position,
+        "createdAt": created_at or now,
+        "updatedAt": updated_at or created_at or now,
     }
-    table.put_item(Item=item, ConditionExpression="attribute_not_exists(PK)")
+    if due_at:
+        item["dueAt"] = due_at
     return item
 
 
-def update_do(do_item: Dict[str, Any], text: Optional[str], completed: Optional[bool]) -> Dict[str, Any]:
+def _write_layout(deck_id: str, deck: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], int]:
+    """The deck (as the caller loaded it, with its layout, or one fresh read) and the layout new dos go to."""
+    if deck is None:
+        deck = get_deck(deck_id)
+    return deck, _deck_layouts(deck)[0] if deck else 1
+
+
+@repository_operation
+def create_do(
+    deck_id: str, text: str, due_at: Optional[str] = None, deck: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Add a do to the end of the deck; pass the ``deck`` already read for the access check to skip reading it again."""
+    table = get_table()
+    deck, shards = _write_layout(deck_id, deck)
+    stored = encode(_do_item(deck_id, text, due_at=due_at, shards=shards))
+    item = decode(stored)
+    # Due entries go in before the do (see update_do).
+    _apply_entry_changes(table, [], _due_entries(_due_scopes(deck_id, [item], deck), item))
+    table.put_item(Item=stored, ConditionExpression="attribute_not_exists(PK)")
+    _apply_entry_changes(table, [], _search_entries(item))
+    _invalidate_views(deck_scope(deck_id))
+    return item
+
+
+@repository_operation
+def adjacent_do(
+    deck_id: str,
+    anchor: Optional[Dict[str, Any]],
+    *,
+    after: bool,
+    exclude: str,
+) -> Optional[Dict[str, Any]]:
+    """The do right after (or before) ``anchor`` in user order, skipping ``exclude``.
+
+    Without an anchor this is the first (or last) do of the deck.
+    """
+    table = get_table()
+    if anchor is None:
+        sort_key = Key("GSI1SK").begins_with("POS#")
+    elif after:
+        sort_key = Key("GSI1SK").between(anchor["GSI1SK"], "POS$")
+    else:
+        sort_key = Key("GSI1SK").between("POS#", anchor["GSI1SK"])
+    skip = {exclude, anchor["doId"] if anchor else None}
+
+    def _query(pk: str) -> List[Dict[str, Any]]:
+        key = Key("GSI1PK").eq(pk) & sort_key
+        response = table.query(IndexName=POSITION_INDEX, KeyConditionExpression=key, ScanIndexForward=after, Limit=3)
+        return decode_all(response.get("Items", []))
+
+    # Each shard's nearest dos, merged; the nearest overall is the first not skipped.
+    for item in _query_partitions(_do_partitions(deck_id), _query, sort_key="GSI1SK", reverse=not after):
+        if item["doId"] not in skip:
+            return item
+    return None
+
+
+@repository_operation
+def move_do(
+    do_item: Dict[str, Any],
+    after: Optional[Dict[str, Any]],
+    before: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Place ``do_item`` between two neighbours by rewriting only its own position."""
+    try:
+        position = key_between(after.get("position") if after else None, before.get("position") if before else None)
+    except PositionError as exc:
+        raise RepositoryError(str(exc)) from exc
     table = get_table()
     now = _now_iso()
+    stored = _reencode(table, do_item)
+    table.update_item(
+        Key={"PK": do_item["PK"], "SK": _do_sk(do_item["doId"])},
+        UpdateExpression="SET #position = :position, GSI1PK = :gsi1pk, GSI1SK = :gsi1sk, #updated = :now",
+        ConditionExpression="attribute_exists(PK)",
+        ExpressionAttributeNames={
+            "#position": stored_name("do", "position", stored),
+            "#updated": stored_name("do", "updatedAt", stored),
+        },
+        ExpressionAttributeValues={
+            ":position": position,
+            ":gsi1pk": do_item["PK"],
+            ":gsi1sk": _position_sk(position, do_item["doId"]),
+            ":now": stored_value("updatedAt", now, stored),
+        },
+    )
+    if stored is not do_item:
+        do_item.clear()
+        do_item.update(stored)
+    do_item.update(position=position, GSI1PK=do_item["PK"], GSI1SK=_position_sk(position, do_item["doId"]))
+    do_item["updatedAt"] = now
+    _invalidate_views(deck_scope(do_item["deckId"]))
+    return do_item
+
+
+@repository_operation
+def rebalance_positions(deck_id: str, dos: List[Dict[str, Any]]) -> int:
+    """Give ``dos`` (already in display order) short, evenly spread positions.
+
+    Index keys missing on older dos are filled in on the way. Dos whose
+    position changed concurrently are left alone; returns how many were
+    rewritten.
+    """
+    table = get_table()
+    rewritten = 0
+    for item, position in zip(dos, keys_between(None, None, len(dos))):
+        if item.get("position") == position and item.get("GSI2PK"):
+            continue
+        if _set_index_keys(table, item, position):
+            rewritten += 1
+    if rewritten:
+        _invalidate_views(deck_scope(deck_id))
+    return rewritten
+
+
+def _set_index_keys(table, item: Dict[str, Any], position: str) -> bool:
+    """Write ``position`` and the position and status index keys onto a do, unless its position changed."""
+    keys = {
+        "GSI1PK": item["PK"],
+        "GSI1SK": _position_sk(position, item["doId"]),
+        "GSI2PK": _status_pk(item["PK"], bool(item.get("completed"))),
+        "GSI2SK": _status_sk(item["createdAt"], item["doId"]),
+    }
+    condition = "attribute_exists(PK) AND "
+    values = {":position": position, **{f":{name.lower()}": value for name, value in keys.items()}}
+    if item.get("position") is None:
+        condition += "attribute_not_exists(#position)"
+    else:
+        condition += "#position = :old"
+        values[":old"] = item["position"]
+    try:
+        table.update_item(
+            Key={"PK": item["PK"], "SK": _do_sk(item["doId"])},
+            UpdateExpression="SET #position = :position, GSI1PK = :gsi1pk, GSI1SK = :gsi1sk, "
+            "GSI2PK = :gsi2pk, GSI2SK = :gsi2sk",
+            ConditionExpression=condition,
+            ExpressionAttributeNames={"#position": stored_name("do", "position", item)},
+            ExpressionAttributeValues=values,
+        )
+    except ClientError as exc:
+        if not _is_condition_failure(exc):
+            raise
+        return False
+    item.update(keys, position=position)
+    return True
+
+
+def _is_indexed(item: Dict[str, Any]) -> bool:
+    return bool(item.get("position") and item.get("GSI1PK") and item.get("GSI2PK"))
+
+
+def _index_legacy_dos(table, deck_id: str) -> List[Dict[str, Any]]:
+    """Fill in index keys on dos written before the position and status indexes, then mark the deck.
+
+    Returns the deck's active dos from the consistent base-table read this
+    makes, so the caller can answer without waiting for the indexes to catch up.
+    """
+    items = _deck_and_dos(table, deck_id, consistent=True)
+    deck = next((item for item in items if item["SK"] == _deck_sk(deck_id)), None)
+    dos = [item for item in items if item["SK"].startswith("DO#")]
+    if deck is None:
+        return dos
+    # Creation-time positions keep the order the base-table read always showed.
+    backfilled = [_set_index_keys(table, item, display_order(item)[0]) for item in dos if not _is_indexed(item)]
+    if all(backfilled):
+        table.update_item(
+            Key={"PK": _deck_pk(deck_id), "SK": _deck_sk(deck_id)},
+            UpdateExpression="SET dosIndexed = :indexed",
+            ConditionExpression="attribute_exists(PK)",
+            ExpressionAttributeValues={":indexed": True},
+        )
+        _remember_layouts(deck_id, {**deck, "dosIndexed": True})
+    return dos
+
+
+def archive_cutoff(now: Optional[datetime] = None) -> Optional[str]:
+    """Completed dos finished before this ISO timestamp belong in the archive."""
+    days = settings.archive_completed_after_days
+    if days <= 0:
+        return None
+    return ((now or datetime.now(timezone.utc)) - timedelta(days=days)).isoformat()
+
+
+def is_archivable(item: Dict[str, Any], cutoff: Optional[str]) -> bool:
+    if cutoff is None or not item.get("completed"):
+        return False
+    # Legacy dos have no completedAt; their last update is the closest stand-in.
+    completed_at = item.get("completedAt") or item["updatedAt"]
+    return max(completed_at, item.get("unarchivedAt", "")) < cutoff
+
+
+def _archived_item(do_item: Dict[str, Any], archived_at: str) -> Dict[str, Any]:
+    """The ``ARCHIVE#`` copy of ``do_item``; it stays in the do's partition and leaves the sparse status index."""
+    archived = {key: value for key, value in do_item.items() if key not in {"unarchivedAt", *STATUS_KEYS}}
+    archived.update(
+        SK=_archive_sk(do_item["doId"]),
+        GSI1PK=do_item["PK"],
+        GSI1SK=_archived_gsi1_sk(archived_at, do_item["doId"]),
+        archivedAt=archived_at,
+    )
+    return archived
+
+
+@repository_operation
+def archive_do(do_item: Dict[str, Any]) -> bool:
+    """Move a completed do to ``ARCHIVE#{doId}``; False if it was reopened or removed meanwhile."""
+    table = get_table()
+    deck_id, do_id = do_item["deckId"], do_item["doId"]
+    archived = _archived_item(do_item, _now_iso())
+    try:
+        table.meta.client.transact_write_items(
+            TransactItems=[
+                {"Put": {"TableName": table.name, "Item": encode(archived)}},
+                {
+                    "Delete": {
+                        "TableName": table.name,
+                        "Key": {"PK": do_item["PK"], "SK": _do_sk(do_id)},
+                        "ConditionExpression": "#completed = :true AND #updated = :updated",
+                        "ExpressionAttributeNames": {
+                            "#completed": stored_name("do", "completed", do_item),
+                            "#updated": stored_name("do", "updatedAt", do_item),
+                        },
+                        "ExpressionAttributeValues": {
+                            ":true": True,
+                            ":updated": stored_value("updatedAt", do_item["updatedAt"], do_item),
+                        },
+                    }
+                },
+            ]
+        )
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") == "TransactionCanceledException":
+            return False
+        raise
+    # Archived dos drop out of search until they are restored.
+    _apply_entry_changes(table, _search_entries(do_item), [])
+    _invalidate_views(deck_scope(deck_id))
+    return True
+
+
+@repository_operation
+def archive_dos(items: List[Dict[str, Any]]) -> int:
+    return sum(1 for item in items if archive_do(item))
+
+
+@repository_operation
+def list_archived_dos(
+    deck_id: str,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Archived dos, most recently archived first.
+
+    Every partition of the deck (one, unless sharded) is read for ``limit + 1``
+    entries past the cursor and the runs are merged; the cursor is the last
+    returned ``GSI1SK``, so it stays valid across shards.
+    """
+    start = _decode_cursor(cursor)
+    if start is not None and not (start.get("GSI1SK") or "").startswith("ARC#"):
+        raise InvalidCursorError
+    table = get_table()
+    # Only ARC# entries sort below an ARC# key in the position index.
+    sort_key = Key("GSI1SK").lt(start["GSI1SK"]) if start else Key("GSI1SK").begins_with("ARC#")
+
+    def _query(pk: str) -> List[Dict[str, Any]]:
+        response = table.query(
+            IndexName=POSITION_INDEX,
+            KeyConditionExpression=Key("GSI1PK").eq(pk) & sort_key,
+            ScanIndexForward=False,
+            Limit=limit + 1,
+        )
+        return response.get("Items", [])
+
+    merged = _query_partitions(_do_partitions(deck_id), _query, sort_key="GSI1SK", reverse=True)
+    items = merged[:limit]
+    next_cursor = _encode_cursor({"GSI1SK": items[-1]["GSI1SK"]}) if len(merged) > limit else None
+    return decode_all(items), next_cursor
+
+
+@repository_operation
+def unarchive_do(deck_id: str, do_id: str) -> Optional[Dict[str, Any]]:
+    """Move an archived do back to its old place in the list; None if it is not archived."""
+    table = get_table()
+    archived = None
+    for key in _do_keys(deck_id, do_id, _layouts_for([deck_id])[deck_id], sk=_archive_sk(do_id)):
+        archived = decode(table.get_item(Key=key, ConsistentRead=True).get("Item"))
+        if archived:
+            break
+    if not archived:
+        return None
+    now = _now_iso()
+    restored = {key: value for key, value in archived.items() if key != "archivedAt"}
+    position = restored.get("position") or timestamp_key(datetime.fromisoformat(restored["createdAt"]))
+    restored.update(
+        SK=_do_sk(do_id),
+        GSI1PK=archived["PK"],
+        GSI1SK=_position_sk(position, do_id),
+        GSI2PK=_status_pk(archived["PK"], bool(restored.get("completed"))),
+        GSI2SK=_status_sk(restored["createdAt"], do_id),
+        position=position,
+        unarchivedAt=now,
+        updatedAt=now,
+    )
+    stored = encode(restored)
+    try:
+        table.meta.client.transact_write_items(
+            TransactItems=[
+                {
+                    "Put": {
+                        "TableName": table.name,
+                        "Item": stored,
+                        "ConditionExpression": "attribute_not_exists(PK)",
+                    }
+                },
+                {
+                    "Delete": {
+                        "TableName": table.name,
+                        "Key": {"PK": archived["PK"], "SK": _archive_sk(do_id)},
+                        "ConditionExpression": "attribute_exists(PK)",
+                    }
+                },
+            ]
+        )
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") == "TransactionCanceledException":
+            return None
+        raise
+    _apply_entry_changes(table, [], _search_entries(restored))
+    _invalidate_views(deck_scope(deck_id))
+    return decode(stored)
+
+
+def _access_scopes_for(owner_sub: str, emails: Iterable[str]) -> List[str]:
+    return [f"USER#{owner_sub}"] + [f"EMAIL#{email}" for email in sorted(emails)]
+
+
+def _due_scopes(deck_id: str, items: Iterable[Dict[str, Any]], deck: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Access scopes whose due indexes cover ``items`` of ``deck_id``: its owner and every collaborator.
+
+    Only dos with a due date have due entries, so for the rest this reads
+    nothing; otherwise it reads the collaborators (and the deck, unless the
+    caller already loaded it).
+    """
+    if not any(_indexed_due_at(item) for item in items):
+        return []
+    if deck is None:
+        deck = get_deck(deck_id)
+    if not deck:
+        return []
+    return _access_scopes_for(deck["ownerSub"], collaborator_emails(deck))
+
+
+def _indexed_due_at(item: Dict[str, Any]) -> Optional[str]:
+    # Only open dos with a due date are indexed.
+    return None if item.get("completed") else item.get("dueAt")
+
+
+def _due_entries(scopes: List[str], item: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Due index entries for ``item`` in each scope; they point back at the do."""
+    if not _indexed_due_at(item):
+        return []
+    return [
+        {
+            "PK": _due_pk(scope, item["dueAt"][:10]),
+            "SK": _due_sk(item["dueAt"], item["doId"]),
+            "deckId": item["deckId"],
+            "doId": item["doId"],
+            "dueAt": item["dueAt"],
+        }
+        for scope in scopes
+    ]
+
+
+def _search_entries(item: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Search postings for a deck or active do item: one per gram of its name or text, under its deck.
+
+    Postings are written once per deck rather than per reader; ``search``
+    finds the caller's decks through their access rows.
+    """
+    deck_id, sk = item["deckId"], item.get("SK", "")
+    if sk == _deck_sk(deck_id):
+        text, ref, extra = item["name"], f"{deck_id}#DECK", {}
+    elif sk.startswith("DO#"):
+        text, ref, extra = item["text"], f"{deck_id}#DO#{item['doId']}", {"doId": item["doId"]}
+    else:
+        return []
+    length = len(tokens(text))
+    return [
+        {"PK": _search_pk(deck_id, gram), "SK": ref, "deckId": deck_id, "exact": exact, "length": length, **extra}
+        for gram, exact in grams(text).items()
+    ]
+
+
+def _derived_entries(scopes: List[str], item: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return _due_entries(scopes, item) + _search_entries(item)
+
+
+def _entry_changes(table_name: str, old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Transaction items turning the ``old`` derived entries into the ``new`` ones."""
+    before = {(entry["PK"], entry["SK"]): entry for entry in old}
+    after = {(entry["PK"], entry["SK"]): entry for entry in new}
+    operations = [
+        {"Delete": {"TableName": table_name, "Key": {"PK": pk, "SK": sk}}} for pk, sk in before if (pk, sk) not in after
+    ]
+    operations.extend(
+        {"Put": {"TableName": table_name, "Item": encode(entry)}} for key, entry in after.items() if before.get(key) != entry
+    )
+    return operations
+
+
+def _apply_entry_changes(table, old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> None:
+    # Derived entries are rebuilt from the item and re-checked on read, so
+    # they go through BatchWriteItem rather than the item's transaction.
+    changes = _entry_changes(table.name, old, new)
+    if not changes:
+        return
+    with table.batch_writer() as batch:
+        for change in changes:
+            if "Delete" in change:
+                batch.delete_item(Key=change["Delete"]["Key"])
+            else:
+                batch.put_item(Item=change["Put"]["Item"])
+
+
+def _deck_and_dos(table, deck_id: str, consistent: bool = False) -> List[Dict[str, Any]]:
+    """The deck item and its active dos, from its own partition and (when sharded) every shard."""
+    # COLLAB# items sort before DECK, so the range skips collaborators.
+    items = decode_all(
+        _query_all(
+            table,
+            KeyConditionExpression=Key("PK").eq(_deck_pk(deck_id)) & Key("SK").gte(_deck_sk(deck_id)),
+            ConsistentRead=consistent,
+        )
+    )
+    deck = next((item for item in items if item["SK"] == _deck_sk(deck_id)), None)
+    if deck is None:
+        return items
+    _remember_layouts(deck_id, deck)
+    shards = [pk for pk in _do_partitions(deck_id, _deck_layouts(deck)) if pk != _deck_pk(deck_id)]
+    if shards:
+        seen = {item["SK"] for item in items}
+        sharded = _query_partitions(
+            shards,
+            lambda pk: decode_all(
+                _query_all(
+                    table, KeyConditionExpression=Key("PK").eq(pk) & Key("SK").begins_with("DO#"), ConsistentRead=consistent
+                )
+            ),
+        )
+        items.extend(item for item in sharded if item["SK"] not in seen)
+    return items
+
+
+def _consistent_dos(table, deck_id: str, keep, sort_key: str, indexed: bool = True) -> List[Dict[str, Any]]:
+    """What an index query of the deck's dos returns, from a consistent read of the base table instead.
+
+    Indexes cannot be read consistently, so views of a deck the caller just
+    wrote select (``keep``) and order (``sort_key``) its dos themselves. For
+    a deck not ``indexed`` yet, the read backfills its older dos' index keys.
+    """
+    if indexed:
+        dos = [item for item in _deck_and_dos(table, deck_id, consistent=True) if item["SK"].startswith("DO#")]
+    else:
+        dos = _index_legacy_dos(table, deck_id)
+    return sorted((item for item in dos if keep(item)), key=lambda item: item[sort_key])
+
+
+def _select(items: List[Dict[str, Any]], attributes: Optional[List[str]]) -> List[Dict[str, Any]]:
+    if attributes is None:
+        return items
+    return [{key: item[key] for key in attributes if key in item} for item in items]
+
+
+def _sync_shared_entries(deck_id: str, email: str, *, shared: bool) -> None:
+    """Copy the deck's due entries into (or out of) a collaborator's scope after a share change."""
+    table = get_table()
+    entries = [entry for item in _deck_and_dos(table, deck_id) for entry in _due_entries([f"EMAIL#{email}"], item)]
+    if shared:
+        _apply_entry_changes(table, [], entries)
+    else:
+        _apply_entry_changes(table, entries, [])
+
+
+def iter_deck_ids() -> Iterator[str]:
+    """Every deck id in the table, by a paginated scan; for maintenance tools, not request paths."""
+    table = get_table()
+    kwargs = {"FilterExpression": Attr("SK").eq("DECK"), "ProjectionExpression": "deckId"}
+    while True:
+        response = table.scan(**kwargs)
+        for item in response.get("Items", []):
+            yield item["deckId"]
+        if "LastEvaluatedKey" not in response:
+            return
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+@repository_operation
+def reindex_deck(deck: Dict[str, Any]) -> int:
+    """Rewrite every due and search entry of one deck; returns how many were written."""
+    table = get_table()
+    scopes = _access_scopes_for(deck["ownerSub"], collaborator_emails(deck))
+    entries = [entry for item in _deck_and_dos(table, deck["deckId"]) for entry in _derived_entries(scopes, item)]
+    with table.batch_writer() as batch:
+        for entry in entries:
+            batch.put_item(Item=encode(entry))
+    return len(entries)
+
+
+def _due_days(start: str, end: str) -> List[str]:
+    first = datetime.fromisoformat(start).date()
+    last = (datetime.fromisoformat(end) - timedelta(microseconds=1)).date()
+    return [(first + timedelta(days=offset)).isoformat() for offset in range((last - first).days + 1)]
+
+
+@repository_operation
+def list_due_dos(
+    owner_sub: str, email: Optional[str], start: str, end: str, consistent: bool = False
+) -> List[Dict[str, Any]]:
+    """Open dos due in ``[start, end)`` across every deck the user owns or shares.
+
+    Each day of the range is one query per access scope (run concurrently);
+    the matching dos are then batch-read and checked against their entries.
+    """
+    table = get_table()
+    client = table.meta.client
+    scopes = _access_scopes_for(owner_sub, [email] if email else [])
+
+    def _query(pk: str) -> List[Dict[str, Any]]:
+        return decode_all(
+            _query_all(table, KeyConditionExpression=Key("PK").eq(pk) & Key("SK").between(start, end), ConsistentRead=consistent)
+        )
+
+    pks = [_due_pk(scope, day) for scope in scopes for day in _due_days(start, end)]
+    workers = max(1, min(settings.cross_deck_concurrency, len(pks)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [_submit(pool, _query, pk) for pk in pks]
+        # A do can briefly have entries for two due dates (see update_do); the one matching it counts.
+        entries: Dict[Tuple[str, str], Set[str]] = {}
+        for future in futures:
+            for entry in future.result():
+                entries.setdefault((entry["deckId"], entry["doId"]), set()).add(entry["dueAt"])
+
+    layouts = _layouts_for({deck_id for deck_id, _ in entries})
+    keys = [key for deck_id, do_id in entries for key in _do_keys(deck_id, do_id, layouts[deck_id])]
+    found: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for item in decode_all(_batch_get(client, table.name, keys, ConsistentRead=consistent)):
+        # Entries written by a racing or interrupted update can disagree with the do.
+        if item.get("dueAt") in entries[(item["deckId"], item["doId"])] and not item.get("completed"):
+            found[(item["deckId"], item["doId"])] = item
+    dos = list(found.values())
+    dos.sort(key=lambda item: (item["dueAt"], item["doId"]))
+    return dos
+
+
+def _search_cursor(cursor: Optional[str]) -> Optional[Tuple[float, str]]:
+    """The rank key (negated score, posting) of the last hit a search page returned."""
+    start = _decode_cursor(cursor)
+    if start is None:
+        return None
+    if set(start) != {"score", "ref"}:
+        raise InvalidCursorError
+    try:
+        return -float(start["score"]), start["ref"]
+    except ValueError as exc:
+        raise InvalidCursorError from exc
+
+
+@repository_operation
+def search(
+    owner_sub: str,
+    email: Optional[str],
+    query: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    consistent: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Decks and dos the user can access whose words start with every query word, best first.
+
+    The user's decks come from their access rows; each query word is then one
+    posting query per deck (run concurrently, reading at most
+    ``SEARCH_MAX_POSTINGS`` postings). Only the page being returned is read
+    back from the base table, and hits whose text no longer matches are
+    dropped. The cursor is the rank of the last hit returned, so later pages
+    neither repeat nor skip hits when the index changes in between.
+    """
+    after = _search_cursor(cursor)
+    terms = list(dict.fromkeys(query_terms(query)))
+    if not terms:
+        return [], None
+    table = get_table()
+    client = table.meta.client
+    deck_ids = [row["deckId"] for row in list_access_rows(owner_sub, email, "all", None, consistent=consistent)]
+
+    def _postings(term: str, deck_id: str) -> Tuple[str, List[Dict[str, Any]]]:
+        key = Key("PK").eq(_search_pk(deck_id, term))
+        return term, decode_all(
+            _query_up_to(table, settings.search_max_postings, KeyConditionExpression=key, ConsistentRead=consistent)
+        )
+
+    pairs = [(term, deck_id) for term in terms for deck_id in deck_ids]
+    hits: Dict[str, Dict[str, bool]] = {}
+    postings: Dict[str, Dict[str, Any]] = {}
+    workers = max(1, min(settings.cross_deck_concurrency, len(pairs)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [_submit(pool, _postings, term, deck_id) for term, deck_id in pairs]
+        for future in futures:
+            term, items = future.result()
+            for posting in items:
+                hits.setdefault(posting["SK"], {})[term] = bool(posting.get("exact"))
+                postings[posting["SK"]] = posting
+
+    ranks = (
+        (-search_score(found.values(), int(postings[ref]["length"]), is_deck="doId" not in postings[ref]), ref)
+        for ref, found in hits.items()
+        if len(found) == len(terms)
+    )
+    ranked = heapq.nsmallest(limit + 1, (rank for rank in ranks if after is None or rank > after))
+    page = ranked[:limit]
+    layouts = _layouts_for({postings[ref]["deckId"] for _, ref in page if "doId" in postings[ref]})
+    refs = []
+    keys = []
+    for _, ref in page:
+        posting = postings[ref]
+        if "doId" in posting:
+            sk = _do_sk(posting["doId"])
+            keys.extend(_do_keys(posting["deckId"], posting["doId"], layouts[posting["deckId"]]))
+        else:
+            sk = _deck_sk(posting["deckId"])
+            keys.append({"PK": _deck_pk(posting["deckId"]), "SK": sk})
+        refs.append((posting["deckId"], sk))
+    # Keyed by deck rather than partition: a do may live in any of its deck's shards.
+    loaded: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for item in decode_all(_batch_get(client, table.name, keys, ConsistentRead=consistent)):
+        loaded[(item["deckId"], item["SK"])] = item
+
+    results = []
+    for (rank, _), ref in zip(page, refs):
+        item = loaded.get(ref)
+        if item is None or not matches(query, item["text"] if "doId" in item else item["name"]):
+            continue
+        results.append({"score": -rank, "item": item})
+    next_cursor = None
+    if len(ranked) > limit:
+        rank, ref = page[-1]
+        next_cursor = _encode_cursor({"score": repr(-rank), "ref": ref})
+    return results, next_cursor
+
+
+def display_order(item: Dict[str, Any]) -> Tuple[str, str]:
+    """Sort key for dos read from the base table; dos without a position fall back to creation time."""
+    position = item.get("position") or timestamp_key(datetime.fromisoformat(item["createdAt"]), jitter=False)
+    return position, item["doId"]
+
+
+@repository_operation
+def update_do(
+    do_item: Dict[str, Any],
+    text: Optional[str],
+    completed: Optional[bool],
+    due_at: Optional[str] = _UNCHANGED,
+    expected_updated_at: Optional[str] = None,
+    deck: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Apply the given changes; with ``expected_updated_at``, only if the stored do was last updated then.
+
+    A ``deck`` the caller already loaded saves reading it again when the due date changes.
+    """
+    table = get_table()
+    now = _now_iso()
+    stored = _reencode(table, do_item)
+    if stored is not do_item:
+        do_item.clear()
+        do_item.update(stored)
+    before = dict(do_item)
     update_expr_parts: List[str] = []
-    expr_attr_values: Dict[str, Any] = {":now": now}
-    expr_attr_names: Dict[str, str] = {}
+    expr_attr_values: Dict[str, Any] = {":now": stored_value("updatedAt", now, stored)}
+    # Every attribute goes through a placeholder so the stored format's names can be used.
+    expr_attr_names: Dict[str, str] = {"#updated": stored_name("do", "updatedAt", stored)}
+    remove_parts: List[str] = []
 
     if text is not None:
         update_expr_parts.append("#text = :text")
         expr_attr_values[":text"] = text.strip()
-        expr_attr_names["#text"] = "text"
+        expr_attr_names["#text"] = stored_name("do", "text", stored)
         do_item["text"] = text.strip()
     if completed is not None:
-        update_expr_parts.append("completed = :completed")
+        update_expr_parts.append("#completed = :completed")
+        expr_attr_names["#completed"] = stored_name("do", "completed", stored)
         expr_attr_values[":completed"] = completed
         do_item["completed"] = completed
-
-    if not update_expr_parts:
+        # Completion moves the do between the OPEN and DONE partitions of GSI2.
+        update_expr_parts.append("GSI2PK = :gsi2pk, GSI2SK = :gsi2sk")
+        expr_attr_values[":gsi2pk"] = _status_pk(do_item["PK"], completed)
+        expr_attr_values[":gsi2sk"] = _status_sk(do_item["createdAt"], do_item["doId"])
+        do_item["GSI2PK"] = expr_attr_values[":gsi2pk"]
+        do_item["GSI2SK"] = expr_attr_values[":gsi2sk"]
+        # completedAt starts the archive clock; reopening a do stops it.
+        if completed and not do_item.get("completedAt"):
+            update_expr_parts.append("#completedAt = :now")
+            expr_attr_names["#completedAt"] = stored_name("do", "completedAt", stored)
+            do_item["completedAt"] = now
+        elif not completed:
+            remove_parts.append("#completedAt")
+            expr_attr_names["#completedAt"] = stored_name("do", "completedAt", stored)
+            do_item.pop("completedAt", None)
+    if due_at is not _UNCHANGED:
+        expr_attr_names["#dueAt"] = stored_name("do", "dueAt", stored)
+        if due_at:
+            update_expr_parts.append("#dueAt = :dueAt")
+            expr_attr_values[":dueAt"] = stored_value("dueAt", due_at, stored)
+            do_item["dueAt"] = due_at
+        else:
+            remove_parts.append("#dueAt")
+            do_item.pop("dueAt", None)
+
+    if not update_expr_parts and not remove_parts:
         return do_item
 
-    update_expr_parts.append("updatedAt = :now")
+    update_expr_parts.append("#updated = :now")
 
     update_kwargs = {
-        "Key": {"PK": _deck_pk(do_item["deckId"]), "SK": _do_sk(do_item["doId"])},
-        "UpdateExpression": "SET " + ", ".join(update_expr_parts),
+        "Key": {"PK": do_item["PK"], "SK": _do_sk(do_item["doId"])},
+        "UpdateExpression": "SET " + ", ".join(update_expr_parts)
+        + (" REMOVE " + ", ".join(remove_parts) if remove_parts else ""),
+        "ExpressionAttributeNames": expr_attr_names,
         "ExpressionAttributeValues": expr_attr_values,
     }
-    if expr_attr_names:
-        update_kwargs["ExpressionAttributeNames"] = expr_attr_names
-
-    table.update_item(**update_kwargs)
+    # A do deleted or moved to another shard since it was read must not come back as a fragment.
+    update_kwargs["ConditionExpression"] = "attribute_exists(PK)"
+    if expected_updated_at is not None:
+        update_kwargs["ConditionExpression"] += " AND #updated = :seen"
+        expr_attr_values[":seen"] = stored_value("updatedAt", expected_updated_at, stored)
+
+    due_changed = _indexed_due_at(before) != _indexed_due_at(do_item)
+    text_changed = before["text"] != do_item["text"]
+    scopes = _due_scopes(do_item["deckId"], [before, do_item], deck) if due_changed else []
+    # One entry per scope is too many for one transaction on a widely shared
+    # deck, so the do is written alone: its new due entries go in first and
+    # the old ones come out after it. A write that stops halfway leaves extra
+    # entries, which list_due_dos checks against the do and skips, never
+    # missing ones; reindex-decks rewrites a deck's entries in full.
+    _apply_entry_changes(table, [], _due_entries(scopes, do_item))
+    try:
+        table.update_item(**update_kwargs)
+    except ClientError as exc:
+        if not _is_condition_failure(exc):
+            raise
+        raise ConcurrentUpdateError(do_item["doId"]) from exc
+    _apply_entry_changes(table, _due_entries(scopes, before), [])
+    if text_changed:
+        _apply_entry_changes(table, _search_entries(before), _search_entries(do_item))
+    _invalidate_views(deck_scope(do_item["deckId"]))
 
     do_item["updatedAt"] = now
     return do_item
 
 
-def delete_do(deck_id: str, do_id: str) -> None:
+@repository_operation
+def delete_do(deck_id: str, do_id: str, deck: Optional[Dict[str, Any]] = None) -> None:
+    table = get_table()
+    old = None
+    layouts = _deck_layouts(deck) if deck is not None else _layouts_for([deck_id])[deck_id]
+    for key in _do_keys(deck_id, do_id, layouts):
+        old = decode(table.delete_item(Key=key, ReturnValues="ALL_OLD").get("Attributes"))
+        if old:
+            break
+    if old:
+        _apply_entry_changes(table, _derived_entries(_due_scopes(deck_id, [old], deck), old), [])
+    _invalidate_views(deck_scope(deck_id))
+
+
+def iter_deck_export(deck_id: str) -> Iterator[Dict[str, Any]]:
+    """Yield the deck item, its dos and then its archived dos, one DynamoDB page at a time."""
+    table = get_table()
+    shards = [pk for pk in _do_partitions(deck_id) if pk != _deck_pk(deck_id)]
+    ranges = [
+        (_deck_pk(deck_id), Key("SK").gte(_deck_sk(deck_id))),
+        *((pk, Key("SK").begins_with("DO#")) for pk in shards),
+        (_deck_pk(deck_id), Key("SK").begins_with("ARCHIVE#")),
+        *((pk, Key("SK").begins_with("ARCHIVE#")) for pk in shards),
+    ]
+    for pk, sk_range in ranges:
+        kwargs: Dict[str, Any] = {
+            "KeyConditionExpression": Key("PK").eq(pk) & sk_range,
+            "Limit": settings.export_page_size,
+        }
+        while True:
+            response = table.query(**kwargs)
+            for item in decode_all(response.get("Items", [])):
+                if item["SK"] == _deck_sk(deck_id) or item["SK"].startswith(("DO#", "ARCHIVE#")):
+                    yield item
+            if "LastEvaluatedKey" not in response:
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def _batch_write_chunk(client, table_name: str, chunk: List[Dict[str, Any]]) -> int:
+    request = {table_name: [{"PutRequest": {"Item": item}} for item in chunk]}
+    for attempt in range(settings.batch_write_max_attempts):
+        response = client.batch_write_item(RequestItems=request)
+        request = response.get("UnprocessedItems") or {}
+        if not request:
+            return len(chunk)
+        # Full jitter keeps parallel chunks from retrying in lockstep.
+        time.sleep(random.uniform(0, min(0.05 * 2**attempt, 2.0)))
+    raise BatchWriteError(f"{len(request.get(table_name, []))} items left unprocessed")
+
+
+@repository_operation
+def batch_write_items(items: List[Dict[str, Any]], concurrency: Optional[int] = None) -> int:
+    table = get_table()
+    client = table.meta.client
+    chunks = list(_chunk(items, size=25))
+    if not chunks:
+        return 0
+    workers = max(1, min(concurrency or settings.batch_write_concurrency, len(chunks)))
+    if workers == 1:
+        return sum(_batch_write_chunk(client, table.name, chunk) for chunk in chunks)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [_submit(pool, _batch_write_chunk, client, table.name, chunk) for chunk in chunks]
+        return sum(future.result() for future in futures)
+
+
+def new_deck_items(
+    deck_id: str, owner_sub: str, name: str, created_at: str, collaborators: List[str], index: bool = True
+) -> List[Dict[str, Any]]:
+    """Every item of a new deck shared with ``collaborators``, unencoded, for bulk loading with ``batch_write_items``.
+
+    The deck item comes first, then its owner access row, a collaborator item
+    and access row per email and, with ``index``, its search postings.
+    """
+    deck = _deck_item(deck_id, owner_sub, name, created_at, len(collaborators))
+    items = [deck, _owner_access_item(deck)]
+    for email in collaborators:
+        items += [_collaborator_item(deck_id, email, created_at), _collaborator_access_item(deck, email)]
+    if index:
+        items += _search_entries(deck)
+    return items
+
+
+def new_do_items(
+    deck: Dict[str, Any],
+    collaborators: List[str],
+    text: str,
+    completed: bool = False,
+    created_at: Optional[str] = None,
+    due_at: Optional[str] = None,
+    index: bool = True,
+) -> List[Dict[str, Any]]:
+    """A new do of ``deck`` followed, with ``index``, by its due entries (for the owner and ``collaborators``) and search postings."""
+    item = _do_item(deck["deckId"], text, completed=completed, created_at=created_at, due_at=due_at)
+    if completed:
+        item["completedAt"] = item["updatedAt"]
+    if not index:
+        return [item]
+    return [item] + _derived_entries(_access_scopes_for(deck["ownerSub"], collaborators), item)
+
+
+@repository_operation
+def import_dos(deck_id: str, records: List[Dict[str, Any]], deck: Optional[Dict[str, Any]] = None) -> int:
+    """Write imported do records; ones with an ``archivedAt`` go back under ``ARCHIVE#``, without index entries."""
+    if not records:
+        return 0
+    deck, shards = _write_layout(deck_id, deck)
+    dos = [
+        _do_item(
+            deck_id,
+            record["text"],
+            completed=bool(record.get("completed", False)),
+            created_at=record.get("createdAt"),
+            updated_at=record.get("updatedAt"),
+            position=record.get("position"),
+            due_at=record.get("dueAt"),
+            shards=shards,
+        )
+        for record in records
+    ]
+    active: List[Dict[str, Any]] = []
+    archived: List[Dict[str, Any]] = []
+    for item, record in zip(dos, records):
+        if record.get("archivedAt"):
+            archived.append(_archived_item(item, record["archivedAt"]))
+        else:
+            active.append(item)
+    scopes = _due_scopes(deck_id, active, deck)
+    entries = [entry for item in active for entry in _derived_entries(scopes, item)]
+    batch_write_items([encode(item) for item in active + archived + entries])
+    _invalidate_views(deck_scope(deck_id))
+    return len(dos)
+
+
+def _do_pages(table, deck_id: str) -> Iterator[List[Dict[str, Any]]]:
+    """Active dos of a deck from the base table (shard by shard), one page at a time."""
+    seen: Set[str] = set()
+    for pk in _do_partitions(deck_id):
+        kwargs: Dict[str, Any] = {
+            "KeyConditionExpression": Key("PK").eq(pk) & Key("SK").begins_with("DO#"),
+            "Limit": settings.export_page_size,
+        }
+        while True:
+            response = table.query(**kwargs)
+            # A do moved between shards mid-read is only copied once.
+            page = [item for item in decode_all(response.get("Items", [])) if item["SK"] not in seen]
+            seen.update(item["SK"] for item in page)
+            if page:
+                yield page
+            if "LastEvaluatedKey" not in response:
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def _copy_dos(deck: Dict[str, Any], items: List[Dict[str, Any]]) -> int:
+    """Write copies of ``items`` (fresh ids, same order and status) into ``deck`` with their entries."""
+    copies = []
+    for item in items:
+        copy = _do_item(
+            deck["deckId"],
+            item["text"],
+            completed=bool(item.get("completed")),
+            position=display_order(item)[0],
+            due_at=item.get("dueAt"),
+        )
+        if item.get("completedAt"):
+            copy["completedAt"] = item["completedAt"]
+        copies.append(copy)
+    scopes = _access_scopes_for(deck["ownerSub"], [])
+    entries = [entry for copy in copies for entry in _derived_entries(scopes, copy)]
+    batch_write_items([encode(item) for item in copies + entries])
+    return len(copies)
+
+
+@repository_operation
+def clone_deck(source: Dict[str, Any], owner_sub: str, name: str) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Create a copy of ``source`` owned by ``owner_sub`` (its dos, not its collaborators or archive).
+
+    Up to ``CLONE_INLINE_MAX_DOS`` dos are copied before returning ``(deck, None)``.
+    Larger decks return ``(deck, job)``; ``run_clone_job`` then copies the dos.
+    """
+    table = get_table()
+    probe: List[Dict[str, Any]] = []
+    for pk in _do_partitions(source["deckId"]):
+        response = table.query(
+            KeyConditionExpression=Key("PK").eq(pk) & Key("SK").begins_with("DO#"),
+            Limit=settings.clone_inline_max_dos + 1 - len(probe),
+        )
+        probe.extend(decode_all(response.get("Items", [])))
+        if len(probe) > settings.clone_inline_max_dos or "LastEvaluatedKey" in response:
+            break
+    if len(probe) <= settings.clone_inline_max_dos and "LastEvaluatedKey" not in response:
+        deck = create_deck(owner_sub, name)
+        _copy_dos(deck, list({item["SK"]: item for item in probe}.values()))
+        _invalidate_views(deck_scope(deck["deckId"]))
+        return deck, None
+
+    job_id = str(uuid4())
+    _claim_job(table, owner_sub, job_id)
+    try:
+        deck = create_deck(owner_sub, name)
+        now = _now_iso()
+        job = {
+            "PK": _job_pk(job_id),
+            "SK": JOB_SK,
+            "jobId": job_id,
+            "kind": "clone",
+            "status": "running",
+            "ownerSub": owner_sub,
+            "sourceDeckId": source["deckId"],
+            "deckId": deck["deckId"],
+            "copied": 0,
+            "createdAt": now,
+            "updatedAt": now,
+            "expiresAt": int(time.time()) + JOB_RETENTION_SECONDS,
+        }
+        table.put_item(Item=job)
+    except BaseException:
+        _release_job(table, owner_sub, job_id)
+        raise
+    return deck, job
+
+
+def _job_claim_key(owner_sub: str) -> Dict[str, str]:
+    return {"PK": _job_pk(f"USER#{owner_sub}"), "SK": JOB_CLAIM_SK}
+
+
+def _claim_job(table, owner_sub: str, job_id: str) -> None:
+    """Take the user's background job slot for ``job_id``; raises ``JobInProgressError`` if another job holds it."""
+    now = int(time.time())
+    try:
+        table.put_item(
+            Item={**_job_claim_key(owner_sub), "jobId": job_id, "expiresAt": now + JOB_CLAIM_SECONDS},
+            ConditionExpression="attribute_not_exists(PK) OR expiresAt < :now",
+            ExpressionAttributeValues={":now": now},
+        )
+    except ClientError as exc:
+        if not _is_condition_failure(exc):
+            raise
+        raise JobInProgressError(owner_sub) from exc
+
+
+def _release_job(table, owner_sub: str, job_id: str) -> None:
+    try:
+        table.delete_item(
+            Key=_job_claim_key(owner_sub),
+            ConditionExpression="jobId = :job",
+            ExpressionAttributeValues={":job": job_id},
+        )
+    except ClientError as exc:
+        # Lapsed and claimed by a newer job; that one releases it.
+        if not _is_condition_failure(exc):
+            raise
+
+
+def _update_job(table, job: Dict[str, Any], **changes: Any) -> None:
+    job.update(changes, updatedAt=_now_iso())
+    names = {f"#f{index}": name for index, name in enumerate(sorted(changes) + ["updatedAt"])}
+    table.update_item(
+        Key={"PK": job["PK"], "SK": JOB_SK},
+        UpdateExpression="SET " + ", ".join(f"{placeholder} = :v{placeholder[2:]}" for placeholder in names),
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues={f":v{placeholder[2:]}": job[name] for placeholder, name in names.items()},
+    )
+
+
+@repository_operation
+def run_clone_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the source deck's dos page by page, recording progress on the job.
+
+    The next page is read while the previous one is written. On failure the
+    partial copy is deleted and the job is marked ``failed``.
+    """
+    table = get_table()
+    deck = get_deck(job["deckId"], consistent=True)
+    try:
+        if deck is None:
+            raise RepositoryError("clone target deleted")
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            in_flight = None
+            for page in _do_pages(table, job["sourceDeckId"]):
+                if in_flight is not None:
+                    _update_job(table, job, copied=job["copied"] + in_flight.result())
+                in_flight = _submit(writer, _copy_dos, deck, page)
+            if in_flight is not None:
+                job["copied"] += in_flight.result()
+        _update_job(table, job, copied=job["copied"], status="succeeded")
+    except Exception as exc:
+        logger.exception("clone job %s failed", job["jobId"])
+        if deck is not None:
+            delete_deck(deck)
+        _update_job(table, job, status="failed", error=type(exc).__name__)
+    finally:
+        _release_job(table, job["ownerSub"], job["jobId"])
+    _invalidate_views(deck_scope(job["deckId"]), user_scope(job["ownerSub"]))
+    return job
+
+
+@repository_operation
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    return get_table().get_item(Key={"PK": _job_pk(job_id), "SK": JOB_SK}, ConsistentRead=True).get("Item")
+
+
+def _move_to_shard(table, stored: Dict[str, Any], pk: str) -> bool:
+    """Move one stored do (or archived do) to partition ``pk``; False if it changed or went away first."""
+    moved = {**stored, "PK": pk}
+    if "GSI1PK" in stored:
+        moved["GSI1PK"] = pk
+    if "GSI2PK" in stored:
+        moved["GSI2PK"] = f"{pk}#{stored['GSI2PK'].rsplit('#', 1)[1]}"
+    delete: Dict[str, Any] = {"TableName": table.name, "Key": {"PK": stored["PK"], "SK": stored["SK"]}}
+    updated = stored_name("do", "updatedAt", stored)
+    if updated in stored:
+        delete["ConditionExpression"] = "#updated = :seen"
+        delete["ExpressionAttributeNames"] = {"#updated": updated}
+        delete["ExpressionAttributeValues"] = {":seen": stored[updated]}
+    else:
+        delete["ConditionExpression"] = "attribute_exists(PK)"
+    try:
+        table.meta.client.transact_write_items(
+            TransactItems=[
+                {"Put": {"TableName": table.name, "Item": moved, "ConditionExpression": "attribute_not_exists(PK)"}},
+                {"Delete": delete},
+            ]
+        )
+    except ClientError as exc:
+        if not _is_condition_failure(exc):
+            raise
+        return False
+    return True
+
+
+def _move_do_item(table, stored: Dict[str, Any], pk: str) -> int:
+    for _ in range(MOVE_ATTEMPTS):
+        if _move_to_shard(table, stored, pk):
+            return 1
+        stored = table.get_item(Key={"PK": stored["PK"], "SK": stored["SK"]}, ConsistentRead=True).get("Item")
+        if stored is None:
+            return 0
+    raise RepositoryError(f"{stored['SK']} kept changing while it was moved")
+
+
+@repository_operation
+def reshard_deck(deck_id: str, shards: int, settle_seconds: Optional[float] = None) -> int:
+    """Spread the deck's dos over ``shards`` partitions (1 puts them back on the deck's own); returns dos moved.
+
+    The new layout is recorded on the deck item first, next to the one being
+    emptied, so readers look in both. After ``settle_seconds`` (by default
+    just over ``SHARD_LAYOUT_CACHE_SECONDS``, so no process still places new
+    dos by the old layout) each do whose partition changes is moved with a
+    transaction, and the old layout is dropped. An interrupted run is resumed
+    by running it again with the same ``shards``.
+    """
+    if not 1 <= shards <= MAX_DO_SHARDS:
+        raise ValueError(f"shards must be between 1 and {MAX_DO_SHARDS}")
     table = get_table()
-    table.delete_item(Key={"PK": _deck_pk(deck_id), "SK": _do_sk(do_id)})
+    key = {"PK": _deck_pk(deck_id), "SK": _deck_sk(deck_id)}
+    deck = get_deck(deck_id, consistent=True)
+    if deck is None:
+        raise RepositoryError(f"deck {deck_id} not found")
+    layouts = _deck_layouts(deck)
+    if layouts[0] != shards:
+        if len(layouts) > 1:
+            raise RepositoryError(f"deck {deck_id} is still moving to {layouts[0]} shards")
+        table.update_item(
+            Key=key,
+            UpdateExpression="SET doShards = :new, previousDoShards = :old",
+            ConditionExpression="attribute_exists(PK) AND attribute_not_exists(previousDoShards)",
+            ExpressionAttributeValues={":new": shards, ":old": layouts[0]},
+        )
+        layouts = [shards, layouts[0]]
+    elif len(layouts) == 1:
+        return 0
+    _remember_layouts(deck_id, {**deck, "doShards": shards, "previousDoShards": layouts[1]})
+    _invalidate_views(deck_scope(deck_id))
+    time.sleep(settings.shard_layout_cache_seconds + 1 if settle_seconds is None else settle_seconds)
+
+    def _move_partition(pk: str) -> int:
+        moved = 0
+        for sk_prefix in ("DO#", "ARCHIVE#"):
+            for stored in _query_all(table, KeyConditionExpression=Key("PK").eq(pk) & Key("SK").begins_with(sk_prefix)):
+                target = _shard_pk(deck_id, stored["SK"].split("#", 1)[1], shards)
+                if target != pk:
+                    moved += _move_do_item(table, stored, target)
+        return moved
+
+    old = _shard_pks(deck_id, layouts[1])
+    workers = max(1, min(settings.cross_deck_concurrency, len(old)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        moved = sum(future.result() for future in [_submit(pool, _move_partition, pk) for pk in old])
+
+    done = "previousDoShards" if shards > 1 else "previousDoShards, doShards"
+    table.update_item(
+        Key=key,
+        UpdateExpression=f"REMOVE {done}",
+        ConditionExpression="doShards = :new",
+        ExpressionAttributeValues={":new": shards},
+    )
+    _remember_layouts(deck_id, {**deck, "doShards": shards, "previousDoShards": None})
+    _invalidate_views(deck_scope(deck_id))
+    return moved
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Literal, Optional
 
 from pydantic import BaseModel, EmailStr, Field, constr
 
@@ -31,6 +31,7 @@ class DeckDetail(BaseModel):
     isOwner: bool
     ownerSub: str
     collaborators: List[str]
+    collaboratorCount: int = 0
     createdAt: datetime
     updatedAt: datetime
 
@@ -39,13 +40,45 @@ class CollaboratorAddRequest(BaseModel):
     email: EmailStr
 
 
+class CollaboratorBatchRequest(BaseModel):
+    emails: List[EmailStr] = Field(..., min_length=1)
+
+
+class CollaboratorBatchResult(BaseModel):
+    email: str
+    status: str
+
+
+class CollaboratorBatchResponse(BaseModel):
+    results: List[CollaboratorBatchResult]
+    collaboratorCount: int
+
+
+class Collaborator(BaseModel):
+    email: str
+    addedAt: datetime
+
+
+class CollaboratorPage(BaseModel):
+    items: List[Collaborator]
+    nextCursor: Optional[str] = None
+
+
 class DoCreateRequest(BaseModel):
     text: constr(min_length=1, max_length=1000)
+    dueAt: Optional[datetime] = None
 
 
 class DoUpdateRequest(BaseModel):
     text: Optional[constr(min_length=1, max_length=1000)] = None
     completed: Optional[bool] = None
+    # Send null to clear the due date.
+    dueAt: Optional[datetime] = None
+
+
+class DoMoveRequest(BaseModel):
+    afterDoId: Optional[str] = None
+    beforeDoId: Optional[str] = None
 
 
 class DoItem(BaseModel):
@@ -53,5 +86,94 @@ class DoItem(BaseModel):
     deckId: str
     text: str
     completed: bool
+    position: Optional[str] = None
     createdAt: datetime
     updatedAt: datetime
+    completedAt: Optional[datetime] = None
+    archivedAt: Optional[datetime] = None
+    dueAt: Optional[datetime] = None
+
+
+class DoPage(BaseModel):
+    items: List[DoItem]
+    nextCursor: Optional[str] = None
+
+
+class SearchHit(BaseModel):
+    type: Literal["deck", "do"]
+    score: float
+    deckId: str
+    doId: Optional[str] = None
+    name: Optional[str] = None
+    text: Optional[str] = None
+    completed: Optional[bool] = None
+
+
+class SearchPage(BaseModel):
+    items: List[SearchHit]
+    nextCursor: Optional[str] = None
+
+
+class DeckDetailWithDos(DeckDetail):
+    dos: List[DoItem]
+
+
+class DeckImportDeckRecord(BaseModel):
+    type: Literal["deck"]
+    name: constr(min_length=1, max_length=120)
+
+
+class DeckImportDoRecord(BaseModel):
+    type: Literal["do"]
+    text: constr(min_length=1, max_length=1000)
+    position: Optional[str] = Field(None, description="Sort key from an export; the order of the file otherwise")
+    completed: bool = False
+    createdAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
+    dueAt: Optional[datetime] = None
+    archivedAt: Optional[datetime] = Field(None, description="Set on archived dos; they are imported into the archive")
+
+
+class DeckImportResponse(BaseModel):
+    deckId: str
+    name: str
+    imported: int
+    seconds: float
+    itemsPerSecond: float
+
+
+class DeckCloneRequest(BaseModel):
+    name: Optional[constr(min_length=1, max_length=120)] = Field(None, description="Defaults to '<source name> (copy)'")
+
+
+class JobStatus(BaseModel):
+    jobId: str
+    kind: Literal["clone"]
+    status: Literal["running", "succeeded", "failed"]
+    deckId: str
+    sourceDeckId: str
+    copied: int = 0
+    error: Optional[str] = None
+    createdAt: datetime
+    updatedAt: datetime
+
+
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = None
+    method: Literal["GET", "POST", "PATCH", "DELETE"] = "GET"
+    path: constr(min_length=1, max_length=2048)
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(..., min_length=1)
+
+
+class BatchSubResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
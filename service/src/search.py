@@ -0,0 +1,60 @@
+"""Tokenizing and ranking for the deck/do search index.
+
+Text is lowercased and split into word tokens; each token is indexed under
+its edge n-grams (``mil``, ``milk``, ...) so a query word matches any word it
+starts. The index itself is plain ``TOK#`` items in the table, so local
+builds on ``STORAGE_BACKEND=memory`` search entirely in process.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List
+
+MIN_GRAM = 2
+MAX_GRAM = 10
+# Long texts index only their first distinct words.
+MAX_TOKENS = 64
+MAX_QUERY_TERMS = 8
+
+_WORD = re.compile(r"\w+")
+
+
+def tokens(text: str) -> List[str]:
+    """Distinct lowercase words of ``text`` in order of first appearance."""
+    folded = unicodedata.normalize("NFKC", text).casefold()
+    seen: Dict[str, None] = {}
+    for word in _WORD.findall(folded):
+        if len(word) >= MIN_GRAM:
+            seen.setdefault(word, None)
+    return list(seen)[:MAX_TOKENS]
+
+
+def grams(text: str) -> Dict[str, bool]:
+    """Every indexed gram of ``text``, mapped to whether it is a whole word."""
+    result: Dict[str, bool] = {}
+    for word in tokens(text):
+        for size in range(MIN_GRAM, min(len(word), MAX_GRAM) + 1):
+            gram = word[:size]
+            result[gram] = result.get(gram, False) or size == len(word)
+    return result
+
+
+def query_terms(query: str) -> List[str]:
+    """Query words, each cut to the longest gram the index holds."""
+    return [word[:MAX_GRAM] for word in tokens(query)][:MAX_QUERY_TERMS]
+
+
+def matches(query: str, text: str) -> bool:
+    """True when every query word starts some word of ``text``."""
+    words = tokens(text)
+    return all(any(word.startswith(term) for word in words) for term in tokens(query)[:MAX_QUERY_TERMS])
+
+
+def score(exact_terms: Iterable[bool], length: int, *, is_deck: bool) -> float:
+    """Whole-word hits count double, shorter texts rank higher and deck names get a boost."""
+    points = sum(2.0 if exact else 1.0 for exact in exact_terms)
+    if is_deck:
+        points += 1.0
+    return round(points / (1.0 + 0.1 * max(length - 1, 0)), 4)
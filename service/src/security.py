@@ -1,15 +1,17 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 
 import httpx
 from fastapi import HTTPException, status
 from jose import jwt
 from jose.exceptions import JWTError
 
+from .authcache import cache_for
 from .settings import settings
 
 JWKS_CACHE: Dict[str, Dict[str, Any]] = {}
@@ -31,27 +33,48 @@ def _load_override() -> Dict[str, Any] | None:
     return None
 
 
-def _get_jwks(issuer: str) -> Dict[str, Any]:
-    now = time.time()
-    if issuer in JWKS_CACHE and JWKS_EXPIRY.get(issuer, 0) > now:
-        return JWKS_CACHE[issuer]
+def _auth_cache():
+    return cache_for(settings.auth_cache_path)
 
+
+def _fetch_jwks(issuer: str) -> Tuple[Dict[str, Any], float]:
     override = _load_override()
     if override:
-        JWKS_CACHE[issuer] = override
-        JWKS_EXPIRY[issuer] = now + 300
-        return override
+        return override, 300
 
     url = f"{issuer}/.well-known/jwks.json"
     with httpx.Client(timeout=5.0) as client:
         resp = client.get(url)
         resp.raise_for_status()
-        jwks = resp.json()
+        return resp.json(), 3600
+
+
+def _get_jwks(issuer: str) -> Dict[str, Any]:
+    now = time.time()
+    if issuer in JWKS_CACHE and JWKS_EXPIRY.get(issuer, 0) > now:
+        return JWKS_CACHE[issuer]
+
+    # Behind the per-process copy, workers share one fetch through the auth cache.
+    cache = _auth_cache()
+    key = f"jwks:{issuer}"
+    jwks = cache.get(key)
+    if jwks is None:
+        with cache.lock("jwks"):
+            jwks = cache.get(key)
+            if jwks is None:
+                jwks, ttl = _fetch_jwks(issuer)
+                cache.set(key, jwks, ttl)
     JWKS_CACHE[issuer] = jwks
-    JWKS_EXPIRY[issuer] = now + 3600
+    # Re-check the shared copy every minute so a refresh by one worker reaches the rest.
+    JWKS_EXPIRY[issuer] = now + 60
     return jwks
 
 
+def _token_key(token: str) -> str:
+    material = f"{settings.auth0_issuer}|{settings.auth0_audience}|{token}"
+    return "token:" + hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
 def verify_jwt(authorization: str | None) -> Dict[str, Any]:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
@@ -66,6 +89,11 @@ def verify_jwt(authorization: str | None) -> Dict[str, Any]:
         )
 
     token = authorization.split(" ", 1)[1]
+    cache_key = _token_key(token)
+    cached = _auth_cache().get(cache_key) if settings.token_cache_ttl_seconds > 0 else None
+    if cached is not None and cached.get("exp", 0) > time.time():
+        return dict(cached)
+
     jwks = _get_jwks(settings.auth0_issuer)
 
     try:
@@ -88,4 +116,8 @@ def verify_jwt(authorization: str | None) -> Dict[str, Any]:
             detail="invalid token",
         ) from exc
 
+    # Only verified tokens are cached, and never past their own expiry.
+    ttl = min(settings.token_cache_ttl_seconds, payload.get("exp", 0) - time.time())
+    if ttl > 0:
+        _auth_cache().set(cache_key, payload, ttl)
     return payload
@@ -0,0 +1,106 @@
+"""Production entrypoint: uvicorn worker processes on one port.
+
+Usage: ``python -m src.serve [--workers N] [--host H] [--port P]``
+
+Workers default to ``WEB_CONCURRENCY`` (``0``, one per CPU the container may
+use: CPU quota and affinity, not the host's core count), since one process
+only keeps one core busy. They share the listening socket and, through
+``AUTH_CACHE_PATH`` (a file under the temp dir unless set), the JWKS and
+verified-token caches; each keeps its own ``/metrics`` registry (a scrape sees
+one worker), view cache, circuit breaker, update coalescer and job runner.
+Several workers refuse to start with the in-memory rate limiter, which would
+let each worker allow the full rate: the image sets
+``RATE_LIMIT_BACKEND=dynamodb``. ``SIGHUP`` replaces the workers one
+at a time; each drains its in-flight requests for up to
+``GRACEFUL_SHUTDOWN_SECONDS`` while the others keep serving. ``SIGTERM``
+drains all of them and exits. With two or more workers,
+``WORKER_MAX_REQUESTS`` recycles a worker after that many requests.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+import uvicorn
+
+from .settings import settings
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def _cgroup_quota(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """CPUs allowed by the container's CFS quota, if one is set."""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>".
+        quota, period = (root / "cpu.max").read_text().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int((root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((root / "cpu" / "cpu.cfs_period_us").read_text())
+        return quota / period if quota > 0 and period > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus(root: Path = CGROUP_ROOT) -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not on Linux
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_quota(root)
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, cpus)
+
+
+def worker_count(requested: Optional[int] = None) -> int:
+    workers = settings.web_concurrency if requested is None else requested
+    return max(1, workers or available_cpus())
+
+
+def multi_worker_problem(workers: int) -> Optional[str]:
+    """Why ``workers`` processes cannot serve with the current settings, if they cannot."""
+    if workers > 1 and settings.rate_limit_enabled and settings.rate_limit_backend == "memory":
+        return (
+            f"{workers} workers would each allow the full rate with RATE_LIMIT_BACKEND=memory; "
+            "set RATE_LIMIT_BACKEND=dynamodb or run one worker"
+        )
+    return None
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, help="worker processes (default WEB_CONCURRENCY; 0 is one per CPU)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8080")))
+    args = parser.parse_args(argv)
+
+    # Workers are spawned fresh and read their settings from the environment.
+    os.environ.setdefault("AUTH_CACHE_PATH", os.path.join(tempfile.gettempdir(), "dodeck-auth-cache.sqlite3"))
+    workers = worker_count(args.workers)
+    problem = multi_worker_problem(workers)
+    if problem:
+        parser.error(problem)
+    uvicorn.run(
+        "src.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        timeout_graceful_shutdown=settings.graceful_shutdown_seconds,
+        # A lone worker has no supervisor to replace it, so it is never recycled.
+        limit_max_requests=(settings.worker_max_requests or None) if workers > 1 else None,
+        log_level=settings.log_level.lower(),
+        proxy_headers=True,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
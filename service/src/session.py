@@ -0,0 +1,152 @@
+"""Read-your-writes session tokens and per-view read consistency.
+
+A response to a request that wrote something carries ``X-Session-Token``:
+the decks it changed (and whether the caller's deck list changed), each with
+the time of the write, merged into the token the request came with. A client
+that sends the token back gets strongly consistent reads of those decks for
+``READ_YOUR_WRITES_SECONDS`` after each write, and eventually consistent (half
+price) reads of everything else. Reads served from a global secondary index,
+which cannot be read consistently, are rebuilt from a consistent read of the
+written deck's own partitions and merged with the index results for the rest.
+
+``READ_CONSISTENCY`` overrides this per view (``decks``, ``deck``, ``dos``,
+``my_dos``, ``due``, ``search``): ``session`` (the default) as above,
+``strong`` as if every deck had just been written, and ``eventual`` ignoring
+the token.
+
+The token only names decks and times, and only makes reads of decks the
+caller can already read more consistent, so it is not signed; one that does
+not parse is ignored.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Set
+
+from .settings import settings
+from .viewcache import deck_scope
+
+SESSION_HEADER = "X-Session-Token"
+# Writes remembered per token; the oldest are dropped first.
+MAX_TOKEN_ENTRIES = 32
+# Write times further ahead than this are someone else's clock (or a forged token).
+CLOCK_SKEW_SECONDS = 60
+
+_LISTS = "lists"
+
+
+class Session:
+    """Writes the incoming token reports, and writes made by this request."""
+
+    def __init__(self, seen: Optional[Dict[str, float]] = None):
+        self.seen = seen or {}
+        self.written: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def note(self, key: str) -> None:
+        with self._lock:
+            self.written[key] = time.time()
+
+    def recent(self, key: str) -> bool:
+        # Sub-requests of one batch see each other's writes too.
+        written = self.written.get(key) or self.seen.get(key)
+        now = time.time()
+        return written is not None and now - settings.read_your_writes_seconds < written <= now + CLOCK_SKEW_SECONDS
+
+    def token(self) -> Optional[str]:
+        with self._lock:
+            if not self.written:
+                return None
+            merged = {key: at for key, at in self.seen.items() if self.recent(key)}
+            merged.update(self.written)
+        keep = sorted(merged.items(), key=lambda pair: pair[1], reverse=True)[:MAX_TOKEN_ENTRIES]
+        payload = {"w": {key: int(at * 1000) for key, at in keep}}
+        return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+_session: ContextVar[Optional[Session]] = ContextVar("dodeck_session", default=None)
+
+
+def parse_token(token: Optional[str]) -> Dict[str, float]:
+    if not token or len(token) > 4096:
+        return {}
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        written = payload["w"]
+        return {str(key): int(at) / 1000 for key, at in list(written.items())[:MAX_TOKEN_ENTRIES]}
+    except (binascii.Error, ValueError, TypeError, KeyError, AttributeError):
+        return {}
+
+
+def note_writes(scopes: Iterable[str]) -> None:
+    """Record view-cache scopes the current request changed (see ``viewcache``)."""
+    session = _session.get()
+    if session is None or settings.read_your_writes_seconds <= 0:
+        return
+    for scope in scopes:
+        # Any user or email scope means someone's deck list changed, and the caller's may have.
+        session.note(scope if scope.startswith(deck_scope("")) else _LISTS)
+
+
+def _mode(view: str) -> str:
+    return settings.read_consistency.get(view, "session")
+
+
+def consistent_lists(view: str) -> bool:
+    """Whether ``view``, which spans all the caller's decks, should read consistently.
+
+    Deck lists, due dates and search results all change with a write to any
+    deck, so any recent write in the session counts.
+    """
+    mode = _mode(view)
+    if mode != "session":
+        return mode == "strong"
+    session = _session.get()
+    return session is not None and any(session.recent(key) for key in [*session.seen, *session.written])
+
+
+def consistent_decks(view: str, deck_ids: Iterable[str]) -> Set[str]:
+    """The decks ``view`` should read consistently: all of them, none, or those the session wrote."""
+    mode = _mode(view)
+    if mode != "session":
+        return set(deck_ids) if mode == "strong" else set()
+    session = _session.get()
+    if session is None:
+        return set()
+    return {deck_id for deck_id in deck_ids if session.recent(deck_scope(deck_id))}
+
+
+def consistent_deck(view: str, deck_id: str) -> bool:
+    return bool(consistent_decks(view, [deck_id]))
+
+
+class SessionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        incoming = next((value for name, value in scope["headers"] if name == SESSION_HEADER.lower().encode()), b"")
+        session = Session(parse_token(incoming.decode("latin-1")))
+        token = _session.set(session)
+
+        async def send_with_token(message):
+            if message["type"] == "http.response.start":
+                issued = session.token()
+                if issued is not None:
+                    headers = [*message.get("headers", []), (SESSION_HEADER.lower().encode(), issued.encode())]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_token)
+        finally:
+            _session.reset(token)
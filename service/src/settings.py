@@ -1,6 +1,7 @@
 import os
+import tempfile
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from dotenv import load_dotenv
 
@@ -14,12 +15,35 @@ def _bool(value: str | None, default: bool = False) -> bool:
     return value.lower() in {"1", "true", "yes", "on"}
 
 
+def _int(value: str | None, default: int) -> int:
+    if value is None or not value.strip():
+        return default
+    return int(value)
+
+
+def _float(value: str | None, default: float) -> float:
+    if value is None or not value.strip():
+        return default
+    return float(value)
+
+
 def _split_csv(value: str | None) -> List[str]:
     if not value:
         return []
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+def _consistency_modes(value: str | None) -> Dict[str, str]:
+    """``view=mode`` pairs, e.g. ``decks=strong,search=eventual``."""
+    modes = {}
+    for pair in _split_csv(value):
+        view, _, mode = pair.partition("=")
+        if mode.strip() not in {"eventual", "session", "strong"}:
+            raise ValueError(f"READ_CONSISTENCY: {pair!r} is not view=eventual|session|strong")
+        modes[view.strip()] = mode.strip()
+    return modes
+
+
 @dataclass(slots=True)
 class Settings:
     auth0_issuer: str = os.getenv("AUTH0_ISSUER", "").rstrip("/")
@@ -34,6 +58,77 @@ class Settings:
     log_level: str = os.getenv("LOG_LEVEL", "info")
     aws_region: str = os.getenv("AWS_REGION", "us-west-2")
     dynamodb_endpoint_url: Optional[str] = os.getenv("DYNAMODB_ENDPOINT_URL")
+    storage_backend: str = os.getenv("STORAGE_BACKEND", "dynamodb")
+    item_encoding: str = os.getenv("ITEM_ENCODING", "verbose")
+
+    collaborator_preview_limit: int = field(default_factory=lambda: _int(os.getenv("COLLABORATOR_PREVIEW_LIMIT"), 25))
+    collaborator_batch_max: int = field(default_factory=lambda: _int(os.getenv("COLLABORATOR_BATCH_MAX"), 100))
+    collaborator_batch_concurrency: int = field(default_factory=lambda: _int(os.getenv("COLLABORATOR_BATCH_CONCURRENCY"), 8))
+    batch_max_requests: int = field(default_factory=lambda: _int(os.getenv("BATCH_MAX_REQUESTS"), 20))
+    batch_concurrency: int = field(default_factory=lambda: _int(os.getenv("BATCH_CONCURRENCY"), 4))
+    batch_write_concurrency: int = field(default_factory=lambda: _int(os.getenv("BATCH_WRITE_CONCURRENCY"), 4))
+    batch_write_max_attempts: int = field(default_factory=lambda: _int(os.getenv("BATCH_WRITE_MAX_ATTEMPTS"), 8))
+    cross_deck_concurrency: int = field(default_factory=lambda: _int(os.getenv("CROSS_DECK_CONCURRENCY"), 8))
+    due_max_range_days: int = field(default_factory=lambda: _int(os.getenv("DUE_MAX_RANGE_DAYS"), 31))
+    search_max_postings: int = field(default_factory=lambda: _int(os.getenv("SEARCH_MAX_POSTINGS"), 500))
+    view_cache_ttl_seconds: float = field(default_factory=lambda: _float(os.getenv("VIEW_CACHE_TTL_SECONDS"), 5.0))
+    view_cache_max_entries: int = field(default_factory=lambda: _int(os.getenv("VIEW_CACHE_MAX_ENTRIES"), 1024))
+    export_page_size: int = field(default_factory=lambda: _int(os.getenv("EXPORT_PAGE_SIZE"), 200))
+    archive_completed_after_days: int = field(default_factory=lambda: _int(os.getenv("ARCHIVE_COMPLETED_AFTER_DAYS"), 30))
+    position_rebalance_length: int = field(default_factory=lambda: _int(os.getenv("POSITION_REBALANCE_LENGTH"), 24))
+    import_max_line_bytes: int = field(default_factory=lambda: _int(os.getenv("IMPORT_MAX_LINE_BYTES"), 16384))
+    # Opt-in: PATCHes to the same do within this window are merged into one write (0 disables).
+    update_coalesce_window_ms: int = field(default_factory=lambda: _int(os.getenv("UPDATE_COALESCE_WINDOW_MS"), 0))
+    shard_layout_cache_seconds: float = field(default_factory=lambda: _float(os.getenv("SHARD_LAYOUT_CACHE_SECONDS"), 10.0))
+    clone_inline_max_dos: int = field(default_factory=lambda: _int(os.getenv("CLONE_INLINE_MAX_DOS"), 200))
+    clone_job_concurrency: int = field(default_factory=lambda: _int(os.getenv("CLONE_JOB_CONCURRENCY"), 2))
+    # Reads carrying a session token see that session's writes for this long (0 issues no tokens).
+    read_your_writes_seconds: float = field(default_factory=lambda: _float(os.getenv("READ_YOUR_WRITES_SECONDS"), 5.0))
+    read_consistency: Dict[str, str] = field(default_factory=lambda: _consistency_modes(os.getenv("READ_CONSISTENCY")))
+
+    rate_limit_enabled: bool = field(default_factory=lambda: _bool(os.getenv("RATE_LIMIT_ENABLED"), True))
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    rate_limit_per_second: float = field(default_factory=lambda: _float(os.getenv("RATE_LIMIT_PER_SECOND"), 10.0))
+    rate_limit_burst: int = field(default_factory=lambda: _int(os.getenv("RATE_LIMIT_BURST"), 50))
+    shed_inflight_soft_limit: int = field(default_factory=lambda: _int(os.getenv("SHED_INFLIGHT_SOFT_LIMIT"), 64))
+    shed_inflight_hard_limit: int = field(default_factory=lambda: _int(os.getenv("SHED_INFLIGHT_HARD_LIMIT"), 128))
+    shed_throttle_ratio: float = field(default_factory=lambda: _float(os.getenv("SHED_THROTTLE_RATIO"), 0.2))
+    shed_min_attempts: int = field(default_factory=lambda: _int(os.getenv("SHED_MIN_ATTEMPTS"), 20))
+    shed_window_seconds: int = field(default_factory=lambda: _int(os.getenv("SHED_WINDOW_SECONDS"), 10))
+    shed_retry_after_seconds: int = field(default_factory=lambda: _int(os.getenv("SHED_RETRY_AFTER_SECONDS"), 2))
+    metrics_token: Optional[str] = os.getenv("METRICS_TOKEN")
+
+    access_log_enabled: bool = field(default_factory=lambda: _bool(os.getenv("ACCESS_LOG_ENABLED"), True))
+    slow_call_threshold_ms: float = field(default_factory=lambda: _float(os.getenv("SLOW_CALL_THRESHOLD_MS"), 200.0))
+    profiling_enabled: bool = field(default_factory=lambda: _bool(os.getenv("PROFILING_ENABLED"), False))
+    profiling_token: Optional[str] = os.getenv("PROFILING_TOKEN")
+    profiling_sample_rate: float = field(default_factory=lambda: _float(os.getenv("PROFILING_SAMPLE_RATE"), 0.0))
+    profiling_interval_seconds: float = field(default_factory=lambda: _float(os.getenv("PROFILING_INTERVAL_SECONDS"), 0.005))
+    profiling_dir: str = os.getenv("PROFILING_DIR", os.path.join(tempfile.gettempdir(), "dodeck-profiles"))
+    profiling_max_files: int = field(default_factory=lambda: _int(os.getenv("PROFILING_MAX_FILES"), 20))
+
+    request_deadline_seconds: float = field(default_factory=lambda: _float(os.getenv("REQUEST_DEADLINE_SECONDS"), 5.0))
+    ddb_retry_mode: str = os.getenv("DDB_RETRY_MODE", "adaptive")
+    ddb_max_attempts: int = field(default_factory=lambda: _int(os.getenv("DDB_MAX_ATTEMPTS"), 3))
+    ddb_connect_timeout_seconds: float = field(default_factory=lambda: _float(os.getenv("DDB_CONNECT_TIMEOUT_SECONDS"), 1.0))
+    ddb_read_timeout_seconds: float = field(default_factory=lambda: _float(os.getenv("DDB_READ_TIMEOUT_SECONDS"), 2.0))
+    ddb_min_call_budget_seconds: float = field(default_factory=lambda: _float(os.getenv("DDB_MIN_CALL_BUDGET_SECONDS"), 0.05))
+    ddb_breaker_enabled: bool = field(default_factory=lambda: _bool(os.getenv("DDB_BREAKER_ENABLED"), True))
+    ddb_breaker_failure_ratio: float = field(default_factory=lambda: _float(os.getenv("DDB_BREAKER_FAILURE_RATIO"), 0.5))
+    ddb_breaker_min_calls: int = field(default_factory=lambda: _int(os.getenv("DDB_BREAKER_MIN_CALLS"), 20))
+    ddb_breaker_window_seconds: int = field(default_factory=lambda: _int(os.getenv("DDB_BREAKER_WINDOW_SECONDS"), 10))
+    ddb_breaker_open_seconds: float = field(default_factory=lambda: _float(os.getenv("DDB_BREAKER_OPEN_SECONDS"), 5.0))
+    # Sync handlers run on AnyIO's worker threads; each needs a pooled DynamoDB connection.
+    worker_threads: int = field(default_factory=lambda: _int(os.getenv("WORKER_THREADS"), 40))
+    # 0 sizes the pool to ``worker_threads``.
+    ddb_max_pool_connections: int = field(default_factory=lambda: _int(os.getenv("DDB_MAX_POOL_CONNECTIONS"), 0))
+
+    # Production entrypoint (``python -m src.serve``); 0 workers means one per available CPU.
+    web_concurrency: int = field(default_factory=lambda: _int(os.getenv("WEB_CONCURRENCY"), 0))
+    graceful_shutdown_seconds: int = field(default_factory=lambda: _int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS"), 20))
+    worker_max_requests: int = field(default_factory=lambda: _int(os.getenv("WORKER_MAX_REQUESTS"), 0))
+    auth_cache_path: Optional[str] = os.getenv("AUTH_CACHE_PATH") or None
+    token_cache_ttl_seconds: float = field(default_factory=lambda: _float(os.getenv("TOKEN_CACHE_TTL_SECONDS"), 300.0))
 
     environment: str = os.getenv("ENVIRONMENT", "local")
     service_name: str = os.getenv("SERVICE_NAME", "dodeck-service")
@@ -0,0 +1,68 @@
+"""Storage backend selection.
+
+``STORAGE_BACKEND=dynamodb`` (the default) talks to DynamoDB through boto3;
+``STORAGE_BACKEND=memory`` uses the in-process engine in ``memorydb`` so tests
+and load tests can run without DynamoDB Local. Both hand out an object with
+the boto3 ``Table`` interface the repository is written against.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from .settings import settings
+
+BACKENDS = {"dynamodb", "memory"}
+
+
+def table_definition(table_name: str) -> Dict[str, Any]:
+    """``create_table`` arguments for the single DoDeck table."""
+    return {
+        "TableName": table_name,
+        "KeySchema": [
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        "AttributeDefinitions": [
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+            {"AttributeName": "GSI1PK", "AttributeType": "S"},
+            {"AttributeName": "GSI1SK", "AttributeType": "S"},
+            {"AttributeName": "GSI2PK", "AttributeType": "S"},
+            {"AttributeName": "GSI2SK", "AttributeType": "S"},
+        ],
+        "GlobalSecondaryIndexes": [
+            {
+                # Dos in user order: GSI1PK = DECK#{id}, GSI1SK = POS#{position}#{doId}.
+                "IndexName": "GSI1",
+                "KeySchema": [
+                    {"AttributeName": "GSI1PK", "KeyType": "HASH"},
+                    {"AttributeName": "GSI1SK", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                # Sparse: active dos only. GSI2PK = DECK#{id}#OPEN|DONE, GSI2SK = {createdAt}#{doId}.
+                "IndexName": "GSI2",
+                "KeySchema": [
+                    {"AttributeName": "GSI2PK", "KeyType": "HASH"},
+                    {"AttributeName": "GSI2SK", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+        "BillingMode": "PAY_PER_REQUEST",
+    }
+
+
+def get_table():
+    backend = settings.storage_backend
+    if backend == "memory":
+        from . import memorydb
+
+        return memorydb.get_table()
+    if backend == "dynamodb":
+        from . import dynamodb
+
+        return dynamodb.get_table()
+    raise ValueError(f"Unknown STORAGE_BACKEND {backend!r}; expected one of {sorted(BACKENDS)}")
@@ -0,0 +1,58 @@
+"""Worker thread limiter sized by ``WORKER_THREADS``, with queue-wait metrics.
+
+Sync endpoints and dependencies run on AnyIO's worker threads, capped by the
+event loop's default ``CapacityLimiter`` (40 unless resized). The lifespan
+sizes it once with ``configure_thread_limiter``. Sync endpoints of the API
+routers are run through ``run_in_worker_thread`` (see ``ProfiledRoute``),
+which records how long each waited for a thread; sync dependencies such as
+authentication share the limiter but are not timed.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+import anyio.to_thread
+
+from .metrics import registry
+from .settings import settings
+
+THREAD_WAIT = registry.histogram(
+    "dodeck_threadpool_wait_seconds",
+    "Time a sync endpoint waited for a worker thread.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+THREADS = registry.gauge("dodeck_threadpool_threads", "Worker threads available to sync handlers.")
+BUSY = registry.gauge("dodeck_threadpool_busy_threads", "Worker threads currently running a sync endpoint.")
+WAITING = registry.gauge("dodeck_threadpool_waiting", "Sync endpoint calls queued for a worker thread.")
+
+
+def configure_thread_limiter() -> None:
+    """Size the running event loop's default thread limiter."""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.worker_threads
+    THREADS.set(settings.worker_threads)
+
+
+async def run_in_worker_thread(call: Callable[..., Any], **kwargs: Any) -> Any:
+    """Run ``call`` on a worker thread of the default limiter, timing its wait for one."""
+    queued = time.perf_counter()
+    started = False
+
+    def run() -> Any:
+        nonlocal started
+        started = True
+        WAITING.dec()
+        THREAD_WAIT.observe(time.perf_counter() - queued)
+        BUSY.inc()
+        try:
+            return call(**kwargs)
+        finally:
+            BUSY.dec()
+
+    WAITING.inc()
+    try:
+        return await anyio.to_thread.run_sync(run)
+    finally:
+        if not started:  # cancelled while still queued
+            WAITING.dec()
@@ -0,0 +1 @@
+"""Operator command-line tools for the DoDeck table."""
@@ -0,0 +1,54 @@
+"""Archive completed dos older than ``ARCHIVE_COMPLETED_AFTER_DAYS``.
+
+Usage: ``python -m src.tools.archive_dos [--dry-run]``
+
+Listing a deck archives its stale completed dos after the response, so this
+sweep only has to catch decks nobody has opened; run it daily.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from boto3.dynamodb.conditions import Attr
+
+from ..codec import decode_all
+from ..repository import archive_cutoff, archive_do, is_archivable
+from ..storage import get_table
+
+
+def _completed_dos(table):
+    # Compact dos store ``completed`` as ``c``.
+    completed = Attr("completed").eq(True) | Attr("c").eq(True)
+    kwargs = {"FilterExpression": Attr("SK").begins_with("DO#") & completed}
+    while True:
+        response = table.scan(**kwargs)
+        yield from decode_all(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="only count dos that would be archived")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    cutoff = archive_cutoff()
+    if cutoff is None:
+        logging.info("archiving disabled (ARCHIVE_COMPLETED_AFTER_DAYS <= 0)")
+        return 0
+    archived = 0
+    for item in _completed_dos(get_table()):
+        if not is_archivable(item, cutoff):
+            continue
+        if args.dry_run or archive_do(item):
+            archived += 1
+    logging.info("%s %d dos", "found" if args.dry_run else "archived", archived)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+"""Compare item sizes and capacity units of the verbose and compact encodings.
+
+Usage: ``python -m src.tools.encoding_benchmark [--users N] [--seed S] ...``
+
+Generates the same synthetic dataset as ``seed_dataset`` (and takes the same
+shape options) without writing it, then sizes every item in both formats by
+DynamoDB's rules: attribute names count as much as values, a write costs one
+unit per started KB of the item plus one per index it lands in (index items
+carry 100 bytes of overhead), and a query costs one unit per started 4 KB of
+everything it returns (strongly consistent; eventually consistent is half).
+Reads are the per-deck do listing on ``GSI1``, the per-user access row query
+and the per-word posting query. Items under 1 KB save storage and read units
+but no write units.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import random
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from ..codec import encode
+from ..memorydb import item_size
+from . import seed_dataset
+
+INDEXES = (("GSI1PK", "GSI1SK"), ("GSI2PK", "GSI2SK"))
+INDEX_OVERHEAD = 100
+
+
+def _write_units(item: Dict[str, Any], size: int) -> int:
+    units = math.ceil(size / 1024)
+    for pk, _ in INDEXES:
+        if pk in item:
+            units += math.ceil((size + INDEX_OVERHEAD) / 1024)
+    return units
+
+
+def _read_units(partitions: Dict[str, int]) -> int:
+    return sum(math.ceil(total / 4096) for total in partitions.values())
+
+
+def measure(items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Bytes, write units and query read units of ``items`` per format."""
+    report: Dict[str, Dict[str, Any]] = {}
+    for name, compact in (("verbose", False), ("compact", True)):
+        bytes_by_kind: Dict[str, int] = defaultdict(int)
+        wcu = 0
+        queries: Dict[str, Dict[str, int]] = {"dos": defaultdict(int), "access": defaultdict(int), "postings": defaultdict(int)}
+        for item in items:
+            stored = encode(item, compact=compact)
+            size = item_size(stored)
+            bytes_by_kind[seed_dataset.item_kind(item)] += size
+            wcu += _write_units(stored, size)
+            if item["SK"].startswith("DO#"):
+                queries["dos"][item["GSI1PK"]] += size + INDEX_OVERHEAD
+            elif item["PK"].startswith("ACCESS#"):
+                queries["access"][item["PK"]] += size
+            elif item["PK"].startswith("TOK#"):
+                queries["postings"][item["PK"]] += size
+        report[name] = {
+            "bytes": dict(bytes_by_kind),
+            "wcu": wcu,
+            "rcu": {query: _read_units(partitions) for query, partitions in queries.items()},
+        }
+    return report
+
+
+def _change(before: float, after: float) -> str:
+    return f"{(after - before) / before:+.0%}" if before else "n/a"
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = seed_dataset.build_parser()
+    parser.description = __doc__.splitlines()[0]
+    parser.set_defaults(users=200)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    items = list(seed_dataset.generate(args, random.Random(args.seed)))
+    counts: Dict[str, int] = defaultdict(int)
+    for item in items:
+        counts[seed_dataset.item_kind(item)] += 1
+    report = measure(items)
+    verbose, compact = report["verbose"], report["compact"]
+
+    logging.info("%d items", len(items))
+    for kind in sorted(counts):
+        before, after = verbose["bytes"][kind] / counts[kind], compact["bytes"][kind] / counts[kind]
+        logging.info("%-7s %7d items  %6.0f -> %6.0f bytes/item (%s)", kind, counts[kind], before, after, _change(before, after))
+    before, after = sum(verbose["bytes"].values()), sum(compact["bytes"].values())
+    logging.info("stored bytes %d -> %d (%s)", before, after, _change(before, after))
+    logging.info("write units %d -> %d (%s)", verbose["wcu"], compact["wcu"], _change(verbose["wcu"], compact["wcu"]))
+    for query in verbose["rcu"]:
+        before, after = verbose["rcu"][query], compact["rcu"][query]
+        logging.info("read units, every %s query once: %d -> %d (%s)", query, before, after, _change(before, after))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
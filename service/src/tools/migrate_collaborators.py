@@ -0,0 +1,49 @@
+"""Move legacy ``collaborators`` maps out of deck items.
+
+Usage: ``python -m src.tools.migrate_collaborators [--dry-run]``
+
+The service reads both layouts and migrates decks lazily when they are
+touched, so this tool only has to sweep the decks nobody has opened yet.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from boto3.dynamodb.conditions import Attr
+
+from ..storage import get_table
+from ..repository import migrate_collaborators
+
+
+def _legacy_decks(table):
+    kwargs = {"FilterExpression": Attr("SK").eq("DECK") & Attr("collaborators").exists()}
+    while True:
+        response = table.scan(**kwargs)
+        yield from response.get("Items", [])
+        if "LastEvaluatedKey" not in response:
+            return
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="only report decks that still need migrating")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    migrated = 0
+    for deck in _legacy_decks(get_table()):
+        if args.dry_run:
+            logging.info("pending %s (%d collaborators)", deck["deckId"], len(deck["collaborators"]))
+        else:
+            migrate_collaborators(deck)
+            logging.info("migrated %s", deck["deckId"])
+        migrated += 1
+    logging.info("%s %d decks", "found" if args.dry_run else "migrated", migrated)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,51 @@
+"""Rewrite do positions that have grown long, and backfill missing index keys.
+
+Usage: ``python -m src.tools.rebalance_positions [--deck DECK_ID ...] [--dry-run]``
+
+Moves only rewrite the moved do, so repeatedly dropping items into the same
+gap makes its keys longer. Decks whose longest position exceeds
+``POSITION_REBALANCE_LENGTH`` (or that still have dos from before the
+position and status indexes existed) get short, evenly spread keys in their
+current display order.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from ..repository import display_order, get_deck_with_dos, iter_deck_ids, rebalance_positions
+from ..settings import settings
+
+
+def needs_rebalance(dos) -> bool:
+    return any(
+        not item.get("position") or not item.get("GSI2PK") or len(item["position"]) > settings.position_rebalance_length
+        for item in dos
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deck", action="append", dest="decks", help="only check this deck (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="only report decks that need rebalancing")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    rebalanced = 0
+    for deck_id in args.decks or iter_deck_ids():
+        deck, dos = get_deck_with_dos(deck_id)
+        if not deck or not needs_rebalance(dos):
+            continue
+        if args.dry_run:
+            logging.info("pending %s (%d dos)", deck_id, len(dos))
+        else:
+            rewritten = rebalance_positions(deck_id, sorted(dos, key=display_order))
+            logging.info("rebalanced %s (%d of %d dos rewritten)", deck_id, rewritten, len(dos))
+        rebalanced += 1
+    logging.info("%s %d decks", "found" if args.dry_run else "rebalanced", rebalanced)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
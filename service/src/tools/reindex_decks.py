@@ -0,0 +1,36 @@
+"""Rebuild the due-date and search entries of every deck.
+
+Usage: ``python -m src.tools.reindex_decks [--deck DECK_ID ...]``
+
+Write paths keep ``DUE#`` and ``TOK#`` entries current; run this once after
+deploying search so decks and dos written before it become searchable.
+Entries are rewritten in place, so it is safe to run while serving traffic.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from ..repository import get_deck, iter_deck_ids, reindex_deck
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deck", action="append", dest="decks", help="only reindex this deck (repeatable)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    decks = entries = 0
+    for deck_id in args.decks or iter_deck_ids():
+        deck = get_deck(deck_id)
+        if not deck:
+            continue
+        entries += reindex_deck(deck)
+        decks += 1
+    logging.info("reindexed %d decks (%d entries)", decks, entries)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
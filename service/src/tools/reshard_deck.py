@@ -0,0 +1,42 @@
+"""Move a deck's dos between the single-partition and sharded layouts.
+
+Usage: ``python -m src.tools.reshard_deck --deck DECK_ID --shards N [--settle-seconds S]``
+
+A deck whose dos take more writes than one partition sustains can spread
+them over ``N`` partitions (``DECK#<deckId>#0`` .. ``#N-1``); ``--shards 1``
+moves them back onto the deck's own partition. The deck stays readable and
+writable throughout. A run that was interrupted is finished by running the
+same command again.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from ..repository import RepositoryError, reshard_deck
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deck", required=True, help="deck to move")
+    parser.add_argument("--shards", type=int, required=True, help="partitions to spread its dos over (1 to unshard)")
+    parser.add_argument(
+        "--settle-seconds",
+        type=float,
+        help="wait between switching layouts and moving dos (default SHARD_LAYOUT_CACHE_SECONDS + 1)",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        moved = reshard_deck(args.deck, args.shards, args.settle_seconds)
+    except (RepositoryError, ValueError) as exc:
+        logging.error("%s", exc)
+        return 1
+    logging.info("moved %d dos of %s to %d shard(s)", moved, args.deck, args.shards)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
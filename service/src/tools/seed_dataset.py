@@ -0,0 +1,154 @@
+"""Generate a synthetic dataset and bulk load it for benchmarks.
+
+Usage: ``python -m src.tools.seed_dataset [--users N] [--seed S] ...``
+
+Writes deck items, dos, owner and collaborator access rows, collaborator
+items and the derived ``DUE#``/``TOK#`` entries with the repository's
+``new_deck_items`` and ``new_do_items``, in the configured ``ITEM_ENCODING``,
+through parallel ``BatchWriteItem``. Deck sizes follow a lognormal long tail,
+and a fraction of users are heavy sharers who share every deck with many
+others. Users are ``auth0|seed-{n}`` with email ``seed-{n}@example.com``.
+Point ``DYNAMODB_ENDPOINT_URL`` at dynamodb-local; never run it against a
+production table.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List
+from uuid import UUID
+
+from ..codec import encode
+from ..repository import batch_write_items, new_deck_items, new_do_items
+
+WORDS = (
+    "milk eggs bread plan call email review draft ship fix book pay clean read write garden "
+    "train run cook visit order renew file check update water pack move sort"
+).split()
+
+
+def _sub(user: int) -> str:
+    return f"auth0|seed-{user}"
+
+
+def _email(user: int) -> str:
+    return f"seed-{user}@example.com"
+
+
+def _long_tail(rng: random.Random, median: float, sigma: float, low: int, high: int) -> int:
+    return max(low, min(high, int(round(rng.lognormvariate(math.log(max(median, 1)), sigma)))))
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def item_kind(item: Dict[str, Any]) -> str:
+    key = item["PK"] if item["PK"].startswith(("ACCESS#", "DUE#", "TOK#")) else item["SK"]
+    return key.split("#", 1)[0]
+
+
+def generate(args: argparse.Namespace, rng: random.Random) -> Iterator[Dict[str, Any]]:
+    """Every item of the dataset, one deck at a time."""
+    now = datetime.now(timezone.utc)
+    heavy = set(rng.sample(range(args.users), k=int(args.users * args.heavy_sharers)))
+    for user in range(args.users):
+        for _ in range(_long_tail(rng, args.decks_median, args.decks_sigma, 1, args.decks_max)):
+            if user in heavy:
+                shares = args.heavy_share_size
+            elif rng.random() < args.share_rate:
+                shares = rng.randint(1, 3)
+            else:
+                shares = 0
+            # Sample from everyone else without building the list: skip over the owner.
+            picks = rng.sample(range(args.users - 1), k=min(shares, args.users - 1))
+            collaborators = [_email(other + (other >= user)) for other in picks]
+
+            created = now - timedelta(days=rng.uniform(0, args.days))
+            deck_id = str(UUID(int=rng.getrandbits(128), version=4))
+            deck_items = new_deck_items(
+                deck_id, _sub(user), _text(rng, 2).title(), created.isoformat(), collaborators, index=args.index
+            )
+            deck = deck_items[0]
+            yield from deck_items
+
+            for _ in range(_long_tail(rng, args.dos_median, args.dos_sigma, 0, args.dos_max)):
+                done = rng.random() < args.completed_rate
+                due = (now + timedelta(days=rng.uniform(-3, 30))).isoformat(timespec="seconds") if rng.random() < args.due_rate else None
+                yield from new_do_items(
+                    deck,
+                    collaborators,
+                    _text(rng, rng.randint(1, 6)),
+                    completed=done,
+                    created_at=(created + (now - created) * rng.random()).isoformat(),
+                    due_at=due,
+                    index=args.index,
+                )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1, help="random seed; the same seed gives the same shape")
+    parser.add_argument("--decks-median", type=float, default=3)
+    parser.add_argument("--decks-sigma", type=float, default=0.8)
+    parser.add_argument("--decks-max", type=int, default=200)
+    parser.add_argument("--dos-median", type=float, default=12, help="median dos per deck (lognormal long tail)")
+    parser.add_argument("--dos-sigma", type=float, default=1.2)
+    parser.add_argument("--dos-max", type=int, default=5000)
+    parser.add_argument("--share-rate", type=float, default=0.2, help="chance a deck is shared with 1-3 users")
+    parser.add_argument("--heavy-sharers", type=float, default=0.02, help="fraction of users who share every deck")
+    parser.add_argument("--heavy-share-size", type=int, default=50)
+    parser.add_argument("--completed-rate", type=float, default=0.3)
+    parser.add_argument("--due-rate", type=float, default=0.1)
+    parser.add_argument("--days", type=float, default=365, help="spread of creation times into the past")
+    parser.add_argument("--no-index", dest="index", action="store_false", help="skip DUE#/TOK# entries")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel BatchWriteItem calls (the client pools 10 connections)")
+    parser.add_argument("--flush", type=int, default=20000, help="items buffered per parallel write")
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    rng = random.Random(args.seed)
+    counts: Dict[str, int] = {}
+    written = 0
+    buffer: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+
+    def flush() -> None:
+        nonlocal written
+        written += batch_write_items(buffer, concurrency=args.concurrency)
+        buffer.clear()
+        elapsed = time.perf_counter() - started
+        logging.info("wrote %d items in %.1fs (%.0f items/s)", written, elapsed, written / max(elapsed, 1e-9))
+
+    for item in generate(args, rng):
+        kind = item_kind(item)
+        counts[kind] = counts.get(kind, 0) + 1
+        buffer.append(encode(item))
+        if len(buffer) >= args.flush:
+            flush()
+    if buffer:
+        flush()
+
+    elapsed = time.perf_counter() - started
+    logging.info(
+        "loaded %d items in %.2fs: %.0f items/s (%s)",
+        written,
+        elapsed,
+        written / max(elapsed, 1e-9),
+        ", ".join(f"{kind}={count}" for kind, count in sorted(counts.items())),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
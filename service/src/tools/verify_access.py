@@ -0,0 +1,271 @@
+"""Verify access rows against deck items and repair drift.
+
+Usage: ``python -m src.tools.verify_access [--repair] [--segments N] [--checkpoint PATH] ...``
+
+Access rows follow decks only through the sharing and rename transactions; a
+rename that fails between its 25-item chunks leaves rows under the old name.
+A parallel segmented scan of deck items checks each deck's owner and
+collaborator rows and ``collaboratorCount``, then a scan of access rows finds
+ones whose deck is gone, renamed or no longer shared. ``--repair`` rewrites or
+deletes them after re-reading the deck strongly; ``--max-scan-rate`` and
+``--max-write-rate`` cap throughput, and ``--checkpoint`` saves each segment's
+position after every page so a rerun with the same file resumes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Attr
+
+from ..codec import decode_all, encode
+from ..repository import (
+    batch_load_decks,
+    collaborator_emails,
+    expected_access_rows,
+    get_deck,
+    is_collaborator,
+)
+from ..storage import get_table
+
+ROW_FIELDS = ("deckId", "name", "nameLower", "ownerSub", "access")
+
+PASSES = (
+    ("decks", Attr("SK").eq("DECK")),
+    ("access", Attr("PK").begins_with("ACCESS#")),
+)
+
+
+class Throttle:
+    """Token bucket shared by every segment; a rate of 0 means unlimited."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._allowance = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(self.rate, self._allowance + (now - self._updated) * self.rate) - amount
+            self._updated = now
+            wait = -self._allowance / self.rate if self._allowance < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+class Checkpoint:
+    """Per-pass, per-segment scan positions and running totals, saved as JSON."""
+
+    def __init__(self, path: Optional[str], segments: int, repair: bool):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state: Dict[str, Any] = {"segments": segments, "repair": repair, "passes": {}, "stats": {}}
+        if path and os.path.exists(path):
+            with open(path) as handle:
+                state = json.load(handle)
+            if (state.get("segments"), state.get("repair")) != (segments, repair):
+                raise SystemExit(
+                    f"{path} was written with --segments {state.get('segments')}"
+                    f"{' --repair' if state.get('repair') else ''}; resume with the same options"
+                )
+            self.state = state
+
+    def position(self, name: str, segment: int) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.state["passes"].get(name, {}).get(str(segment), {}))
+
+    def save(self, name: str, segment: int, last_key: Optional[Dict[str, Any]], stats: Counter) -> None:
+        with self._lock:
+            self.state["passes"].setdefault(name, {})[str(segment)] = {"lastKey": last_key, "done": last_key is None}
+            self.state["stats"] = dict(stats)
+            if not self.path:
+                return
+            temp = f"{self.path}.tmp"
+            with open(temp, "w") as handle:
+                json.dump(self.state, handle)
+            os.replace(temp, self.path)
+
+
+def _fields(row: Optional[Dict[str, Any]]) -> Optional[Tuple[Any, ...]]:
+    return tuple(row.get(field) for field in ROW_FIELDS) if row else None
+
+
+class Verifier:
+    def __init__(self, table, *, repair: bool, writes: Throttle, stats: Counter):
+        self.table = table
+        self.repair = repair
+        self.writes = writes
+        self.stats = stats
+        self._lock = threading.Lock()
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[key] += amount
+
+    def _write(self, call: Callable[[], Any]) -> None:
+        self.writes.acquire()
+        call()
+        self._count("writes")
+
+    def _deck_drift(self, deck: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Access rows to (re)write, and the collaborator count to set if it is off."""
+        emails = collaborator_emails(deck)
+        expected = expected_access_rows(deck, emails)
+        keys = [{"PK": row["PK"], "SK": row["SK"]} for row in expected]
+        found: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        client = self.table.meta.client
+        for start in range(0, len(keys), 100):
+            request = {self.table.name: {"Keys": keys[start:start + 100], "ConsistentRead": True}}
+            while request:
+                response = client.batch_get_item(RequestItems=request)
+                for row in decode_all(response.get("Responses", {}).get(self.table.name, [])):
+                    found[(row["PK"], row["SK"])] = row
+                request = response.get("UnprocessedKeys") or {}
+        rows = [row for row in expected if _fields(found.get((row["PK"], row["SK"]))) != _fields(row)]
+        # Legacy decks still carry the map and no count; migrate-collaborators handles them.
+        count = None
+        if "collaboratorCount" in deck and not deck.get("collaborators") and int(deck["collaboratorCount"]) != len(emails):
+            count = len(emails)
+        return rows, count
+
+    def check_decks(self, decks: List[Dict[str, Any]]) -> None:
+        for deck in decks:
+            self._count("decks")
+            rows, count = self._deck_drift(deck)
+            if not rows and count is None:
+                continue
+            self._count("missing_rows", len(rows))
+            self._count("wrong_counts", int(count is not None))
+            logging.info("deck %s: %d access rows missing or stale, count %s", deck["deckId"], len(rows), count)
+            if not self.repair:
+                continue
+            # Re-check against a strong read so a share or rename in flight is not undone.
+            fresh = get_deck(deck["deckId"], consistent=True)
+            if fresh is None:
+                continue
+            rows, count = self._deck_drift(fresh)
+            for row in rows:
+                self._write(lambda row=row: self.table.put_item(Item=encode(row)))
+            if count is not None:
+                self._write(
+                    lambda: self.table.update_item(
+                        Key={"PK": fresh["PK"], "SK": fresh["SK"]},
+                        UpdateExpression="SET collaboratorCount = :count",
+                        ConditionExpression="attribute_exists(PK)",
+                        ExpressionAttributeValues={":count": count},
+                    )
+                )
+
+    def _stale(self, row: Dict[str, Any], deck: Optional[Dict[str, Any]]) -> Optional[str]:
+        if deck is None:
+            return "orphaned"
+        email = row["PK"][len("ACCESS#EMAIL#"):] if row["PK"].startswith("ACCESS#EMAIL#") else None
+        owner, *shared = expected_access_rows(deck, [email] if email else [])
+        if row["SK"] != owner["SK"]:
+            return "renamed"
+        if email is None:
+            return None if row["PK"] == owner["PK"] else "not_owner"
+        return None if row["PK"] == shared[0]["PK"] and is_collaborator(deck, email) else "not_shared"
+
+    def check_access_rows(self, rows: List[Dict[str, Any]]) -> None:
+        rows = decode_all(rows)
+        decks = batch_load_decks({row["deckId"] for row in rows if row.get("deckId")})
+        for row in rows:
+            self._count("access_rows")
+            reason = self._stale(row, decks.get(row.get("deckId", "")))
+            if reason is None:
+                continue
+            self._count(f"stale_{reason}")
+            logging.info("access row %s %s: %s", row["PK"], row["SK"], reason)
+            if not self.repair:
+                continue
+            fresh = get_deck(row["deckId"], consistent=True) if row.get("deckId") else None
+            if self._stale(row, fresh) is not None:
+                self._write(lambda row=row: self.table.delete_item(Key={"PK": row["PK"], "SK": row["SK"]}))
+
+
+def _scan_segment(
+    table,
+    name: str,
+    condition,
+    segment: int,
+    segments: int,
+    handle: Callable[[List[Dict[str, Any]]], None],
+    checkpoint: Checkpoint,
+    reads: Throttle,
+    page_size: int,
+    stats: Counter,
+) -> None:
+    position = checkpoint.position(name, segment)
+    if position.get("done"):
+        return
+    kwargs: Dict[str, Any] = {"Segment": segment, "TotalSegments": segments, "FilterExpression": condition, "Limit": page_size}
+    if position.get("lastKey"):
+        kwargs["ExclusiveStartKey"] = position["lastKey"]
+    while True:
+        response = table.scan(**kwargs)
+        reads.acquire(response.get("ScannedCount", len(response.get("Items", []))))
+        handle(response.get("Items", []))
+        last_key = response.get("LastEvaluatedKey")
+        checkpoint.save(name, segment, last_key, stats)
+        if not last_key:
+            return
+        kwargs["ExclusiveStartKey"] = last_key
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repair", action="store_true", help="write missing rows and delete stale ones")
+    parser.add_argument("--segments", type=int, default=8, help="parallel Scan segments")
+    parser.add_argument("--page-size", type=int, default=500, help="items evaluated per Scan page")
+    parser.add_argument("--max-scan-rate", type=float, default=2000, help="items scanned per second, 0 for no cap")
+    parser.add_argument("--max-write-rate", type=float, default=50, help="repair writes per second, 0 for no cap")
+    parser.add_argument("--checkpoint", help="JSON file to save progress to and resume from")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    table = get_table()
+    checkpoint = Checkpoint(args.checkpoint, args.segments, args.repair)
+    stats: Counter = Counter(checkpoint.state.get("stats", {}))
+    verifier = Verifier(table, repair=args.repair, writes=Throttle(args.max_write_rate), stats=stats)
+    reads = Throttle(args.max_scan_rate)
+    handlers = {"decks": verifier.check_decks, "access": verifier.check_access_rows}
+
+    started = time.perf_counter()
+    # Decks first, so rows a rename left behind are replaced before the stale ones go.
+    for name, condition in PASSES:
+        with ThreadPoolExecutor(max_workers=args.segments) as pool:
+            futures = [
+                pool.submit(
+                    _scan_segment, table, name, condition, segment, args.segments,
+                    handlers[name], checkpoint, reads, args.page_size, stats,
+                )
+                for segment in range(args.segments)
+            ]
+            for future in futures:
+                future.result()
+        logging.info("%s pass done after %.1fs", name, time.perf_counter() - started)
+
+    drift = sum(count for key, count in stats.items() if key.startswith(("missing_", "wrong_", "stale_")))
+    logging.info(
+        "%s: %s",
+        "repaired" if args.repair else "verified",
+        ", ".join(f"{key}={count}" for key, count in sorted(stats.items())) or "nothing to check",
+    )
+    return 1 if drift and not args.repair else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
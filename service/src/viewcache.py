@@ -0,0 +1,91 @@
+"""Short-lived per-user cache for cross-deck do views.
+
+Each entry remembers the generation of every scope it was built from: the
+user (and their email) for which decks are visible, and each deck it read.
+Writes bump their deck's generation and sharing changes bump the email's, so
+a lookup after a write misses instead of serving stale dos. Generations are
+per process; the TTL bounds how stale another worker's entries can get.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from .metrics import registry
+from .settings import settings
+
+VIEW_CACHE_LOOKUPS = registry.counter("dodeck_view_cache_lookups_total", "Cross-deck view cache lookups, by outcome.")
+
+
+def deck_scope(deck_id: str) -> str:
+    return f"deck:{deck_id}"
+
+
+def user_scope(sub: str) -> str:
+    return f"user:{sub}"
+
+
+def email_scope(email: str) -> str:
+    return f"email:{email.lower()}"
+
+
+class ViewCache:
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, int], Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self, scopes: Iterable[str]) -> Dict[str, int]:
+        """Current generations of ``scopes``; take it before reading the data it covers."""
+        with self._lock:
+            return {scope: self._generations.get(scope, 0) for scope in scopes}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                VIEW_CACHE_LOOKUPS.inc(outcome="miss")
+                return None
+            expires, generations, value = entry
+            if expires <= self._clock() or any(
+                self._generations.get(scope, 0) != generation for scope, generation in generations.items()
+            ):
+                del self._entries[key]
+                VIEW_CACHE_LOOKUPS.inc(outcome="stale")
+                return None
+            self._entries.move_to_end(key)
+        VIEW_CACHE_LOOKUPS.inc(outcome="hit")
+        return value
+
+    def put(self, key: Hashable, generations: Dict[str, int], value: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, generations, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *scopes: str) -> None:
+        with self._lock:
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+@lru_cache(maxsize=1)
+def get_view_cache() -> ViewCache:
+    return ViewCache(settings.view_cache_ttl_seconds, settings.view_cache_max_entries)
@@ -61,6 +61,9 @@ os.environ.setdefault("DYNAMODB_ENDPOINT_URL", "http://localhost:8000")
 os.environ.setdefault("REQUIRE_EMAIL_VERIFIED", "true")
 os.environ.setdefault("ENVIRONMENT", "test")
 os.environ.setdefault("TABLE_NAME", TABLE_NAME)
+# Tests run against the in-process engine unless STORAGE_BACKEND=dynamodb
+# points them at DynamoDB Local (see `just test-dynamodb`).
+os.environ.setdefault("STORAGE_BACKEND", "memory")
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -84,6 +87,13 @@ def test_client() -> Generator[TestClient, None, None]:
 
 @pytest.fixture(scope="session")
 def dynamodb_table() -> Generator:
+    from src.storage import table_definition
+
+    if os.environ["STORAGE_BACKEND"] == "memory":
+        from src import memorydb
+
+        return memorydb.get_table()
+
     resource = boto3.resource(
         "dynamodb",
         region_name=os.environ["AWS_REGION"],
@@ -92,27 +102,28 @@ def dynamodb_table() -> Generator:
         aws_secret_access_key=os.environ["AWS_SECRET_ACCESS_KEY"],
     )
 
+    definition = table_definition(TABLE_NAME)
     table = resource.Table(TABLE_NAME)
     try:
         table.load()
     except resource.meta.client.exceptions.ResourceNotFoundException:
-        table = resource.create_table(
-            TableName=TABLE_NAME,
-            KeySchema=[
-                {"AttributeName": "PK", "KeyType": "HASH"},
-                {"AttributeName": "SK", "KeyType": "RANGE"},
-            ],
-            AttributeDefinitions=[
-                {"AttributeName": "PK", "AttributeType": "S"},
-                {"AttributeName": "SK", "AttributeType": "S"},
-            ],
-            BillingMode="PAY_PER_REQUEST",
-        )
-        table.wait_until_exists()
+        pass
+    else:
+        # A table left behind by an older schema is recreated with the current indexes.
+        expected = {index["IndexName"] for index in definition.get("GlobalSecondaryIndexes", [])}
+        if {index["IndexName"] for index in table.global_secondary_indexes or []} == expected:
+            return table
+        table.delete()
+        table.wait_until_not_exists()
+    table = resource.create_table(**definition)
+    table.wait_until_exists()
     return table
 
 
 def _wipe_table(table) -> None:
+    if hasattr(table, "clear"):
+        table.clear()
+        return
     scan = table.scan()
     with table.batch_writer() as batch:
         for item in scan.get("Items", []):
@@ -131,6 +142,23 @@ def clean_table(dynamodb_table):
     _wipe_table(dynamodb_table)
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    from src import ratelimit
+
+    ratelimit.get_backend.cache_clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_view_cache():
+    # Tests wipe the table behind the repository's back.
+    from src import viewcache
+
+    viewcache.get_view_cache.cache_clear()
+    yield
+
+
 @pytest.fixture
 def token_factory() -> Callable[[str, str | None, bool], str]:
     def _make(sub: str, email: str | None, email_verified: bool = True, **claims) -> str:
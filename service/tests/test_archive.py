@@ -0,0 +1,82 @@
+from typing import Dict
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def _age_completion(dynamodb_table, deck_id: str, do_id: str, when: str) -> None:
+    dynamodb_table.update_item(
+        Key={"PK": f"DECK#{deck_id}", "SK": f"DO#{do_id}"},
+        UpdateExpression="SET completedAt = :when, updatedAt = :when",
+        ExpressionAttributeValues={":when": when},
+    )
+
+
+def _setup(test_client, token):
+    deck_id = test_client.post("/v1/decks", json={"name": "Archive"}, headers=auth_header(token)).json()["deckId"]
+    ids = []
+    for text in ("old done", "recent done", "open"):
+        response = test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": text}, headers=auth_header(token))
+        ids.append(response.json()["doId"])
+    for do_id in ids[:2]:
+        test_client.patch(f"/v1/decks/{deck_id}/dos/{do_id}", json={"completed": True}, headers=auth_header(token))
+    return deck_id, ids
+
+
+def test_listing_hides_and_archives_old_completed_dos(test_client, token_factory, dynamodb_table):
+    token = token_factory("auth0|arch", "arch@example.com")
+    deck_id, (old, recent, open_) = _setup(test_client, token)
+    _age_completion(dynamodb_table, deck_id, old, "2020-01-01T00:00:00+00:00")
+
+    listing = test_client.get(f"/v1/decks/{deck_id}/dos", headers=auth_header(token)).json()["items"]
+    assert [item["doId"] for item in listing] == [recent, open_]
+    assert listing[0]["completedAt"] is not None
+
+    # The background task moved the old do into the ARCHIVE# range.
+    keys = {item["SK"] for item in dynamodb_table.scan()["Items"] if item["PK"] == f"DECK#{deck_id}"}
+    assert f"ARCHIVE#{old}" in keys and f"DO#{old}" not in keys
+
+    page = test_client.get(f"/v1/decks/{deck_id}/archive", params={"limit": 1}, headers=auth_header(token)).json()
+    assert [item["doId"] for item in page["items"]] == [old]
+    assert page["items"][0]["archivedAt"] is not None
+
+    detail = test_client.get(f"/v1/decks/{deck_id}", params={"include": "dos"}, headers=auth_header(token)).json()
+    assert [item["doId"] for item in detail["dos"]] == [recent, open_]
+
+    export = test_client.get(f"/v1/decks/{deck_id}/export", headers=auth_header(token)).text.splitlines()
+    assert len(export) == 4
+
+
+def test_unarchive_restores_the_do_in_place(test_client, token_factory, dynamodb_table):
+    token = token_factory("auth0|arch", "arch@example.com")
+    deck_id, (old, recent, open_) = _setup(test_client, token)
+    _age_completion(dynamodb_table, deck_id, old, "2020-01-01T00:00:00+00:00")
+    test_client.get(f"/v1/decks/{deck_id}/dos", headers=auth_header(token))
+
+    response = test_client.post(f"/v1/decks/{deck_id}/archive/{old}:unarchive", headers=auth_header(token))
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+
+    listing = test_client.get(f"/v1/decks/{deck_id}/dos", headers=auth_header(token)).json()["items"]
+    assert [item["doId"] for item in listing] == [old, recent, open_]
+    assert test_client.get(f"/v1/decks/{deck_id}/archive", headers=auth_header(token)).json()["items"] == []
+
+    again = test_client.post(f"/v1/decks/{deck_id}/archive/{old}:unarchive", headers=auth_header(token))
+    assert again.status_code == 404
+
+
+def test_archive_sweep_and_reopen_clears_the_clock(test_client, token_factory, dynamodb_table):
+    from src.tools import archive_dos
+
+    token = token_factory("auth0|arch", "arch@example.com")
+    deck_id, (old, recent, _) = _setup(test_client, token)
+    _age_completion(dynamodb_table, deck_id, old, "2020-01-01T00:00:00+00:00")
+    _age_completion(dynamodb_table, deck_id, recent, "2020-01-01T00:00:00+00:00")
+    test_client.patch(f"/v1/decks/{deck_id}/dos/{recent}", json={"completed": False}, headers=auth_header(token))
+    reopened = dynamodb_table.get_item(Key={"PK": f"DECK#{deck_id}", "SK": f"DO#{recent}"})["Item"]
+    assert "completedAt" not in reopened
+
+    assert archive_dos.main([]) == 0
+    archived = test_client.get(f"/v1/decks/{deck_id}/archive", headers=auth_header(token)).json()["items"]
+    assert [item["doId"] for item in archived] == [old]
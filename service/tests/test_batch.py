@@ -0,0 +1,78 @@
+from typing import Dict
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def test_batch_runs_deck_calls_with_one_token_check(test_client, token_factory, monkeypatch):
+    from src import dependencies
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    owner = token_factory("auth0|batcher", "batcher@example.com")
+    stranger = token_factory("auth0|stranger", "stranger@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Dashboard"}, headers=auth_header(owner)).json()["deckId"]
+    test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": "first"}, headers=auth_header(owner))
+
+    verified = []
+    verify_jwt = dependencies.verify_jwt
+    monkeypatch.setattr(dependencies, "verify_jwt", lambda header: verified.append(header) or verify_jwt(header))
+
+    response = test_client.post(
+        "/v1/batch",
+        json={
+            "requests": [
+                {"id": "list", "path": "/v1/decks"},
+                {"id": "detail", "path": f"/v1/decks/{deck_id}?fields=name"},
+                {"id": "dos", "path": f"/v1/decks/{deck_id}/dos"},
+                {"id": "add", "method": "POST", "path": f"/v1/decks/{deck_id}/dos", "body": {"text": "second"}},
+                {"id": "bad", "method": "POST", "path": f"/v1/decks/{deck_id}/dos", "body": {}},
+                {"id": "missing", "path": "/v1/decks/nope"},
+                {"id": "other", "path": "/healthz"},
+                {"id": "export", "path": f"/v1/decks/{deck_id}/export"},
+            ]
+        },
+        headers=auth_header(owner),
+    )
+    assert response.status_code == 200
+    assert len(verified) == 1
+    results = {item["id"]: item for item in response.json()["responses"]}
+    assert [item["id"] for item in response.json()["responses"]][:3] == ["list", "detail", "dos"]
+    assert results["list"]["status"] == 200 and results["list"]["body"]["items"][0]["name"] == "Dashboard"
+    assert results["detail"]["body"] == {"name": "Dashboard"}
+    assert results["dos"]["status"] == 200
+    assert results["add"]["status"] == 201 and results["add"]["body"]["text"] == "second"
+    assert results["bad"]["status"] == 422
+    assert results["missing"]["status"] == 404
+    assert results["other"]["status"] == 400 and results["export"]["status"] == 400
+
+    # Sub-requests keep their route's access checks.
+    denied = test_client.post(
+        "/v1/batch", json={"requests": [{"path": f"/v1/decks/{deck_id}"}]}, headers=auth_header(stranger)
+    )
+    assert denied.json()["responses"][0]["status"] == 403
+
+
+def test_batch_limits(test_client, token_factory, monkeypatch):
+    from src.settings import settings
+
+    token = token_factory("auth0|batcher", "batcher@example.com")
+    assert test_client.post("/v1/batch", json={"requests": [{"path": "/v1/decks"}]}).status_code == 401
+
+    monkeypatch.setattr(settings, "batch_max_requests", 2)
+    response = test_client.post(
+        "/v1/batch", json={"requests": [{"path": "/v1/decks"}] * 3}, headers=auth_header(token)
+    )
+    assert response.status_code == 400 and response.json()["detail"] == "batch_too_large"
+
+    # Every sub-request spends a rate-limit token of its own.
+    from src.ratelimit import get_backend
+
+    monkeypatch.setattr(settings, "rate_limit_burst", 2)
+    monkeypatch.setattr(settings, "rate_limit_per_second", 0.001)
+    get_backend().reset()
+    response = test_client.post(
+        "/v1/batch", json={"requests": [{"path": "/v1/decks"}] * 2}, headers=auth_header(token)
+    )
+    assert sorted(item["status"] for item in response.json()["responses"]) == [200, 429]
@@ -0,0 +1,118 @@
+from typing import Dict
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def _create_deck(test_client, token: str, name: str = "Team Deck") -> str:
+    response = test_client.post("/v1/decks", json={"name": name}, headers=auth_header(token))
+    assert response.status_code == 201
+    return response.json()["deckId"]
+
+
+def test_batch_share_and_paginated_listing(test_client, token_factory):
+    owner_token = token_factory("auth0|sharer", "sharer@example.com")
+    deck_id = _create_deck(test_client, owner_token)
+    emails = [f"member{i}@example.com" for i in range(5)]
+
+    response = test_client.post(
+        f"/v1/decks/{deck_id}/collaborators:batch",
+        json={"emails": emails + ["Member0@example.com", "sharer@example.com"]},
+        headers=auth_header(owner_token),
+    )
+    assert response.status_code == 200
+    body = response.json()
+    statuses = {r["email"]: r["status"] for r in body["results"]}
+    assert all(statuses[email] == "added" for email in emails)
+    assert statuses["sharer@example.com"] == "cannot_add_self"
+    assert body["collaboratorCount"] == 5
+
+    # Re-sharing reports existing collaborators without double counting.
+    response = test_client.post(
+        f"/v1/decks/{deck_id}/collaborators:batch",
+        json={"emails": ["member1@example.com", "member9@example.com"]},
+        headers=auth_header(owner_token),
+    )
+    statuses = {r["email"]: r["status"] for r in response.json()["results"]}
+    assert statuses == {"member1@example.com": "exists", "member9@example.com": "added"}
+    assert response.json()["collaboratorCount"] == 6
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        response = test_client.get(
+            f"/v1/decks/{deck_id}/collaborators",
+            params=params,
+            headers=auth_header(owner_token),
+        )
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(item["email"] for item in page["items"])
+        cursor = page["nextCursor"]
+        if not cursor:
+            break
+    assert seen == sorted(emails + ["member9@example.com"])
+
+    # Shared members see the deck and its summary count.
+    member_token = token_factory("auth0|member3", "member3@example.com")
+    response = test_client.get(f"/v1/decks/{deck_id}", headers=auth_header(member_token))
+    assert response.status_code == 200
+    assert response.json()["collaboratorCount"] == 6
+
+    response = test_client.get("/v1/decks", headers=auth_header(owner_token))
+    assert response.json()["items"][0]["collaborators"] == 6
+
+
+def test_invalid_cursor_is_rejected(test_client, token_factory):
+    owner_token = token_factory("auth0|cursor", "cursor@example.com")
+    deck_id = _create_deck(test_client, owner_token)
+    response = test_client.get(
+        f"/v1/decks/{deck_id}/collaborators",
+        params={"cursor": "not-a-cursor"},
+        headers=auth_header(owner_token),
+    )
+    assert response.status_code == 400
+
+
+def test_legacy_collaborator_map_is_migrated_on_touch(test_client, token_factory, dynamodb_table):
+    owner_token = token_factory("auth0|legacy", "legacy@example.com")
+    collab_token = token_factory("auth0|old", "old@example.com")
+    deck_id = _create_deck(test_client, owner_token, "Legacy Deck")
+
+    # Rewrite the deck item into the pre-migration layout.
+    dynamodb_table.update_item(
+        Key={"PK": f"DECK#{deck_id}", "SK": "DECK"},
+        UpdateExpression="SET collaborators = :map REMOVE collaboratorCount",
+        ExpressionAttributeValues={":map": {"old@example.com": {"addedAt": "2025-01-01T00:00:00+00:00"}}},
+    )
+    dynamodb_table.put_item(
+        Item={
+            "PK": "ACCESS#EMAIL#old@example.com",
+            "SK": f"DECK#legacy deck#{deck_id}",
+            "deckId": deck_id,
+            "name": "Legacy Deck",
+            "nameLower": "legacy deck",
+            "ownerSub": "auth0|legacy",
+            "access": "collaborator",
+        }
+    )
+
+    response = test_client.get(f"/v1/decks/{deck_id}", headers=auth_header(collab_token))
+    assert response.status_code == 200
+    assert response.json()["collaborators"] == ["old@example.com"]
+
+    item = dynamodb_table.get_item(Key={"PK": f"DECK#{deck_id}", "SK": "DECK"})["Item"]
+    assert "collaborators" not in item
+    assert item["collaboratorCount"] == 1
+
+    response = test_client.delete(
+        f"/v1/decks/{deck_id}/collaborators/old@example.com",
+        headers=auth_header(owner_token),
+    )
+    assert response.status_code == 204
+    response = test_client.get(f"/v1/decks/{deck_id}", headers=auth_header(collab_token))
+    assert response.status_code == 403
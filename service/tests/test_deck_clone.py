@@ -0,0 +1,150 @@
+from typing import Dict
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def _deck_with_dos(test_client, token, name, count):
+    deck_id = test_client.post("/v1/decks", json={"name": name}, headers=auth_header(token)).json()["deckId"]
+    ids = [
+        test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": f"step {i}"}, headers=auth_header(token)).json()["doId"]
+        for i in range(count)
+    ]
+    return deck_id, ids
+
+
+def _finished(test_client, token, job_id):
+    import time
+
+    deadline = time.monotonic() + 10
+    while True:
+        job = test_client.get(f"/v1/jobs/{job_id}", headers=auth_header(token)).json()
+        if job["status"] != "running" or time.monotonic() > deadline:
+            return job
+        time.sleep(0.01)
+
+
+def _texts(test_client, token, deck_id):
+    return [item["text"] for item in test_client.get(f"/v1/decks/{deck_id}/dos", headers=auth_header(token)).json()["items"]]
+
+
+def test_small_clone_is_inline_and_owned_by_the_caller(test_client, token_factory, monkeypatch):
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    owner = token_factory("auth0|template-owner", "template-owner@example.com")
+    member = token_factory("auth0|template-user", "template-user@example.com")
+    stranger = token_factory("auth0|template-stranger", "template-stranger@example.com")
+    deck_id, ids = _deck_with_dos(test_client, owner, "Packing list", 3)
+    test_client.post(f"/v1/decks/{deck_id}/dos/{ids[2]}:move", json={}, headers=auth_header(owner))
+    test_client.patch(
+        f"/v1/decks/{deck_id}/dos/{ids[0]}",
+        json={"completed": True, "dueAt": "2026-05-01T08:00:00Z"},
+        headers=auth_header(owner),
+    )
+    test_client.post(f"/v1/decks/{deck_id}/collaborators", json={"email": "template-user@example.com"}, headers=auth_header(owner))
+
+    assert test_client.post(f"/v1/decks/{deck_id}:clone", headers=auth_header(stranger)).status_code == 403
+    response = test_client.post(f"/v1/decks/{deck_id}:clone", headers=auth_header(member))
+    assert response.status_code == 201
+    clone = response.json()
+    assert clone["name"] == "Packing list (copy)" and clone["isOwner"] and clone["collaborators"] == []
+
+    assert _texts(test_client, member, clone["deckId"]) == ["step 2", "step 0", "step 1"]
+    copied = test_client.get(f"/v1/decks/{clone['deckId']}/dos", headers=auth_header(member)).json()["items"]
+    assert not {item["doId"] for item in copied} & set(ids)
+    assert copied[1]["completed"] is True and copied[1]["dueAt"].startswith("2026-05-01T08:00:00")
+    hits = test_client.get("/v1/search", params={"q": "step"}, headers=auth_header(member)).json()["items"]
+    assert {hit["deckId"] for hit in hits} == {deck_id, clone["deckId"]}
+
+    named = test_client.post(f"/v1/decks/{deck_id}:clone", json={"name": "Trip"}, headers=auth_header(owner)).json()
+    assert named["name"] == "Trip"
+    assert _texts(test_client, owner, deck_id) == ["step 2", "step 0", "step 1"]
+
+
+def test_large_clone_runs_as_a_job(test_client, token_factory, monkeypatch):
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    monkeypatch.setattr(settings, "clone_inline_max_dos", 3)
+    monkeypatch.setattr(settings, "export_page_size", 4)
+    owner = token_factory("auth0|big-template", "big-template@example.com")
+    other = token_factory("auth0|job-peeker", "job-peeker@example.com")
+    deck_id, _ = _deck_with_dos(test_client, owner, "Onboarding", 10)
+
+    response = test_client.post(f"/v1/decks/{deck_id}:clone", headers=auth_header(owner))
+    assert response.status_code == 202
+    job = response.json()
+    assert response.headers["location"] == f"/v1/jobs/{job['jobId']}"
+    assert job["status"] == "running" and job["sourceDeckId"] == deck_id
+
+    done = _finished(test_client, owner, job["jobId"])
+    assert done["status"] == "succeeded" and done["copied"] == 10
+    assert _texts(test_client, owner, job["deckId"]) == [f"step {i}" for i in range(10)]
+    assert test_client.get(f"/v1/jobs/{job['jobId']}", headers=auth_header(other)).status_code == 404
+
+
+def test_failed_clone_job_removes_the_partial_deck(test_client, token_factory, monkeypatch):
+    from src import repository
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    monkeypatch.setattr(settings, "clone_inline_max_dos", 2)
+    monkeypatch.setattr(settings, "export_page_size", 3)
+    owner = token_factory("auth0|flaky-clone", "flaky-clone@example.com")
+    deck_id, _ = _deck_with_dos(test_client, owner, "Flaky", 7)
+
+    write = repository.batch_write_items
+    calls = []
+
+    def failing_write(items, concurrency=None):
+        calls.append(len(items))
+        if len(calls) == 2:
+            raise repository.BatchWriteError("3 items left unprocessed")
+        return write(items, concurrency)
+
+    monkeypatch.setattr(repository, "batch_write_items", failing_write)
+    job = test_client.post(f"/v1/decks/{deck_id}:clone", headers=auth_header(owner)).json()
+    done = _finished(test_client, owner, job["jobId"])
+    assert done["status"] == "failed" and done["error"] == "BatchWriteError"
+    assert test_client.get(f"/v1/decks/{job['deckId']}", headers=auth_header(owner)).status_code == 404
+    listed = test_client.get("/v1/decks", headers=auth_header(owner)).json()["items"]
+    assert [deck["deckId"] for deck in listed] == [deck_id]
+
+
+def test_a_user_runs_one_clone_job_at_a_time(test_client, token_factory, monkeypatch):
+    import threading
+
+    from src import repository
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    monkeypatch.setattr(settings, "clone_inline_max_dos", 1)
+    owner = token_factory("auth0|busy-cloner", "busy-cloner@example.com")
+    other = token_factory("auth0|other-cloner", "other-cloner@example.com")
+    deck_id, _ = _deck_with_dos(test_client, owner, "Busy", 3)
+    test_client.post(f"/v1/decks/{deck_id}/collaborators", json={"email": "other-cloner@example.com"}, headers=auth_header(owner))
+
+    release = threading.Event()
+    copy = repository._copy_dos
+
+    def slow_copy(deck, items):
+        release.wait(10)
+        return copy(deck, items)
+
+    monkeypatch.setattr(repository, "_copy_dos", slow_copy)
+    first = test_client.post(f"/v1/decks/{deck_id}:clone", headers=auth_header(owner))
+    # The request returned while its job is still copying, off the request's thread.
+    assert first.status_code == 202
+    second = test_client.post(f"/v1/decks/{deck_id}:clone", headers=auth_header(owner))
+    assert second.status_code == 409 and second.json()["detail"] == "clone_in_progress"
+    elsewhere = test_client.post(f"/v1/decks/{deck_id}:clone", headers=auth_header(other))
+    assert elsewhere.status_code == 202
+
+    release.set()
+    assert _finished(test_client, owner, first.json()["jobId"])["status"] == "succeeded"
+    again = test_client.post(f"/v1/decks/{deck_id}:clone", headers=auth_header(owner))
+    assert again.status_code == 202
+    assert _finished(test_client, owner, again.json()["jobId"])["status"] == "succeeded"
+    assert _finished(test_client, other, elsewhere.json()["jobId"])["status"] == "succeeded"
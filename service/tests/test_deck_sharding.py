@@ -0,0 +1,89 @@
+from typing import Dict
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def _partitions(dynamodb_table, deck_id):
+    """Partition of every do and archived do of the deck, by doId."""
+    return {
+        item["SK"].split("#", 1)[1]: item["PK"]
+        for item in dynamodb_table.scan()["Items"]
+        if item["PK"].startswith(f"DECK#{deck_id}") and item["SK"].startswith(("DO#", "ARCHIVE#"))
+    }
+
+
+def _ids(test_client, token, path, **params):
+    return [item["doId"] for item in test_client.get(path, params=params, headers=auth_header(token)).json()["items"]]
+
+
+def test_sharded_deck_reads_and_writes_like_any_other(test_client, token_factory, dynamodb_table, monkeypatch):
+    from src.repository import archive_do, get_do, reshard_deck
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    token = token_factory("auth0|hot-deck", "hot-deck@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Launch"}, headers=auth_header(token)).json()["deckId"]
+    ids = [
+        test_client.post(
+            f"/v1/decks/{deck_id}/dos",
+            json={"text": f"task {n}", **({"dueAt": f"2026-06-0{n + 1}T09:00:00Z"} if n < 3 else {})},
+            headers=auth_header(token),
+        ).json()["doId"]
+        for n in range(10)
+    ]
+    for do_id in ids[7:]:
+        test_client.patch(f"/v1/decks/{deck_id}/dos/{do_id}", json={"completed": True}, headers=auth_header(token))
+    assert archive_do(get_do(deck_id, ids[8], consistent=True))
+
+    assert reshard_deck(deck_id, 4, settle_seconds=0) > 0
+    partitions = _partitions(dynamodb_table, deck_id)
+    assert set(partitions) == set(ids)
+    assert set(partitions.values()) <= {f"DECK#{deck_id}#{n}" for n in range(4)}
+    assert len(set(partitions.values())) > 1
+
+    dos = f"/v1/decks/{deck_id}/dos"
+    assert _ids(test_client, token, dos) == ids[:8] + ids[9:]
+    assert _ids(test_client, token, dos, completed="false") == ids[:7]
+    assert _ids(test_client, token, dos, completed="true") == [ids[7], ids[9]]
+    assert _ids(test_client, token, "/v1/dos") == ids[:7]
+    assert _ids(test_client, token, "/v1/dos/due", **{"from": "2026-06-01T00:00:00Z", "to": "2026-06-03T00:00:00Z"}) == ids[:2]
+    hits = test_client.get("/v1/search", params={"q": "task", "limit": 50}, headers=auth_header(token)).json()["items"]
+    assert {hit["doId"] for hit in hits} == set(ids) - {ids[8]}
+
+    # Point reads and writes find the do in its shard; new dos land in one.
+    patched = test_client.patch(f"{dos}/{ids[1]}", json={"text": "renamed"}, headers=auth_header(token))
+    assert patched.status_code == 200 and patched.json()["text"] == "renamed"
+    moved = test_client.post(f"{dos}/{ids[6]}:move", json={"beforeDoId": ids[0]}, headers=auth_header(token))
+    assert moved.status_code == 200
+    assert test_client.delete(f"{dos}/{ids[5]}", headers=auth_header(token)).status_code == 204
+    new = test_client.post(dos, json={"text": "late addition"}, headers=auth_header(token)).json()["doId"]
+    assert _partitions(dynamodb_table, deck_id)[new].startswith(f"DECK#{deck_id}#")
+    assert _ids(test_client, token, dos) == [ids[6], *ids[:5], ids[7], ids[9], new]
+    assert _ids(test_client, token, dos, completed="false") == [*ids[:5], ids[6], new]
+
+    # Archive pages are merged across shards.
+    assert archive_do(get_do(deck_id, ids[7], consistent=True))
+    first = test_client.get(f"/v1/decks/{deck_id}/archive", params={"limit": 1}, headers=auth_header(token)).json()
+    second = test_client.get(
+        f"/v1/decks/{deck_id}/archive", params={"limit": 1, "cursor": first["nextCursor"]}, headers=auth_header(token)
+    ).json()
+    assert [item["doId"] for item in first["items"] + second["items"]] == [ids[7], ids[8]]
+    assert second["nextCursor"] is None
+
+    export = test_client.get(f"/v1/decks/{deck_id}/export", headers=auth_header(token)).text.splitlines()
+    assert len(export) == 1 + 10
+    clone = test_client.post(f"/v1/decks/{deck_id}:clone", headers=auth_header(token)).json()
+    assert len(_ids(test_client, token, f"/v1/decks/{clone['deckId']}/dos")) == 8
+
+    # Back to one partition, in the same order.
+    listed = _ids(test_client, token, dos)
+    assert reshard_deck(deck_id, 1, settle_seconds=0) > 0
+    assert set(_partitions(dynamodb_table, deck_id).values()) == {f"DECK#{deck_id}"}
+    assert _ids(test_client, token, dos) == listed
+    assert reshard_deck(deck_id, 1, settle_seconds=0) == 0
+
+    assert reshard_deck(deck_id, 3, settle_seconds=0) > 0
+    assert test_client.delete(f"/v1/decks/{deck_id}", headers=auth_header(token)).status_code == 204
+    assert not [item for item in dynamodb_table.scan()["Items"] if deck_id in item["PK"] + item["SK"]]
@@ -183,3 +183,53 @@ def test_requires_valid_email_for_collaborator_access(test_client, token_factory
         headers=auth_header(unverified),
     )
     assert response.status_code == 403
+
+
+def test_deck_detail_with_embedded_dos(test_client, token_factory):
+    owner_token = token_factory("auth0|owner3", "owner3@example.com")
+    collaborator_token = token_factory("auth0|collab3", "collab3@example.com")
+    outsider_token = token_factory("auth0|outsider", "outsider@example.com")
+    deck_id = test_client.post(
+        "/v1/decks",
+        json={"name": "Open Deck"},
+        headers=auth_header(owner_token),
+    ).json()["deckId"]
+    test_client.post(
+        f"/v1/decks/{deck_id}/collaborators",
+        json={"email": "collab3@example.com"},
+        headers=auth_header(owner_token),
+    )
+    for text in ("one", "two"):
+        test_client.post(
+            f"/v1/decks/{deck_id}/dos",
+            json={"text": text},
+            headers=auth_header(owner_token),
+        )
+
+    response = test_client.get(
+        f"/v1/decks/{deck_id}",
+        params={"include": "dos"},
+        headers=auth_header(collaborator_token),
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["deckId"] == deck_id
+    assert body["isOwner"] is False
+    assert [d["text"] for d in body["dos"]] == ["one", "two"]
+
+    response = test_client.get(f"/v1/decks/{deck_id}", headers=auth_header(owner_token))
+    assert "dos" not in response.json()
+
+    response = test_client.get(
+        f"/v1/decks/{deck_id}",
+        params={"include": "dos"},
+        headers=auth_header(outsider_token),
+    )
+    assert response.status_code == 403
+
+    response = test_client.get(
+        "/v1/decks/missing",
+        params={"include": "dos"},
+        headers=auth_header(owner_token),
+    )
+    assert response.status_code == 404
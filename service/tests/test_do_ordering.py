@@ -0,0 +1,149 @@
+import random
+from typing import Dict, List
+
+import pytest
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def test_key_between_stays_ordered_under_random_inserts():
+    from src.positions import key_between, keys_between, validate
+
+    rng = random.Random(7)
+    keys: List[str] = []
+    for _ in range(2000):
+        index = rng.randrange(len(keys) + 1)
+        before = keys[index - 1] if index else None
+        after = keys[index] if index < len(keys) else None
+        key = key_between(before, after)
+        validate(key)
+        keys.insert(index, key)
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+    spread = keys_between(None, None, 500)
+    assert spread == sorted(spread) and max(len(key) for key in spread) <= 3
+
+    with pytest.raises(ValueError):
+        key_between("a1", "a0")
+
+
+def _create(test_client, token, deck_id, text):
+    response = test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": text}, headers=auth_header(token))
+    assert response.status_code == 201
+    return response.json()["doId"]
+
+
+def _texts(test_client, token, deck_id):
+    items = test_client.get(f"/v1/decks/{deck_id}/dos", headers=auth_header(token)).json()["items"]
+    return [item["text"] for item in items]
+
+
+def test_move_rewrites_one_do_and_list_follows_user_order(test_client, token_factory, dynamodb_table):
+    token = token_factory("auth0|order", "order@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Order"}, headers=auth_header(token)).json()["deckId"]
+    ids = {text: _create(test_client, token, deck_id, text) for text in ("a", "b", "c", "d")}
+    assert _texts(test_client, token, deck_id) == ["a", "b", "c", "d"]
+
+    before = {item["SK"]: item.get("position") for item in dynamodb_table.scan()["Items"]}
+    response = test_client.post(
+        f"/v1/decks/{deck_id}/dos/{ids['d']}:move", json={"afterDoId": ids["a"]}, headers=auth_header(token)
+    )
+    assert response.status_code == 200
+    after = {item["SK"]: item.get("position") for item in dynamodb_table.scan()["Items"]}
+    assert [sk for sk in before if before[sk] != after[sk]] == [f"DO#{ids['d']}"]
+    assert _texts(test_client, token, deck_id) == ["a", "d", "b", "c"]
+
+    test_client.post(f"/v1/decks/{deck_id}/dos/{ids['c']}:move", json={}, headers=auth_header(token))
+    assert _texts(test_client, token, deck_id) == ["c", "a", "d", "b"]
+
+    test_client.post(
+        f"/v1/decks/{deck_id}/dos/{ids['c']}:move", json={"beforeDoId": ids["b"]}, headers=auth_header(token)
+    )
+    assert _texts(test_client, token, deck_id) == ["a", "d", "c", "b"]
+
+    detail = test_client.get(f"/v1/decks/{deck_id}", params={"include": "dos"}, headers=auth_header(token)).json()
+    assert [item["text"] for item in detail["dos"]] == ["a", "d", "c", "b"]
+
+    stale = test_client.post(
+        f"/v1/decks/{deck_id}/dos/{ids['a']}:move",
+        json={"afterDoId": ids["b"], "beforeDoId": ids["d"]},
+        headers=auth_header(token),
+    )
+    assert stale.status_code == 409
+    missing = test_client.post(
+        f"/v1/decks/{deck_id}/dos/{ids['a']}:move", json={"afterDoId": "nope"}, headers=auth_header(token)
+    )
+    assert missing.status_code == 400
+
+
+def test_rebalance_shortens_positions_and_backfills_legacy_dos(test_client, token_factory, dynamodb_table, monkeypatch):
+    from src.settings import settings
+    from src.tools import rebalance_positions
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    monkeypatch.setattr(settings, "position_rebalance_length", 6)
+    token = token_factory("auth0|order", "order@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Long"}, headers=auth_header(token)).json()["deckId"]
+    first = _create(test_client, token, deck_id, "first")
+    last = _create(test_client, token, deck_id, "last")
+    # Repeatedly dropping into the same gap grows the moved key.
+    for n in range(30):
+        moved = _create(test_client, token, deck_id, f"m{n}")
+        test_client.post(
+            f"/v1/decks/{deck_id}/dos/{moved}:move",
+            json={"afterDoId": first, "beforeDoId": last} if n == 0 else {"beforeDoId": last},
+            headers=auth_header(token),
+        )
+    order = _texts(test_client, token, deck_id)
+    assert order[0] == "first" and order[-1] == "last"
+    assert max(len(item.get("position", "")) for item in dynamodb_table.scan()["Items"]) > 6
+    dynamodb_table.put_item(
+        Item={
+            "PK": f"DECK#{deck_id}",
+            "SK": "DO#legacy",
+            "deckId": deck_id,
+            "doId": "legacy",
+            "text": "legacy",
+            "completed": False,
+            "createdAt": "2020-01-01T00:00:00+00:00",
+            "updatedAt": "2020-01-01T00:00:00+00:00",
+        }
+    )
+
+    assert rebalance_positions.main(["--deck", deck_id]) == 0
+    items = [item for item in dynamodb_table.scan()["Items"] if item["SK"].startswith("DO#")]
+    assert max(len(item["position"]) for item in items) <= 3
+    assert _texts(test_client, token, deck_id) == ["legacy"] + order
+    assert all(item["GSI2PK"] == f"DECK#{deck_id}#OPEN" for item in items)
+
+
+def test_dos_of_unindexed_decks_are_listed_and_backfilled(test_client, token_factory, dynamodb_table, monkeypatch):
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "shard_layout_cache_seconds", 0.0)
+    token = token_factory("auth0|order", "order@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Old"}, headers=auth_header(token)).json()["deckId"]
+    _create(test_client, token, deck_id, "new")
+    # A deck from before the indexes, holding a do without position or index keys.
+    dynamodb_table.update_item(Key={"PK": f"DECK#{deck_id}", "SK": "DECK"}, UpdateExpression="REMOVE dosIndexed")
+    dynamodb_table.put_item(
+        Item={
+            "PK": f"DECK#{deck_id}",
+            "SK": "DO#legacy",
+            "deckId": deck_id,
+            "doId": "legacy",
+            "text": "legacy",
+            "completed": False,
+            "createdAt": "2020-01-01T00:00:00+00:00",
+            "updatedAt": "2020-01-01T00:00:00+00:00",
+        }
+    )
+
+    assert _texts(test_client, token, deck_id) == ["legacy", "new"]
+    legacy = dynamodb_table.get_item(Key={"PK": f"DECK#{deck_id}", "SK": "DO#legacy"})["Item"]
+    assert legacy["GSI1SK"] == f"POS#{legacy['position']}#legacy"
+    assert dynamodb_table.get_item(Key={"PK": f"DECK#{deck_id}", "SK": "DECK"})["Item"]["dosIndexed"] is True
+    assert _texts(test_client, token, deck_id) == ["legacy", "new"]
@@ -0,0 +1,85 @@
+from typing import Dict
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def _ids(test_client, token, deck_id, **params):
+    response = test_client.get(f"/v1/decks/{deck_id}/dos", params=params, headers=auth_header(token))
+    assert response.status_code == 200
+    return [item["doId"] for item in response.json()["items"]]
+
+
+def test_completed_filter_reads_only_the_matching_status(test_client, token_factory, dynamodb_table):
+    token = token_factory("auth0|status", "status@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Status"}, headers=auth_header(token)).json()["deckId"]
+    ids = [
+        test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": f"do {n}"}, headers=auth_header(token)).json()["doId"]
+        for n in range(4)
+    ]
+    for do_id in ids[1::2]:
+        test_client.patch(f"/v1/decks/{deck_id}/dos/{do_id}", json={"completed": True}, headers=auth_header(token))
+
+    assert _ids(test_client, token, deck_id, completed="false") == [ids[0], ids[2]]
+    assert _ids(test_client, token, deck_id, completed="true") == [ids[1], ids[3]]
+
+    test_client.patch(f"/v1/decks/{deck_id}/dos/{ids[1]}", json={"completed": False}, headers=auth_header(token))
+    assert _ids(test_client, token, deck_id, completed="false") == ids[:3]
+    assert _ids(test_client, token, deck_id, completed="true") == [ids[3]]
+
+    test_client.delete(f"/v1/decks/{deck_id}/dos/{ids[0]}", headers=auth_header(token))
+    assert _ids(test_client, token, deck_id, completed="false") == ids[1:3]
+    assert test_client.get(f"/v1/decks/{deck_id}/dos", params={"completed": "maybe"}, headers=auth_header(token)).status_code == 422
+
+
+def test_archived_dos_leave_the_status_index(test_client, token_factory, dynamodb_table):
+    token = token_factory("auth0|status", "status@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Status"}, headers=auth_header(token)).json()["deckId"]
+    do_id = test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": "old"}, headers=auth_header(token)).json()["doId"]
+    test_client.patch(f"/v1/decks/{deck_id}/dos/{do_id}", json={"completed": True}, headers=auth_header(token))
+    dynamodb_table.update_item(
+        Key={"PK": f"DECK#{deck_id}", "SK": f"DO#{do_id}"},
+        UpdateExpression="SET completedAt = :when, updatedAt = :when",
+        ExpressionAttributeValues={":when": "2020-01-01T00:00:00+00:00"},
+    )
+
+    assert _ids(test_client, token, deck_id, completed="true") == []
+    archived = dynamodb_table.get_item(Key={"PK": f"DECK#{deck_id}", "SK": f"ARCHIVE#{do_id}"})["Item"]
+    assert "GSI2PK" not in archived
+
+    test_client.post(f"/v1/decks/{deck_id}/archive/{do_id}:unarchive", headers=auth_header(token))
+    assert _ids(test_client, token, deck_id, completed="true") == [do_id]
+
+
+def test_unindexed_decks_are_filtered_from_the_base_table(test_client, token_factory, dynamodb_table, monkeypatch):
+    from datetime import datetime, timezone
+
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "shard_layout_cache_seconds", 0.0)
+    token = token_factory("auth0|status", "status@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Old"}, headers=auth_header(token)).json()["deckId"]
+    new = test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": "new"}, headers=auth_header(token)).json()["doId"]
+    # Dos from before the status index, in a deck not yet backfilled.
+    dynamodb_table.update_item(Key={"PK": f"DECK#{deck_id}", "SK": "DECK"}, UpdateExpression="REMOVE dosIndexed")
+    now = datetime.now(timezone.utc).isoformat()
+    for do_id, completed, created in (("open", False, "2020-01-01T00:00:00+00:00"), ("done", True, now)):
+        dynamodb_table.put_item(
+            Item={
+                "PK": f"DECK#{deck_id}",
+                "SK": f"DO#{do_id}",
+                "deckId": deck_id,
+                "doId": do_id,
+                "text": do_id,
+                "completed": completed,
+                "createdAt": created,
+                "updatedAt": created,
+            }
+        )
+
+    open_dos = test_client.get("/v1/dos", headers=auth_header(token)).json()["items"]
+    assert [item["doId"] for item in open_dos] == ["open", new]
+    assert _ids(test_client, token, deck_id, completed="true") == ["done"]
+    assert _ids(test_client, token, deck_id, completed="false") == ["open", new]
+    assert all("GSI2PK" in item for item in dynamodb_table.scan()["Items"] if item["SK"].startswith("DO#"))
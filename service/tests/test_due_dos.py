@@ -0,0 +1,166 @@
+from typing import Dict
+
+import pytest
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def _due(test_client, token, start, end):
+    response = test_client.get("/v1/dos/due", params={"from": start, "to": end}, headers=auth_header(token))
+    assert response.status_code == 200, response.text
+    return [item["text"] for item in response.json()["items"]]
+
+
+def _due_entries(dynamodb_table):
+    return sorted(item["PK"] for item in dynamodb_table.scan()["Items"] if item["PK"].startswith("DUE#"))
+
+
+def test_due_index_follows_create_update_delete_and_sharing(test_client, token_factory, dynamodb_table, monkeypatch):
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    owner = token_factory("auth0|due", "due@example.com")
+    friend = token_factory("auth0|duefriend", "duefriend@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Due"}, headers=auth_header(owner)).json()["deckId"]
+
+    def create(text, due_at=None):
+        body = {"text": text} if due_at is None else {"text": text, "dueAt": due_at}
+        response = test_client.post(f"/v1/decks/{deck_id}/dos", json=body, headers=auth_header(owner))
+        assert response.status_code == 201
+        return response.json()
+
+    late = create("late", "2026-03-02T18:00:00-08:00")
+    early = create("early", "2026-03-02T09:30:00Z")
+    create("next day", "2026-03-04T00:00:00Z")
+    loose = create("no date")
+    assert late["dueAt"].startswith("2026-03-03T02:00:00")
+    assert len(_due_entries(dynamodb_table)) == 3
+
+    assert _due(test_client, owner, "2026-03-02T00:00:00Z", "2026-03-04T00:00:00Z") == ["early", "late"]
+    assert _due(test_client, owner, "2026-03-02T00:00:00Z", "2026-03-05T00:00:00Z") == ["early", "late", "next day"]
+
+    test_client.patch(f"/v1/decks/{deck_id}/dos/{loose['doId']}", json={"dueAt": "2026-03-02T12:00:00Z"}, headers=auth_header(owner))
+    test_client.patch(f"/v1/decks/{deck_id}/dos/{early['doId']}", json={"completed": True}, headers=auth_header(owner))
+    test_client.patch(f"/v1/decks/{deck_id}/dos/{late['doId']}", json={"dueAt": None}, headers=auth_header(owner))
+    assert _due(test_client, owner, "2026-03-02T00:00:00Z", "2026-03-04T00:00:00Z") == ["no date"]
+
+    test_client.post(f"/v1/decks/{deck_id}/collaborators", json={"email": "duefriend@example.com"}, headers=auth_header(owner))
+    assert _due(test_client, friend, "2026-03-01T00:00:00Z", "2026-03-05T00:00:00Z") == ["no date", "next day"]
+    test_client.patch(f"/v1/decks/{deck_id}/dos/{early['doId']}", json={"completed": False}, headers=auth_header(owner))
+    assert _due(test_client, friend, "2026-03-01T00:00:00Z", "2026-03-05T00:00:00Z") == ["early", "no date", "next day"]
+
+    test_client.delete(f"/v1/decks/{deck_id}/dos/{loose['doId']}", headers=auth_header(owner))
+    test_client.delete(f"/v1/decks/{deck_id}/collaborators/duefriend@example.com", headers=auth_header(owner))
+    assert _due(test_client, friend, "2026-03-01T00:00:00Z", "2026-03-05T00:00:00Z") == []
+    assert _due(test_client, owner, "2026-03-01T00:00:00Z", "2026-03-05T00:00:00Z") == ["early", "next day"]
+
+    test_client.delete(f"/v1/decks/{deck_id}", headers=auth_header(owner))
+    assert _due_entries(dynamodb_table) == []
+
+
+def test_due_changes_on_a_widely_shared_deck(test_client, token_factory, dynamodb_table, monkeypatch):
+    from src.repository import ConcurrentUpdateError, add_collaborators, get_deck, get_do, update_do
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    owner = token_factory("auth0|wide", "wide@example.com")
+    friend = token_factory("auth0|wide0", "wide0@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Wide"}, headers=auth_header(owner)).json()["deckId"]
+    add_collaborators(get_deck(deck_id, consistent=True), [f"wide{n}@example.com" for n in range(20)])
+    do = test_client.post(
+        f"/v1/decks/{deck_id}/dos", json={"text": "shared", "dueAt": "2026-03-02T12:00:00Z"}, headers=auth_header(owner)
+    ).json()
+    assert len(_due_entries(dynamodb_table)) == 21
+
+    # 21 scopes moving is 42 entry writes, more than one transaction holds.
+    moved = test_client.patch(
+        f"/v1/decks/{deck_id}/dos/{do['doId']}", json={"dueAt": "2026-03-03T12:00:00Z"}, headers=auth_header(owner)
+    )
+    assert moved.status_code == 200
+    assert _due_entries(dynamodb_table) == sorted(
+        ["DUE#USER#auth0|wide#2026-03-03"] + [f"DUE#EMAIL#wide{n}@example.com#2026-03-03" for n in range(20)]
+    )
+    assert _due(test_client, friend, "2026-03-01T00:00:00Z", "2026-03-05T00:00:00Z") == ["shared"]
+
+    # A do write that fails after its new entries went in leaves entries the listing skips.
+    stale = get_do(deck_id, do["doId"], consistent=True)
+    update_do(dict(stale), "renamed", None)
+    with pytest.raises(ConcurrentUpdateError):
+        update_do(dict(stale), None, None, due_at="2026-03-04T12:00:00Z", expected_updated_at=stale["updatedAt"])
+    assert _due(test_client, friend, "2026-03-01T00:00:00Z", "2026-03-05T00:00:00Z") == ["renamed"]
+    assert _due(test_client, friend, "2026-03-04T00:00:00Z", "2026-03-05T00:00:00Z") == []
+
+
+def test_due_range_is_validated(test_client, token_factory):
+    token = token_factory("auth0|due", "due@example.com")
+    backwards = test_client.get(
+        "/v1/dos/due", params={"from": "2026-03-02T00:00:00Z", "to": "2026-03-01T00:00:00Z"}, headers=auth_header(token)
+    )
+    assert backwards.status_code == 400
+    too_wide = test_client.get(
+        "/v1/dos/due", params={"from": "2026-01-01T00:00:00Z", "to": "2026-06-01T00:00:00Z"}, headers=auth_header(token)
+    )
+    assert too_wide.json()["detail"] == "range_too_large"
+
+
+
+def test_unprocessed_keys_are_read_again(monkeypatch):
+    from src.repository import BatchReadError, _batch_get
+    from src.settings import settings
+
+    class ThrottlingClient:
+        def __init__(self, throttled_calls):
+            self.throttled_calls = throttled_calls
+            self.requests = []
+
+        def batch_get_item(self, RequestItems):
+            self.requests.append(RequestItems)
+            request = RequestItems["t"]
+            if len(self.requests) <= self.throttled_calls:
+                return {"Responses": {"t": request["Keys"][:1]}, "UnprocessedKeys": {"t": {**request, "Keys": request["Keys"][1:]}}}
+            return {"Responses": {"t": request["Keys"]}}
+
+    monkeypatch.setattr(settings, "batch_write_max_attempts", 3)
+    keys = [{"PK": f"DECK#{n}", "SK": "DECK"} for n in range(3)]
+    client = ThrottlingClient(throttled_calls=1)
+    assert _batch_get(client, "t", keys, ConsistentRead=True) == keys
+    assert [request["t"]["Keys"] for request in client.requests] == [keys, keys[1:]]
+    assert all(request["t"]["ConsistentRead"] for request in client.requests)
+
+    with pytest.raises(BatchReadError):
+        _batch_get(ThrottlingClient(throttled_calls=5), "t", keys + keys)
+
+
+def test_do_writes_reuse_the_deck_read_for_the_access_check(test_client, token_factory, monkeypatch):
+    from src import repository
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    token = token_factory("auth0|due", "due@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Reads"}, headers=auth_header(token)).json()["deckId"]
+    calls = []
+
+    def spy(name):
+        original = getattr(repository, name)
+
+        def counted(*args, **kwargs):
+            calls.append(name)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(repository, name, counted)
+
+    spy("get_deck")
+    spy("collaborator_emails")
+
+    do = test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": "plain"}, headers=auth_header(token)).json()
+    test_client.patch(f"/v1/decks/{deck_id}/dos/{do['doId']}", json={"text": "still plain"}, headers=auth_header(token))
+    test_client.delete(f"/v1/decks/{deck_id}/dos/{do['doId']}", headers=auth_header(token))
+    assert calls == []
+
+    # Due entries go to every reader's scope, so only dated writes look up the collaborators.
+    body = {"text": "dated", "dueAt": "2026-03-02T09:30:00Z"}
+    dated = test_client.post(f"/v1/decks/{deck_id}/dos", json=body, headers=auth_header(token)).json()
+    test_client.delete(f"/v1/decks/{deck_id}/dos/{dated['doId']}", headers=auth_header(token))
+    assert calls == ["collaborator_emails", "collaborator_emails"]
@@ -0,0 +1,114 @@
+import json
+from typing import Dict
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def test_export_then_import_into_another_account(test_client, token_factory):
+    owner_token = token_factory("auth0|exporter", "exporter@example.com")
+    other_token = token_factory("auth0|importer", "importer@example.com")
+    deck_id = test_client.post(
+        "/v1/decks", json={"name": "Backup Me"}, headers=auth_header(owner_token)
+    ).json()["deckId"]
+    for i in range(30):
+        test_client.post(
+            f"/v1/decks/{deck_id}/dos",
+            json={"text": f"task {i}"},
+            headers=auth_header(owner_token),
+        )
+
+    response = test_client.get(f"/v1/decks/{deck_id}/export", headers=auth_header(owner_token))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records[0]["type"] == "deck"
+    assert records[0]["name"] == "Backup Me"
+    assert sorted(r["text"] for r in records[1:]) == sorted(f"task {i}" for i in range(30))
+    # Moving a do changes the order the export has to carry over.
+    listed = test_client.get(f"/v1/decks/{deck_id}/dos", headers=auth_header(owner_token)).json()["items"]
+    moved = test_client.post(
+        f"/v1/decks/{deck_id}/dos/{listed[-1]['doId']}:move",
+        json={"afterDoId": None, "beforeDoId": listed[0]["doId"]},
+        headers=auth_header(owner_token),
+    )
+    assert moved.status_code == 200
+    expected = ["task 29"] + [f"task {i}" for i in range(29)]
+    records = [json.loads(line) for line in test_client.get(f"/v1/decks/{deck_id}/export", headers=auth_header(owner_token)).text.splitlines()]
+
+    response = test_client.get(f"/v1/decks/{deck_id}/export", headers=auth_header(other_token))
+    assert response.status_code == 403
+
+    response = test_client.post(
+        "/v1/decks/import",
+        content=iter(json.dumps(record).encode() + b"\n" for record in records),
+        headers={**auth_header(other_token), "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 201
+    body = response.json()
+    assert body["imported"] == 30
+    assert body["name"] == "Backup Me"
+    assert body["deckId"] != deck_id
+
+    response = test_client.get(f"/v1/decks/{body['deckId']}/dos", headers=auth_header(other_token))
+    dos = response.json()["items"]
+    assert [d["text"] for d in dos] == expected
+
+    # Positions decide the order, not the file; records without one follow the last seen.
+    records = [records[0], *reversed(records[1:]), {"type": "do", "text": "appended"}]
+    response = test_client.post(
+        "/v1/decks/import",
+        content=iter(json.dumps(record).encode() + b"\n" for record in records),
+        headers={**auth_header(other_token), "Content-Type": "application/x-ndjson"},
+    )
+    dos = test_client.get(f"/v1/decks/{response.json()['deckId']}/dos", headers=auth_header(other_token)).json()["items"]
+    assert [d["text"] for d in dos] == expected + ["appended"]
+
+
+def test_import_rejects_bad_records_without_leaving_a_deck(test_client, token_factory):
+    token = token_factory("auth0|badimport", "badimport@example.com")
+    payload = b'{"type": "deck", "name": "Broken"}\n{"type": "do", "text": ""}\n'
+    response = test_client.post(
+        "/v1/decks/import",
+        content=payload,
+        headers={**auth_header(token), "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == {"error": "invalid_record", "line": 2}
+
+    response = test_client.get("/v1/decks", headers=auth_header(token))
+    assert response.json()["items"] == []
+
+
+def test_archived_dos_and_timestamps_survive_a_round_trip(test_client, token_factory):
+    from src.repository import archive_do, get_do
+
+    token = token_factory("auth0|archiver", "archiver@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Kept"}, headers=auth_header(token)).json()["deckId"]
+    done, open_ = (
+        test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": text}, headers=auth_header(token)).json()["doId"]
+        for text in ("done", "open")
+    )
+    test_client.patch(f"/v1/decks/{deck_id}/dos/{done}", json={"completed": True}, headers=auth_header(token))
+    assert archive_do(get_do(deck_id, done, consistent=True))
+
+    records = [json.loads(line) for line in test_client.get(f"/v1/decks/{deck_id}/export", headers=auth_header(token)).text.splitlines()]
+    assert [record.get("archivedAt") is not None for record in records[1:]] == [False, True]
+    records.append({"type": "do", "text": "naive", "createdAt": "2026-03-01T09:30:00", "updatedAt": "2026-03-01T10:30:00+02:00"})
+    response = test_client.post(
+        "/v1/decks/import",
+        content=b"".join(json.dumps(record).encode() + b"\n" for record in records),
+        headers={**auth_header(token), "Content-Type": "application/x-ndjson"},
+    )
+    imported = response.json()["deckId"]
+    assert response.json()["imported"] == 3
+
+    dos = test_client.get(f"/v1/decks/{imported}/dos", headers=auth_header(token)).json()["items"]
+    assert [item["text"] for item in dos] == ["open", "naive"]
+    assert dos[1]["createdAt"].startswith("2026-03-01T09:30:00")
+    assert dos[1]["updatedAt"].startswith("2026-03-01T08:30:00")
+    archived = test_client.get(f"/v1/decks/{imported}/archive", headers=auth_header(token)).json()["items"]
+    assert [item["text"] for item in archived] == ["done"]
+    assert archived[0]["archivedAt"].startswith(records[2]["archivedAt"][:19])
+    assert test_client.post(f"/v1/decks/{imported}/archive/{archived[0]['doId']}:unarchive", headers=auth_header(token)).status_code == 200
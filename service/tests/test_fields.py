@@ -0,0 +1,45 @@
+from typing import Dict
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def test_fields_limit_the_response(test_client, token_factory, monkeypatch):
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    token = token_factory("auth0|sparse", "sparse@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Sparse"}, headers=auth_header(token)).json()["deckId"]
+    test_client.post("/v1/decks", json={"name": "Another"}, headers=auth_header(token))
+    test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": "first"}, headers=auth_header(token))
+    test_client.post(f"/v1/decks/{deck_id}/collaborators", json={"email": "peer@example.com"}, headers=auth_header(token))
+
+    listing = test_client.get("/v1/decks", params={"fields": "deckId,name"}, headers=auth_header(token)).json()
+    assert [item["name"] for item in listing["items"]] == ["Another", "Sparse"]
+    assert all(set(item) == {"deckId", "name"} for item in listing["items"])
+
+    detail = test_client.get(f"/v1/decks/{deck_id}", params={"fields": "name,createdAt"}, headers=auth_header(token))
+    assert set(detail.json()) == {"name", "createdAt"}
+    full = test_client.get(f"/v1/decks/{deck_id}", headers=auth_header(token)).json()
+    assert detail.json()["createdAt"] == full["createdAt"]
+    assert full["collaborators"] == ["peer@example.com"]
+
+    dos = test_client.get(f"/v1/decks/{deck_id}/dos", params={"fields": "doId,text"}, headers=auth_header(token)).json()
+    assert [set(item) for item in dos["items"]] == [{"doId", "text"}]
+
+    bad = test_client.get(f"/v1/decks/{deck_id}/dos", params={"fields": "doId,secret"}, headers=auth_header(token))
+    assert bad.status_code == 400 and bad.json()["detail"] == "invalid_fields"
+
+
+def test_projection_reads_only_requested_attributes(token_factory, test_client):
+    from src import repository
+
+    token = token_factory("auth0|sparse", "sparse@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Sparse"}, headers=auth_header(token)).json()["deckId"]
+    repository.create_do(deck_id, "first")
+
+    assert set(repository.get_deck(deck_id, attributes=["deckId", "name"])) == {"deckId", "name"}
+    assert set(repository.batch_load_decks([deck_id], attributes=["deckId"])[deck_id]) == {"deckId"}
+    (item,) = repository.list_dos(deck_id, attributes=["doId", "text", "position"])
+    assert set(item) == {"doId", "text", "position"}
@@ -0,0 +1,144 @@
+import re
+from typing import Dict
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def _raw(dynamodb_table, deck_id: str, do_id: str):
+    return dynamodb_table.get_item(Key={"PK": f"DECK#{deck_id}", "SK": f"DO#{do_id}"}, ConsistentRead=True)["Item"]
+
+
+def _snapshot(test_client, token, deck_id):
+    detail = test_client.get(f"/v1/decks/{deck_id}", params={"include": "dos"}, headers=auth_header(token)).json()
+    due = test_client.get(
+        "/v1/dos/due", params={"from": "2026-03-01T00:00:00Z", "to": "2026-03-10T00:00:00Z"}, headers=auth_header(token)
+    ).json()
+    # Equal scores are ordered by id, which differs between runs.
+    hits = sorted(
+        test_client.get("/v1/search", params={"q": "pay"}, headers=auth_header(token)).json()["items"],
+        key=lambda hit: hit["text"] or "",
+    )
+    listed = test_client.get("/v1/decks", headers=auth_header(token)).json()
+    return detail, due, hits, listed
+
+
+def _exercise(test_client, token):
+    deck_id = test_client.post("/v1/decks", json={"name": "Bills"}, headers=auth_header(token)).json()["deckId"]
+    ids = []
+    for text, due_at in (("pay rent", "2026-03-02T09:30:00Z"), ("pay water", None), ("file taxes", None)):
+        body = {"text": text} if due_at is None else {"text": text, "dueAt": due_at}
+        ids.append(test_client.post(f"/v1/decks/{deck_id}/dos", json=body, headers=auth_header(token)).json()["doId"])
+    test_client.patch(f"/v1/decks/{deck_id}/dos/{ids[1]}", json={"completed": True}, headers=auth_header(token))
+    test_client.post(f"/v1/decks/{deck_id}/dos/{ids[2]}:move", json={}, headers=auth_header(token))
+    test_client.patch(f"/v1/decks/{deck_id}", json={"name": "Monthly bills"}, headers=auth_header(token))
+    return deck_id, ids
+
+
+def _comparable(snapshot, deck_id, ids):
+    # Ids, timestamps and the positions made from them differ between runs; everything else must match.
+    text = repr(snapshot).replace(deck_id, "DECK")
+    for index, do_id in enumerate(ids):
+        text = text.replace(do_id, f"DO{index}")
+    text = re.sub(r"'position': '[^']*'", "'position': P", text)
+    return re.sub(r"\d{4}-\d\d-\d\dT[\d:.]+(\+00:00|Z)?", "T", text)
+
+
+def test_compact_items_are_smaller_and_serve_the_same_api(test_client, token_factory, dynamodb_table, monkeypatch):
+    from src.codec import decode, encode
+    from src.memorydb import item_size
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    token = token_factory("auth0|codec", "codec@example.com")
+    verbose_deck, verbose_ids = _exercise(test_client, token)
+    verbose = _snapshot(test_client, token, verbose_deck)
+    test_client.delete(f"/v1/decks/{verbose_deck}", headers=auth_header(token))
+
+    monkeypatch.setattr(settings, "item_encoding", "compact")
+    deck_id, ids = _exercise(test_client, token)
+    compact = _snapshot(test_client, token, deck_id)
+    assert _comparable(compact, deck_id, ids) == _comparable(verbose, verbose_deck, verbose_ids)
+
+    stored = _raw(dynamodb_table, deck_id, ids[1])
+    assert stored["v"] == 2 and stored["c"] is True and "completed" not in stored and "deckId" not in stored
+    items = dynamodb_table.scan()["Items"]
+    assert all(item["v"] == 2 for item in items if item["PK"].startswith(("ACCESS#", "DUE#", "TOK#")))
+    assert item_size(stored) < item_size(encode(decode(stored), compact=False)) - 100
+
+    # Deleting the deck removes every compact entry along with it.
+    test_client.delete(f"/v1/decks/{deck_id}", headers=auth_header(token))
+    assert not [item for item in dynamodb_table.scan()["Items"] if item["PK"].startswith(("DECK#", "DUE#", "TOK#"))]
+
+
+def test_both_formats_are_read_and_touched_dos_migrate(test_client, token_factory, dynamodb_table, monkeypatch):
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    token = token_factory("auth0|codec", "codec@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Mixed"}, headers=auth_header(token)).json()["deckId"]
+    old = test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": "legacy"}, headers=auth_header(token)).json()["doId"]
+
+    monkeypatch.setattr(settings, "item_encoding", "compact")
+    new = test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": "compact"}, headers=auth_header(token)).json()["doId"]
+    assert "v" not in _raw(dynamodb_table, deck_id, old) and _raw(dynamodb_table, deck_id, new)["v"] == 2
+    listed = test_client.get(f"/v1/decks/{deck_id}/dos", headers=auth_header(token)).json()["items"]
+    assert [item["text"] for item in listed] == ["legacy", "compact"]
+    sparse = test_client.get(f"/v1/decks/{deck_id}/dos", params={"fields": "text"}, headers=auth_header(token)).json()
+    assert sparse["items"] == [{"text": "legacy"}, {"text": "compact"}]
+
+    response = test_client.patch(f"/v1/decks/{deck_id}/dos/{old}", json={"completed": True}, headers=auth_header(token))
+    assert response.status_code == 200 and response.json()["completed"] is True
+    migrated = _raw(dynamodb_table, deck_id, old)
+    assert migrated["v"] == 2 and migrated["t"] == "legacy" and migrated["c"] is True
+    assert not {"text", "completed", "updatedAt"} & set(migrated)
+
+    # Rolling back to verbose keeps compact items readable and migrates them back on touch.
+    monkeypatch.setattr(settings, "item_encoding", "verbose")
+    listed = test_client.get(f"/v1/decks/{deck_id}/dos", params={"completed": "true"}, headers=auth_header(token)).json()
+    assert [item["text"] for item in listed["items"]] == ["legacy"]
+    test_client.patch(f"/v1/decks/{deck_id}/dos/{new}", json={"text": "verbose again"}, headers=auth_header(token))
+    restored = _raw(dynamodb_table, deck_id, new)
+    assert "v" not in restored and restored["text"] == "verbose again"
+
+
+def test_codec_round_trip():
+    from src import codec
+
+    do = {
+        "PK": "DECK#d1", "SK": "DO#x1", "GSI1PK": "DECK#d1", "GSI1SK": "POS#a#x1",
+        "deckId": "d1", "doId": "x1", "text": "hi", "completed": False, "position": "a",
+        "createdAt": "2026-03-02T09:30:00.123456+00:00", "updatedAt": "2026-03-02T09:30:00+00:00",
+        "dueAt": "2026-03-02T01:30:00-08:00",
+    }
+    access = {
+        "PK": "ACCESS#USER#auth0|u", "SK": "DECK#my deck#d1", "deckId": "d1", "name": "My Deck",
+        "nameLower": "my deck", "ownerSub": "auth0|u", "access": "owner",
+    }
+    for item in (do, access):
+        stored = codec.encode(item, compact=True)
+        assert len(stored) < len(item) or stored.keys() != item.keys()
+        assert codec.decode(stored) == {**item, "v": 2}
+        assert codec.encode(codec.decode(stored), compact=False) == item
+    # Offsets other than UTC would not survive the round trip as numbers, so they stay strings.
+    assert codec.encode(do, compact=True)["du"] == do["dueAt"]
+    assert isinstance(codec.encode(do, compact=True)["ua"], int)
+    assert codec.decode(do) is do
+
+
+def test_encoding_benchmark_reports_smaller_compact_items(caplog):
+    import logging
+    import random
+
+    from src.tools import encoding_benchmark, seed_dataset
+
+    args = seed_dataset.build_parser().parse_args(["--users", "5", "--dos-median", "4"])
+    report = encoding_benchmark.measure(list(seed_dataset.generate(args, random.Random(args.seed))))
+    assert report["compact"]["bytes"]["DO"] < report["verbose"]["bytes"]["DO"]
+    assert report["compact"]["bytes"]["DECK"] == report["verbose"]["bytes"]["DECK"]
+    assert report["compact"]["wcu"] <= report["verbose"]["wcu"]
+
+    with caplog.at_level(logging.INFO):
+        assert encoding_benchmark.main(["--users", "3"]) == 0
+    assert "stored bytes" in caplog.text
@@ -0,0 +1,166 @@
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+
+def _table(**gsis):
+    from src.memorydb import MemoryTable
+    from src.storage import table_definition
+
+    definition = table_definition("Test")
+    definition["GlobalSecondaryIndexes"] = [
+        {
+            "IndexName": name,
+            "KeySchema": [
+                {"AttributeName": hash_key, "KeyType": "HASH"},
+                {"AttributeName": range_key, "KeyType": "RANGE"},
+            ],
+            "Projection": {"ProjectionType": "ALL"},
+        }
+        for name, (hash_key, range_key) in gsis.items()
+    ]
+    return MemoryTable("Test", definition)
+
+
+def _code(info) -> str:
+    return info.value.response["Error"]["Code"]
+
+
+def test_query_ranges_are_sorted_and_paginate():
+    table = _table()
+    for sk in ("DO#3", "DECK", "DO#1", "COLLAB#a", "DO#2"):
+        table.put_item(Item={"PK": "DECK#1", "SK": sk, "n": 1})
+    table.put_item(Item={"PK": "DECK#2", "SK": "DO#9"})
+
+    dos = table.query(KeyConditionExpression=Key("PK").eq("DECK#1") & Key("SK").begins_with("DO#"))
+    assert [item["SK"] for item in dos["Items"]] == ["DO#1", "DO#2", "DO#3"]
+    assert dos["Items"][0]["n"] == Decimal(1)
+
+    tail = table.query(KeyConditionExpression=Key("PK").eq("DECK#1") & Key("SK").gte("DECK"))
+    assert [item["SK"] for item in tail["Items"]] == ["DECK", "DO#1", "DO#2", "DO#3"]
+
+    first = table.query(KeyConditionExpression=Key("PK").eq("DECK#1"), Limit=2, ScanIndexForward=False)
+    assert [item["SK"] for item in first["Items"]] == ["DO#3", "DO#2"]
+    second = table.query(
+        KeyConditionExpression=Key("PK").eq("DECK#1"),
+        ScanIndexForward=False,
+        ExclusiveStartKey=first["LastEvaluatedKey"],
+    )
+    assert [item["SK"] for item in second["Items"]] == ["DO#1", "DECK", "COLLAB#a"]
+    assert "LastEvaluatedKey" not in second
+
+    count = table.query(KeyConditionExpression=Key("PK").eq("DECK#1"), Select="COUNT")
+    assert count["Count"] == 5 and "Items" not in count
+
+
+def test_conditions_updates_and_return_values():
+    table = _table()
+    table.put_item(Item={"PK": "A", "SK": "B", "count": 1, "tags": {"x"}}, ConditionExpression="attribute_not_exists(PK)")
+    with pytest.raises(ClientError) as info:
+        table.put_item(Item={"PK": "A", "SK": "B"}, ConditionExpression=Attr("PK").not_exists())
+    assert _code(info) == "ConditionalCheckFailedException"
+
+    result = table.update_item(
+        Key={"PK": "A", "SK": "B"},
+        UpdateExpression="SET #t = :t, nested = if_not_exists(nested, :m) ADD #c :one, tags :more REMOVE missing",
+        ConditionExpression="#c < :limit AND size(tags) = :one",
+        ExpressionAttributeNames={"#t": "text", "#c": "count"},
+        ExpressionAttributeValues={":t": "hi", ":one": 1, ":limit": 5, ":more": {"y"}, ":m": {"k": "v"}},
+        ReturnValues="ALL_NEW",
+    )
+    assert result["Attributes"]["count"] == 2
+    assert result["Attributes"]["tags"] == {"x", "y"}
+    assert result["Attributes"]["nested"] == {"k": "v"}
+
+    with pytest.raises(ClientError) as info:
+        table.update_item(
+            Key={"PK": "A", "SK": "B"},
+            UpdateExpression="SET #c = :v",
+            ConditionExpression="#c = :v",
+            ExpressionAttributeNames={"#c": "count"},
+            ExpressionAttributeValues={":v": 9},
+            ReturnValuesOnConditionCheckFailure="ALL_OLD",
+        )
+    assert info.value.response["Item"]["count"] == {"N": "2"}
+
+    with pytest.raises(ClientError) as info:
+        table.update_item(Key={"PK": "A", "SK": "B"}, UpdateExpression="SET SK = :v", ExpressionAttributeValues={":v": "C"})
+    assert _code(info) == "ValidationException"
+
+    with pytest.raises(ClientError) as info:
+        table.put_item(Item={"PK": "A", "SK": "C", "score": 1.5})
+    assert _code(info) == "ValidationException"
+
+
+def test_transactions_are_all_or_nothing():
+    table = _table()
+    client = table.meta.client
+    table.put_item(Item={"PK": "A", "SK": "1", "v": 1})
+
+    with pytest.raises(ClientError) as info:
+        client.transact_write_items(
+            TransactItems=[
+                {"Put": {"TableName": "Test", "Item": {"PK": "A", "SK": "2"}}},
+                {
+                    "Update": {
+                        "TableName": "Test",
+                        "Key": {"PK": "A", "SK": "1"},
+                        "UpdateExpression": "SET v = :two",
+                        "ConditionExpression": "v = :two",
+                        "ExpressionAttributeValues": {":two": 2},
+                    }
+                },
+            ]
+        )
+    assert _code(info) == "TransactionCanceledException"
+    assert [reason["Code"] for reason in info.value.response["CancellationReasons"]] == ["None", "ConditionalCheckFailed"]
+    assert "Item" not in table.get_item(Key={"PK": "A", "SK": "2"})
+
+    client.transact_write_items(
+        TransactItems=[
+            {"Put": {"TableName": "Test", "Item": {"PK": "A", "SK": "2"}}},
+            {"Delete": {"TableName": "Test", "Key": {"PK": "A", "SK": "1"}}},
+        ]
+    )
+    assert [item["SK"] for item in table.scan()["Items"]] == ["2"]
+
+
+def test_sparse_global_secondary_index():
+    table = _table(ByStatus=("GSI1PK", "GSI1SK"))
+    table.put_item(Item={"PK": "D", "SK": "1", "GSI1PK": "OPEN", "GSI1SK": "b"})
+    table.put_item(Item={"PK": "D", "SK": "2", "GSI1PK": "OPEN", "GSI1SK": "a"})
+    table.put_item(Item={"PK": "D", "SK": "3"})
+
+    page = table.query(IndexName="ByStatus", KeyConditionExpression=Key("GSI1PK").eq("OPEN"), Limit=1)
+    assert [item["SK"] for item in page["Items"]] == ["2"]
+    rest = table.query(
+        IndexName="ByStatus",
+        KeyConditionExpression=Key("GSI1PK").eq("OPEN"),
+        ExclusiveStartKey=page["LastEvaluatedKey"],
+    )
+    assert [item["SK"] for item in rest["Items"]] == ["1"]
+
+    table.update_item(Key={"PK": "D", "SK": "1"}, UpdateExpression="REMOVE GSI1PK, GSI1SK")
+    assert table.query(IndexName="ByStatus", KeyConditionExpression=Key("GSI1PK").eq("OPEN"))["Count"] == 1
+
+    with pytest.raises(ClientError):
+        table.query(IndexName="ByStatus", KeyConditionExpression=Key("GSI1PK").eq("OPEN"), ConsistentRead=True)
+
+
+def test_segmented_scan_covers_every_item_once():
+    table = _table()
+    with table.batch_writer() as batch:
+        for n in range(60):
+            batch.put_item(Item={"PK": f"P#{n % 13}", "SK": f"S#{n}"})
+    seen = []
+    for segment in range(4):
+        kwargs = {"Segment": segment, "TotalSegments": 4, "Limit": 7}
+        while True:
+            page = table.scan(**kwargs)
+            seen.extend(item["SK"] for item in page["Items"])
+            if "LastEvaluatedKey" not in page:
+                break
+            kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+    assert sorted(seen) == sorted(f"S#{n}" for n in range(60))
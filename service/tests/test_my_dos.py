@@ -0,0 +1,77 @@
+from typing import Dict
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def _deck(test_client, token, name):
+    return test_client.post("/v1/decks", json={"name": name}, headers=auth_header(token)).json()["deckId"]
+
+
+def _do(test_client, token, deck_id, text):
+    return test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": text}, headers=auth_header(token)).json()["doId"]
+
+
+def _texts(page):
+    return [item["text"] for item in page["items"]]
+
+
+def test_open_dos_merge_across_owned_and_shared_decks(test_client, token_factory, monkeypatch):
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    owner = token_factory("auth0|mine", "mine@example.com")
+    friend = token_factory("auth0|friend", "friend@example.com")
+    mine = _deck(test_client, owner, "Mine")
+    theirs = _deck(test_client, friend, "Theirs")
+    test_client.post(f"/v1/decks/{theirs}/collaborators", json={"email": "mine@example.com"}, headers=auth_header(friend))
+    _deck(test_client, friend, "Private")
+
+    for n in range(6):
+        deck_id, token = (mine, owner) if n % 2 == 0 else (theirs, friend)
+        do_id = _do(test_client, token, deck_id, f"do {n}")
+        if n == 4:
+            test_client.patch(f"/v1/decks/{deck_id}/dos/{do_id}", json={"completed": True}, headers=auth_header(token))
+
+    first = test_client.get("/v1/dos", params={"limit": 3}, headers=auth_header(owner)).json()
+    assert _texts(first) == ["do 0", "do 1", "do 2"]
+    second = test_client.get(
+        "/v1/dos", params={"limit": 3, "cursor": first["nextCursor"]}, headers=auth_header(owner)
+    ).json()
+    assert _texts(second) == ["do 3", "do 5"]
+    assert second["nextCursor"] is None
+
+    done = test_client.get("/v1/dos", params={"completed": "true"}, headers=auth_header(owner)).json()
+    assert _texts(done) == ["do 4"]
+    assert test_client.get("/v1/dos", params={"cursor": "bogus"}, headers=auth_header(owner)).status_code == 400
+
+
+def test_cached_view_is_invalidated_by_writes_and_shares(test_client, token_factory, monkeypatch):
+    from src import repository
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    owner = token_factory("auth0|mine", "mine@example.com")
+    friend = token_factory("auth0|friend", "friend@example.com")
+    mine = _deck(test_client, owner, "Mine")
+    first = _do(test_client, owner, mine, "first")
+    assert _texts(test_client.get("/v1/dos", headers=auth_header(owner)).json()) == ["first"]
+
+    calls = []
+    original = repository.list_dos_across_decks
+    monkeypatch.setattr(
+        "src.api.v1.dos.list_dos_across_decks", lambda *args: calls.append(args) or original(*args)
+    )
+    assert _texts(test_client.get("/v1/dos", headers=auth_header(owner)).json()) == ["first"]
+    assert calls == []
+
+    test_client.patch(f"/v1/decks/{mine}/dos/{first}", json={"completed": True}, headers=auth_header(owner))
+    assert _texts(test_client.get("/v1/dos", headers=auth_header(owner)).json()) == []
+
+    theirs = _deck(test_client, friend, "Theirs")
+    _do(test_client, friend, theirs, "shared")
+    assert _texts(test_client.get("/v1/dos", headers=auth_header(owner)).json()) == []
+    test_client.post(f"/v1/decks/{theirs}/collaborators", json={"email": "mine@example.com"}, headers=auth_header(friend))
+    assert _texts(test_client.get("/v1/dos", headers=auth_header(owner)).json()) == ["shared"]
+    assert len(calls) == 2
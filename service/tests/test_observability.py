@@ -0,0 +1,85 @@
+import json
+import logging
+from typing import Dict, List
+
+import pytest
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+@pytest.fixture
+def captured():
+    from src.observability import access_logger, slow_call_logger
+
+    handler = ListHandler()
+    access_logger.addHandler(handler)
+    slow_call_logger.addHandler(handler)
+    yield handler.records
+    access_logger.removeHandler(handler)
+    slow_call_logger.removeHandler(handler)
+
+
+def test_access_log_has_route_status_latency_user_and_call_count(test_client, token_factory, captured):
+    from src.observability import user_hash
+
+    token = token_factory("auth0|logged", "logged@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Logged"}, headers=auth_header(token)).json()["deckId"]
+    captured.clear()
+
+    assert test_client.get(f"/v1/decks/{deck_id}", headers=auth_header(token)).status_code == 200
+    (record,) = [r for r in captured if r.name == "dodeck.access"]
+    fields = record.fields
+    assert fields["route"] == "/v1/decks/{deck_id}"
+    assert fields["status"] == 200
+    assert fields["latencyMs"] >= 0
+    assert fields["userHash"] == user_hash("auth0|logged")
+    assert "auth0|logged" not in json.dumps(fields)
+    assert fields["dynamodbCalls"] >= 1
+
+
+def test_slow_repository_call_logs_key_condition_and_pages(test_client, token_factory, captured, monkeypatch):
+    from src import repository
+    from src.settings import settings
+
+    token = token_factory("auth0|slowlog", "slowlog@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Slow"}, headers=auth_header(token)).json()["deckId"]
+    for n in range(3):
+        repository.create_do(deck_id, f"do {n}")
+    monkeypatch.setattr(settings, "slow_call_threshold_ms", 0)
+    captured.clear()
+
+    repository.list_dos(deck_id)
+    (record,) = [r for r in captured if r.name == "dodeck.slow_call"]
+    assert record.fields["operation"] == "list_dos"
+    assert record.fields["pagesRead"] == 1
+    assert record.fields["keyConditions"] == [f"(GSI1PK = DECK#{deck_id} AND begins_with(GSI1SK, POS#))"]
+
+
+def test_fast_repository_calls_are_not_logged(captured, monkeypatch):
+    from src import repository
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "slow_call_threshold_ms", 60_000)
+    repository.get_deck("missing")
+    assert [r for r in captured if r.name == "dodeck.slow_call"] == []
+
+
+def test_json_formatter_emits_one_object_per_line():
+    from src.observability import JsonFormatter
+
+    record = logging.LogRecord("dodeck.access", logging.INFO, __file__, 1, "request", None, None)
+    record.fields = {"route": "/healthz", "status": 200}
+    line = JsonFormatter().format(record)
+    assert "\n" not in line
+    assert json.loads(line)["route"] == "/healthz"
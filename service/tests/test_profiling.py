@@ -0,0 +1,137 @@
+from typing import Dict
+
+import pytest
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    monkeypatch.setattr(settings, "profiling_token", "profile-secret")
+    monkeypatch.setattr(settings, "profiling_sample_rate", 0.0)
+    monkeypatch.setattr(settings, "profiling_interval_seconds", 0.001)
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_max_files", 2)
+    return tmp_path
+
+
+def test_authorized_header_profiles_one_request(test_client, token_factory, profiling):
+    token = token_factory("auth0|prof", "prof@example.com")
+    headers = {**auth_header(token), "X-Dodeck-Profile": "profile-secret"}
+
+    response = test_client.post("/v1/decks", json={"name": "Profiled"}, headers=headers)
+    assert response.status_code == 201
+    name = response.headers["X-Dodeck-Profile-Id"]
+
+    admin = {"Authorization": "Bearer profile-secret"}
+    listing = test_client.get("/admin/profiles", headers=admin).json()["items"]
+    assert [item["name"] for item in listing] == [name]
+    assert listing[0]["path"] == "/v1/decks"
+    assert listing[0]["status"] == 201
+    assert listing[0]["trigger"] == "header"
+
+    profile = test_client.get(f"/admin/profiles/{name}", headers=admin).json()
+    assert set(profile) == {"request", "wall", "cpu"}
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in profile["wall"])
+
+
+def test_profile_covers_endpoint_code_and_serialization(test_client, token_factory, profiling, monkeypatch):
+    import time
+
+    from starlette.responses import JSONResponse
+
+    from src.api.v1 import decks
+
+    detail, render = decks._deck_to_detail, JSONResponse.render
+
+    def slow_detail(*args, **kwargs):
+        time.sleep(0.03)
+        return detail(*args, **kwargs)
+
+    def slow_render(self, content):
+        time.sleep(0.03)
+        return render(self, content)
+
+    monkeypatch.setattr(decks, "_deck_to_detail", slow_detail)
+    monkeypatch.setattr(JSONResponse, "render", slow_render)
+    token = token_factory("auth0|prof", "prof@example.com")
+    response = test_client.post(
+        "/v1/decks", json={"name": "Profiled"}, headers={**auth_header(token), "X-Dodeck-Profile": "profile-secret"}
+    )
+    profile = test_client.get(
+        f"/admin/profiles/{response.headers['X-Dodeck-Profile-Id']}", headers={"Authorization": "Bearer profile-secret"}
+    ).json()
+    # Endpoint code outside repository calls (on its worker thread) and rendering (on the event loop).
+    assert any("create_deck_endpoint" in line and "slow_detail" in line for line in profile["wall"])
+    assert any("slow_render" in line for line in profile["wall"])
+
+
+def test_requests_without_a_trigger_are_not_profiled(test_client, token_factory, profiling):
+    token = token_factory("auth0|prof", "prof@example.com")
+    test_client.get("/v1/decks", headers={**auth_header(token), "X-Dodeck-Profile": "wrong"})
+    response = test_client.get("/v1/decks", headers=auth_header(token))
+    assert "X-Dodeck-Profile-Id" not in response.headers
+    assert list(profiling.iterdir()) == []
+
+
+def test_profile_ring_is_bounded(test_client, token_factory, profiling, monkeypatch):
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "profiling_sample_rate", 1.0)
+    token = token_factory("auth0|prof", "prof@example.com")
+    for _ in range(4):
+        assert test_client.get("/v1/decks", headers=auth_header(token)).status_code == 200
+    files = sorted(path.name for path in profiling.iterdir())
+    assert len(files) == 2
+
+    listing = test_client.get("/admin/profiles", headers={"Authorization": "Bearer profile-secret"}).json()["items"]
+    assert [item["name"] for item in listing] == list(reversed(files))
+    assert {item["trigger"] for item in listing} == {"sampled"}
+
+
+def test_admin_endpoints_require_the_profiling_token(test_client, profiling, monkeypatch):
+    from src.settings import settings
+
+    assert test_client.get("/admin/profiles").status_code == 401
+    assert test_client.get("/admin/profiles/../../etc", headers={"Authorization": "Bearer profile-secret"}).status_code == 404
+    monkeypatch.setattr(settings, "profiling_enabled", False)
+    assert test_client.get("/admin/profiles", headers={"Authorization": "Bearer profile-secret"}).status_code == 404
+
+
+def test_sampler_reads_only_the_profiled_requests_threads():
+    import contextvars
+    import threading
+
+    from src.profiling import Sampler, _profiled, request_thread
+
+    sampler = Sampler(60)
+    attached, done = threading.Event(), threading.Event()
+
+    def profiled_work():
+        with request_thread():
+            attached.set()
+            done.wait(5)
+
+    def other_request():
+        done.wait(5)
+
+    token = _profiled.set(sampler)
+    context = contextvars.copy_context()
+    _profiled.reset(token)
+    threads = [threading.Thread(target=context.run, args=(profiled_work,)), threading.Thread(target=other_request)]
+    for thread in threads:
+        thread.start()
+    assert attached.wait(5)
+    sampler.sample()
+    done.set()
+    for thread in threads:
+        thread.join()
+
+    assert sampler.samples == 1
+    assert len(sampler.wall) == 1
+    assert "profiled_work" in next(iter(sampler.wall)) and "other_request" not in next(iter(sampler.wall))
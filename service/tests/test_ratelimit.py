@@ -0,0 +1,91 @@
+from typing import Dict
+
+import pytest
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+@pytest.fixture
+def tight_limits(monkeypatch):
+    from src import ratelimit
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_per_second", 0.5)
+    monkeypatch.setattr(settings, "rate_limit_burst", 3)
+    ratelimit.get_backend.cache_clear()
+    yield settings
+    ratelimit.get_backend.cache_clear()
+
+
+def test_in_memory_bucket_allows_burst_then_limits():
+    from src.ratelimit import InMemoryRateLimitBackend
+
+    backend = InMemoryRateLimitBackend()
+    results = [backend.take("USER#a", rate=1.0, burst=3) for _ in range(4)]
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert 0 < results[-1][1] <= 1.0
+    assert backend.take("USER#b", rate=1.0, burst=3)[0] is True
+
+
+def test_dynamodb_bucket_is_shared_through_the_table(dynamodb_table):
+    from src.ratelimit import DynamoDBRateLimitBackend
+
+    first = DynamoDBRateLimitBackend(dynamodb_table)
+    second = DynamoDBRateLimitBackend(dynamodb_table)
+    assert first.take("USER#shared", rate=0.5, burst=2)[0] is True
+    assert second.take("USER#shared", rate=0.5, burst=2)[0] is True
+    allowed, retry_after = first.take("USER#shared", rate=0.5, burst=2)
+    assert allowed is False
+    assert retry_after > 0
+
+
+def test_rate_limited_requests_get_429_and_are_counted(test_client, token_factory, tight_limits):
+    from src.ratelimit import RATE_LIMITED
+
+    token = token_factory("auth0|hammer", "hammer@example.com")
+    before = RATE_LIMITED.value()
+    statuses = [test_client.get("/v1/decks", headers=auth_header(token)).status_code for _ in range(4)]
+    assert statuses == [200, 200, 200, 429]
+
+    response = test_client.get("/v1/decks", headers=auth_header(token))
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert RATE_LIMITED.value() == before + 2
+
+    # Other users keep their own budget.
+    other = token_factory("auth0|polite", "polite@example.com")
+    assert test_client.get("/v1/decks", headers=auth_header(other)).status_code == 200
+
+    metrics = test_client.get("/metrics").text
+    assert "dodeck_rate_limited_total" in metrics
+
+
+def test_shed_probability_ramps_with_inflight_and_throttling(monkeypatch):
+    from src.loadshed import shed_probability
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "shed_inflight_soft_limit", 10)
+    monkeypatch.setattr(settings, "shed_inflight_hard_limit", 20)
+    monkeypatch.setattr(settings, "shed_throttle_ratio", 0.2)
+    monkeypatch.setattr(settings, "shed_min_attempts", 10)
+
+    assert shed_probability(5, 0.0, 0) == (0.0, None)
+    assert shed_probability(15, 0.0, 0) == (0.5, "inflight")
+    assert shed_probability(25, 0.0, 0) == (1.0, "inflight")
+    # Too few attempts to trust the ratio.
+    assert shed_probability(5, 0.9, 3) == (0.0, None)
+    probability, reason = shed_probability(5, 0.6, 50)
+    assert reason == "dynamodb_throttling"
+    assert probability == pytest.approx(0.5)
+
+
+def test_overload_returns_503_with_retry_after(test_client, monkeypatch):
+    from src import loadshed
+
+    monkeypatch.setattr(loadshed, "shed_probability", lambda *args: (1.0, "inflight"))
+    response = test_client.get("/v1/decks")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+    assert test_client.get("/healthz").status_code == 200
@@ -0,0 +1,129 @@
+from typing import Dict, Optional
+
+import pytest
+
+
+def auth_header(token: str, session: Optional[str] = None) -> Dict[str, str]:
+    headers = {"Authorization": token}
+    if session:
+        headers["X-Session-Token"] = session
+    return headers
+
+
+def _spy(monkeypatch, module, name, calls):
+    original = getattr(module, name)
+
+    def spy(*args, **kwargs):
+        calls.append((args, kwargs))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(module, name, spy)
+
+
+def _session_for(*deck_ids):
+    """A token as another worker would have issued it, without touching this process's caches."""
+    from src.session import Session
+
+    session = Session()
+    for deck_id in deck_ids:
+        session.note(f"deck:{deck_id}")
+    return session.token()
+
+
+def test_writes_issue_a_token_that_makes_later_reads_consistent(test_client, token_factory, monkeypatch):
+    from src.api.v1 import decks
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    token = token_factory("auth0|ryw", "ryw@example.com")
+    created = test_client.post("/v1/decks", json={"name": "Errands"}, headers=auth_header(token))
+    session = created.headers["x-session-token"]
+    deck_id = created.json()["deckId"]
+    added = test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": "milk"}, headers=auth_header(token, session))
+    session = added.headers["x-session-token"]
+    other = test_client.post("/v1/decks", json={"name": "Other"}, headers=auth_header(token)).json()["deckId"]
+
+    reads = []
+    _spy(monkeypatch, decks, "list_dos", reads)
+    _spy(monkeypatch, decks, "list_access_rows", reads)
+    response = test_client.get(f"/v1/decks/{deck_id}/dos", headers=auth_header(token, session))
+    assert [item["text"] for item in response.json()["items"]] == ["milk"]
+    assert "x-session-token" not in response.headers
+    assert reads[-1][1]["consistent"] is True
+    test_client.get(f"/v1/decks/{other}/dos", headers=auth_header(token, session))
+    assert reads[-1][1]["consistent"] is False
+    test_client.get(f"/v1/decks/{deck_id}/dos", headers=auth_header(token))
+    assert reads[-1][1]["consistent"] is False
+    test_client.get("/v1/decks", headers=auth_header(token, session))
+    assert reads[-1][0][-1] is True
+
+    # The consistent path reads the base table but answers like the indexes.
+    test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": "eggs"}, headers=auth_header(token))
+    test_client.patch(
+        f"/v1/decks/{deck_id}/dos/{added.json()['doId']}", json={"completed": True}, headers=auth_header(token)
+    )
+    for params in ({}, {"completed": "true"}, {"completed": "false"}, {"fields": "text"}):
+        fresh = test_client.get(f"/v1/decks/{deck_id}/dos", params=params, headers=auth_header(token, session)).json()
+        assert fresh == test_client.get(f"/v1/decks/{deck_id}/dos", params=params, headers=auth_header(token)).json()
+
+    # Expired or unreadable tokens are ignored.
+    monkeypatch.setattr(settings, "read_your_writes_seconds", 0.000001)
+    test_client.get(f"/v1/decks/{deck_id}/dos", headers=auth_header(token, session))
+    assert reads[-1][1]["consistent"] is False
+    assert test_client.get(f"/v1/decks/{deck_id}/dos", headers=auth_header(token, "%%not a token")).status_code == 200
+
+
+def test_cross_deck_page_merges_the_written_deck_read_consistently(test_client, token_factory, monkeypatch):
+    from src.api.v1 import dos
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    token = token_factory("auth0|ryw-many", "ryw-many@example.com")
+    deck_ids = [test_client.post("/v1/decks", json={"name": name}, headers=auth_header(token)).json()["deckId"] for name in "AB"]
+    for n in range(6):
+        test_client.post(f"/v1/decks/{deck_ids[n % 2]}/dos", json={"text": f"do {n}"}, headers=auth_header(token))
+
+    def pages(session=None):
+        texts, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = test_client.get("/v1/dos", params=params, headers=auth_header(token, session)).json()
+            texts.append([item["text"] for item in page["items"]])
+            cursor = page["nextCursor"]
+            if cursor is None:
+                return texts
+
+    expected = pages()
+    assert expected == [["do 0", "do 1"], ["do 2", "do 3"], ["do 4", "do 5"]]
+
+    calls = []
+    _spy(monkeypatch, dos, "list_dos_across_decks", calls)
+    assert pages() == expected
+    assert calls == []  # served from the view cache
+    session = _session_for(deck_ids[0])
+    assert pages(session) == expected
+    assert [args[-1] for args, _ in calls] == [{deck_ids[0]}] * 3
+
+
+def test_per_view_consistency_settings(test_client, token_factory, monkeypatch):
+    from src.api.v1 import decks
+    from src.settings import _consistency_modes, settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    token = token_factory("auth0|ryw-modes", "ryw-modes@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Modes"}, headers=auth_header(token)).json()["deckId"]
+    session = _session_for(deck_id)
+    calls = []
+    _spy(monkeypatch, decks, "list_dos", calls)
+    _spy(monkeypatch, decks, "get_deck_with_dos", calls)
+
+    monkeypatch.setattr(settings, "read_consistency", _consistency_modes("dos=strong, deck=eventual"))
+    test_client.get(f"/v1/decks/{deck_id}/dos", headers=auth_header(token))
+    assert calls[-1][1]["consistent"] is True
+    test_client.get(f"/v1/decks/{deck_id}", params={"include": "dos"}, headers=auth_header(token, session))
+    assert calls[-1][1]["consistent"] is False
+
+    monkeypatch.setattr(settings, "read_your_writes_seconds", 0.0)
+    assert "x-session-token" not in test_client.post("/v1/decks", json={"name": "Quiet"}, headers=auth_header(token)).headers
+    with pytest.raises(ValueError):
+        _consistency_modes("dos=linearizable")
@@ -0,0 +1,172 @@
+from typing import Dict
+
+import pytest
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_fails_fast_and_recovers_through_a_probe():
+    from src.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_ratio=0.5, min_calls=4, window_seconds=10, open_seconds=5, clock=clock)
+    for failed in (False, True, True, True):
+        breaker.before_call()
+        breaker.record(failed)
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_call()
+    assert info.value.retry_after == pytest.approx(5)
+
+    clock.now += 5
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time while half-open.
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record(False)
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_failed_probe_reopens_the_circuit():
+    from src.breaker import OPEN, CircuitBreaker
+
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_ratio=0.5, min_calls=2, window_seconds=10, open_seconds=5, clock=clock)
+    breaker.record(True)
+    breaker.record(True)
+    assert breaker.state == OPEN
+    clock.now += 6
+    breaker.before_call()
+    breaker.record(True)
+    assert breaker.state == OPEN
+
+
+def test_client_config_is_capped_by_the_remaining_budget(monkeypatch):
+    from src.dynamodb import _client_config, budget_tier
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "ddb_read_timeout_seconds", 2.0)
+    monkeypatch.setattr(settings, "ddb_connect_timeout_seconds", 1.0)
+    monkeypatch.setattr(settings, "ddb_max_attempts", 3)
+
+    assert budget_tier(None) is None
+    assert budget_tier(0.1) == 0.25
+    assert budget_tier(3.7) == 2.0
+
+    unbounded = _client_config(None)
+    assert (unbounded.read_timeout, unbounded.retries["max_attempts"]) == (2.0, 3)
+    tight = _client_config(0.5)
+    assert (tight.connect_timeout, tight.read_timeout, tight.retries["max_attempts"]) == (0.5, 0.5, 1)
+    roomy = _client_config(5.0)
+    assert (roomy.read_timeout, roomy.retries["max_attempts"]) == (2.0, 2)
+
+
+def test_pool_size_follows_worker_threads_and_gate_times_the_wait(monkeypatch):
+    import threading
+
+    from src import deadline
+    from src.dynamodb import (
+        BUDGET_TIERS,
+        DDB_CONNECTION_WAIT,
+        ConnectionGate,
+        DeadlineExceededError,
+        _client_config,
+        _create_resource,
+        connection_gate,
+    )
+    from src.settings import settings
+
+    tiers = (None,) + BUDGET_TIERS
+    monkeypatch.setattr(settings, "worker_threads", 12)
+    monkeypatch.setattr(settings, "ddb_max_pool_connections", 0)
+    assert sum(_client_config(tier).max_pool_connections for tier in tiers) == 12
+    monkeypatch.setattr(settings, "ddb_max_pool_connections", 40)
+    sizes = {tier: _client_config(tier).max_pool_connections for tier in tiers}
+    assert sum(sizes.values()) == 40 and sizes[None] == 6 and sizes[0.25] == 5
+
+    # Every tier's client holds its slots in the same gate.
+    shared = connection_gate()
+    shared.acquire()
+    _create_resource(0.25).meta.client.meta.events.emit("response-received.dynamodb.GetItem")
+    assert not shared._held.slot
+
+    gate = ConnectionGate(1)
+    waits, _ = DDB_CONNECTION_WAIT.snapshot()
+    gate.acquire()
+    waiter = threading.Thread(target=gate.acquire)
+    waiter.start()
+    waiter.join(0.05)
+    assert waiter.is_alive()
+    gate.release()
+    waiter.join(1)
+    assert not waiter.is_alive()
+    count, total = DDB_CONNECTION_WAIT.snapshot()
+    assert count == waits + 2 and total >= 0.04
+
+    # The waiter still holds the only slot, so a call with a spent budget gives up at once.
+    token = deadline.set_budget(0.01)
+    try:
+        with pytest.raises(DeadlineExceededError):
+            gate.acquire()
+    finally:
+        deadline.reset(token)
+
+
+def test_worker_threads_size_the_limiter_and_waits_are_recorded(test_client, token_factory):
+    import anyio.to_thread
+
+    from src.settings import settings
+    from src.threadpool import BUSY, THREAD_WAIT, WAITING
+
+    limit = test_client.portal.call(lambda: anyio.to_thread.current_default_thread_limiter().total_tokens)
+    assert limit == settings.worker_threads
+    before, _ = THREAD_WAIT.snapshot()
+    token = token_factory("auth0|threads", "threads@example.com")
+    assert test_client.get("/v1/decks", headers={"Authorization": token}).status_code == 200
+    assert THREAD_WAIT.snapshot()[0] == before + 1
+    assert BUSY.value() == WAITING.value() == 0
+
+    metrics = test_client.get("/metrics").text
+    assert f"dodeck_threadpool_threads {settings.worker_threads}" in metrics
+    assert "dodeck_threadpool_wait_seconds_count" in metrics
+
+
+def test_exhausted_deadline_fails_fast_with_504(test_client, token_factory, monkeypatch):
+    from src.settings import settings
+
+    token = token_factory("auth0|slow", "slow@example.com")
+    monkeypatch.setattr(settings, "request_deadline_seconds", 0.01)
+    response = test_client.get("/v1/decks", headers=auth_header(token))
+    assert response.status_code == 504
+    assert response.json() == {"error": "deadline_exceeded"}
+
+
+def test_open_circuit_returns_503_with_retry_after(test_client, token_factory):
+    from src.dynamodb import DDB_FAST_FAILURES, breaker
+
+    token = token_factory("auth0|breaker", "breaker@example.com")
+    before = DDB_FAST_FAILURES.value(reason="circuit_open")
+    breaker._open()
+    try:
+        response = test_client.get("/v1/decks", headers=auth_header(token))
+    finally:
+        breaker.window.clear()
+        breaker._transition("closed")
+    assert response.status_code == 503
+    assert response.json() == {"error": "dynamodb_unavailable"}
+    assert int(response.headers["Retry-After"]) >= 1
+    assert DDB_FAST_FAILURES.value(reason="circuit_open") == before + 1
+    assert test_client.get("/v1/decks", headers=auth_header(token)).status_code == 200
@@ -0,0 +1,119 @@
+from typing import Dict
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def _search(test_client, token, q, **params):
+    response = test_client.get("/v1/search", params={"q": q, **params}, headers=auth_header(token))
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _labels(page):
+    return [item.get("name") or item.get("text") for item in page["items"]]
+
+
+def test_tokens_and_grams():
+    from src.search import grams, matches, query_terms
+
+    assert grams("Milk, milk!") == {"mi": False, "mil": False, "milk": True}
+    assert query_terms("  Über-Groceries ") == ["über", "groceries"]
+    assert matches("gro mil", "Groceries: milk") and not matches("eggs", "Groceries: milk")
+
+
+def test_search_ranks_pages_and_follows_writes(test_client, token_factory, monkeypatch):
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    owner = token_factory("auth0|seek", "seek@example.com")
+    friend = token_factory("auth0|seekfriend", "seekfriend@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Groceries"}, headers=auth_header(owner)).json()["deckId"]
+    other = test_client.post("/v1/decks", json={"name": "Work"}, headers=auth_header(owner)).json()["deckId"]
+
+    def create(deck, text):
+        return test_client.post(f"/v1/decks/{deck}/dos", json={"text": text}, headers=auth_header(owner)).json()["doId"]
+
+    milk = create(deck_id, "buy milk")
+    create(deck_id, "milkshake for the groceries party")
+    create(other, "email the grocer about milk deliveries")
+    create(other, "unrelated")
+
+    page = _search(test_client, owner, "milk")
+    assert _labels(page) == ["buy milk", "email the grocer about milk deliveries", "milkshake for the groceries party"]
+    assert page["items"][0]["type"] == "do" and page["items"][0]["deckId"] == deck_id
+    assert _labels(_search(test_client, owner, "gro")) == [
+        "Groceries",
+        "milkshake for the groceries party",
+        "email the grocer about milk deliveries",
+    ]
+    assert _labels(_search(test_client, owner, "groc milk")) == [
+        "email the grocer about milk deliveries",
+        "milkshake for the groceries party",
+    ]
+
+    first = _search(test_client, owner, "milk", limit=2)
+    second = _search(test_client, owner, "milk", limit=2, cursor=first["nextCursor"])
+    assert _labels(first) + _labels(second) == _labels(page) and second["nextCursor"] is None
+
+    test_client.patch(f"/v1/decks/{deck_id}/dos/{milk}", json={"text": "buy oat drink"}, headers=auth_header(owner))
+    test_client.patch(f"/v1/decks/{deck_id}", json={"name": "Shopping"}, headers=auth_header(owner))
+    assert "buy milk" not in _labels(_search(test_client, owner, "milk"))
+    assert _labels(_search(test_client, owner, "oat")) == ["buy oat drink"]
+    assert _labels(_search(test_client, owner, "shop")) == ["Shopping"]
+
+    assert _search(test_client, friend, "oat")["items"] == []
+    test_client.post(f"/v1/decks/{deck_id}/collaborators", json={"email": "seekfriend@example.com"}, headers=auth_header(owner))
+    assert _labels(_search(test_client, friend, "oat")) == ["buy oat drink"]
+    test_client.delete(f"/v1/decks/{deck_id}/dos/{milk}", headers=auth_header(owner))
+    assert _search(test_client, friend, "oat")["items"] == []
+
+    test_client.delete(f"/v1/decks/{other}", headers=auth_header(owner))
+    assert _labels(_search(test_client, owner, "milk")) == ["milkshake for the groceries party"]
+    assert test_client.get("/v1/search", params={"q": "milk", "cursor": "x"}, headers=auth_header(owner)).status_code == 400
+
+
+def test_reindex_backfills_items_written_before_search(test_client, token_factory, dynamodb_table):
+    from src.tools import reindex_decks
+
+    token = token_factory("auth0|seek", "seek@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Legacy"}, headers=auth_header(token)).json()["deckId"]
+    test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": "old words"}, headers=auth_header(token))
+    for item in dynamodb_table.scan()["Items"]:
+        if item["PK"].startswith("TOK#"):
+            dynamodb_table.delete_item(Key={"PK": item["PK"], "SK": item["SK"]})
+    assert _search(test_client, token, "words")["items"] == []
+
+    assert reindex_decks.main([]) == 0
+    assert _labels(_search(test_client, token, "words")) == ["old words"]
+    assert _labels(_search(test_client, token, "legacy")) == ["Legacy"]
+
+
+def test_postings_are_per_deck_and_pages_are_keyed_by_rank(test_client, token_factory, dynamodb_table, monkeypatch):
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    owner = token_factory("auth0|seek", "seek@example.com")
+    friend = token_factory("auth0|seekfriend", "seekfriend@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Pantry"}, headers=auth_header(owner)).json()["deckId"]
+    for text in ("rice", "rice noodles", "rice noodles and beans"):
+        test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": text}, headers=auth_header(owner))
+
+    def postings():
+        return sorted((item["PK"], item["SK"]) for item in dynamodb_table.scan()["Items"] if item["PK"].startswith("TOK#"))
+
+    before = postings()
+    assert all(pk.startswith(f"TOK#DECK#{deck_id}#") for pk, _ in before)
+    test_client.post(f"/v1/decks/{deck_id}/collaborators", json={"email": "seekfriend@example.com"}, headers=auth_header(owner))
+    assert postings() == before
+    assert _labels(_search(test_client, friend, "rice")) == ["rice", "rice noodles", "rice noodles and beans"]
+
+    # A better hit written between pages neither shifts nor repeats the next page.
+    first = _search(test_client, owner, "rice", limit=1)
+    test_client.post("/v1/decks", json={"name": "Rice"}, headers=auth_header(owner))
+    rest = _search(test_client, owner, "rice", limit=5, cursor=first["nextCursor"])
+    assert _labels(first) + _labels(rest) == ["rice", "rice noodles", "rice noodles and beans"]
+
+    monkeypatch.setattr(settings, "search_max_postings", 1)
+    assert len(_search(test_client, owner, "rice")["items"]) == 2  # one posting from each deck
@@ -0,0 +1,50 @@
+import random
+from typing import Dict
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+ARGS = ["--users", "4", "--heavy-sharers", "0.5", "--heavy-share-size", "2", "--dos-median", "2", "--dos-max", "8", "--days", "10", "--decks-max", "3"]
+
+
+def test_seeded_dataset_is_served_by_the_api(test_client, token_factory, dynamodb_table, monkeypatch):
+    from src.settings import settings
+    from src.tools import seed_dataset
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    assert seed_dataset.main(ARGS) == 0
+
+    items, kwargs = [], {}
+    while True:
+        page = dynamodb_table.scan(**kwargs)
+        items.extend(page["Items"])
+        if "LastEvaluatedKey" not in page:
+            break
+        kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+    decks = {item["deckId"]: item for item in items if item["SK"] == "DECK"}
+    dos = [item for item in items if item["SK"].startswith("DO#")]
+    assert decks and dos
+    assert any(deck["collaboratorCount"] for deck in decks.values())
+
+    # Same seed, same decks.
+    args = seed_dataset.build_parser().parse_args(ARGS)
+    regenerated = [item["deckId"] for item in seed_dataset.generate(args, random.Random(args.seed)) if item["SK"] == "DECK"]
+    assert sorted(regenerated) == sorted(decks)
+
+    for deck in decks.values():
+        token = token_factory(deck["ownerSub"], deck["ownerSub"].split("|")[1] + "@example.com")
+        detail = test_client.get(f"/v1/decks/{deck['deckId']}", headers=auth_header(token)).json()
+        assert detail["collaboratorCount"] == deck["collaboratorCount"] == len(detail["collaborators"])
+        listed = test_client.get(f"/v1/decks/{deck['deckId']}/dos", headers=auth_header(token)).json()["items"]
+        assert len(listed) == sum(1 for item in dos if item["deckId"] == deck["deckId"])
+        first_word = deck["name"].split()[0]
+        hits = test_client.get("/v1/search", params={"q": first_word}, headers=auth_header(token)).json()["items"]
+        assert deck["deckId"] in {hit["deckId"] for hit in hits}
+
+        for email in detail["collaborators"]:
+            member = token_factory("auth0|" + email.split("@")[0], email)
+            shared = test_client.get("/v1/decks", params={"visibility": "shared"}, headers=auth_header(member)).json()
+            assert deck["deckId"] in {item["deckId"] for item in shared["items"]}
+
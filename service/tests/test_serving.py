@@ -0,0 +1,95 @@
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def test_worker_count_follows_the_cpu_quota(tmp_path, monkeypatch):
+    from src import serve
+    from src.settings import settings
+
+    monkeypatch.setattr(serve.os, "sched_getaffinity", lambda pid: set(range(8)))
+    assert serve.available_cpus(tmp_path) == 8
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+    assert serve.available_cpus(tmp_path) == 2
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert serve.available_cpus(tmp_path) == 8
+
+    monkeypatch.setattr(serve, "CGROUP_ROOT", tmp_path)
+    monkeypatch.setattr(settings, "web_concurrency", 0)
+    assert serve.worker_count() == 8
+    monkeypatch.setattr(settings, "web_concurrency", 3)
+    assert serve.worker_count() == 3
+    assert serve.worker_count(5) == 5
+
+
+def test_several_workers_need_a_shared_rate_limiter(tmp_path, monkeypatch):
+    from src import serve
+    from src.settings import settings
+
+    monkeypatch.setenv("AUTH_CACHE_PATH", str(tmp_path / "auth.sqlite3"))
+    started = []
+    monkeypatch.setattr(serve.uvicorn, "run", lambda app, **options: started.append(options["workers"]))
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_backend", "memory")
+    monkeypatch.setattr(settings, "web_concurrency", 1)
+    assert serve.main([]) == 0
+    with pytest.raises(SystemExit):
+        serve.main(["--workers", "2"])
+
+    monkeypatch.setattr(settings, "rate_limit_backend", "dynamodb")
+    assert serve.main(["--workers", "2"]) == 0
+    assert started == [1, 2]
+
+
+def test_file_cache_is_shared_between_processes(tmp_path):
+    from src.authcache import FileCache
+
+    path = str(tmp_path / "auth.sqlite3")
+    script = f"from src.authcache import FileCache; FileCache({path!r}).set('jwks:x', {{'keys': [1]}}, 60)"
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=Path(__file__).resolve().parents[1])
+
+    cache = FileCache(path)
+    assert cache.get("jwks:x") == {"keys": [1]}
+    cache.set("gone", 1, -1)
+    assert cache.get("gone") is None
+    assert (Path(path).stat().st_mode & 0o777) == 0o600
+
+
+def test_workers_share_the_jwks_fetch_and_verified_tokens(test_client, token_factory, tmp_path, monkeypatch):
+    from src import security
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "auth_cache_path", str(tmp_path / "auth.sqlite3"))
+    monkeypatch.setattr(settings, "token_cache_ttl_seconds", 300.0)
+    fetches, decodes = [], []
+    fetch, decode = security._fetch_jwks, security.jwt.decode
+    monkeypatch.setattr(security, "_fetch_jwks", lambda issuer: fetches.append(issuer) or fetch(issuer))
+    monkeypatch.setattr(security.jwt, "decode", lambda *args, **kwargs: decodes.append(1) or decode(*args, **kwargs))
+    security.JWKS_CACHE.clear()
+    security.JWKS_EXPIRY.clear()
+
+    token = token_factory("auth0|workers", "workers@example.com", purpose="shared-cache")
+    for _ in range(3):
+        assert test_client.get("/v1/decks", headers=auth_header(token)).status_code == 200
+    assert len(fetches) == 1 and len(decodes) == 1
+
+    # Another worker starts with empty process caches but finds both entries on disk.
+    security.JWKS_CACHE.clear()
+    security.JWKS_EXPIRY.clear()
+    assert test_client.get("/v1/decks", headers=auth_header(token)).status_code == 200
+    other = token_factory("auth0|workers", "workers@example.com", purpose="second")
+    assert test_client.get("/v1/decks", headers=auth_header(other)).status_code == 200
+    assert len(fetches) == 1 and len(decodes) == 2
+
+    # A bad signature is never cached.
+    forged = token[:-4] + ("AAAA" if not token.endswith("AAAA") else "BBBB")
+    assert test_client.get("/v1/decks", headers=auth_header(forged)).status_code == 401
+    assert test_client.get("/v1/decks", headers=auth_header(forged)).status_code == 401
+    assert len(decodes) == 4
@@ -0,0 +1,62 @@
+import json
+from typing import Dict
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def _access_keys(table, prefix):
+    return {(item["PK"], item["SK"]) for item in table.scan()["Items"] if item["PK"].startswith(prefix)}
+
+
+def test_verifier_reports_then_repairs_drift(test_client, token_factory, dynamodb_table, tmp_path):
+    from src.tools import verify_access
+
+    owner = token_factory("auth0|keeper", "keeper@example.com")
+    deck_id = test_client.post("/v1/decks", json={"name": "Kept"}, headers=auth_header(owner)).json()["deckId"]
+    gone_id = test_client.post("/v1/decks", json={"name": "Gone"}, headers=auth_header(owner)).json()["deckId"]
+    for email in ("a@example.com", "b@example.com"):
+        test_client.post(f"/v1/decks/{deck_id}/collaborators", json={"email": email}, headers=auth_header(owner))
+    healthy = _access_keys(dynamodb_table, "ACCESS#")
+    assert verify_access.main(["--segments", "3"]) == 0
+
+    # A rename that stopped after its first chunk, a lost share row, a deleted deck's leftovers and a bad count.
+    dynamodb_table.update_item(
+        Key={"PK": f"DECK#{deck_id}", "SK": "DECK"},
+        UpdateExpression="SET #n = :name, nameLower = :lower, collaboratorCount = :count",
+        ExpressionAttributeNames={"#n": "name"},
+        ExpressionAttributeValues={":name": "Renamed", ":lower": "renamed", ":count": 5},
+    )
+    dynamodb_table.delete_item(Key={"PK": "ACCESS#EMAIL#b@example.com", "SK": f"DECK#kept#{deck_id}"})
+    dynamodb_table.delete_item(Key={"PK": f"DECK#{gone_id}", "SK": "DECK"})
+    dynamodb_table.put_item(
+        Item={"PK": "ACCESS#EMAIL#a@example.com", "SK": f"DECK#kept#{deck_id}x", "deckId": f"{deck_id}x"}
+    )
+    drifted = _access_keys(dynamodb_table, "ACCESS#")
+
+    assert verify_access.main(["--segments", "3"]) == 1
+    assert _access_keys(dynamodb_table, "ACCESS#") == drifted
+
+    checkpoint = tmp_path / "verify.json"
+    assert verify_access.main(["--segments", "3", "--repair", "--checkpoint", str(checkpoint)]) == 0
+    expected = {
+        ("ACCESS#USER#auth0|keeper", f"DECK#renamed#{deck_id}"),
+        ("ACCESS#EMAIL#a@example.com", f"DECK#renamed#{deck_id}"),
+        ("ACCESS#EMAIL#b@example.com", f"DECK#renamed#{deck_id}"),
+    }
+    assert _access_keys(dynamodb_table, "ACCESS#") == expected
+    assert len(healthy) == 4
+    deck = dynamodb_table.get_item(Key={"PK": f"DECK#{deck_id}", "SK": "DECK"})["Item"]
+    assert deck["collaboratorCount"] == 2
+    shared = test_client.get("/v1/decks", params={"visibility": "shared"}, headers=auth_header(token_factory("auth0|b", "b@example.com")))
+    assert [item["name"] for item in shared.json()["items"]] == ["Renamed"]
+
+    state = json.loads(checkpoint.read_text())
+    assert all(position["done"] for segments in state["passes"].values() for position in segments.values())
+    assert state["stats"]["stale_orphaned"] == 2 and state["stats"]["stale_renamed"] == 2
+
+    # A finished checkpoint resumes to nothing left to scan.
+    assert verify_access.main(["--segments", "3", "--repair", "--checkpoint", str(checkpoint)]) == 0
+    assert json.loads(checkpoint.read_text())["stats"] == state["stats"]
+    assert verify_access.main(["--segments", "3"]) == 0
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+import pytest
+
+
+def auth_header(token: str) -> Dict[str, str]:
+    return {"Authorization": token}
+
+
+def _new_do(test_client, token, text="draft"):
+    deck_id = test_client.post("/v1/decks", json={"name": "Typing"}, headers=auth_header(token)).json()["deckId"]
+    do = test_client.post(f"/v1/decks/{deck_id}/dos", json={"text": text}, headers=auth_header(token)).json()
+    return deck_id, do
+
+
+def test_rapid_patches_share_one_write(test_client, token_factory, monkeypatch):
+    from src import coalesce
+    from src.api.v1 import decks
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    monkeypatch.setattr(settings, "update_coalesce_window_ms", 300)
+    coalescer = coalesce.WriteCoalescer(0.3)
+    monkeypatch.setattr(decks, "get_coalescer", lambda: coalescer)
+    token = token_factory("auth0|typist", "typist@example.com")
+    deck_id, do = _new_do(test_client, token)
+    writes, saved = coalesce.COALESCED_WRITES.value(), coalesce.SAVED_WRITES.value()
+
+    bodies = [{"text": "final text "}, {"completed": True}, {"dueAt": "2026-04-01T12:00:00Z"}]
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        responses = list(
+            pool.map(
+                lambda body: test_client.patch(f"/v1/decks/{deck_id}/dos/{do['doId']}", json=body, headers=auth_header(token)),
+                bodies,
+            )
+        )
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    results = [response.json() for response in responses]
+    assert all(result == results[0] for result in results)
+    assert results[0]["text"] == "final text" and results[0]["completed"] is True
+    assert results[0]["dueAt"].startswith("2026-04-01T12:00:00")
+    assert coalesce.COALESCED_WRITES.value() - writes == 1
+    assert coalesce.SAVED_WRITES.value() - saved == 2
+
+    # Updates that change nothing are not written.
+    response = test_client.patch(f"/v1/decks/{deck_id}/dos/{do['doId']}", json={"completed": True}, headers=auth_header(token))
+    assert response.json()["updatedAt"] == results[0]["updatedAt"]
+    assert coalesce.COALESCED_WRITES.value() - writes == 1
+    missing = test_client.patch(f"/v1/decks/{deck_id}/dos/nope", json={"completed": True}, headers=auth_header(token))
+    assert missing.status_code == 404
+
+
+def test_conditional_update_detects_a_racing_write(test_client, token_factory, monkeypatch):
+    from src.repository import ConcurrentUpdateError, get_do, update_do
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    token = token_factory("auth0|racer", "racer@example.com")
+    deck_id, do = _new_do(test_client, token)
+    stale = get_do(deck_id, do["doId"], consistent=True)
+    update_do(dict(stale), "first", None)
+    with pytest.raises(ConcurrentUpdateError):
+        update_do(dict(stale), "second", None, expected_updated_at=stale["updatedAt"])
+    assert get_do(deck_id, do["doId"], consistent=True)["text"] == "first"
+
+
+def test_close_flushes_open_batches_and_then_writes_through():
+    from src.coalesce import WriteCoalescer
+
+    written = []
+
+    def write(key, changes):
+        written.append((key, dict(changes)))
+        return {"doId": key[1], **changes}, 1
+
+    coalescer = WriteCoalescer(30.0, write=write)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(asyncio.run(coalescer.submit(("d", "x"), {"text": "a"}))))
+    waiter.start()
+    while not coalescer._open:
+        time.sleep(0.001)
+    started = time.monotonic()
+    assert coalescer.close(timeout=5)
+    waiter.join(timeout=5)
+    assert time.monotonic() - started < 5
+    assert results == [{"doId": "x", "text": "a"}]
+
+    assert asyncio.run(coalescer.submit(("d", "x"), {"completed": True})) == {"doId": "x", "completed": True}
+    assert written == [(("d", "x"), {"text": "a"}), (("d", "x"), {"completed": True})]
+
+
+def test_every_submitter_records_the_write_in_its_own_session():
+    from src.coalesce import WriteCoalescer
+    from src.session import Session, _session, note_writes
+
+    writers = []
+
+    def write(key, changes):
+        # Like update_do, the write itself only notes the session of the request that flushes it.
+        writers.append(threading.current_thread())
+        note_writes([f"deck:{key[0]}"])
+        return {"doId": key[1], **changes}, 1
+
+    async def submit(coalescer, session, changes):
+        _session.set(session)
+        return await coalescer.submit(("d", "x"), changes)
+
+    async def concurrently(coalescer, sessions, bodies):
+        return await asyncio.gather(*(submit(coalescer, *pair) for pair in zip(sessions, bodies)))
+
+    sessions = [Session() for _ in range(3)]
+    bodies = [{"text": "a"}, {"completed": True}, {"dueAt": "2026-04-01T12:00:00Z"}]
+    results = asyncio.run(concurrently(WriteCoalescer(0.2, write=write), sessions, bodies))
+    assert results == [{"doId": "x", "text": "a", "completed": True, "dueAt": "2026-04-01T12:00:00Z"}] * 3
+    assert [set(session.written) for session in sessions] == [{"deck:d"}] * 3
+    # Submitters waited on the event loop; only the one write took a worker thread.
+    assert len(writers) == 1 and writers[0] is not threading.main_thread()
+
+    # A batch that changed nothing is not a write.
+    unchanged = Session()
+    asyncio.run(submit(WriteCoalescer(0.0, write=lambda key, changes: ({"doId": key[1]}, 0)), unchanged, {"text": "same"}))
+    assert unchanged.written == {}
@@ -13,6 +13,7 @@ export default function App() {
   const { loginWithRedirect, logout, isAuthenticated, getAccessTokenSilently, user } = useAuth0()
   const [decks, setDecks] = useState<any[]>([])
   const [search, setSearch] = useState("")
+  const [openDeck, setOpenDeck] = useState<any | null>(null)
   const apiBase = import.meta.env.VITE_API_BASE_URL
 
   useEffect(() => {
@@ -27,6 +28,14 @@ export default function App() {
     run()
   }, [isAuthenticated, search])
 
+  const openDeckById = async (deckId: string) => {
+    const token = await getAccessTokenSilently()
+    const url = new URL(`${apiBase}/v1/decks/${deckId}`)
+    url.searchParams.set('include', 'dos')
+    const res = await fetch(url.toString(), { headers: { Authorization: `Bearer ${token}` } })
+    if (res.ok) setOpenDeck(await res.json())
+  }
+
   if (!isAuthenticated) {
     return (
       <main className="min-h-screen flex items-center justify-center bg-gradient-to-br from-slate-900 to-slate-800">
@@ -61,7 +70,7 @@ export default function App() {
             />
             <ul className="space-y-1">
               {decks.map((d, i) => (
-                <li key={i} className="rounded-lg px-3 py-2 hover:bg-white/10 cursor-pointer">
+                <li key={i} className="rounded-lg px-3 py-2 hover:bg-white/10 cursor-pointer" onClick={() => openDeckById(d.deckId)}>
                   {d.name || "Example Deck"}
                 </li>
               ))}
@@ -70,19 +79,23 @@ export default function App() {
           </div>
         </GlassContainer>
 
-        {/* Right: Dos placeholder */}
+        {/* Right: Dos of the open deck */}
         <GlassContainer>
           <div className="flex items-center justify-between mb-3">
-            <h2 className="text-xl font-semibold">Dos</h2>
+            <h2 className="text-xl font-semibold">{openDeck?.name ?? "Dos"}</h2>
             <button className="rounded-lg px-3 py-1 bg-white/20 hover:bg-white/30">+ Add Do</button>
           </div>
           <ul className="space-y-2">
-            <li className="rounded-lg px-3 py-2 bg-white/5 border border-white/10 line-through text-white/60">
-              Example completed Do
-            </li>
-            <li className="rounded-lg px-3 py-2 bg-white/5 border border-white/10">
-              Example active Do
-            </li>
+            {(openDeck?.dos ?? []).map((item: any) => (
+              <li
+                key={item.doId}
+                className={`rounded-lg px-3 py-2 bg-white/5 border border-white/10 ${item.completed ? "line-through text-white/60" : ""}`}
+              >
+                {item.text}
+              </li>
+            ))}
+            {!openDeck && <li className="text-white/50">Select a deck.</li>}
+            {openDeck && !openDeck.dos?.length && <li className="text-white/50">No dos yet.</li>}
           </ul>
           <div className="mt-6 text-right">
             <button className="rounded-lg px-3 py-1 bg-white/20 hover:bg-white/30"